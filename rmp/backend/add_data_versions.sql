@@ -0,0 +1,12 @@
+-- Migration: Add version counters for reference data (used to build ETags)
+-- Triggers on teams and Schedule (migrate.py, VersionTriggers) bump the
+-- matching counter on every insert, update and delete.
+
+CREATE TABLE data_versions (
+    name VARCHAR(50) PRIMARY KEY,
+    version INT NOT NULL DEFAULT 0
+);
+
+INSERT INTO data_versions (name, version) VALUES
+('teams', 1),
+('schedule', 1);
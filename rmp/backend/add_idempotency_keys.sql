@@ -0,0 +1,14 @@
+-- Migration: Idempotency keys and the responses they replay, shared by every API worker (idempotency.py)
+
+CREATE TABLE idempotency_keys (
+    id CHAR(64) PRIMARY KEY, -- SHA-256 of the caller's credentials and Idempotency-Key
+    request_hash CHAR(64) NOT NULL,
+    status INT, -- NULL while the first request is running
+    headers TEXT, -- JSON
+    body LONGBLOB,
+    created_at DATETIME,
+    expires_at DATETIME NOT NULL
+);
+
+-- Expired keys are deleted oldest first
+CREATE INDEX idx_idempotency_keys_expires_at ON idempotency_keys(expires_at);
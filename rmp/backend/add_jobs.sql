@@ -0,0 +1,22 @@
+-- Migration: Add the jobs table used by the background job runner (jobs.py)
+
+CREATE TABLE jobs (
+    id CHAR(36) PRIMARY KEY,
+    kind VARCHAR(50) NOT NULL,
+    args TEXT, -- JSON
+    status VARCHAR(10) NOT NULL DEFAULT 'queued', -- queued, running, done, failed
+    attempts INT NOT NULL DEFAULT 0,
+    max_attempts INT NOT NULL DEFAULT 5,
+    run_at DATETIME NOT NULL,
+    locked_by VARCHAR(100),
+    locked_at DATETIME,
+    result TEXT, -- JSON
+    error TEXT,
+    created_by CHAR(36),
+    created_at DATETIME,
+    updated_at DATETIME,
+    finished_at DATETIME
+);
+
+-- Workers claim the oldest due job in a given status
+CREATE INDEX idx_jobs_status_run_at ON jobs(status, run_at);
@@ -0,0 +1,19 @@
+-- Migration: In-app notifications written by the notification jobs (notifications.py)
+
+CREATE TABLE notifications (
+    id CHAR(36) PRIMARY KEY,
+    user_id CHAR(36) NOT NULL,
+    kind VARCHAR(50) NOT NULL, -- deadline_reminder, week_results
+    dedupe_key VARCHAR(100) NOT NULL,
+    title VARCHAR(255) NOT NULL,
+    body TEXT,
+    created_at DATETIME,
+    read_at DATETIME,
+    FOREIGN KEY (user_id) REFERENCES users(id)
+);
+
+-- Lets a retried send skip users it already notified
+CREATE UNIQUE INDEX idx_notifications_user_key ON notifications(user_id, dedupe_key);
+
+-- A user's notification list, newest first
+CREATE INDEX idx_notifications_user_created ON notifications(user_id, created_at);
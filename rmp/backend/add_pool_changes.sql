@@ -0,0 +1,16 @@
+-- Migration: Add per-pool change versions and change log for incremental sync
+
+ALTER TABLE pools ADD COLUMN change_version INT DEFAULT 0;
+ALTER TABLE pools ADD COLUMN compacted_version INT DEFAULT 0;
+
+CREATE TABLE pool_changes (
+    pool_id CHAR(36) NOT NULL,
+    version INT NOT NULL,
+    kind VARCHAR(10) NOT NULL, -- entry, pick, pool
+    object_id CHAR(36) NOT NULL,
+    op VARCHAR(10) NOT NULL, -- upsert, delete
+    user_id CHAR(36),
+    created_at DATETIME,
+    PRIMARY KEY (pool_id, version),
+    FOREIGN KEY (pool_id) REFERENCES pools(id)
+);
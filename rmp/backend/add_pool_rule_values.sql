@@ -0,0 +1,4 @@
+-- Migration: A pool's own value for a rule it has chosen (rules.py)
+-- NULL keeps the rule's default_value
+
+ALTER TABLE pool_rules ADD COLUMN value VARCHAR(25);
@@ -0,0 +1,23 @@
+-- Migration: Seasons on pools and picks, and an archive for earlier seasons' picks (seasons.py, archive.py)
+-- Runs on every database holding pools: the primary and each shard
+
+ALTER TABLE pools ADD COLUMN season INT;
+ALTER TABLE picks ADD COLUMN season INT;
+
+-- Picks of completed seasons, moved here by the archive job
+CREATE TABLE picks_archive (
+    id CHAR(36) PRIMARY KEY,
+    entry_id CHAR(36),
+    week INT,
+    team VARCHAR(255),
+    team_id INT,
+    locked BOOLEAN DEFAULT FALSE,
+    result VARCHAR(10),
+    season INT,
+    created_at DATETIME,
+    updated_at DATETIME,
+    archived_at DATETIME
+);
+
+-- An entry's pick history
+CREATE INDEX idx_picks_archive_entry_week ON picks_archive(entry_id, week);
@@ -0,0 +1,7 @@
+-- Migration: Shard map, the database each pool's entries and picks live on (sharding.py)
+
+CREATE TABLE pool_shards (
+    pool_id CHAR(36) PRIMARY KEY,
+    shard VARCHAR(50) NOT NULL,
+    created_at DATETIME
+);
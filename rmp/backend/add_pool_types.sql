@@ -0,0 +1,7 @@
+-- Migration: Pool formats, and confidences on picks (rules.py)
+-- Runs on every database holding pools: the primary and each shard
+
+-- NULL is survivor, the format of every pool created before this
+ALTER TABLE pools ADD COLUMN pool_type VARCHAR(50);
+ALTER TABLE picks ADD COLUMN confidence INT;
+ALTER TABLE picks_archive ADD COLUMN confidence INT;
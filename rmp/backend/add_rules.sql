@@ -0,0 +1,20 @@
+-- Migration: Pool format rules, for databases created before rules had models (rules.py)
+-- datamodel.sql has always had these tables; this creates them elsewhere
+
+CREATE TABLE rules (
+    id VARCHAR(36) PRIMARY KEY,
+    pool_type VARCHAR(50),
+    rule_text VARCHAR(255),
+    rule_type VARCHAR(25),
+    default_value VARCHAR(25),
+    enabled_by_default BOOLEAN
+);
+
+CREATE TABLE pool_rules (
+    pool_id VARCHAR(36),
+    rule_id VARCHAR(36),
+    value VARCHAR(25),
+    PRIMARY KEY (pool_id, rule_id),
+    FOREIGN KEY (pool_id) REFERENCES pools(id),
+    FOREIGN KEY (rule_id) REFERENCES rules(id)
+);
@@ -0,0 +1,16 @@
+-- Migration: Seasons on the schedule, and an archive for aged audit logs (seasons.py, archive.py)
+-- ADD COLUMN of a nullable column is an instant, online change on MySQL 8
+
+ALTER TABLE Schedule ADD COLUMN season INT;
+
+-- Audit logs older than AUDIT_LOG_RETENTION_DAYS, moved here by the archive job
+CREATE TABLE audit_logs_archive (
+    id CHAR(36) PRIMARY KEY,
+    user_id CHAR(36),
+    action VARCHAR(255),
+    details TEXT,
+    created_at DATETIME,
+    archived_at DATETIME
+);
+
+CREATE INDEX idx_audit_logs_archive_created_at ON audit_logs_archive(created_at);
@@ -0,0 +1,18 @@
+-- Migration: Server-side login sessions, revocable before their token expires (auth_sessions.py)
+
+CREATE TABLE sessions (
+    id CHAR(36) PRIMARY KEY, -- the token's sid claim
+    user_id CHAR(36) NOT NULL,
+    created_at DATETIME,
+    last_seen_at DATETIME,
+    expires_at DATETIME,
+    revoked_at DATETIME,
+    user_agent VARCHAR(255),
+    ip_address VARCHAR(45),
+    FOREIGN KEY (user_id) REFERENCES users(id)
+);
+
+CREATE INDEX idx_sessions_user_id ON sessions(user_id);
+
+-- Workers poll for sessions revoked since their last poll
+CREATE INDEX idx_sessions_revoked_at ON sessions(revoked_at);
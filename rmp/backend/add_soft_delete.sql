@@ -0,0 +1,9 @@
+-- Migration: Soft deletes for users, pools and entries, purged in the background (deletion.py)
+-- ADD COLUMN of a nullable column is an instant, online change on MySQL 8
+
+ALTER TABLE users ADD COLUMN deleted_at DATETIME;
+ALTER TABLE pools ADD COLUMN deleted_at DATETIME;
+ALTER TABLE entries ADD COLUMN deleted_at DATETIME;
+
+-- Progress reported by long-running jobs such as purges
+ALTER TABLE jobs ADD COLUMN progress TEXT;
@@ -0,0 +1,204 @@
+import json
+import math
+import os
+import time
+from collections import OrderedDict
+
+from jose import JWTError, jwt
+
+import deps
+
+CRITICAL = "critical"
+NORMAL = "normal"
+LOW = "low"
+
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() in ("1", "true", "yes")
+ADMISSION_MAX_IN_FLIGHT = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", 200))
+# Share of in-flight capacity that only critical requests may use
+ADMISSION_CRITICAL_RESERVE = float(os.getenv("ADMISSION_CRITICAL_RESERVE", 0.25))
+# Share of in-flight capacity that low-priority requests may use
+ADMISSION_LOW_SHARE = float(os.getenv("ADMISSION_LOW_SHARE", 0.5))
+ADMISSION_MAX_CLIENTS = int(os.getenv("ADMISSION_MAX_CLIENTS", 50000))
+
+# (requests per second, burst) per client for each priority class
+ADMISSION_RATES = {
+    CRITICAL: (float(os.getenv("ADMISSION_CRITICAL_RATE", 5)), float(os.getenv("ADMISSION_CRITICAL_BURST", 20))),
+    NORMAL: (float(os.getenv("ADMISSION_NORMAL_RATE", 10)), float(os.getenv("ADMISSION_NORMAL_BURST", 40))),
+    LOW: (float(os.getenv("ADMISSION_LOW_RATE", 2)), float(os.getenv("ADMISSION_LOW_BURST", 10))),
+}
+
+# Pick writes and logins always get reserved capacity
+CRITICAL_ROUTES = {
+    ("POST", "/picks/create"),
+    ("POST", "/auth/login"),
+}
+CRITICAL_PREFIXES = (
+    ("PUT", "/picks/"),
+)
+# Listings and dashboard polling are the first thing shed under load
+LOW_PREFIXES = (
+    ("GET", "/messages"),
+    ("GET", "/audit"),
+    ("GET", "/users"),
+    ("GET", "/pools/my-pools"),
+    ("GET", "/entries/"),
+    ("GET", "/export/"),
+)
+EXEMPT_PATHS = {"/", "/health", "/health/ready", "/metrics", "/docs", "/openapi.json"}
+
+def classify(method: str, path: str) -> str:
+    if (method, path) in CRITICAL_ROUTES:
+        return CRITICAL
+    for route_method, prefix in CRITICAL_PREFIXES:
+        if method == route_method and path.startswith(prefix):
+            return CRITICAL
+    for route_method, prefix in LOW_PREFIXES:
+        if method == route_method and path.startswith(prefix):
+            return LOW
+    return NORMAL
+
+class TokenBucket:
+    __slots__ = ("tokens", "updated_at")
+
+    def __init__(self, burst: float, now: float):
+        self.tokens = burst
+        self.updated_at = now
+
+    def take(self, rate: float, burst: float, now: float) -> float:
+        """Take one token. Returns 0 on success, otherwise seconds until one is available."""
+        self.tokens = min(burst, self.tokens + (now - self.updated_at) * rate)
+        self.updated_at = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / rate if rate > 0 else 60.0
+
+class AdmissionController:
+    """
+    Per-client token buckets plus a global in-flight limit with capacity
+    reserved by priority class. Every check is O(1): one dict lookup, one
+    bucket refill and a couple of integer comparisons. Buckets are kept in
+    LRU order and capped at max_clients.
+    """
+
+    def __init__(self, max_in_flight: int = ADMISSION_MAX_IN_FLIGHT, critical_reserve: float = ADMISSION_CRITICAL_RESERVE,
+                 low_share: float = ADMISSION_LOW_SHARE, rates: dict = ADMISSION_RATES,
+                 max_clients: int = ADMISSION_MAX_CLIENTS):
+        self.rates = rates
+        self.max_clients = max_clients
+        self.limits = {
+            CRITICAL: max_in_flight,
+            NORMAL: max(1, int(max_in_flight * (1 - critical_reserve))),
+            LOW: max(1, int(max_in_flight * low_share)),
+        }
+        self.in_flight = 0
+        self._buckets = OrderedDict()
+        self.counters = {
+            priority: {"admitted": 0, "rate_limited": 0, "shed": 0}
+            for priority in (CRITICAL, NORMAL, LOW)
+        }
+
+    def admit(self, client: str, priority: str):
+        """
+        Returns (status, retry_after). status is 200 when the request may
+        proceed, 429 when the client is over its rate and 503 when the server
+        has no capacity left for this priority class.
+        """
+        now = time.monotonic()
+        key = (client, priority)
+        rate, burst = self.rates[priority]
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(burst, now)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+
+        wait = bucket.take(rate, burst, now)
+        if wait:
+            self.counters[priority]["rate_limited"] += 1
+            return 429, wait
+
+        if self.in_flight >= self.limits[priority]:
+            self.counters[priority]["shed"] += 1
+            return 503, 1.0
+
+        self.in_flight += 1
+        self.counters[priority]["admitted"] += 1
+        return 200, 0.0
+
+    def release(self):
+        self.in_flight -= 1
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "limits": dict(self.limits),
+            "tracked_clients": len(self._buckets),
+            "counters": {priority: dict(counts) for priority, counts in self.counters.items()},
+        }
+
+controller = AdmissionController()
+
+def _client_key(scope, headers: dict) -> str:
+    # Rate limits follow the user once their login token is verified: the
+    # signature and expiry are checked here, without a query, so a made-up
+    # token never gets a bucket of its own. Anything else, including every
+    # /auth/ request, is limited by the client's address. Behind a load
+    # balancer that address is only the real client's when uvicorn trusts
+    # the balancer's X-Forwarded-For (FORWARDED_ALLOW_IPS); otherwise every
+    # user shares the balancer's bucket.
+    client = scope.get("client")
+    address = "address:" + (client[0] if client else "anonymous")
+    if scope["path"].startswith("/auth/"):
+        return address
+    authorization = headers.get(b"authorization")
+    if not authorization:
+        return address
+    scheme, _, token = authorization.decode("latin-1").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return address
+    try:
+        payload = jwt.decode(token, deps.SECRET_KEY, algorithms=[deps.ALGORITHM])
+    except JWTError:
+        return address
+    # Password reset tokens are signed with the same key but are not logins
+    if not payload.get("sub") or payload.get("type") is not None:
+        return address
+    return "user:" + payload["sub"]
+
+class AdmissionMiddleware:
+    """ASGI middleware that sheds over-limit requests with 429/503 and Retry-After."""
+
+    def __init__(self, app, controller: AdmissionController = controller):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if not ADMISSION_ENABLED or scope["type"] != "http" or scope["method"] == "OPTIONS" \
+                or scope["path"] in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        priority = classify(scope["method"], scope["path"])
+        status, retry_after = self.controller.admit(_client_key(scope, dict(scope["headers"])), priority)
+        if status != 200:
+            detail = "Too many requests" if status == 429 else "Server is busy, please retry"
+            body = json.dumps({"detail": detail}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release()
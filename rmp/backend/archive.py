@@ -0,0 +1,156 @@
+"""
+Archival of completed seasons and aged audit logs, and the history API.
+
+The archive job moves every pick of a season before the current one (see
+seasons.py) into picks_archive, on every database holding pools, and every
+audit log older than AUDIT_LOG_RETENTION_DAYS into audit_logs_archive. Rows
+move ARCHIVE_CHUNK_SIZE at a time, each chunk copied and deleted in one
+transaction, so the job can be interrupted and retried at any point. Run it
+once a season has finished (POST /history/archive, super-admins only); it
+is also safe to run on a schedule, since it only moves what is due.
+
+Archived rows stay readable under /history.
+"""
+
+import os
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import literal, select
+from sqlalchemy.orm import Session
+
+import models
+import schemas
+import deps
+import jobs
+import seasons
+import sharding
+
+ARCHIVE_CHUNK_SIZE = int(os.getenv("ARCHIVE_CHUNK_SIZE", 1000))
+ARCHIVE_PAUSE_MS = float(os.getenv("ARCHIVE_PAUSE_MS", 20))
+AUDIT_LOG_RETENTION_DAYS = int(os.getenv("AUDIT_LOG_RETENTION_DAYS", 365))
+
+ARCHIVE = "archive"
+
+router = APIRouter(prefix="/history", tags=["history"])
+
+def _move_in_chunks(db: Session, job: models.Job, progress: dict, label: str, table, archive, criteria,
+                    bind_arguments: dict) -> int:
+    """Copy rows of table matching criteria into archive and delete them, ARCHIVE_CHUNK_SIZE per transaction."""
+    columns = [column.name for column in table.columns]
+    moved = 0
+    while True:
+        ids = db.execute(
+            select(table.c.id).where(criteria).order_by(table.c.id).limit(ARCHIVE_CHUNK_SIZE),
+            bind_arguments=bind_arguments
+        ).scalars().all()
+        if not ids:
+            return moved
+        db.execute(
+            archive.insert().from_select(
+                columns + ["archived_at"],
+                select(*table.c, literal(datetime.utcnow())).where(table.c.id.in_(ids))
+            ),
+            bind_arguments=bind_arguments
+        )
+        db.execute(table.delete().where(table.c.id.in_(ids)), bind_arguments=bind_arguments)
+        moved += len(ids)
+        progress[label] += len(ids)
+        jobs.report_progress(db, job, progress)
+        db.commit()
+        time.sleep(ARCHIVE_PAUSE_MS / 1000.0)
+
+@jobs.handler(ARCHIVE)
+def _archive_job(db: Session, job: models.Job):
+    season = seasons.current_season()
+    progress = {"current_season": season, "picks": 0, "audit_logs": 0}
+    picks = models.Pick.__table__
+    for bind_arguments in sharding.pool_databases():
+        _move_in_chunks(db, job, progress, "picks", picks, models.ArchivedPick.__table__,
+                        picks.c.season < season, bind_arguments)
+    audit_logs = models.AuditLog.__table__
+    cutoff = datetime.utcnow() - timedelta(days=AUDIT_LOG_RETENTION_DAYS)
+    _move_in_chunks(db, job, progress, "audit_logs", audit_logs, models.ArchivedAuditLog.__table__,
+                    audit_logs.c.created_at < cutoff, {})
+    return progress
+
+@router.post("/archive", status_code=202)
+def queue_archive(
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.require_super_admin)
+):
+    """Archive earlier seasons' picks and aged audit logs. Super-admins only."""
+    job = jobs.enqueue(db, ARCHIVE, user_id=current_user.id)
+    db.commit()
+    return {"job_id": job.id, "run_at": job.run_at}
+
+@router.get("/seasons")
+def list_seasons(db: Session = Depends(deps.get_read_db)):
+    """Every season on the schedule, newest first, and the current one."""
+    rows = db.query(models.Schedule.season).filter(models.Schedule.season.isnot(None)).distinct().all()
+    return {"current": seasons.current_season(), "seasons": sorted((row[0] for row in rows), reverse=True)}
+
+@router.get("/pools", response_model=List[schemas.PoolOut])
+def list_past_pools(
+    season: int = None,
+    db: Session = Depends(deps.get_read_db),
+    current_user: models.User = Depends(deps.get_current_user)
+):
+    """The current user's pools from earlier seasons, or from `season`."""
+    criteria = [models.Pool.owner_id == current_user.id]
+    criteria.append(models.Pool.season == season if season is not None
+                    else models.Pool.season < seasons.current_season())
+    pools = sharding.fan_out(db, lambda session: session.query(models.Pool).filter(*criteria))
+    return sorted(pools, key=lambda pool: (-(pool.season or 0), pool.name))
+
+@router.get("/entries/{entry_id}/picks", response_model=List[schemas.PickOut])
+def get_entry_history(
+    entry_id: str,
+    db: Session = Depends(deps.get_read_db),
+    current_user: models.User = Depends(deps.get_current_user)
+):
+    """All of an entry's picks, archived or not, by week."""
+    entry = db.query(models.Entry).filter(models.Entry.id == entry_id).first()
+    if not entry or (entry.user_id != current_user.id and current_user.role != models.UserRole.SUPER_ADMIN):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Entry not found or doesn't belong to you"
+        )
+    live = db.query(models.Pick).filter(models.Pick.entry_id == entry_id).all()
+    archived = db.query(models.ArchivedPick).filter(models.ArchivedPick.entry_id == entry_id).all()
+    return sorted(live + archived, key=lambda pick: pick.week or 0)
+
+@router.get("/pools/{pool_id}/picks", response_model=List[schemas.PickOut])
+def get_pool_history(
+    pool_id: str,
+    skip: int = 0,
+    limit: int = 1000,
+    db: Session = Depends(deps.get_read_db),
+    current_user: models.User = Depends(deps.require_pool_admin)
+):
+    """A pool's archived picks, by entry and week. Pool owners, pool admins and super-admins only."""
+    return db.query(models.ArchivedPick).join(
+        models.Entry, models.Entry.id == models.ArchivedPick.entry_id
+    ).filter(models.Entry.pool_id == pool_id).order_by(
+        models.ArchivedPick.entry_id, models.ArchivedPick.week
+    ).offset(skip).limit(limit).all()
+
+@router.get("/audit", response_model=List[schemas.ArchivedAuditLogOut])
+def list_archived_audit_logs(
+    since: datetime = None,
+    until: datetime = None,
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(deps.get_read_db),
+    current_user: models.User = Depends(deps.require_super_admin)
+):
+    """Archived audit logs, oldest first, optionally within [since, until). Super-admins only."""
+    query = db.query(models.ArchivedAuditLog)
+    if since is not None:
+        query = query.filter(models.ArchivedAuditLog.created_at >= since)
+    if until is not None:
+        query = query.filter(models.ArchivedAuditLog.created_at < until)
+    return query.order_by(models.ArchivedAuditLog.created_at, models.ArchivedAuditLog.id) \
+        .offset(skip).limit(limit).all()
@@ -8,5 +8,5 @@ from typing import List
 router = APIRouter(prefix="/audit", tags=["audit"])
 
 @router.get("/", response_model=List[schemas.AuditLogOut])
-def list_audit_logs(skip: int = 0, limit: int = 100, db: Session = Depends(deps.get_db)):
+def list_audit_logs(skip: int = 0, limit: int = 100, db: Session = Depends(deps.get_read_db)):
     return db.query(models.AuditLog).offset(skip).limit(limit).all()
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 from passlib.context import CryptContext
 from jose import jwt, JWTError
@@ -6,6 +6,10 @@ from datetime import datetime, timedelta
 import models
 import schemas
 import deps
+import auth_sessions
+import jobs
+import notifications
+import logging
 import os
 import uuid
 
@@ -22,6 +26,8 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+logger = logging.getLogger(__name__)
+
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
@@ -37,16 +43,12 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
 @router.post("/register", response_model=schemas.UserOut)
 def register(user: schemas.UserCreate, db: Session = Depends(deps.get_db)):
     try:
-        print(f"Registration attempt for email: {user.email}")
         db_user = db.query(models.User).filter(models.User.email == user.email).first()
         if db_user:
-            print("Email already exists")
             raise HTTPException(status_code=400, detail="Email already registered")
         
-        print("Hashing password...")
         hashed_password = get_password_hash(user.password)
         
-        print("Creating user object...")
         db_user = models.User(
             id=str(uuid.uuid4()),
             email=user.email, 
@@ -56,24 +58,93 @@ def register(user: schemas.UserCreate, db: Session = Depends(deps.get_db)):
             updated_at=datetime.utcnow()
         )
         
-        print("Adding to database...")
         db.add(db_user)
         db.commit()
         db.refresh(db_user)
-        print("User created successfully")
+        logger.info("user registered", extra={"event": "register", "user_id": db_user.id})
         return db_user
     except Exception as e:
-        print(f"Registration error: {str(e)}")
+        # Addresses stay out of the logs; the user id identifies successes
+        logger.info("registration failed: %s", e, extra={"event": "register_failed"})
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/login")
-def login(user: schemas.UserCreate, db: Session = Depends(deps.get_db)):
+def login(user: schemas.UserCreate, request: Request, db: Session = Depends(deps.get_db)):
     db_user = db.query(models.User).filter(models.User.email == user.email).first()
     if not db_user or not verify_password(user.password, db_user.hashed_password):
         raise HTTPException(status_code=401, detail="Invalid credentials")
-    access_token = create_access_token(data={"sub": db_user.email})
+    session = auth_sessions.create_session(
+        db, db_user, timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
+        user_agent=request.headers.get("user-agent"),
+        ip_address=request.client.host if request.client else None
+    )
+    db.commit()
+    access_token = create_access_token(data={"sub": db_user.email, "sid": session.id})
     return {"access_token": access_token, "token_type": "bearer"}
 
+@router.post("/logout")
+def logout(
+    sid: str = Depends(deps.get_session_id),
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.get_current_user)
+):
+    """Revoke the session of the token used for this request."""
+    if sid:
+        auth_sessions.revoke(db, models.UserSession.id == sid, models.UserSession.user_id == current_user.id)
+        db.commit()
+    return {"message": "Logged out"}
+
+@router.get("/sessions")
+def list_sessions(
+    sid: str = Depends(deps.get_session_id),
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.get_current_user)
+):
+    """The current user's live sessions, most recently used first."""
+    sessions = db.query(models.UserSession).filter(
+        models.UserSession.user_id == current_user.id,
+        models.UserSession.revoked_at.is_(None),
+        models.UserSession.expires_at > datetime.utcnow()
+    ).order_by(models.UserSession.last_seen_at.desc()).all()
+    return [
+        {
+            "id": session.id,
+            "current": session.id == sid,
+            "created_at": session.created_at,
+            "last_seen_at": session.last_seen_at,
+            "expires_at": session.expires_at,
+            "user_agent": session.user_agent,
+            "ip_address": session.ip_address,
+        }
+        for session in sessions
+    ]
+
+@router.delete("/sessions/{session_id}")
+def revoke_session(
+    session_id: str,
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.get_current_user)
+):
+    """Sign out one of the current user's sessions, e.g. on a lost device."""
+    revoked = auth_sessions.revoke(
+        db, models.UserSession.id == session_id, models.UserSession.user_id == current_user.id
+    )
+    if not revoked:
+        raise HTTPException(status_code=404, detail="Session not found")
+    db.commit()
+    return {"message": "Session revoked"}
+
+@router.post("/sessions/revoke-others")
+def revoke_other_sessions(
+    sid: str = Depends(deps.get_session_id),
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.get_current_user)
+):
+    """Sign out everywhere except this session."""
+    revoked = auth_sessions.revoke_user_sessions(db, current_user.id, keep=sid)
+    db.commit()
+    return {"revoked": revoked}
+
 @router.get("/me", response_model=schemas.UserOut)
 def get_current_user_info(current_user: models.User = Depends(deps.get_current_user)):
     """Get current user information."""
@@ -88,23 +159,36 @@ def forgot_password(request: schemas.ForgotPasswordRequest, db: Session = Depend
     try:
         db_user = db.query(models.User).filter(models.User.email == request.email).first()
         if db_user:
-            # Generate password reset token (expires in 1 hour)
-            reset_token = create_access_token(
-                data={"sub": db_user.email, "type": "password_reset"}, 
-                expires_delta=timedelta(hours=1)
-            )
-            
-            # In a real application, you would send an email here
-            # For now, we'll just log the reset token
-            print(f"Password reset token for {request.email}: {reset_token}")
-            print(f"Reset URL would be: {os.getenv('FRONTEND_URL', 'http://localhost:3000')}/reset-password?token={reset_token}")
+            # Sent by a job worker; the token is created there, so it is
+            # never stored in the jobs table
+            jobs.enqueue(db, "password_reset_email", {"user_id": db_user.id})
+            db.commit()
         
         # Always return success message regardless of whether email exists
         return {"message": "If an account with that email exists, you will receive a password reset link shortly."}
-    except Exception as e:
-        print(f"Forgot password error: {str(e)}")
+    except Exception:
+        logger.exception("forgot password failed")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@jobs.handler("password_reset_email")
+def _password_reset_email_job(db: Session, job: models.Job):
+    db_user = db.query(models.User).filter(models.User.id == jobs.job_args(job)["user_id"]).first()
+    if not db_user:
+        return None
+    # Generate password reset token (expires in 1 hour)
+    reset_token = create_access_token(
+        data={"sub": db_user.email, "type": "password_reset"},
+        expires_delta=timedelta(hours=1)
+    )
+    notifications.mailer.send(notifications.email_message(
+        db_user.email,
+        "Reset your RunMyPool password",
+        f"Someone asked to reset the password for this account. If it was you, choose a new one here "
+        f"(the link is valid for one hour):\n\n"
+        f"{notifications.FRONTEND_URL}/reset-password?token={reset_token}\n\n"
+        f"If it wasn't you, you can ignore this email."
+    ))
+
 @router.post("/reset-password")
 def reset_password(request: schemas.ResetPasswordRequest, db: Session = Depends(deps.get_db)):
     """
@@ -127,12 +211,14 @@ def reset_password(request: schemas.ResetPasswordRequest, db: Session = Depends(
         # Update the password
         db_user.hashed_password = get_password_hash(request.new_password)
         db_user.updated_at = datetime.utcnow()
+        # Whoever knew the old password is signed out everywhere
+        auth_sessions.revoke_user_sessions(db, db_user.id)
         
         db.commit()
         
         return {"message": "Password reset successfully"}
     except JWTError:
         raise HTTPException(status_code=400, detail="Invalid or expired reset token")
-    except Exception as e:
-        print(f"Reset password error: {str(e)}")
+    except Exception:
+        logger.exception("reset password failed")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -0,0 +1,251 @@
+"""
+Server-side login sessions.
+
+Every login creates a row in the sessions table and puts its id in the
+token's "sid" claim, so a session can be revoked (logout, password reset,
+account deletion) before its token expires. Validating a session must not
+cost a query per request, so each worker caches validated sessions, with
+their user, for SESSION_CACHE_TTL_SECONDS. Revocations made on this worker
+take effect at once and reach other workers over the invalidation bus (see
+invalidation.py); as a backstop for lost messages, each worker also polls for
+recently revoked sessions at most every SESSION_REVOCATION_POLL_SECONDS.
+
+last_seen_at is not written per request either: requests only note the time
+in memory and a background thread writes the latest time of each active
+session in one batched UPDATE every SESSION_LAST_SEEN_FLUSH_SECONDS.
+"""
+
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from sqlalchemy import bindparam, event, update
+from sqlalchemy.orm import Session
+
+import models
+from database import SessionLocal
+from invalidation import bus
+
+SESSION_CACHE_TTL_SECONDS = float(os.getenv("SESSION_CACHE_TTL_SECONDS", 30))
+SESSION_REVOCATION_POLL_SECONDS = float(os.getenv("SESSION_REVOCATION_POLL_SECONDS", 2))
+SESSION_LAST_SEEN_FLUSH_SECONDS = float(os.getenv("SESSION_LAST_SEEN_FLUSH_SECONDS", 30))
+SESSION_CACHE_MAX_ENTRIES = int(os.getenv("SESSION_CACHE_MAX_ENTRIES", 100000))
+
+logger = logging.getLogger(__name__)
+
+def create_session(db: Session, user: models.User, expires_delta: timedelta, user_agent: str = None,
+                   ip_address: str = None) -> models.UserSession:
+    now = datetime.utcnow()
+    session = models.UserSession(
+        id=str(uuid.uuid4()),
+        user_id=user.id,
+        created_at=now,
+        last_seen_at=now,
+        expires_at=now + expires_delta,
+        user_agent=(user_agent or "")[:255] or None,
+        ip_address=ip_address
+    )
+    db.add(session)
+    return session
+
+def revoke(db: Session, *criteria) -> int:
+    """Revoke the live sessions matching criteria inside the caller's transaction."""
+    now = datetime.utcnow()
+    ids = [row[0] for row in db.query(models.UserSession.id).filter(
+        models.UserSession.revoked_at.is_(None), *criteria
+    )]
+    if ids:
+        db.query(models.UserSession).filter(models.UserSession.id.in_(ids)).update(
+            {models.UserSession.revoked_at: now}, synchronize_session=False
+        )
+        db.info.setdefault("revoked_sessions", set()).update(ids)
+    return len(ids)
+
+def revoke_user_sessions(db: Session, user_id: str, keep: str = None) -> int:
+    """Revoke all of a user's sessions, except `keep` if given."""
+    criteria = [models.UserSession.user_id == user_id]
+    if keep is not None:
+        criteria.append(models.UserSession.id != keep)
+    return revoke(db, *criteria)
+
+class SessionCache:
+    """Validated sessions and their users, plus pending last-seen times."""
+
+    def __init__(self, session_factory=SessionLocal, ttl: float = SESSION_CACHE_TTL_SECONDS,
+                 poll_seconds: float = SESSION_REVOCATION_POLL_SECONDS,
+                 flush_seconds: float = SESSION_LAST_SEEN_FLUSH_SECONDS, max_entries: int = SESSION_CACHE_MAX_ENTRIES):
+        self.session_factory = session_factory
+        self.ttl = ttl
+        self.poll_seconds = poll_seconds
+        self.flush_seconds = flush_seconds
+        self.max_entries = max_entries
+        self.counters = {"hits": 0, "misses": 0, "revoked": 0, "last_seen_writes": 0}
+        # sid -> (detached user, session expiry, cached until)
+        self._entries = OrderedDict()
+        self._pending_last_seen = {}
+        self._lock = threading.Lock()
+        self._next_poll = 0.0
+        self._polled_since = datetime.utcnow()
+        self._flusher = None
+        self._stopping = threading.Event()
+
+    def validate(self, db: Session, sid: str):
+        """The user of a live session, attached to db, or None if it is unknown, expired or revoked."""
+        self._poll_revocations(db)
+        now = datetime.utcnow()
+        with self._lock:
+            cached = self._entries.get(sid)
+        if cached is not None and cached[2] > time.monotonic():
+            user, expires_at, _ = cached
+            self.counters["hits"] += 1
+        else:
+            self.counters["misses"] += 1
+            row = db.query(models.UserSession, models.User).join(
+                models.User, models.User.id == models.UserSession.user_id
+            ).filter(
+                models.UserSession.id == sid,
+                models.UserSession.revoked_at.is_(None),
+                models.User.is_active == True
+            ).first()
+            if row is None:
+                self.invalidate(sid)
+                return None
+            session, user = row
+            expires_at = session.expires_at
+            # Keep a detached copy; every request gets its own attached one
+            db.expunge(user)
+            with self._lock:
+                self._entries[sid] = (user, expires_at, time.monotonic() + self.ttl)
+                self._entries.move_to_end(sid)
+                if len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        if expires_at is not None and expires_at <= now:
+            self.invalidate(sid)
+            return None
+        with self._lock:
+            self._pending_last_seen[sid] = now
+        return db.merge(user, load=False)
+
+    def invalidate(self, sid: str):
+        with self._lock:
+            self._entries.pop(sid, None)
+
+    def invalidate_user(self, user_id: str):
+        with self._lock:
+            for sid in [sid for sid, cached in self._entries.items() if cached[0].id == user_id]:
+                del self._entries[sid]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _poll_revocations(self, db: Session):
+        """Drop sessions revoked by other workers since the last poll."""
+        if time.monotonic() < self._next_poll:
+            return
+        with self._lock:
+            if time.monotonic() < self._next_poll:
+                return
+            self._next_poll = time.monotonic() + self.poll_seconds
+            since = self._polled_since
+        # Overlap polls by a second so a revocation committed while the
+        # previous poll ran is not missed
+        polled_at = datetime.utcnow() - timedelta(seconds=1)
+        revoked = [row[0] for row in db.query(models.UserSession.id).filter(
+            models.UserSession.revoked_at >= since
+        )]
+        with self._lock:
+            self._polled_since = max(self._polled_since, polled_at)
+            for sid in revoked:
+                self._entries.pop(sid, None)
+        self.counters["revoked"] += len(revoked)
+
+    def flush_last_seen(self) -> int:
+        """Write the pending last-seen times in one batched UPDATE."""
+        with self._lock:
+            pending, self._pending_last_seen = self._pending_last_seen, {}
+        if not pending:
+            return 0
+        db = self.session_factory()
+        try:
+            db.connection().execute(
+                update(models.UserSession.__table__)
+                .where(models.UserSession.__table__.c.id == bindparam("sid"))
+                .values(last_seen_at=bindparam("seen")),
+                [{"sid": sid, "seen": seen} for sid, seen in pending.items()]
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            # Keep the times for the next flush unless newer ones arrived
+            with self._lock:
+                for sid, seen in pending.items():
+                    self._pending_last_seen.setdefault(sid, seen)
+            raise
+        finally:
+            db.close()
+        self.counters["last_seen_writes"] += len(pending)
+        return len(pending)
+
+    def _flush_loop(self):
+        while not self._stopping.wait(self.flush_seconds):
+            try:
+                self.flush_last_seen()
+            except Exception:
+                logger.exception("failed to write session last-seen times")
+
+    def start(self):
+        with self._lock:
+            if self._flusher is None or not self._flusher.is_alive():
+                self._stopping.clear()
+                self._flusher = threading.Thread(target=self._flush_loop, name="session-last-seen", daemon=True)
+                self._flusher.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the flusher and write whatever is still pending."""
+        with self._lock:
+            flusher, self._flusher = self._flusher, None
+        self._stopping.set()
+        if flusher is not None:
+            flusher.join(timeout)
+        self.flush_last_seen()
+
+    def stats(self) -> dict:
+        with self._lock:
+            cached, pending = len(self._entries), len(self._pending_last_seen)
+        return {"cached": cached, "pending_last_seen": pending, "counters": dict(self.counters)}
+
+cache = SessionCache()
+
+@event.listens_for(Session, "before_flush")
+def _note_user_changes(session, flush_context, instances):
+    # A changed or deleted user must not be served from the cache
+    changed = {obj.id for obj in list(session.dirty) + list(session.deleted) if isinstance(obj, models.User)}
+    if changed:
+        session.info.setdefault("changed_users", set()).update(changed)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    revoked = session.info.pop("revoked_sessions", ())
+    changed = session.info.pop("changed_users", ())
+    for sid in revoked:
+        cache.invalidate(sid)
+    for user_id in changed:
+        cache.invalidate_user(user_id)
+    if revoked:
+        bus.publish("session", list(revoked))
+    if changed:
+        bus.publish("user", list(changed))
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop("revoked_sessions", None)
+    session.info.pop("changed_users", None)
+
+bus.subscribe("session", cache.invalidate)
+bus.subscribe("user", cache.invalidate_user)
+bus.on_reset(cache.clear)
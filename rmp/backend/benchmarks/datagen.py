@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Synthetic league data for benchmarks.
+
+Recreates the schema on the target database, loads the real teams and
+Schedule rows from add_teams_table.sql and schedule_inserts.sql, then adds
+--pools pools with --users users spread across them, --entries-per-user
+entries each and a pick for every week before --week. Every pick uses a
+team playing that week and never repeats a team within an entry, just like
+real survivor picks. All users share the password in PASSWORD.
+
+Only point it at a throwaway database: it drops every table first.
+
+    python benchmarks/datagen.py --database-url sqlite:///rush.db --users 5000 --week 10
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, BACKEND_DIR)
+
+from passlib.context import CryptContext
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.orm import sessionmaker
+
+import models
+from migrate import load_reference_data
+
+PASSWORD = "rush-bench-password"
+EMAIL_FORMAT = "bench{}@example.com"
+# Rows per multi-row INSERT
+INSERT_BATCH = 5000
+
+def _engine(database_url: str):
+    connect_args = {"check_same_thread": False, "timeout": 30} if database_url.startswith("sqlite") else {}
+    return create_engine(database_url, connect_args=connect_args)
+
+def _insert(conn, model, rows: list):
+    for start in range(0, len(rows), INSERT_BATCH):
+        conn.execute(insert(model), rows[start:start + INSERT_BATCH])
+
+def generate(database_url: str, num_pools: int, num_users: int, entries_per_user: int, week: int,
+             seed: int = 1) -> dict:
+    rng = random.Random(seed)
+    engine = _engine(database_url)
+    models.Base.metadata.drop_all(bind=engine)
+    models.Base.metadata.create_all(bind=engine)
+
+    with engine.begin() as conn:
+        load_reference_data(conn)
+        abbreviations = dict(conn.execute(text("SELECT id, abbrv FROM teams")).all())
+        # The league plays the newest season on the schedule, the app's default current season
+        season = conn.execute(text("SELECT MAX(season) FROM Schedule")).scalar()
+        teams_by_week = {}
+        for week_num, home, away in conn.execute(text(
+            "SELECT week_num, home_team_id, away_team_id FROM Schedule WHERE season = :season"
+        ), {"season": season}):
+            teams_by_week.setdefault(week_num, set()).update((home, away))
+
+    # Hashing is deliberately slow, so every user gets the same hash
+    hashed_password = CryptContext(schemes=["bcrypt"], deprecated="auto").hash(PASSWORD)
+    now = datetime.utcnow()
+    users = [
+        {"id": str(uuid.uuid4()), "email": EMAIL_FORMAT.format(i), "hashed_password": hashed_password,
+         "is_active": True, "role": models.UserRole.USER, "created_at": now, "updated_at": now}
+        for i in range(num_users)
+    ]
+    pools = [
+        {"id": str(uuid.uuid4()), "name": f"Bench pool {i}", "description": "Synthetic benchmark pool",
+         "is_private": False, "owner_id": users[i % num_users]["id"], "change_version": 0,
+         "compacted_version": 0, "season": season, "created_at": now, "updated_at": now}
+        for i in range(num_pools)
+    ]
+    entries, picks = [], []
+    for i, user in enumerate(users):
+        pool = pools[i % num_pools]
+        for n in range(entries_per_user):
+            entry_id = str(uuid.uuid4())
+            entries.append({"id": entry_id, "user_id": user["id"], "pool_id": pool["id"],
+                            "name": f"{user['email'].split('@')[0]} #{n + 1}", "alive": True,
+                            "created_at": now, "updated_at": now})
+            used = set()
+            for pick_week in range(1, week):
+                choices = sorted(teams_by_week.get(pick_week, set()) - used)
+                if not choices:
+                    continue
+                team_id = rng.choice(choices)
+                used.add(team_id)
+                picks.append({"id": str(uuid.uuid4()), "entry_id": entry_id, "week": pick_week,
+                              "team_id": team_id, "team": abbreviations[team_id], "locked": True,
+                              "result": rng.choice(("win", "win", "loss")), "season": season,
+                              "created_at": now, "updated_at": now})
+
+    with engine.begin() as conn:
+        _insert(conn, models.User, users)
+        _insert(conn, models.Pool, pools)
+        _insert(conn, models.Entry, entries)
+        _insert(conn, models.Pick, picks)
+    engine.dispose()
+    return {"users": len(users), "pools": len(pools), "entries": len(entries), "picks": len(picks)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--pools", type=int, default=50)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--entries-per-user", type=int, default=2)
+    parser.add_argument("--week", type=int, default=10, help="the week being picked; earlier weeks get picks")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    counts = generate(args.database_url, args.pools, args.users, args.entries_per_user, args.week, args.seed)
+    print(", ".join(f"{count} {name}" for name, count in counts.items()) +
+          f" in {time.perf_counter() - started:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Benchmark: one commit per pick vs. the group-commit pick queue.
+
+Submits picks from many concurrent threads and reports picks/sec and
+commits/sec for both modes. Runs against a throwaway SQLite file by default;
+point --database-url at a local MySQL to measure real fsync pressure.
+
+    python benchmarks/group_commit_bench.py --threads 64 --entries 2000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import models
+import picks
+import rules
+from group_commit import GroupCommitQueue
+from schemas import PickCreate
+
+MAX_WEEKS = 18
+# A survivor pool with no rules rows: the built-in defaults
+PLAN = rules.compile_plan(rules.DEFAULT_POOL_TYPE, [], {})
+SEASON = 2025
+
+def setup_database(database_url: str, num_entries: int):
+    connect_args = {"check_same_thread": False, "timeout": 30} if database_url.startswith("sqlite") else {}
+    engine = create_engine(database_url, connect_args=connect_args)
+    models.Base.metadata.drop_all(bind=engine)
+    models.Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    db = Session()
+    now = datetime.utcnow()
+    user = models.User(id=str(uuid.uuid4()), email="bench@example.com", hashed_password="x",
+                       role=models.UserRole.USER, created_at=now, updated_at=now)
+    pool = models.Pool(id=str(uuid.uuid4()), name="bench", owner_id=user.id, created_at=now, updated_at=now)
+    db.add_all([user, pool])
+    # One team per week, so every pick in an entry uses a different team
+    db.add_all([models.Team(id=week, name=f"Team {week}", abbrv=f"T{week}") for week in range(1, MAX_WEEKS + 1)])
+    pool_id, user_id = pool.id, user.id
+    entry_ids = []
+    for i in range(num_entries):
+        entry = models.Entry(id=str(uuid.uuid4()), user_id=user.id, pool_id=pool.id, name=f"entry {i}",
+                             alive=True, created_at=now, updated_at=now)
+        db.add(entry)
+        entry_ids.append(entry.id)
+    db.commit()
+    db.close()
+    return engine, Session, pool_id, user_id, entry_ids
+
+def make_picks(entry_ids, weeks: int):
+    return [PickCreate(entry_id=entry_id, week=week, team=f"T{week}")
+            for week in range(1, weeks + 1) for entry_id in entry_ids]
+
+def run_direct(Session, pool_id, user_id, work, threads: int):
+    commits = 0
+    lock = threading.Lock()
+
+    def worker(items):
+        nonlocal commits
+        for pick in items:
+            db = Session()
+            try:
+                picks._save_pick(db, pick, pick.week, pick.team, pool_id, user_id, PLAN, SEASON)
+                db.commit()
+            finally:
+                db.close()
+            with lock:
+                commits += 1
+
+    elapsed = _run_threads(worker, work, threads)
+    return elapsed, commits
+
+def run_grouped(Session, pool_id, user_id, work, threads: int, max_batch: int, max_delay_ms: float):
+    write_queue = GroupCommitQueue(session_factory=Session, max_batch=max_batch, max_delay_ms=max_delay_ms)
+
+    def worker(items):
+        for pick in items:
+            # Each caller blocks on its own future, just like the API handler
+            write_queue.submit(lambda session, pick=pick: picks._save_pick(session, pick, pick.week, pick.team, pool_id, user_id, PLAN, SEASON)).result()
+
+    elapsed = _run_threads(worker, work, threads)
+    write_queue.stop()
+    return elapsed, write_queue.commits
+
+def _run_threads(worker, work, threads: int):
+    chunks = [work[i::threads] for i in range(threads)]
+    pool = [threading.Thread(target=worker, args=(chunk,)) for chunk in chunks]
+    start = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return time.perf_counter() - start
+
+def report(label: str, num_picks: int, elapsed: float, commits: int):
+    print(f"{label:<16} picks={num_picks:<7} time={elapsed:7.2f}s "
+          f"picks/sec={num_picks / elapsed:9.1f} commits/sec={commits / elapsed:9.1f} "
+          f"picks/commit={num_picks / max(commits, 1):6.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--entries", type=int, default=500)
+    parser.add_argument("--weeks", type=int, default=2, choices=range(1, MAX_WEEKS + 1), metavar="1-18")
+    parser.add_argument("--max-batch", type=int, default=100)
+    parser.add_argument("--max-delay-ms", type=float, default=5)
+    args = parser.parse_args()
+
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    print(f"Database: {database_url}  threads={args.threads}")
+
+    _, Session, pool_id, user_id, entry_ids = setup_database(database_url, args.entries)
+    work = make_picks(entry_ids, args.weeks)
+    elapsed, commits = run_direct(Session, pool_id, user_id, work, args.threads)
+    report("commit-per-pick", len(work), elapsed, commits)
+
+    _, Session, pool_id, user_id, entry_ids = setup_database(database_url, args.entries)
+    work = make_picks(entry_ids, args.weeks)
+    elapsed, commits = run_grouped(Session, pool_id, user_id, work, args.threads, args.max_batch, args.max_delay_ms)
+    report("group-commit", len(work), elapsed, commits)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark: deadline reminders for a large league.
+
+Creates --users users with --entries-per-user entries each (a share of them
+already picked for the week), then runs the deadline-reminder job against a
+local SMTP sink and reports reminders/sec, SMTP connections opened and the
+time spent finding recipients. Runs against a throwaway SQLite file by
+default.
+
+    python benchmarks/notification_bench.py --users 20000 --connections 8
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+import models
+import jobs
+import notifications
+import seasons
+from smtp_sink import SmtpSink
+
+WEEK = 1
+SEASON = seasons.season_of(datetime.utcnow())
+
+def setup_database(database_url: str, num_users: int, entries_per_user: int, picked_share: float):
+    connect_args = {"check_same_thread": False, "timeout": 30} if database_url.startswith("sqlite") else {}
+    engine = create_engine(database_url, connect_args=connect_args)
+    models.Base.metadata.drop_all(bind=engine)
+    models.Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    now = datetime.utcnow()
+    db = Session()
+    db.add_all([models.Team(id=1, name="Home", abbrv="HOM"), models.Team(id=2, name="Away", abbrv="AWY")])
+    db.add(models.Schedule(game_id=1, week_num=WEEK, home_team_id=1, away_team_id=2,
+                           start_time=now + timedelta(days=2), winning_team_id="99", season=SEASON))
+    owner = str(uuid.uuid4())
+    pool = str(uuid.uuid4())
+    users = [{"id": owner, "email": "owner@example.com", "hashed_password": "x", "is_active": True,
+              "role": models.UserRole.USER, "created_at": now}]
+    users += [{"id": str(uuid.uuid4()), "email": f"user{i}@example.com", "hashed_password": "x",
+               "is_active": True, "role": models.UserRole.USER, "created_at": now} for i in range(num_users)]
+    db.execute(insert(models.User), users)
+    db.execute(insert(models.Pool), [{"id": pool, "name": "bench", "owner_id": owner, "season": SEASON,
+                                          "created_at": now}])
+    entries, picks = [], []
+    for i, user in enumerate(users[1:]):
+        for n in range(entries_per_user):
+            entry_id = str(uuid.uuid4())
+            entries.append({"id": entry_id, "user_id": user["id"], "pool_id": pool, "name": f"entry {n}",
+                            "alive": True, "created_at": now})
+            if (i * entries_per_user + n) % 100 < picked_share * 100:
+                picks.append({"id": str(uuid.uuid4()), "entry_id": entry_id, "week": WEEK, "team": "HOM",
+                              "team_id": 1, "locked": False, "created_at": now})
+    db.execute(insert(models.Entry), entries)
+    if picks:
+        db.execute(insert(models.Pick), picks)
+    db.commit()
+    db.close()
+    return Session, len(entries) - len(picks)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--entries-per-user", type=int, default=2)
+    parser.add_argument("--picked", type=float, default=0.3, help="share of entries that already picked")
+    parser.add_argument("--connections", type=int, default=notifications.SMTP_CONNECTIONS)
+    parser.add_argument("--batch-size", type=int, default=notifications.NOTIFY_BATCH_SIZE)
+    args = parser.parse_args()
+
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    # The bench database is not the app's, so don't look the season up there
+    seasons.CURRENT_SEASON = str(SEASON)
+    print(f"Database: {database_url}  users={args.users} entries/user={args.entries_per_user}")
+    Session, missing = setup_database(database_url, args.users, args.entries_per_user, args.picked)
+
+    sink = SmtpSink().start()
+    notifications.mailer = notifications.SmtpPool(host=sink.host, port=sink.port, starttls=False,
+                                                   size=args.connections)
+    notifications.NOTIFY_BATCH_SIZE = args.batch_size
+
+    db = Session()
+    started = time.perf_counter()
+    recipients = notifications._recipients(notifications._missing_picks_query(db, WEEK))
+    query_time = time.perf_counter() - started
+    db.close()
+
+    db = Session()
+    job_id = jobs.enqueue(db, notifications.DEADLINE_REMINDER, {"week": WEEK}).id
+    db.commit()
+    db.close()
+    runner = jobs.JobRunner(session_factory=Session, workers=0)
+    started = time.perf_counter()
+    runner.run_once()
+    elapsed = time.perf_counter() - started
+    notifications.mailer.close()
+    sink.stop()
+
+    db = Session()
+    job = db.get(models.Job, job_id)
+    print(f"entries missing a pick: {missing}  users to remind: {len(recipients)}")
+    print(f"recipient query:  {query_time * 1000:8.1f} ms")
+    print(f"job:              {elapsed:8.2f} s  status={job.status}  result={job.result}")
+    print(f"emails received:  {sink.messages}  over {sink.connections} SMTP connections  "
+          f"({sink.messages / elapsed:.0f}/sec)")
+    print(f"in-app rows:      {db.query(models.Notification).count()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Benchmark: the 12:55-1:00pm pick rush.
+
+Generates a league with datagen.py, starts the API under uvicorn and replays
+the last minutes before kickoff, compressed into --duration seconds. Users
+arrive ever faster towards the deadline (arrival density grows linearly, as
+it does in production) and each one runs the real client flow:
+
+    POST /auth/login
+    GET  /pools/my-pools, /entries/
+    GET  /pools/{id}, /entries/pool/{id}          (pool page)
+    GET  /schedule/week/{n}
+    per entry: GET /picks/entry/{id}, POST /picks/create, GET /picks/entry/{id}
+
+Reports p50/p99 latency and errors per request type, overall throughput and
+SQL statements per request (from the server's /metrics). Admission control
+(admission.py) is off unless --admission is given: it limits each client
+address, and every simulated user connects from 127.0.0.1. Rate-limited
+responses (429) are counted apart from errors either way. Runs against a
+throwaway SQLite file by default, or pass --database-url for a local MySQL
+(its tables are dropped and recreated).
+
+    python benchmarks/rush_bench.py --users 2000 --concurrency 64 --duration 30
+    python benchmarks/rush_bench.py --output before.json
+    python benchmarks/rush_bench.py --compare before.json
+"""
+
+import argparse
+import gzip
+import http.client
+import json
+import math
+import os
+import queue
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import text
+
+import datagen
+from startup_bench import BACKEND_DIR, free_port, wait_for
+
+class Client:
+    """One keep-alive HTTP connection, timing every request by name."""
+
+    def __init__(self, port: int, results):
+        self.port = port
+        self.results = results
+        self.token = None
+        self.conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+
+    def request(self, name: str, method: str, path: str, body=None):
+        headers = {"Accept-Encoding": "gzip"}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        payload = None
+        if body is not None:
+            payload = json.dumps(body)
+            headers["Content-Type"] = "application/json"
+        started = time.perf_counter()
+        try:
+            self.conn.request(method, path, body=payload, headers=headers)
+            response = self.conn.getresponse()
+            data = response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            self.conn.close()
+            self.conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=60)
+            data, status = b"", 0
+        self.results.record(name, time.perf_counter() - started, status)
+        if status != 200 or not data:
+            return None
+        if response.getheader("Content-Encoding") == "gzip":
+            data = gzip.decompress(data)
+        return json.loads(data)
+
+class Results:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.rate_limited = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, name: str, seconds: float, status: int):
+        with self._lock:
+            self.latencies[name].append(seconds)
+            if status == 429:
+                self.rate_limited[name] += 1
+            elif status >= 400 or status == 0:
+                self.errors[name] += 1
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))]
+
+def load_plan(database_url: str, week: int) -> list:
+    """Per user: (email, [(entry_id, team abbreviation to pick)]), using teams unused by the entry."""
+    engine = datagen._engine(database_url)
+    with engine.connect() as conn:
+        playing = {abbrv for (abbrv,) in conn.execute(text(
+            "SELECT t.abbrv FROM teams t JOIN Schedule s ON t.id IN (s.home_team_id, s.away_team_id) "
+            "WHERE s.week_num = :week AND s.season = (SELECT MAX(season) FROM Schedule)"
+        ), {"week": week})}
+        used = defaultdict(set)
+        for entry_id, team in conn.execute(text("SELECT entry_id, team FROM picks")):
+            used[entry_id].add(team)
+        plan = defaultdict(list)
+        for email, entry_id in conn.execute(text(
+            "SELECT u.email, e.id FROM users u JOIN entries e ON e.user_id = u.id ORDER BY u.email, e.id"
+        )):
+            choices = sorted(playing - used[entry_id])
+            if choices:
+                plan[email].append((entry_id, random.choice(choices)))
+    engine.dispose()
+    return list(plan.items())
+
+def user_session(port: int, results: Results, email: str, entries: list, week: int):
+    client = Client(port, results)
+    login = client.request("login", "POST", "/auth/login", {"email": email, "password": datagen.PASSWORD})
+    if not login:
+        return
+    client.token = login["access_token"]
+    pools = client.request("my_pools", "GET", "/pools/my-pools") or []
+    my_entries = client.request("entries", "GET", "/entries/") or []
+    pool_ids = {entry["pool_id"] for entry in my_entries} | {pool["id"] for pool in pools}
+    for pool_id in sorted(pool_ids)[:1]:
+        client.request("pool", "GET", f"/pools/{pool_id}")
+        client.request("pool_entries", "GET", f"/entries/pool/{pool_id}")
+    client.request("schedule_week", "GET", f"/schedule/week/{week}")
+    for entry_id, team in entries:
+        client.request("picks_entry", "GET", f"/picks/entry/{entry_id}")
+        client.request("picks_create", "POST", "/picks/create", {"entry_id": entry_id, "week": week, "team": team})
+        client.request("picks_entry", "GET", f"/picks/entry/{entry_id}")
+    client.conn.close()
+
+def run_rush(port: int, plan: list, week: int, concurrency: int, duration: float) -> tuple:
+    """Start user i at duration * sqrt(i / n), so arrivals accelerate towards the deadline."""
+    results = Results()
+    arrivals = queue.Queue()
+    n = len(plan)
+    for i, (email, entries) in enumerate(plan):
+        arrivals.put((duration * math.sqrt(i / n), email, entries))
+    started = time.perf_counter()
+
+    def worker():
+        while True:
+            try:
+                at, email, entries = arrivals.get_nowait()
+            except queue.Empty:
+                return
+            delay = at - (time.perf_counter() - started)
+            if delay > 0:
+                time.sleep(delay)
+            user_session(port, results, email, entries, week)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, time.perf_counter() - started
+
+_METRIC = re.compile(r'^(rmp_db_statements_total|rmp_http_responses_total)\{method="(\w+)",route="([^"]*)"(?:,status="\d+")?\} (\S+)$')
+
+def statements_per_request(port: int) -> dict:
+    """SQL statements per request by route, from one worker's /metrics."""
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    conn.request("GET", "/metrics")
+    body = conn.getresponse().read().decode()
+    conn.close()
+    statements, requests = defaultdict(float), defaultdict(float)
+    for line in body.splitlines():
+        match = _METRIC.match(line)
+        if not match:
+            continue
+        metric, method, route, value = match.groups()
+        target = statements if metric == "rmp_db_statements_total" else requests
+        target[f"{method} {route}"] += float(value)
+    return {route: statements[route] / count for route, count in requests.items()
+            if count and not route.split(" ", 1)[1].startswith(("/health", "unmatched"))}
+
+def summarize(results: Results, elapsed: float, queries: dict) -> dict:
+    total = sum(len(values) for values in results.latencies.values())
+    return {
+        "requests": total,
+        "seconds": elapsed,
+        "throughput": total / elapsed,
+        "errors": sum(results.errors.values()),
+        "rate_limited": sum(results.rate_limited.values()),
+        "endpoints": {
+            name: {
+                "count": len(values),
+                "p50_ms": percentile(values, 50) * 1000,
+                "p99_ms": percentile(values, 99) * 1000,
+                "errors": results.errors[name],
+                "rate_limited": results.rate_limited[name],
+            }
+            for name, values in sorted(results.latencies.items())
+        },
+        "queries_per_request": queries,
+    }
+
+def report(summary: dict, baseline: dict = None):
+    def delta(now, before):
+        if before is None or not before:
+            return ""
+        return f" ({(now - before) / before * 100:+.0f}%)"
+
+    base_endpoints = (baseline or {}).get("endpoints", {})
+    print(f"{'request':<16}{'count':>8}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}{'429s':>8}")
+    for name, stats in summary["endpoints"].items():
+        before = base_endpoints.get(name, {})
+        print(f"{name:<16}{stats['count']:>8}{stats['p50_ms']:>10.1f}{stats['p99_ms']:>10.1f}{stats['errors']:>8}"
+              f"{stats.get('rate_limited', 0):>8}{delta(stats['p99_ms'], before.get('p99_ms'))}")
+    print(f"\n{summary['requests']} requests in {summary['seconds']:.1f}s: "
+          f"{summary['throughput']:.0f} req/s{delta(summary['throughput'], (baseline or {}).get('throughput'))}, "
+          f"{summary['errors']} errors, {summary.get('rate_limited', 0)} rate limited")
+    print("\nSQL statements per request (one worker's /metrics):")
+    base_queries = (baseline or {}).get("queries_per_request", {})
+    for route, count in sorted(summary["queries_per_request"].items()):
+        print(f"  {route:<40}{count:6.2f}{delta(count, base_queries.get(route))}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None, help="defaults to a temporary SQLite file")
+    parser.add_argument("--skip-generate", action="store_true", help="reuse data from an earlier run")
+    parser.add_argument("--pools", type=int, default=50)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--entries-per-user", type=int, default=2)
+    parser.add_argument("--week", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=32, help="users in flight at once")
+    parser.add_argument("--duration", type=float, default=30, help="seconds the rush is compressed into")
+    parser.add_argument("--server-workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--admission", action="store_true",
+                        help="leave admission control on; all users then share one address's rate limits")
+    parser.add_argument("--output", help="write the results as JSON, for --compare on a later commit")
+    parser.add_argument("--compare", help="JSON results of an earlier run to show deltas against")
+    args = parser.parse_args()
+
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'rush.db')}"
+    if not args.skip_generate:
+        counts = datagen.generate(database_url, args.pools, args.users, args.entries_per_user, args.week)
+        print(f"Generated {', '.join(f'{count} {name}' for name, count in counts.items())} in {database_url}")
+    plan = load_plan(database_url, args.week)
+
+    port = free_port()
+    env = dict(os.environ, SQLALCHEMY_DATABASE_URL=database_url, JOB_WORKERS="0",
+               ADMISSION_ENABLED="true" if args.admission else "false")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning",
+         "--workers", str(args.server_workers)],
+        cwd=BACKEND_DIR, env=env
+    )
+    try:
+        if not wait_for(f"http://127.0.0.1:{port}/health/ready", 200, time.perf_counter() + 120):
+            raise RuntimeError("server did not become ready")
+        results, elapsed = run_rush(port, plan, args.week, args.concurrency, args.duration)
+        summary = summarize(results, elapsed, statements_per_request(port))
+    finally:
+        server.terminate()
+        server.wait()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    report(summary, baseline)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+A local SMTP server that accepts every message and throws it away.
+
+Point the notification jobs at it to try them without a real relay:
+
+    python benchmarks/smtp_sink.py --port 1025 --print
+    SMTP_HOST=localhost SMTP_PORT=1025 SMTP_STARTTLS=false python worker.py
+
+Only the commands smtplib needs are implemented (no TLS or AUTH).
+"""
+
+import argparse
+import socketserver
+import threading
+
+class _Handler(socketserver.StreamRequestHandler):
+    def reply(self, line: str):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        sink = self.server.sink
+        with sink.lock:
+            sink.connections += 1
+        self.reply("220 smtp-sink ready")
+        recipients = []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode("utf-8", "replace").strip()
+            verb = command[:4].upper()
+            if verb == "EHLO":
+                self.reply("250-smtp-sink")
+                self.reply("250-8BITMIME")
+                self.reply("250 SMTPUTF8")
+            elif verb == "HELO":
+                self.reply("250 smtp-sink")
+            elif verb == "MAIL":
+                recipients = []
+                self.reply("250 OK")
+            elif verb == "RCPT":
+                recipients.append(command.split(":", 1)[1].strip().strip("<>"))
+                self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                while True:
+                    data = self.rfile.readline()
+                    if not data or data in (b".\r\n", b".\n"):
+                        break
+                    lines.append(data)
+                sink.received(recipients, b"".join(lines))
+                self.reply("250 OK")
+            elif verb in ("RSET", "NOOP"):
+                self.reply("250 OK")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+class SmtpSink:
+    """Runs the sink on a background thread and counts what it received."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, show: bool = False):
+        self.show = show
+        self.messages = 0
+        self.connections = 0
+        self.lock = threading.Lock()
+        self._server = _Server((host, port), _Handler)
+        self._server.sink = self
+        self.host, self.port = self._server.server_address
+
+    def received(self, recipients: list, data: bytes):
+        with self.lock:
+            self.messages += 1
+        if self.show:
+            print(f"--- to {', '.join(recipients)}\n{data.decode('utf-8', 'replace')}")
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, name="smtp-sink", daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1025)
+    parser.add_argument("--print", action="store_true", help="print every message received")
+    args = parser.parse_args()
+
+    sink = SmtpSink(args.host, args.port, show=args.print)
+    print(f"SMTP sink listening on {sink.host}:{sink.port}")
+    try:
+        sink._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    print(f"{sink.messages} messages over {sink.connections} connections")
+
+if __name__ == "__main__":
+    main()
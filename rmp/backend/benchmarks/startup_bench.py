@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cold start of one API worker.
+
+Reports the import time of main (via -X importtime), then starts uvicorn and
+measures how long until /health answers (liveness), until /health/ready
+reports the warm-up done, and the latency of the first /teams/ request.
+Runs against a throwaway SQLite file by default.
+
+    python benchmarks/startup_bench.py --runs 3
+"""
+
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+def import_time(env) -> float:
+    """Cumulative import time of main in seconds, as reported by -X importtime."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    for line in reversed(result.stderr.splitlines()):
+        fields = [field.strip() for field in line.split("|")]
+        if len(fields) == 3 and fields[2] == "main":
+            return int(fields[1]) / 1e6
+    raise RuntimeError("main not found in -X importtime output")
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def get(url: str, timeout: float = 5):
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except OSError:
+        return None
+
+def wait_for(url: str, status: int, deadline: float) -> bool:
+    while time.perf_counter() < deadline:
+        if get(url, timeout=1) == status:
+            return True
+        time.sleep(0.01)
+    return False
+
+def cold_start(env, timeout: float) -> dict:
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env
+    )
+    try:
+        deadline = started + timeout
+        if not wait_for(f"{base}/health", 200, deadline):
+            raise RuntimeError("server did not come up")
+        live = time.perf_counter() - started
+        if not wait_for(f"{base}/health/ready", 200, deadline):
+            raise RuntimeError("warm-up did not finish")
+        ready = time.perf_counter() - started
+
+        request_started = time.perf_counter()
+        get(f"{base}/teams/")
+        first_request = time.perf_counter() - request_started
+        return {"live": live, "ready": ready, "first_request": first_request}
+    finally:
+        server.terminate()
+        server.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--database-url", default=None,
+                        help="defaults to a temporary SQLite file created with AUTO_CREATE_SCHEMA")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    if args.database_url:
+        env["SQLALCHEMY_DATABASE_URL"] = args.database_url
+    else:
+        path = os.path.join(tempfile.mkdtemp(), "startup_bench.db")
+        env["SQLALCHEMY_DATABASE_URL"] = f"sqlite:///{path}"
+        env["AUTO_CREATE_SCHEMA"] = "true"
+        # Create the schema once so every run measures the same cold start
+        cold_start(env, args.timeout)
+
+    imports = [import_time(env) for _ in range(args.runs)]
+    print(f"import main:      {min(imports) * 1000:8.1f} ms (best of {args.runs})")
+
+    runs = [cold_start(env, args.timeout) for _ in range(args.runs)]
+    for name in ("live", "ready", "first_request"):
+        best = min(run[name] for run in runs)
+        print(f"{name + ':':17s} {best * 1000:8.1f} ms (best of {args.runs})")
+
+if __name__ == "__main__":
+    main()
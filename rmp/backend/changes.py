@@ -0,0 +1,137 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+from datetime import datetime
+import os
+import models
+import schemas
+import deps
+import versions
+import jobs
+
+# How many change log rows to keep per pool before older ones are compacted
+CHANGE_LOG_RETAIN = int(os.getenv("CHANGE_LOG_RETAIN", 5000))
+# Compaction runs once every this many versions rather than on every write
+CHANGE_LOG_COMPACT_EVERY = int(os.getenv("CHANGE_LOG_COMPACT_EVERY", 500))
+
+router = APIRouter(prefix="/pools", tags=["sync"])
+
+def record_change(db: Session, pool_id: str, kind: str, object_id: str, op: str = "upsert", user_id: str = None) -> int:
+    """
+    Bump the pool's change version and append a change log row, inside the
+    caller's transaction. The version bump is an atomic UPDATE on the pool
+    row, so versions are handed out in commit order for that pool.
+    """
+    db.query(models.Pool).filter(models.Pool.id == pool_id).update(
+        {models.Pool.change_version: func.coalesce(models.Pool.change_version, 0) + 1},
+        synchronize_session=False
+    )
+    version = db.query(models.Pool.change_version).filter(models.Pool.id == pool_id).scalar()
+    if version is None:
+        return 0
+    versions.touch_pool(db, pool_id)
+
+    db.add(models.PoolChange(
+        pool_id=pool_id,
+        version=version,
+        kind=kind,
+        object_id=object_id,
+        op=op,
+        user_id=user_id,
+        created_at=datetime.utcnow()
+    ))
+
+    if version % CHANGE_LOG_COMPACT_EVERY == 0 and version > CHANGE_LOG_RETAIN:
+        # Deleting old rows can take a while; keep it out of the write path
+        jobs.enqueue(db, "compact_changes", {"pool_id": pool_id, "up_to_version": version - CHANGE_LOG_RETAIN})
+
+    return version
+
+def compact(db: Session, pool_id: str, up_to_version: int):
+    """Drop change log rows at or below up_to_version; older clients must resync."""
+    db.query(models.PoolChange).filter(
+        models.PoolChange.pool_id == pool_id,
+        models.PoolChange.version <= up_to_version
+    ).delete(synchronize_session=False)
+    db.query(models.Pool).filter(models.Pool.id == pool_id).update(
+        {models.Pool.compacted_version: up_to_version},
+        synchronize_session=False
+    )
+
+@jobs.handler("compact_changes")
+def _compact_changes_job(db: Session, job: models.Job):
+    args = jobs.job_args(job)
+    compact(db, args["pool_id"], args["up_to_version"])
+    return {"compacted_to": args["up_to_version"]}
+
+@router.get("/{pool_id}/changes", response_model=schemas.PoolChangesOut)
+def get_pool_changes(
+    pool_id: str,
+    since: int = 0,
+    db: Session = Depends(deps.get_read_db),
+    current_user: models.User = Depends(deps.get_current_user)
+):
+    """
+    Get the current user's entries and picks in a pool that changed after
+    version `since`. Returns resync=true when the change log no longer goes
+    back that far and the client should reload the pool in full.
+    """
+    pool = db.query(
+        models.Pool.change_version, models.Pool.compacted_version
+    ).filter(models.Pool.id == pool_id).first()
+    if not pool:
+        raise HTTPException(status_code=404, detail="Pool not found")
+
+    version = pool.change_version or 0
+    compacted_version = pool.compacted_version or 0
+    if since < compacted_version or since > version:
+        return {"pool_id": pool_id, "version": version, "resync": True}
+    if since == version:
+        return {"pool_id": pool_id, "version": version}
+
+    rows = db.query(
+        models.PoolChange.kind, models.PoolChange.object_id, models.PoolChange.op
+    ).filter(
+        models.PoolChange.pool_id == pool_id,
+        models.PoolChange.version > since,
+        or_(models.PoolChange.user_id == current_user.id, models.PoolChange.user_id.is_(None))
+    ).order_by(models.PoolChange.version).all()
+
+    # Only the latest operation per object matters
+    latest = {}
+    pool_changed = False
+    for kind, object_id, op in rows:
+        if kind == "pool":
+            pool_changed = True
+        else:
+            latest[(kind, object_id)] = op
+
+    def ids(kind, op):
+        return [object_id for (k, object_id), o in latest.items() if k == kind and o == op]
+
+    entry_ids = ids("entry", "upsert")
+    pick_ids = ids("pick", "upsert")
+
+    entries = []
+    if entry_ids:
+        entries = db.query(models.Entry).filter(
+            models.Entry.id.in_(entry_ids),
+            models.Entry.user_id == current_user.id
+        ).all()
+
+    picks = []
+    if pick_ids:
+        picks = db.query(models.Pick).join(models.Entry).filter(
+            models.Pick.id.in_(pick_ids),
+            models.Entry.user_id == current_user.id
+        ).all()
+
+    return {
+        "pool_id": pool_id,
+        "version": version,
+        "pool_changed": pool_changed,
+        "entries": entries,
+        "picks": picks,
+        "deleted_entries": ids("entry", "delete"),
+        "deleted_picks": ids("pick", "delete")
+    }
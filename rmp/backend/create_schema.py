@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 """
-Script to create the database schema from datamodel.sql
+Script to create the database and bring its schema up to date
 """
 
 import mysql.connector
@@ -10,6 +10,9 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+import database
+import migrate
+
 # Database configuration
 MYSQL_USER = os.getenv("MYSQL_USER", "root")
 MYSQL_PASSWORD = os.getenv("MYSQL_PASSWORD", "ccmdecoder")
@@ -18,9 +21,15 @@ MYSQL_PORT = os.getenv("MYSQL_PORT", "3306")
 MYSQL_DB = os.getenv("MYSQL_DB", "rmp")
 
 def create_database_schema():
-    """Create the database schema from datamodel.sql"""
+    """Create the database if needed, then apply all migrations"""
     
     try:
+        if database.is_sqlite(database.DATABASE_URL):
+            # Embedded mode: SQLite creates the file on first connect
+            print(f"Applying migrations to {database.DATABASE_URL}...")
+            migrate.main([])
+            return True
+
         # Connect to MySQL server (without specifying database)
         connection = mysql.connector.connect(
             host=MYSQL_HOST,
@@ -34,46 +43,11 @@ def create_database_schema():
         # Create database if it doesn't exist
         print(f"Creating database '{MYSQL_DB}' if it doesn't exist...")
         cursor.execute(f"CREATE DATABASE IF NOT EXISTS {MYSQL_DB}")
-        cursor.execute(f"USE {MYSQL_DB}")
-        
-        # Read and execute the SQL schema
-        print("Reading datamodel.sql...")
-        with open('datamodel.sql', 'r') as f:
-            sql_content = f.read()
-        
-        # Split by semicolons and execute each statement
-        statements = [stmt.strip() for stmt in sql_content.split(';') if stmt.strip()]
-        
-        print(f"Executing {len(statements)} SQL statements...")
-        for i, statement in enumerate(statements, 1):
-            try:
-                # Skip empty statements and comments
-                if not statement or statement.startswith('--'):
-                    continue
-                    
-                print(f"Executing statement {i}: {statement[:50]}...")
-                cursor.execute(statement)
-                connection.commit()
-                
-            except mysql.connector.Error as e:
-                # Check if it's a harmless error (table already exists, etc.)
-                if "already exists" in str(e).lower() or "duplicate" in str(e).lower():
-                    print(f"Warning (skipping): {e}")
-                    continue
-                else:
-                    print(f"Error executing statement {i}: {e}")
-                    print(f"Statement: {statement}")
-                    # Don't stop on errors, continue with next statement
-                    continue
-        
-        print("Database schema creation completed!")
         
-        # Show tables to verify
-        cursor.execute("SHOW TABLES")
-        tables = cursor.fetchall()
-        print(f"\nCreated tables:")
-        for table in tables:
-            print(f"  - {table[0]}")
+        # The schema itself is versioned by migrate.py, which creates it on an
+        # empty database and applies anything newer to an existing one.
+        print("Applying migrations...")
+        migrate.main([])
         
         return True
         
@@ -1,6 +1,13 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+import collections
 import os
+import threading
+import time
+
+import sharding
 
 MYSQL_USER = os.getenv("MYSQL_USER", "root")
 MYSQL_PASSWORD = os.getenv("MYSQL_PASSWORD", "ccmdecoder")
@@ -8,7 +15,194 @@ MYSQL_HOST = os.getenv("MYSQL_HOST", "localhost")
 MYSQL_PORT = os.getenv("MYSQL_PORT", "3306")
 MYSQL_DB = os.getenv("MYSQL_DB", "rmp")
 
-DATABASE_URL = f"mysql+mysqlconnector://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DB}"
+# Embedded mode: a single SQLite file instead of a MySQL server
+SQLITE_PATH = os.getenv("SQLITE_PATH")
+
+DATABASE_URL = os.getenv(
+    "SQLALCHEMY_DATABASE_URL",
+    f"sqlite:///{SQLITE_PATH}" if SQLITE_PATH else
+    f"mysql+mysqlconnector://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DB}"
+)
+# Optional read replica for GET-only routes (see deps.get_read_db)
+READ_REPLICA_URL = os.getenv("READ_REPLICA_URL")
+
+# Connection pool sizing, per worker process
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 20))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 10))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+
+# SQLite tuning (embedded mode)
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", 65536))
+SQLITE_MMAP_SIZE_MB = int(os.getenv("SQLITE_MMAP_SIZE_MB", 256))
+# How long a write waits for its turn before failing
+SQLITE_WRITE_TIMEOUT = float(os.getenv("SQLITE_WRITE_TIMEOUT", 30))
+
+def is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+def _is_memory(url: str) -> bool:
+    return make_url(url).database in (None, "", ":memory:")
+
+def _engine_kwargs(url: str) -> dict:
+    kwargs = {"pool_pre_ping": True}
+    if is_sqlite(url):
+        # SQLite's default pools don't take sizing options
+        kwargs["connect_args"] = {"check_same_thread": False}
+        if _is_memory(url):
+            # Every connection to :memory: is a new, empty database
+            kwargs["poolclass"] = StaticPool
+        return kwargs
+    kwargs.update(
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+    )
+    return kwargs
+
+class WriteQueue:
+    """
+    Admits one writing connection at a time, in arrival order.
+
+    SQLite allows a single writer per database. Left to itself, every other
+    writer polls in SQLite's busy handler, sleeping in growing steps, and
+    fails with "database is locked" once busy_timeout runs out, so a burst of
+    pick writes loses some of them. Instead each connection takes a turn here
+    before its first write and gives it up when it goes back to the pool,
+    i.e. when its transaction has ended. The queue is per process; several
+    processes on one file still fall back on busy_timeout between them.
+    """
+
+    def __init__(self, timeout: float = SQLITE_WRITE_TIMEOUT):
+        self.timeout = timeout
+        self.counters = {"writes": 0, "waited": 0, "timeouts": 0}
+        self.max_wait_ms = 0.0
+        self._waiting = collections.deque()
+        self._holder = None
+        self._cond = threading.Condition()
+
+    def acquire(self, holder):
+        ticket = object()
+        started = time.monotonic()
+        with self._cond:
+            self._waiting.append(ticket)
+            deadline = started + self.timeout
+            while self._holder is not None or self._waiting[0] is not ticket:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._waiting.remove(ticket)
+                    self.counters["timeouts"] += 1
+                    self._cond.notify_all()
+                    raise TimeoutError(f"waited {self.timeout:.0f}s for the SQLite writer")
+                self._cond.wait(remaining)
+            self._waiting.popleft()
+            self._holder = holder
+            waited = (time.monotonic() - started) * 1000
+            self.counters["writes"] += 1
+            if waited >= 1:
+                self.counters["waited"] += 1
+            self.max_wait_ms = max(self.max_wait_ms, waited)
+
+    def release(self, holder):
+        with self._cond:
+            if self._holder is holder:
+                self._holder = None
+                self._cond.notify_all()
+
+    def stats(self) -> dict:
+        with self._cond:
+            waiting = len(self._waiting)
+        return {"waiting": waiting, "max_wait_ms": round(self.max_wait_ms, 1), "counters": dict(self.counters)}
+
+_READ_PREFIXES = ("SELECT", "PRAGMA", "EXPLAIN")
+
+def configure_sqlite(engine, url: str) -> WriteQueue:
+    """Tune every new connection with pragmas and queue writers; returns the queue, if any."""
+    memory = _is_memory(url)
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if not memory:
+            # Readers no longer block the writer, nor it them
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE_MB * 1024 * 1024}")
+        # NORMAL only syncs at checkpoints in WAL mode; a power cut can lose
+        # the last commits but never corrupts the database
+        cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+    if memory:
+        # A single shared connection; there is nothing to queue
+        return None
+    writes = WriteQueue()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _queue_writer(conn, cursor, statement, parameters, context, executemany):
+        # record_info outlives reconnects, so an invalidated connection still releases its turn
+        holder = conn.connection.record_info
+        if not holder.get("writer") and not statement.lstrip()[:7].upper().startswith(_READ_PREFIXES):
+            writes.acquire(holder)
+            holder["writer"] = True
+
+    @event.listens_for(engine.pool, "checkin")
+    def _release_writer(dbapi_connection, connection_record):
+        holder = connection_record.record_info
+        if holder.pop("writer", False):
+            writes.release(holder)
+
+    return writes
+
+# SQLite engine -> its WriteQueue
+write_queues = {}
+
+def make_engine(url: str):
+    engine = create_engine(url, **_engine_kwargs(url))
+    if is_sqlite(url):
+        writes = configure_sqlite(engine, url)
+        if writes is not None:
+            write_queues[engine] = writes
+    return engine
+
+engine = make_engine(DATABASE_URL)
+# Pool shards (see sharding.py); the primary keeps the global tables
+shard_engines = {name: make_engine(url) for name, url in sharding.parse_shard_urls(sharding.SHARD_URLS).items()}
+if shard_engines:
+    SessionLocal = sharding.routing_sessionmaker(engine, shard_engines)
+else:
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# A replica mirrors only the primary, so with shards every read goes to the
+# databases themselves
+if READ_REPLICA_URL and not shard_engines:
+    replica_engine = make_engine(READ_REPLICA_URL)
+    ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+else:
+    replica_engine = None
+    ReplicaSessionLocal = SessionLocal
 
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def pool_status(engine) -> dict:
+    """Snapshot of an engine's connection pool usage, and its SQLite writer queue."""
+    pool = engine.pool
+    status = {"pool": type(pool).__name__}
+    if hasattr(pool, "checkedout"):
+        size = pool.size()
+        checked_out = pool.checkedout()
+        overflow = max(pool.overflow(), 0)
+        capacity = size + max(getattr(pool, "_max_overflow", 0), 0)
+        status.update(
+            size=size,
+            checked_out=checked_out,
+            overflow=overflow,
+            capacity=capacity,
+            saturation=round(checked_out / capacity, 3) if capacity else 0.0,
+        )
+    if engine in write_queues:
+        status["writer"] = write_queues[engine].stats()
+    return status
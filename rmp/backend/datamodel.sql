@@ -443,3 +443,188 @@ INSERT INTO Schedule (game_id, week_num, home_team_id, away_team_id, start_time,
 (401772935, 17, 25, 3, '2025-12-29 01:20:00', '99'),
 (401772825, 17, 1, 14, '2025-12-30 01:15:00', '99');
 
+
+-- Migration: Add per-pool change versions and change log for incremental sync
+
+ALTER TABLE pools ADD COLUMN change_version INT DEFAULT 0;
+ALTER TABLE pools ADD COLUMN compacted_version INT DEFAULT 0;
+
+CREATE TABLE pool_changes (
+    pool_id CHAR(36) NOT NULL,
+    version INT NOT NULL,
+    kind VARCHAR(10) NOT NULL, -- entry, pick, pool
+    object_id CHAR(36) NOT NULL,
+    op VARCHAR(10) NOT NULL, -- upsert, delete
+    user_id CHAR(36),
+    created_at DATETIME,
+    PRIMARY KEY (pool_id, version),
+    FOREIGN KEY (pool_id) REFERENCES pools(id)
+);
+
+-- Migration: Add version counters for reference data (used to build ETags)
+-- Triggers on teams and Schedule (migrate.py, VersionTriggers) bump the
+-- matching counter on every insert, update and delete.
+
+CREATE TABLE data_versions (
+    name VARCHAR(50) PRIMARY KEY,
+    version INT NOT NULL DEFAULT 0
+);
+
+INSERT INTO data_versions (name, version) VALUES
+('teams', 1),
+('schedule', 1);
+
+-- Pick upserts look up the existing pick by entry and week
+CREATE INDEX idx_picks_entry_week ON picks(entry_id, week);
+
+-- Team availability checks look up an entry's picks by team id
+CREATE INDEX idx_picks_entry_team ON picks(entry_id, team_id);
+
+-- Migration: Add the jobs table used by the background job runner (jobs.py)
+
+CREATE TABLE jobs (
+    id CHAR(36) PRIMARY KEY,
+    kind VARCHAR(50) NOT NULL,
+    args TEXT, -- JSON
+    status VARCHAR(10) NOT NULL DEFAULT 'queued', -- queued, running, done, failed
+    attempts INT NOT NULL DEFAULT 0,
+    max_attempts INT NOT NULL DEFAULT 5,
+    run_at DATETIME NOT NULL,
+    locked_by VARCHAR(100),
+    locked_at DATETIME,
+    result TEXT, -- JSON
+    error TEXT,
+    created_by CHAR(36),
+    created_at DATETIME,
+    updated_at DATETIME,
+    finished_at DATETIME
+);
+
+-- Workers claim the oldest due job in a given status
+CREATE INDEX idx_jobs_status_run_at ON jobs(status, run_at);
+
+-- Migration: Soft deletes for users, pools and entries, purged in the background (deletion.py)
+-- ADD COLUMN of a nullable column is an instant, online change on MySQL 8
+
+ALTER TABLE users ADD COLUMN deleted_at DATETIME;
+ALTER TABLE pools ADD COLUMN deleted_at DATETIME;
+ALTER TABLE entries ADD COLUMN deleted_at DATETIME;
+
+-- Progress reported by long-running jobs such as purges
+ALTER TABLE jobs ADD COLUMN progress TEXT;
+
+-- Migration: In-app notifications written by the notification jobs (notifications.py)
+
+CREATE TABLE notifications (
+    id CHAR(36) PRIMARY KEY,
+    user_id CHAR(36) NOT NULL,
+    kind VARCHAR(50) NOT NULL, -- deadline_reminder, week_results
+    dedupe_key VARCHAR(100) NOT NULL,
+    title VARCHAR(255) NOT NULL,
+    body TEXT,
+    created_at DATETIME,
+    read_at DATETIME,
+    FOREIGN KEY (user_id) REFERENCES users(id)
+);
+
+-- Lets a retried send skip users it already notified
+CREATE UNIQUE INDEX idx_notifications_user_key ON notifications(user_id, dedupe_key);
+
+-- A user's notification list, newest first
+CREATE INDEX idx_notifications_user_created ON notifications(user_id, created_at);
+
+-- Migration: Server-side login sessions, revocable before their token expires (auth_sessions.py)
+
+CREATE TABLE sessions (
+    id CHAR(36) PRIMARY KEY, -- the token's sid claim
+    user_id CHAR(36) NOT NULL,
+    created_at DATETIME,
+    last_seen_at DATETIME,
+    expires_at DATETIME,
+    revoked_at DATETIME,
+    user_agent VARCHAR(255),
+    ip_address VARCHAR(45),
+    FOREIGN KEY (user_id) REFERENCES users(id)
+);
+
+CREATE INDEX idx_sessions_user_id ON sessions(user_id);
+
+-- Workers poll for sessions revoked since their last poll
+CREATE INDEX idx_sessions_revoked_at ON sessions(revoked_at);
+
+-- Migration: Shard map, the database each pool's entries and picks live on (sharding.py)
+
+CREATE TABLE pool_shards (
+    pool_id CHAR(36) PRIMARY KEY,
+    shard VARCHAR(50) NOT NULL,
+    created_at DATETIME
+);
+
+-- Migration: Seasons on the schedule, and an archive for aged audit logs (seasons.py, archive.py)
+-- ADD COLUMN of a nullable column is an instant, online change on MySQL 8
+
+ALTER TABLE Schedule ADD COLUMN season INT;
+
+-- Audit logs older than AUDIT_LOG_RETENTION_DAYS, moved here by the archive job
+CREATE TABLE audit_logs_archive (
+    id CHAR(36) PRIMARY KEY,
+    user_id CHAR(36),
+    action VARCHAR(255),
+    details TEXT,
+    created_at DATETIME,
+    archived_at DATETIME
+);
+
+CREATE INDEX idx_audit_logs_archive_created_at ON audit_logs_archive(created_at);
+
+-- Migration: Seasons on pools and picks, and an archive for earlier seasons' picks (seasons.py, archive.py)
+-- Runs on every database holding pools: the primary and each shard
+
+ALTER TABLE pools ADD COLUMN season INT;
+ALTER TABLE picks ADD COLUMN season INT;
+
+-- Picks of completed seasons, moved here by the archive job
+CREATE TABLE picks_archive (
+    id CHAR(36) PRIMARY KEY,
+    entry_id CHAR(36),
+    week INT,
+    team VARCHAR(255),
+    team_id INT,
+    locked BOOLEAN DEFAULT FALSE,
+    result VARCHAR(10),
+    season INT,
+    created_at DATETIME,
+    updated_at DATETIME,
+    archived_at DATETIME
+);
+
+-- An entry's pick history
+CREATE INDEX idx_picks_archive_entry_week ON picks_archive(entry_id, week);
+
+-- Migration: Pool formats, and confidences on picks (rules.py)
+-- Runs on every database holding pools: the primary and each shard
+
+-- NULL is survivor, the format of every pool created before this
+ALTER TABLE pools ADD COLUMN pool_type VARCHAR(50);
+ALTER TABLE picks ADD COLUMN confidence INT;
+ALTER TABLE picks_archive ADD COLUMN confidence INT;
+
+-- Migration: A pool's own value for a rule it has chosen (rules.py)
+-- NULL keeps the rule's default_value
+
+ALTER TABLE pool_rules ADD COLUMN value VARCHAR(25);
+
+-- Migration: Idempotency keys and the responses they replay, shared by every API worker (idempotency.py)
+
+CREATE TABLE idempotency_keys (
+    id CHAR(64) PRIMARY KEY, -- SHA-256 of the caller's credentials and Idempotency-Key
+    request_hash CHAR(64) NOT NULL,
+    status INT, -- NULL while the first request is running
+    headers TEXT, -- JSON
+    body LONGBLOB,
+    created_at DATETIME,
+    expires_at DATETIME NOT NULL
+);
+
+-- Expired keys are deleted oldest first
+CREATE INDEX idx_idempotency_keys_expires_at ON idempotency_keys(expires_at);
@@ -0,0 +1,171 @@
+import os
+import time
+from datetime import datetime
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, with_loader_criteria
+
+import models
+import jobs
+import auth_sessions
+from changes import record_change
+
+# Rows removed per transaction while purging; small enough that a chunk
+# never holds locks long enough to stall pick writes
+PURGE_CHUNK_SIZE = int(os.getenv("PURGE_CHUNK_SIZE", 500))
+PURGE_PAUSE_MS = float(os.getenv("PURGE_PAUSE_MS", 20))
+# A user purge may have to wait for pool purges, so allow plenty of retries
+PURGE_MAX_ATTEMPTS = int(os.getenv("PURGE_MAX_ATTEMPTS", 20))
+
+SOFT_DELETABLE = (models.User, models.Pool, models.Entry)
+
+# Execution option that lets the purge jobs see soft-deleted rows
+INCLUDE_DELETED = {"include_deleted": True}
+
+@event.listens_for(Session, "do_orm_execute")
+def _hide_soft_deleted(execute_state):
+    """
+    Soft-deleted users, pools and entries disappear from every ORM query,
+    including joins and get(), the moment their deleted_at is committed.
+    """
+    if not execute_state.is_select or execute_state.execution_options.get("include_deleted", False):
+        return
+    execute_state.statement = execute_state.statement.options(*(
+        with_loader_criteria(model, lambda cls: cls.deleted_at.is_(None), include_aliases=True)
+        for model in SOFT_DELETABLE
+    ))
+
+class StillReferenced(Exception):
+    """Raised by a purge that has to wait for another purge first; the job runner retries it."""
+
+def _pause():
+    time.sleep(PURGE_PAUSE_MS / 1000.0)
+
+def _delete_in_chunks(db: Session, job: models.Job, progress: dict, label: str, model, key, *criteria) -> int:
+    """Delete rows of model matching criteria, PURGE_CHUNK_SIZE per committed transaction."""
+    deleted = 0
+    while True:
+        ids = [row[0] for row in db.query(key).filter(*criteria).limit(PURGE_CHUNK_SIZE)
+               .execution_options(**INCLUDE_DELETED).all()]
+        if not ids:
+            return deleted
+        db.query(model).filter(key.in_(ids), *criteria).execution_options(**INCLUDE_DELETED) \
+            .delete(synchronize_session=False)
+        deleted += len(ids)
+        progress[label] = progress.get(label, 0) + len(ids)
+        jobs.report_progress(db, job, progress)
+        db.commit()
+        _pause()
+
+def _update_in_chunks(db: Session, job: models.Job, progress: dict, label: str, model, key, values: dict, *criteria) -> int:
+    """Like _delete_in_chunks, for an UPDATE that takes rows out of criteria."""
+    updated = 0
+    while True:
+        ids = [row[0] for row in db.query(key).filter(*criteria).limit(PURGE_CHUNK_SIZE)
+               .execution_options(**INCLUDE_DELETED).all()]
+        if not ids:
+            return updated
+        db.query(model).filter(key.in_(ids)).execution_options(**INCLUDE_DELETED) \
+            .update(values, synchronize_session=False)
+        updated += len(ids)
+        progress[label] = progress.get(label, 0) + len(ids)
+        jobs.report_progress(db, job, progress)
+        db.commit()
+        _pause()
+
+def _purge_entries(db: Session, job: models.Job, progress: dict, *entry_criteria):
+    """Picks of the matching entries, live and archived, then the entries themselves."""
+    entry_ids = select(models.Entry.id).where(*entry_criteria)
+    _delete_in_chunks(db, job, progress, "picks", models.Pick, models.Pick.id, models.Pick.entry_id.in_(entry_ids))
+    _delete_in_chunks(db, job, progress, "archived_picks", models.ArchivedPick, models.ArchivedPick.id,
+                      models.ArchivedPick.entry_id.in_(entry_ids))
+    _delete_in_chunks(db, job, progress, "entries", models.Entry, models.Entry.id, *entry_criteria)
+
+# Soft deletes. Each runs inside the request's transaction and enqueues the
+# purge job there too, so the caller commits both at once and returns.
+
+def delete_entry(db: Session, entry: models.Entry, user_id: str) -> models.Job:
+    entry.deleted_at = datetime.utcnow()
+    record_change(db, entry.pool_id, "entry", entry.id, op="delete", user_id=user_id)
+    return jobs.enqueue(db, "purge_entry", {"entry_id": entry.id}, user_id=user_id,
+                        max_attempts=PURGE_MAX_ATTEMPTS)
+
+def delete_pool(db: Session, pool: models.Pool, user_id: str) -> models.Job:
+    pool.deleted_at = datetime.utcnow()
+    record_change(db, pool.id, "pool", pool.id, op="delete", user_id=user_id)
+    return jobs.enqueue(db, "purge_pool", {"pool_id": pool.id}, user_id=user_id,
+                        max_attempts=PURGE_MAX_ATTEMPTS)
+
+def delete_user(db: Session, user: models.User, user_id: str) -> models.Job:
+    now = datetime.utcnow()
+    user.deleted_at = now
+    user.is_active = False
+    # Free the address straight away so it can register again before the purge finishes
+    user.email = f"{user.id}@deleted.invalid"
+    auth_sessions.revoke_user_sessions(db, user.id)
+    entries = db.query(models.Entry).filter(models.Entry.user_id == user.id).all()
+    for entry in entries:
+        entry.deleted_at = now
+        record_change(db, entry.pool_id, "entry", entry.id, op="delete", user_id=user_id)
+    return jobs.enqueue(db, "purge_user", {"user_id": user.id}, user_id=user_id,
+                        max_attempts=PURGE_MAX_ATTEMPTS)
+
+# Purge jobs. Every step deletes only what is left, so a retried job picks
+# up where the previous attempt stopped.
+
+@jobs.handler("purge_entry")
+def _purge_entry_job(db: Session, job: models.Job):
+    entry_id = jobs.job_args(job)["entry_id"]
+    progress = {}
+    _purge_entries(db, job, progress, models.Entry.id == entry_id, models.Entry.deleted_at.isnot(None))
+    return progress
+
+@jobs.handler("purge_pool")
+def _purge_pool_job(db: Session, job: models.Job):
+    pool_id = jobs.job_args(job)["pool_id"]
+    progress = {}
+    # Hide the pool's entries first, chunk by chunk, then remove them
+    _update_in_chunks(db, job, progress, "entries_hidden", models.Entry, models.Entry.id,
+                      {models.Entry.deleted_at: datetime.utcnow()},
+                      models.Entry.pool_id == pool_id, models.Entry.deleted_at.is_(None))
+    _purge_entries(db, job, progress, models.Entry.pool_id == pool_id)
+    _delete_in_chunks(db, job, progress, "pool_admins", models.PoolAdmin, models.PoolAdmin.user_id,
+                      models.PoolAdmin.pool_id == pool_id)
+    _delete_in_chunks(db, job, progress, "pool_changes", models.PoolChange, models.PoolChange.version,
+                      models.PoolChange.pool_id == pool_id)
+    _delete_in_chunks(db, job, progress, "pool_rules", models.PoolRule, models.PoolRule.rule_id,
+                      models.PoolRule.pool_id == pool_id)
+    db.query(models.Pool).filter(models.Pool.id == pool_id, models.Pool.deleted_at.isnot(None)) \
+        .execution_options(**INCLUDE_DELETED).delete(synchronize_session=False)
+    progress["pools"] = 1
+    return progress
+
+@jobs.handler("purge_user")
+def _purge_user_job(db: Session, job: models.Job):
+    user_id = jobs.job_args(job)["user_id"]
+    progress = {}
+    _purge_entries(db, job, progress, models.Entry.user_id == user_id)
+    _delete_in_chunks(db, job, progress, "pool_admins", models.PoolAdmin, models.PoolAdmin.pool_id,
+                      models.PoolAdmin.user_id == user_id)
+    _delete_in_chunks(db, job, progress, "messages", models.MessageBoard, models.MessageBoard.id,
+                      models.MessageBoard.user_id == user_id)
+    _delete_in_chunks(db, job, progress, "notifications", models.Notification, models.Notification.id,
+                      models.Notification.user_id == user_id)
+    _delete_in_chunks(db, job, progress, "sessions", models.UserSession, models.UserSession.id,
+                      models.UserSession.user_id == user_id)
+    # Keep the audit trail, minus the reference to the deleted account
+    _update_in_chunks(db, job, progress, "audit_logs_detached", models.AuditLog, models.AuditLog.id,
+                      {models.AuditLog.user_id: None}, models.AuditLog.user_id == user_id)
+
+    owned = db.query(models.Pool.id).filter(models.Pool.owner_id == user_id) \
+        .execution_options(**INCLUDE_DELETED).first()
+    if owned:
+        # Deleting a user is refused while they own live pools, so this is a
+        # pool purge still in flight; retry once it has finished.
+        db.commit()
+        raise StillReferenced(f"Pool {owned.id} owned by this user has not been purged yet")
+
+    db.query(models.User).filter(models.User.id == user_id, models.User.deleted_at.isnot(None)) \
+        .execution_options(**INCLUDE_DELETED).delete(synchronize_session=False)
+    progress["users"] = 1
+    return progress
@@ -1,39 +1,114 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from jose import jwt, JWTError
-from database import SessionLocal
+from collections import OrderedDict
+from database import SessionLocal, ReplicaSessionLocal
 import models
+import auth_sessions
+import hashlib
 import os
+import threading
+import time
 
 SECRET_KEY = os.getenv("SECRET_KEY", "supersecretkey")
 ALGORITHM = "HS256"
 
+# After a user's own write, their reads go to the primary for this long so
+# they never see replica lag on data they just changed
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", 5))
+# Tokens issued before server-side sessions carry no session id. Accept them
+# until they expire (one token lifetime after the deploy), then turn this off.
+ACCEPT_STATELESS_TOKENS = os.getenv("ACCEPT_STATELESS_TOKENS", "true").lower() == "true"
+
 security = HTTPBearer()
 
-def get_db():
+_recent_writers = OrderedDict()
+_recent_writers_lock = threading.Lock()
+
+def _writer_key(request: Request):
+    authorization = request.headers.get("authorization")
+    return hashlib.sha1(authorization.encode()).hexdigest() if authorization else None
+
+def _mark_writer(request: Request):
+    key = _writer_key(request)
+    if key is None:
+        return
+    with _recent_writers_lock:
+        _recent_writers[key] = time.monotonic() + READ_YOUR_WRITES_SECONDS
+        _recent_writers.move_to_end(key)
+        # Entries are in expiry order, so expired ones are always at the front
+        while _recent_writers and next(iter(_recent_writers.values())) < time.monotonic():
+            _recent_writers.popitem(last=False)
+
+def _wrote_recently(request: Request) -> bool:
+    key = _writer_key(request)
+    if key is None:
+        return False
+    with _recent_writers_lock:
+        expires_at = _recent_writers.get(key)
+    return expires_at is not None and expires_at > time.monotonic()
+
+def get_db(request: Request):
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+        if request.method not in ("GET", "HEAD", "OPTIONS"):
+            _mark_writer(request)
+
+def get_read_db(request: Request):
+    """
+    Session for GET-only routes. Uses the read replica when one is
+    configured, except for callers who made a write in the last
+    READ_YOUR_WRITES_SECONDS, who stay on the primary. Recent writers are
+    tracked per worker process.
+
+    Don't use this for routes that are cached or send an ETag; those are
+    keyed on the primary's versions (see versions.py).
+    """
+    if ReplicaSessionLocal is SessionLocal or _wrote_recently(request):
+        db = SessionLocal()
+    else:
+        db = ReplicaSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
 
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
 ):
-    """Get the current authenticated user from JWT token."""
+    """Get the current authenticated user from the token's server-side session."""
     try:
         token = credentials.credentials
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email = payload.get("sub")
+        sid = payload.get("sid")
         
-        if not email:
+        # Password reset tokens are signed with the same key but are not logins
+        if not email or payload.get("type") is not None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid authentication credentials"
             )
         
+        if sid:
+            user = auth_sessions.cache.validate(db, sid)
+            if not user:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Session expired or revoked"
+                )
+            return user
+        
+        if not ACCEPT_STATELESS_TOKENS:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Session expired or revoked"
+            )
         user = db.query(models.User).filter(models.User.email == email).first()
         if not user:
             raise HTTPException(
@@ -47,3 +122,43 @@ def get_current_user(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials"
         )
+
+def get_session_id(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """The session id of the current request's token, if it has one."""
+    try:
+        return jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM]).get("sid")
+    except JWTError:
+        return None
+
+def require_super_admin(current_user: models.User = Depends(get_current_user)):
+    """Allow only site super-admins."""
+    if current_user.role != models.UserRole.SUPER_ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Super admin access required"
+        )
+    return current_user
+
+def require_pool_admin(
+    pool_id: str,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """Allow the pool's owner, its pool admins and super-admins."""
+    if current_user.role == models.UserRole.SUPER_ADMIN:
+        return current_user
+    pool = db.query(models.Pool.owner_id).filter(models.Pool.id == pool_id).first()
+    if not pool:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Pool not found")
+    if pool.owner_id == current_user.id:
+        return current_user
+    is_admin = db.query(models.PoolAdmin.user_id).filter(
+        models.PoolAdmin.pool_id == pool_id,
+        models.PoolAdmin.user_id == current_user.id
+    ).first()
+    if not is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Pool admin access required"
+        )
+    return current_user
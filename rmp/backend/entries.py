@@ -4,11 +4,18 @@ from typing import List
 import models
 import schemas
 import deps
+from changes import record_change
+import versions
+import deletion
+import sharding
 from datetime import datetime
+import logging
 import uuid
 
 router = APIRouter(prefix="/entries", tags=["entries"])
 
+logger = logging.getLogger(__name__)
+
 @router.post("/create", response_model=schemas.EntryOut)
 def create_entry(
     entry: schemas.EntryCreate, 
@@ -43,19 +50,21 @@ def create_entry(
         )
         
         db.add(db_entry)
+        record_change(db, db_entry.pool_id, "entry", db_entry.id, user_id=current_user.id)
         db.commit()
         db.refresh(db_entry)
         
         return db_entry
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"Create entry error: {str(e)}")
+    except Exception:
+        logger.exception("create entry failed")
         raise HTTPException(status_code=500, detail="Failed to create entry")
 
 @router.get("/pool/{pool_id}", response_model=List[schemas.EntryOut])
 def get_user_entries_for_pool(
     pool_id: str,
+    etag: str = Depends(versions.UserConditionalGet("pool")),
     db: Session = Depends(deps.get_db),
     current_user: models.User = Depends(deps.get_current_user)
 ):
@@ -67,32 +76,32 @@ def get_user_entries_for_pool(
         ).all()
         
         return entries
-    except Exception as e:
-        print(f"Get user entries error: {str(e)}")
+    except Exception:
+        logger.exception("get user entries failed")
         raise HTTPException(status_code=500, detail="Failed to retrieve entries")
 
 @router.get("/", response_model=List[schemas.EntryOut])
 def list_entries(
     skip: int = 0, 
     limit: int = 100, 
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
     current_user: models.User = Depends(deps.get_current_user)
 ):
     """Get all entries for the current user."""
     try:
-        entries = db.query(models.Entry).filter(
+        entries = sharding.fan_out_page(db, lambda session: session.query(models.Entry).filter(
             models.Entry.user_id == current_user.id
-        ).offset(skip).limit(limit).all()
+        ), [models.Entry.created_at, models.Entry.id], skip, limit)
         
         return entries
-    except Exception as e:
-        print(f"List entries error: {str(e)}")
+    except Exception:
+        logger.exception("list entries failed")
         raise HTTPException(status_code=500, detail="Failed to retrieve entries")
 
 @router.get("/{entry_id}", response_model=schemas.EntryOut)
 def get_entry(
     entry_id: str, 
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
     current_user: models.User = Depends(deps.get_current_user)
 ):
     """Get a specific entry (only if owned by current user)."""
@@ -108,8 +117,8 @@ def get_entry(
         return entry
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"Get entry error: {str(e)}")
+    except Exception:
+        logger.exception("get entry failed")
         raise HTTPException(status_code=500, detail="Failed to retrieve entry")
 
 @router.put("/{entry_id}", response_model=schemas.EntryOut)
@@ -133,6 +142,7 @@ def update_entry(
             entry.name = entry_update.name
         
         entry.updated_at = datetime.utcnow()
+        record_change(db, entry.pool_id, "entry", entry.id, user_id=current_user.id)
         
         db.commit()
         db.refresh(entry)
@@ -140,17 +150,17 @@ def update_entry(
         return entry
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"Update entry error: {str(e)}")
+    except Exception:
+        logger.exception("update entry failed")
         raise HTTPException(status_code=500, detail="Failed to update entry")
 
-@router.delete("/{entry_id}")
+@router.delete("/{entry_id}", status_code=202)
 def delete_entry(
     entry_id: str, 
     db: Session = Depends(deps.get_db),
     current_user: models.User = Depends(deps.get_current_user)
 ):
-    """Delete an entry (only if owned by current user)."""
+    """Delete an entry (only if owned by current user). Its picks are purged in the background."""
     try:
         entry = db.query(models.Entry).filter(
             models.Entry.id == entry_id,
@@ -160,12 +170,12 @@ def delete_entry(
         if not entry:
             raise HTTPException(status_code=404, detail="Entry not found")
         
-        db.delete(entry)
+        job = deletion.delete_entry(db, entry, current_user.id)
         db.commit()
         
-        return {"message": "Entry deleted successfully"}
+        return {"message": "Entry deleted successfully", "job_id": job.id}
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"Delete entry error: {str(e)}")
+    except Exception:
+        logger.exception("delete entry failed")
         raise HTTPException(status_code=500, detail="Failed to delete entry")
@@ -0,0 +1,20 @@
+#!/bin/sh
+# Bring the schema up to date, then run the container's command (the API
+# by default). Tasks starting together wait for each other's migration run
+# instead of failing; set MIGRATE_ON_START=false to skip this step.
+set -e
+
+if [ "${MIGRATE_ON_START:-true}" = "true" ]; then
+    attempt=1
+    # The database may still be starting (docker compose); retry before giving up
+    until python migrate.py --lock-wait "${MIGRATE_LOCK_WAIT_SECONDS:-600}"; do
+        if [ "$attempt" -ge "${MIGRATE_ATTEMPTS:-10}" ]; then
+            echo "migrate.py failed after $attempt attempts" >&2
+            exit 1
+        fi
+        attempt=$((attempt + 1))
+        sleep 5
+    done
+fi
+
+exec "$@"
@@ -0,0 +1,281 @@
+import csv
+import io
+import os
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, literal, or_
+
+import database
+import deps
+import models
+import rules
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover - optional columnar formats
+    pyarrow = None
+
+# Rows fetched per query; the most an export holds in memory at once
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 1000))
+# Rows per Parquet row group; bounds memory for columnar output
+EXPORT_ROW_GROUP_SIZE = int(os.getenv("EXPORT_ROW_GROUP_SIZE", 10000))
+
+# format -> (media type, file extension)
+FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+}
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+class Report:
+    """
+    An export: its (name, type) columns and a query returning one tuple per
+    row. Users live on the global database and pool data may be on a shard
+    (see sharding.py), so queries never join users: a report with an
+    email_column selects the user id there and each batch swaps in emails.
+
+    Rows are read a batch at a time by keyset: keys are the (column index,
+    descending) pairs the report is sorted by, ending in a unique column,
+    and each batch asks for the rows after the last one of the batch before.
+    The MySQL driver buffers whole result sets client-side, so a single
+    query over a large pool would be held in memory at once.
+    """
+
+    def __init__(self, name: str, columns: list, query, keys: list, email_column: int = None):
+        self.name = name
+        self.columns = columns
+        self.query = query
+        self.keys = keys
+        self.email_column = email_column
+
+def _entries_query(db, pool_id: str):
+    return db.query(
+        models.Entry.id, models.Entry.name, models.Entry.user_id, models.Entry.user_id.label("user_email"),
+        models.Entry.alive, models.Entry.created_at, models.Entry.updated_at
+    ).filter(
+        models.Entry.pool_id == pool_id
+    )
+
+def _picks_query(db, pool_id: str):
+    return db.query(
+        models.Pick.id, models.Pick.entry_id, models.Entry.name, models.Entry.user_id, models.Pick.week,
+        models.Pick.team_id, models.Pick.team, models.Pick.locked, models.Pick.result,
+        models.Pick.created_at, models.Pick.updated_at
+    ).join(models.Entry, models.Entry.id == models.Pick.entry_id).filter(models.Entry.pool_id == pool_id)
+
+def _standings_query(db, pool_id: str):
+    # Scored by the pool's rules, as GET /pools/{id}/standings is, and
+    # aggregated in the database; a subquery, so that batches can be selected by score
+    scores = rules.standings_query(db, rules.plan_for(pool_id, db), pool_id).subquery()
+    return db.query(scores.c.entry_id, scores.c.name, scores.c.user_id, scores.c.alive, scores.c.correct,
+                    scores.c.incorrect, scores.c.points)
+
+def _audit_query(db, since: datetime = None):
+    query = db.query(
+        models.AuditLog.id, models.AuditLog.user_id, models.AuditLog.action,
+        models.AuditLog.details, models.AuditLog.created_at
+    )
+    if since is not None:
+        query = query.filter(models.AuditLog.created_at >= since)
+    return query
+
+POOL_REPORTS = {
+    "entries": Report("entries", [
+        ("entry_id", "string"), ("entry_name", "string"), ("user_id", "string"), ("user_email", "string"),
+        ("alive", "bool"), ("created_at", "datetime"), ("updated_at", "datetime"),
+    ], _entries_query, keys=[(0, False)], email_column=3),
+    "picks": Report("picks", [
+        ("pick_id", "string"), ("entry_id", "string"), ("entry_name", "string"), ("user_email", "string"),
+        ("week", "int"), ("team_id", "int"), ("team", "string"), ("locked", "bool"), ("result", "string"),
+        ("created_at", "datetime"), ("updated_at", "datetime"),
+    ], _picks_query, keys=[(1, False), (4, False), (0, False)], email_column=3),
+    "standings": Report("standings", [
+        ("entry_id", "string"), ("entry_name", "string"), ("user_email", "string"), ("alive", "bool"),
+        ("correct", "int"), ("incorrect", "int"), ("points", "int"),
+    ], _standings_query, keys=[(3, True), (6, True), (5, False), (1, False), (0, False)], email_column=2),
+}
+
+AUDIT_REPORT = Report("audit", [
+    ("id", "string"), ("user_id", "string"), ("action", "string"), ("details", "string"),
+    ("created_at", "datetime"),
+], _audit_query, keys=[(4, False), (0, False)])
+
+def _with_emails(db, report: Report, batch: list) -> list:
+    """The batch with the user ids in report.email_column replaced by emails, in one lookup."""
+    column = report.email_column
+    user_ids = {row[column] for row in batch if row[column] is not None}
+    emails = dict(db.query(models.User.id, models.User.email).filter(models.User.id.in_(user_ids))) \
+        if user_ids else {}
+    return [row[:column] + (emails.get(row[column]),) + row[column + 1:] for row in batch]
+
+def _after(keys: list, last: tuple):
+    """
+    Criteria for the rows sorting after last, keys being (column,
+    descending) pairs. NULLs sort first ascending and last descending, as
+    they do in MySQL and SQLite.
+    """
+    # Bound as literals: booleans (alive) compare with < and > too
+    values = [literal(value, column.type) if value is not None else None for (column, _), value in zip(keys, last)]
+    clauses = []
+    for i, ((column, descending), value) in enumerate(zip(keys, values)):
+        if value is None:
+            beyond = None if descending else column.isnot(None)
+        else:
+            beyond = or_(column < value, column.is_(None)) if descending else column > value
+        if beyond is not None:
+            same = [prefix == prior if prior is not None else prefix.is_(None)
+                    for (prefix, _), prior in zip(keys[:i], values)]
+            clauses.append(and_(*same, beyond))
+    return or_(*clauses)
+
+def _batches(report: Report, params: dict):
+    """Lists of at most EXPORT_BATCH_SIZE row tuples, one keyset query each, on a session of our own."""
+    # The request's session is closed once the handler returns, before the
+    # body is streamed, so the generator opens (and always closes) its own
+    db = database.ReplicaSessionLocal()
+    try:
+        last = None
+        while True:
+            query = report.query(db, **params)
+            columns = [description["expr"] for description in query.column_descriptions]
+            keys = [(columns[index], descending) for index, descending in report.keys]
+            if last is not None:
+                query = query.filter(_after(keys, last))
+            batch = [tuple(row) for row in query.order_by(
+                *(column.desc() if descending else column for column, descending in keys)
+            ).limit(EXPORT_BATCH_SIZE)]
+            if not batch:
+                return
+            last = tuple(batch[-1][index] for index, _ in report.keys)
+            yield _with_emails(db, report, batch) if report.email_column is not None else batch
+            if len(batch) < EXPORT_BATCH_SIZE:
+                return
+    finally:
+        db.close()
+
+def _csv_stream(report: Report, batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # The header goes out before the query runs, so the download starts at once
+    writer.writerow([name for name, _ in report.columns])
+    yield buffer.getvalue().encode()
+    for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(batch)
+        yield buffer.getvalue().encode()
+
+class _ChunkSink:
+    """Write-only file object that hands back whatever was written since the last drain()."""
+
+    def __init__(self):
+        self.closed = False
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+def _arrow_schema(report: Report):
+    types = {
+        "string": pyarrow.string(),
+        "int": pyarrow.int64(),
+        "bool": pyarrow.bool_(),
+        "datetime": pyarrow.timestamp("us"),
+    }
+    return pyarrow.schema([(name, types[type_]) for name, type_ in report.columns])
+
+def _arrow_table(schema, rows: list):
+    columns = list(zip(*rows))
+    return pyarrow.Table.from_arrays(
+        [pyarrow.array(column, type=field.type) for column, field in zip(columns, schema)],
+        schema=schema
+    )
+
+def _columnar_stream(report: Report, batches, fmt: str):
+    schema = _arrow_schema(report)
+    sink = _ChunkSink()
+    if fmt == "parquet":
+        writer = pyarrow.parquet.ParquetWriter(sink, schema)
+        group_size = EXPORT_ROW_GROUP_SIZE
+    else:
+        writer = pyarrow.ipc.new_stream(sink, schema)
+        group_size = EXPORT_BATCH_SIZE
+    yield sink.drain()
+
+    pending = []
+    for batch in batches:
+        pending.extend(batch)
+        if len(pending) >= group_size:
+            writer.write_table(_arrow_table(schema, pending))
+            pending = []
+            yield sink.drain()
+    if pending:
+        writer.write_table(_arrow_table(schema, pending))
+    writer.close()
+    yield sink.drain()
+
+def _export_response(report: Report, params: dict, fmt: str, filename: str) -> StreamingResponse:
+    if fmt not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(FORMATS)}")
+    if fmt != "csv" and pyarrow is None:
+        raise HTTPException(status_code=501, detail=f"{fmt} export requires pyarrow to be installed")
+
+    media_type, extension = FORMATS[fmt]
+    batches = _batches(report, params)
+    body = _csv_stream(report, batches) if fmt == "csv" else _columnar_stream(report, batches, fmt)
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}.{extension}"',
+            "Cache-Control": "no-store",
+        }
+    )
+
+@router.get("/pools/{pool_id}/{report}")
+def export_pool_report(
+    pool_id: str,
+    report: str,
+    format: str = "csv",
+    current_user: models.User = Depends(deps.require_pool_admin)
+):
+    """
+    Stream a pool's entries, picks or standings as CSV (default), Parquet or
+    an Arrow IPC stream. Pool owners, pool admins and super-admins only.
+    """
+    if report not in POOL_REPORTS:
+        raise HTTPException(status_code=404, detail=f"Unknown report {report}")
+    return _export_response(POOL_REPORTS[report], {"pool_id": pool_id}, format, f"pool-{pool_id}-{report}")
+
+@router.get("/audit")
+def export_audit_logs(
+    since: datetime = None,
+    format: str = "csv",
+    current_user: models.User = Depends(deps.require_super_admin)
+):
+    """Stream audit logs, optionally only those created at or after `since`. Super-admins only."""
+    return _export_response(AUDIT_REPORT, {"since": since}, format, "audit-logs")
@@ -0,0 +1,141 @@
+import asyncio
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from database import DATABASE_URL, SessionLocal, is_sqlite
+
+# On by default with SQLite, whose single writer makes each commit a queue turn
+PICK_GROUP_COMMIT = os.getenv(
+    "PICK_GROUP_COMMIT", "true" if is_sqlite(DATABASE_URL) else "false"
+).lower() in ("1", "true", "yes")
+PICK_GROUP_COMMIT_MAX_BATCH = int(os.getenv("PICK_GROUP_COMMIT_MAX_BATCH", 100))
+PICK_GROUP_COMMIT_MAX_DELAY_MS = float(os.getenv("PICK_GROUP_COMMIT_MAX_DELAY_MS", 5))
+
+_STOP = object()
+
+class GroupCommitQueue:
+    """
+    Coalesces many small writes into one transaction.
+
+    Each submitted write is a callable taking a Session. A single writer
+    thread collects writes for up to max_delay_ms (or max_batch writes),
+    runs each one inside its own SAVEPOINT so a failing write only rolls back
+    itself, then commits the whole batch once. A caller's future is completed
+    only after that commit, so success still means the write is durable.
+    """
+
+    def __init__(self, session_factory=SessionLocal, max_batch: int = PICK_GROUP_COMMIT_MAX_BATCH,
+                 max_delay_ms: float = PICK_GROUP_COMMIT_MAX_DELAY_MS):
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000.0
+        self.commits = 0
+        self.writes = 0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="group-commit-writer", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Flush anything still queued and stop the writer thread."""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+    def submit(self, write) -> Future:
+        future = Future()
+        self.start()
+        self._queue.put((write, future))
+        return future
+
+    async def run(self, write):
+        """Submit a write and wait for its individual result after the batch commits."""
+        return await asyncio.wrap_future(self.submit(write))
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._flush(batch)
+
+    def _flush(self, batch):
+        # Skip writes whose caller has already gone away
+        batch = [(write, future) for write, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        outcomes = []
+        committed = False
+        db = self.session_factory(expire_on_commit=False)
+        try:
+            for write, future in batch:
+                try:
+                    with db.begin_nested():
+                        outcomes.append((future, True, write(db)))
+                except Exception as e:
+                    outcomes.append((future, False, e))
+            db.commit()
+            committed = True
+        except Exception:
+            db.rollback()
+        finally:
+            db.close()
+
+        if not committed:
+            # The batch commit itself failed; fall back to one transaction per
+            # write so each caller still gets its own result.
+            for write, future in batch:
+                self._flush_single(write, future)
+            return
+
+        self.commits += 1
+        self.writes += len(batch)
+        for future, ok, value in outcomes:
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+    def _flush_single(self, write, future):
+        db = self.session_factory(expire_on_commit=False)
+        try:
+            result = write(db)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            future.set_exception(e)
+            return
+        finally:
+            db.close()
+        self.commits += 1
+        self.writes += 1
+        future.set_result(result)
+
+pick_queue = GroupCommitQueue()
@@ -0,0 +1,274 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+
+import models
+from database import SessionLocal
+
+IDEMPOTENCY_HEADER = b"idempotency-key"
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", 60 * 60 * 24))
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", 10))
+# How often a retry waiting on the first request re-reads its key
+IDEMPOTENCY_POLL_SECONDS = float(os.getenv("IDEMPOTENCY_POLL_SECONDS", 0.1))
+# Expired keys are deleted, at most this many at a time, once every this many new keys per worker
+IDEMPOTENCY_PURGE_EVERY = int(os.getenv("IDEMPOTENCY_PURGE_EVERY", 1000))
+IDEMPOTENCY_PURGE_BATCH = int(os.getenv("IDEMPOTENCY_PURGE_BATCH", 1000))
+
+# Mutating endpoints that honour the Idempotency-Key header
+IDEMPOTENT_PATHS = {"/picks/create", "/entries/create"}
+
+class _Record:
+    __slots__ = ("request_hash", "status", "headers", "body")
+
+    def __init__(self, request_hash: str, status: int = None, headers: list = None, body: bytes = None):
+        self.request_hash = request_hash
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+def _encode_headers(headers: list) -> str:
+    return json.dumps([[name.decode("latin-1"), value.decode("latin-1")] for name, value in headers])
+
+def _decode_headers(headers: str) -> list:
+    return [(name.encode("latin-1"), value.encode("latin-1")) for name, value in json.loads(headers or "[]")]
+
+class IdempotencyStore:
+    """
+    Idempotency keys -> (request hash, stored response), in the
+    idempotency_keys table: a client's retry can reach any worker of any
+    task, so every one of them must see the key. The key is the primary
+    key, so of two requests racing with it exactly one INSERT succeeds and
+    runs the handler; the other waits for its response. Blocking, so the
+    middleware calls it from the threadpool.
+    """
+
+    def __init__(self, session_factory=SessionLocal, ttl_seconds: int = IDEMPOTENCY_TTL_SECONDS):
+        self.session_factory = session_factory
+        self.ttl_seconds = ttl_seconds
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _load(self, db, key: str):
+        """The live record for key, or None; an expired one is deleted."""
+        row = db.query(models.IdempotencyKey).filter(models.IdempotencyKey.id == key).first()
+        if row is None:
+            return None
+        if row.expires_at <= datetime.utcnow():
+            db.query(models.IdempotencyKey).filter(
+                models.IdempotencyKey.id == key, models.IdempotencyKey.expires_at == row.expires_at
+            ).delete(synchronize_session=False)
+            db.commit()
+            return None
+        return _Record(row.request_hash, row.status, _decode_headers(row.headers) if row.status else None, row.body)
+
+    def begin(self, key: str, request_hash: str):
+        """
+        Return (record, created). When created is True the caller owns the
+        key and must call finish() or abort() on it.
+        """
+        db = self.session_factory()
+        try:
+            # A key can expire or be aborted between our INSERT and our read; try again then
+            for _ in range(3):
+                now = datetime.utcnow()
+                db.add(models.IdempotencyKey(id=key, request_hash=request_hash, created_at=now,
+                                             expires_at=now + timedelta(seconds=self.ttl_seconds)))
+                try:
+                    db.commit()
+                except IntegrityError:
+                    db.rollback()
+                else:
+                    self._note_created()
+                    return _Record(request_hash), True
+                record = self._load(db, key)
+                if record is not None:
+                    return record, False
+            # Still contended: report it as in progress
+            return _Record(request_hash), False
+        finally:
+            db.close()
+
+    def get(self, key: str):
+        db = self.session_factory()
+        try:
+            return self._load(db, key)
+        finally:
+            db.close()
+
+    def finish(self, key: str, status: int, headers: list, body: bytes):
+        db = self.session_factory()
+        try:
+            db.query(models.IdempotencyKey).filter(models.IdempotencyKey.id == key).update(
+                {models.IdempotencyKey.status: status, models.IdempotencyKey.headers: _encode_headers(headers),
+                 models.IdempotencyKey.body: body},
+                synchronize_session=False
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def abort(self, key: str):
+        """Drop a key whose request failed so a retry can run it again."""
+        db = self.session_factory()
+        try:
+            db.query(models.IdempotencyKey).filter(
+                models.IdempotencyKey.id == key, models.IdempotencyKey.status.is_(None)
+            ).delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    def _note_created(self):
+        with self._lock:
+            self._created += 1
+            due = self._created % IDEMPOTENCY_PURGE_EVERY == 0
+        if due:
+            self.purge_expired()
+
+    def purge_expired(self) -> int:
+        """Delete up to IDEMPOTENCY_PURGE_BATCH expired keys, oldest first."""
+        db = self.session_factory()
+        try:
+            expired = [key for (key,) in db.query(models.IdempotencyKey.id).filter(
+                models.IdempotencyKey.expires_at <= datetime.utcnow()
+            ).order_by(models.IdempotencyKey.expires_at).limit(IDEMPOTENCY_PURGE_BATCH)]
+            if expired:
+                db.query(models.IdempotencyKey).filter(models.IdempotencyKey.id.in_(expired)).delete(
+                    synchronize_session=False
+                )
+                db.commit()
+            return len(expired)
+        finally:
+            db.close()
+
+    async def wait(self, key: str, timeout: float):
+        """The key's record once its response is stored, or as it stands after timeout (None if aborted)."""
+        deadline = time.monotonic() + timeout
+        while True:
+            record = await run_in_threadpool(self.get, key)
+            if record is None or record.status is not None or time.monotonic() >= deadline:
+                return record
+            await asyncio.sleep(IDEMPOTENCY_POLL_SECONDS)
+
+store = IdempotencyStore()
+
+def _request_hash(method: str, path: str, body: bytes) -> str:
+    digest = hashlib.sha256()
+    digest.update(method.encode())
+    digest.update(b" ")
+    digest.update(path.encode())
+    digest.update(b"\n")
+    digest.update(body)
+    return digest.hexdigest()
+
+def _scope_key(headers: dict, idempotency_key: bytes) -> str:
+    # Keys are scoped to the caller's credentials so two users can never
+    # collide on (or replay) each other's keys. The bearer token is hashed
+    # rather than decoded, which keeps the replay path free of user lookups.
+    digest = hashlib.sha256(headers.get(b"authorization", b""))
+    digest.update(b"\n")
+    digest.update(idempotency_key)
+    return digest.hexdigest()
+
+async def _send_json(send, status: int, body: bytes, extra_headers: list = None):
+    headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    headers.extend(extra_headers or [])
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+class IdempotencyMiddleware:
+    """
+    ASGI middleware that replays the stored response for a repeated
+    Idempotency-Key instead of re-running the handler. Only responses with a
+    status below 500 are stored; server errors release the key so the client
+    can retry.
+    """
+
+    def __init__(self, app, paths=None, store: IdempotencyStore = store):
+        self.app = app
+        self.paths = set(paths or IDEMPOTENT_PATHS)
+        self.store = store
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        idempotency_key = headers.get(IDEMPOTENCY_HEADER)
+        if not idempotency_key:
+            await self.app(scope, receive, send)
+            return
+
+        # Buffer the request body so it can be hashed and then handed on
+        body = b""
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+        key = _scope_key(headers, idempotency_key)
+        request_hash = _request_hash(scope["method"], scope["path"], body)
+        record, created = await run_in_threadpool(self.store.begin, key, request_hash)
+
+        if not created:
+            if record.request_hash != request_hash:
+                await _send_json(send, 422, b'{"detail":"Idempotency-Key was already used with a different request"}')
+                return
+            if record.status is None:
+                # The original request is still running; wait for its result
+                # rather than executing the same write twice.
+                record = await self.store.wait(key, IDEMPOTENCY_WAIT_SECONDS)
+            if record is None or record.status is None:
+                await _send_json(
+                    send, 409,
+                    b'{"detail":"A request with this Idempotency-Key is still in progress"}',
+                    [(b"retry-after", b"1")],
+                )
+                return
+            await send({"type": "http.response.start", "status": record.status,
+                        "headers": record.headers + [(b"idempotent-replayed", b"true")]})
+            await send({"type": "http.response.body", "body": record.body})
+            return
+
+        body_sent = False
+
+        async def replay_receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        response = {"status": None, "headers": [], "body": b""}
+
+        async def capture_send(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                response["body"] += message.get("body", b"")
+            await send(message)
+
+        try:
+            await self.app(scope, replay_receive, capture_send)
+        except BaseException:
+            # Not awaited: a cancelled request must still release its key
+            self.store.abort(key)
+            raise
+
+        if response["status"] is None or response["status"] >= 500:
+            await run_in_threadpool(self.store.abort, key)
+        else:
+            await run_in_threadpool(self.store.finish, key, response["status"], response["headers"],
+                                    response["body"])
@@ -0,0 +1,239 @@
+"""
+Cross-worker cache invalidation.
+
+Each worker keeps its own caches (versions, sessions, and everything keyed
+on versions: the response cache, the team map, schedule payloads). A write
+evicts the writer's entries as soon as it commits; this bus carries the same
+evictions to every other worker, so their staleness is bounded by bus
+latency instead of the caches' TTLs, which can then be set generously. The
+TTLs still apply, as a backstop for messages lost while a worker was
+disconnected; on reconnecting, a worker also clears its caches outright.
+
+Modules register handlers with bus.subscribe(topic, fn) and bus.on_reset(fn)
+and call bus.publish(topic, keys) after commit. Publishing never blocks the
+request: messages are queued and a background thread sends everything queued
+so far as one compact message.
+
+INVALIDATION_BUS_URL selects the backend:
+    unset or memory://     in-process only (a single worker, and tests)
+    redis://host:6379/0    Redis (or any Redis-protocol server) pub/sub
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+import uuid
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - only needed with a redis:// bus
+    redis = None
+
+INVALIDATION_BUS_URL = os.getenv("INVALIDATION_BUS_URL", "")
+INVALIDATION_CHANNEL = os.getenv("INVALIDATION_CHANNEL", "rmp:invalidate")
+# Keys merged into one published message at most
+INVALIDATION_MAX_BATCH = int(os.getenv("INVALIDATION_MAX_BATCH", 500))
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+class InvalidationBus:
+    """Routes invalidation messages to the handlers subscribed in this process."""
+
+    def __init__(self, channel: str = INVALIDATION_CHANNEL, max_batch: int = INVALIDATION_MAX_BATCH):
+        self.channel = channel
+        self.max_batch = max_batch
+        # Lets a worker skip its own messages; it evicted those keys at commit
+        self.origin = uuid.uuid4().hex[:12]
+        self.counters = {"published": 0, "messages_sent": 0, "received": 0, "resets": 0, "errors": 0}
+        self._handlers = {}
+        self._reset_handlers = []
+        self._outbox = queue.Queue()
+        self._publisher = None
+        self._lock = threading.Lock()
+
+    def subscribe(self, topic: str, handler):
+        """Call handler(key) for every key published on topic by another worker."""
+        self._handlers.setdefault(topic, []).append(handler)
+
+    def on_reset(self, handler):
+        """Call handler() when messages may have been missed and every cache must go."""
+        self._reset_handlers.append(handler)
+
+    def publish(self, topic: str, keys):
+        for key in keys:
+            self._outbox.put((topic, key))
+            self.counters["published"] += 1
+        self._ensure_publisher()
+
+    def start(self):
+        self._ensure_publisher()
+
+    def stop(self, timeout: float = 5.0):
+        """Send whatever is still queued and stop the background threads."""
+        with self._lock:
+            publisher, self._publisher = self._publisher, None
+        if publisher is not None:
+            self._outbox.put(_STOP)
+            publisher.join(timeout)
+
+    def _ensure_publisher(self):
+        with self._lock:
+            if self._publisher is None or not self._publisher.is_alive():
+                self._publisher = threading.Thread(target=self._publish_loop, name="invalidation-publisher",
+                                                   daemon=True)
+                self._publisher.start()
+
+    def _publish_loop(self):
+        while True:
+            item = self._outbox.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            stopping = False
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._outbox.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            payload = json.dumps({"o": self.origin, "k": batch}, separators=(",", ":"))
+            try:
+                self._send(payload)
+                self.counters["messages_sent"] += 1
+            except Exception:
+                self.counters["errors"] += 1
+                logger.exception("failed to publish %d cache invalidations", len(batch))
+            if stopping:
+                return
+
+    def _send(self, payload: str):
+        raise NotImplementedError
+
+    def _deliver(self, payload):
+        message = json.loads(payload)
+        if message.get("o") == self.origin:
+            return
+        for topic, key in message.get("k", ()):
+            self.counters["received"] += 1
+            for handler in self._handlers.get(topic, ()):
+                try:
+                    handler(key)
+                except Exception:
+                    logger.exception("cache invalidation handler for %s failed", topic)
+
+    def _reset(self):
+        self.counters["resets"] += 1
+        for handler in self._reset_handlers:
+            try:
+                handler()
+            except Exception:
+                logger.exception("cache reset handler failed")
+
+    def stats(self) -> dict:
+        return {"backend": type(self).__name__, "origin": self.origin, "counters": dict(self.counters)}
+
+class MemoryBroker:
+    """In-process stand-in for a pub/sub server; every MemoryBus on it acts as one worker."""
+
+    def __init__(self):
+        self._buses = []
+        self._lock = threading.Lock()
+
+    def attach(self, bus):
+        with self._lock:
+            self._buses.append(bus)
+
+    def publish(self, channel: str, payload: str):
+        with self._lock:
+            buses = [bus for bus in self._buses if bus.channel == channel]
+        for bus in buses:
+            bus._deliver(payload)
+
+class MemoryBus(InvalidationBus):
+    def __init__(self, broker: MemoryBroker = None, **kwargs):
+        super().__init__(**kwargs)
+        self.broker = broker or MemoryBroker()
+        self.broker.attach(self)
+
+    def _send(self, payload: str):
+        self.broker.publish(self.channel, payload)
+
+class RedisBus(InvalidationBus):
+    """
+    Redis pub/sub. Pass a client (e.g. fakeredis.FakeRedis()) or a url.
+    A listener thread delivers messages and reconnects with backoff.
+    """
+
+    def __init__(self, url: str = None, client=None, **kwargs):
+        super().__init__(**kwargs)
+        if client is None:
+            if redis is None:
+                raise RuntimeError("INVALIDATION_BUS_URL is a redis:// URL but the redis package is not installed")
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self._listener = None
+        self._stopping = threading.Event()
+
+    def _send(self, payload: str):
+        self.client.publish(self.channel, payload)
+
+    def start(self):
+        super().start()
+        with self._lock:
+            if self._listener is None or not self._listener.is_alive():
+                self._stopping.clear()
+                self._listener = threading.Thread(target=self._listen, name="invalidation-listener", daemon=True)
+                self._listener.start()
+
+    def stop(self, timeout: float = 5.0):
+        super().stop(timeout)
+        self._stopping.set()
+        with self._lock:
+            listener, self._listener = self._listener, None
+        if listener is not None:
+            listener.join(timeout)
+
+    def _listen(self):
+        subscribed_before = False
+        backoff = 0.5
+        while not self._stopping.is_set():
+            pubsub = None
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                if subscribed_before:
+                    # Anything published while we were away is lost
+                    self._reset()
+                subscribed_before = True
+                while not self._stopping.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    backoff = 0.5
+                    if message is not None and message.get("type") == "message":
+                        self._deliver(message["data"])
+            except Exception:
+                self.counters["errors"] += 1
+                logger.warning("invalidation bus disconnected; retrying in %.1fs", backoff, exc_info=True)
+                self._stopping.wait(backoff)
+                backoff = min(backoff * 2, 30)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+def from_url(url: str) -> InvalidationBus:
+    if not url or url.startswith("memory://"):
+        return MemoryBus()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBus(url)
+    raise ValueError(f"Unsupported INVALIDATION_BUS_URL {url}")
+
+bus = from_url(INVALIDATION_BUS_URL)
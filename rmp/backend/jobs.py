@@ -0,0 +1,342 @@
+"""
+Durable background jobs, stored in the jobs table.
+
+Handlers are registered with @jobs.handler("kind") and enqueued with
+jobs.enqueue(db, "kind", {...}) inside the caller's transaction, so a job
+exists exactly when the write that needed it committed. Worker threads
+claim due jobs with SELECT ... FOR UPDATE SKIP LOCKED, run the handler and
+record the result in the handler's own transaction. Failures are retried
+with exponential backoff up to max_attempts; jobs whose worker died are
+re-queued once their lease expires.
+
+API processes run JOB_WORKERS threads. To keep heavy work off them, set
+JOB_WORKERS=0 and run dedicated workers instead:
+
+    python worker.py --workers 4
+"""
+
+import json
+import logging
+import os
+import random
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+import models
+import deps
+from database import SessionLocal
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 1))
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", 1))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", 5))
+JOB_RETRY_BASE_SECONDS = float(os.getenv("JOB_RETRY_BASE_SECONDS", 5))
+JOB_RETRY_MAX_SECONDS = float(os.getenv("JOB_RETRY_MAX_SECONDS", 3600))
+# A running job not heard from for this long is assumed lost and re-queued
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", 300))
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+_handlers = {}
+
+def handler(kind: str):
+    """Register fn(db, job) -> JSON-serializable result as the handler for a job kind."""
+    def register(fn):
+        _handlers[kind] = fn
+        return fn
+    return register
+
+def enqueue(db: Session, kind: str, args: dict = None, user_id: str = None, delay_seconds: float = 0,
+            max_attempts: int = JOB_MAX_ATTEMPTS) -> models.Job:
+    """Add a job inside the caller's transaction. Workers see it once the caller commits."""
+    if kind not in _handlers:
+        raise ValueError(f"No handler registered for job kind {kind}")
+    now = datetime.utcnow()
+    job = models.Job(
+        id=str(uuid.uuid4()),
+        kind=kind,
+        args=json.dumps(args or {}),
+        status=QUEUED,
+        attempts=0,
+        max_attempts=max_attempts,
+        run_at=now + timedelta(seconds=delay_seconds),
+        created_by=user_id,
+        created_at=now,
+        updated_at=now
+    )
+    db.add(job)
+    db.info["jobs_enqueued"] = True
+    return job
+
+def job_args(job: models.Job) -> dict:
+    return json.loads(job.args) if job.args else {}
+
+def heartbeat(db: Session, job: models.Job):
+    """Extend a long-running job's lease; takes effect with the handler's next commit."""
+    job.locked_at = datetime.utcnow()
+
+def report_progress(db: Session, job: models.Job, progress: dict):
+    """Record progress (and extend the lease); visible once the handler commits."""
+    job.progress = json.dumps(progress)
+    heartbeat(db, job)
+
+@event.listens_for(Session, "after_commit")
+def _wake_workers_after_commit(session):
+    if session.info.pop("jobs_enqueued", False):
+        runner.wake()
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop("jobs_enqueued", None)
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff with jitter for a job that has failed `attempts` times."""
+    delay = min(JOB_RETRY_MAX_SECONDS, JOB_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+class JobRunner:
+    """Worker threads that claim and run due jobs until stopped."""
+
+    def __init__(self, session_factory=SessionLocal, workers: int = JOB_WORKERS,
+                 poll_seconds: float = JOB_POLL_SECONDS, lease_seconds: float = JOB_LEASE_SECONDS):
+        self.session_factory = session_factory
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self.counters = {"done": 0, "retried": 0, "failed": 0}
+        self._threads = []
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._last_reap = 0.0
+
+    def start(self):
+        with self._lock:
+            if self._threads:
+                return
+            self._stopping.clear()
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._loop, args=(f"{self.name}:{i}",),
+                                          name=f"job-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self, timeout: float = 10.0):
+        """Let running jobs finish (up to timeout) and stop claiming new ones."""
+        with self._lock:
+            threads, self._threads = self._threads, []
+        self._stopping.set()
+        self._wake.set()
+        for thread in threads:
+            thread.join(timeout)
+
+    def wake(self):
+        self._wake.set()
+
+    def _loop(self, worker: str):
+        while not self._stopping.is_set():
+            try:
+                ran = self.run_once(worker)
+            except Exception:
+                logger.exception("job worker %s failed to poll", worker)
+                ran = False
+            if not ran:
+                self._wake.wait(self.poll_seconds)
+                self._wake.clear()
+
+    def run_once(self, worker: str = None) -> bool:
+        """Claim and run one due job. Returns False if there was nothing to do."""
+        worker = worker or f"{self.name}:inline"
+        if time.monotonic() - self._last_reap >= self.lease_seconds / 4:
+            self._last_reap = time.monotonic()
+            self.requeue_expired()
+        job_id = self.claim(worker)
+        if job_id is None:
+            return False
+        self._execute(job_id)
+        return True
+
+    def claim(self, worker: str):
+        db = self.session_factory()
+        try:
+            now = datetime.utcnow()
+            job = db.query(models.Job.id).filter(
+                models.Job.status == QUEUED,
+                models.Job.run_at <= now
+            ).order_by(models.Job.run_at).with_for_update(skip_locked=True).first()
+            if job is None:
+                db.rollback()
+                return None
+            # Guarded so two workers can never both claim it, even on
+            # databases without row locks (SQLite)
+            claimed = db.query(models.Job).filter(
+                models.Job.id == job.id,
+                models.Job.status == QUEUED
+            ).update({
+                models.Job.status: RUNNING,
+                models.Job.locked_by: worker,
+                models.Job.locked_at: now,
+                models.Job.attempts: models.Job.attempts + 1,
+                models.Job.updated_at: now,
+            }, synchronize_session=False)
+            db.commit()
+            return job.id if claimed else None
+        finally:
+            db.close()
+
+    def _execute(self, job_id: str):
+        db = self.session_factory()
+        try:
+            job = db.get(models.Job, job_id)
+            fn = _handlers.get(job.kind)
+            if fn is None:
+                raise LookupError(f"No handler registered for job kind {job.kind}")
+            result = fn(db, job)
+            now = datetime.utcnow()
+            job.status = DONE
+            job.result = json.dumps(result) if result is not None else None
+            job.error = None
+            job.locked_by = None
+            job.updated_at = now
+            job.finished_at = now
+            # The handler's own writes commit together with the DONE status
+            db.commit()
+            self.counters["done"] += 1
+        except Exception as e:
+            db.rollback()
+            logger.warning("job %s failed: %s", job_id, e)
+            self._record_failure(job_id, f"{type(e).__name__}: {e}")
+        finally:
+            db.close()
+
+    def _record_failure(self, job_id: str, error: str):
+        db = self.session_factory()
+        try:
+            job = db.get(models.Job, job_id)
+            now = datetime.utcnow()
+            job.error = error
+            job.locked_by = None
+            job.updated_at = now
+            if job.attempts >= job.max_attempts:
+                job.status = FAILED
+                job.finished_at = now
+                self.counters["failed"] += 1
+            else:
+                job.status = QUEUED
+                job.run_at = now + timedelta(seconds=retry_delay(job.attempts))
+                self.counters["retried"] += 1
+            db.commit()
+        finally:
+            db.close()
+
+    def requeue_expired(self):
+        """Return jobs whose worker stopped heartbeating to the queue (or fail them)."""
+        db = self.session_factory()
+        try:
+            now = datetime.utcnow()
+            expired = db.query(models.Job).filter(
+                models.Job.status == RUNNING,
+                models.Job.locked_at < now - timedelta(seconds=self.lease_seconds)
+            ).with_for_update(skip_locked=True).all()
+            for job in expired:
+                job.error = f"Lease expired on {job.locked_by}"
+                job.locked_by = None
+                job.updated_at = now
+                if job.attempts >= job.max_attempts:
+                    job.status = FAILED
+                    job.finished_at = now
+                else:
+                    job.status = QUEUED
+                    job.run_at = now
+            db.commit()
+        finally:
+            db.close()
+
+    def stats(self) -> dict:
+        return {"workers": len(self._threads), "counters": dict(self.counters)}
+
+runner = JobRunner()
+
+def _job_out(job: models.Job) -> dict:
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "args": job_args(job),
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "run_at": job.run_at,
+        "progress": json.loads(job.progress) if job.progress else None,
+        "result": json.loads(job.result) if job.result else None,
+        "error": job.error,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at,
+        "finished_at": job.finished_at,
+    }
+
+@router.get("/")
+def list_jobs(
+    status: str = None,
+    kind: str = None,
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(deps.get_read_db),
+    current_user: models.User = Depends(deps.require_super_admin)
+):
+    """Most recent jobs first, optionally filtered by status and kind. Super-admins only."""
+    query = db.query(models.Job)
+    if status:
+        query = query.filter(models.Job.status == status)
+    if kind:
+        query = query.filter(models.Job.kind == kind)
+    jobs = query.order_by(models.Job.created_at.desc()).offset(skip).limit(limit).all()
+    return [_job_out(job) for job in jobs]
+
+@router.get("/{job_id}")
+def get_job(
+    job_id: str,
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.get_current_user)
+):
+    """Status of a job started by the current user (super-admins can see any job)."""
+    job = db.query(models.Job).filter(models.Job.id == job_id).first()
+    if not job or (job.created_by != current_user.id and current_user.role != models.UserRole.SUPER_ADMIN):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_out(job)
+
+@router.post("/{job_id}/retry")
+def retry_job(
+    job_id: str,
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.require_super_admin)
+):
+    """Queue a failed job to run again with a fresh set of attempts."""
+    job = db.query(models.Job).filter(models.Job.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status != FAILED:
+        raise HTTPException(status_code=409, detail=f"Only failed jobs can be retried (job is {job.status})")
+    now = datetime.utcnow()
+    job.status = QUEUED
+    job.attempts = 0
+    job.run_at = now
+    job.updated_at = now
+    job.finished_at = None
+    db.info["jobs_enqueued"] = True
+    db.commit()
+    db.refresh(job)
+    return _job_out(job)
@@ -0,0 +1,241 @@
+"""
+Logging.
+
+setup() is the one place logging is configured, for the API (main.py) and
+job workers (worker.py); modules keep using logging.getLogger(__name__).
+Logging a record never waits on I/O: the handler on the root logger only
+puts the record on a bounded in-memory queue, and a background thread
+formats and writes it to stdout. When the queue is full (the writer cannot
+keep up), records are dropped and counted rather than blocking the request.
+
+Records are written as one JSON object per line (LOG_FORMAT=text for local
+runs), with any extra= fields as keys of their own:
+
+    logger.info("user registered", extra={"event": "register", "user_id": user.id})
+
+Every record logged while a request is handled carries that request's id,
+taken from its X-Request-ID header or generated by RequestIdMiddleware, which
+also returns it in the response. The middleware logs each request as a
+"request" event with its status and duration.
+
+High-volume events are sampled: LOG_SAMPLE_RATES maps an event (a record's
+event extra, or else its logger name) to the fraction of its records kept.
+Warnings and errors are always kept.
+
+    LOG_SAMPLE_RATES="request=0.01,register=0.1"
+"""
+
+import atexit
+import contextvars
+import copy
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+    import json
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")  # json or text
+# Records waiting for the writer; more than this and new records are dropped
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))
+LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "request=0.01")
+
+REQUEST_ID_HEADER = "x-request-id"
+# Accepted from clients and proxies as is; anything else gets a fresh id
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._:-]{1,64}$")
+
+# The id of the request being handled, if any
+request_id = contextvars.ContextVar("request_id", default=None)
+
+# Attributes every LogRecord has; anything else on a record came from extra=
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+logger = logging.getLogger(__name__)
+
+def parse_sample_rates(value: str) -> dict:
+    rates = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        name, _, rate = item.partition("=")
+        rates[name.strip()] = float(rate)
+    return rates
+
+class Sampler(logging.Filter):
+    """Keeps a fraction of the records of each sampled event; warnings and above always pass."""
+
+    def __init__(self, rates: dict):
+        super().__init__()
+        self.rates = rates
+        self.sampled_out = 0
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(getattr(record, "event", None) or record.name)
+        if rate is None or random.random() < rate:
+            return True
+        self.sampled_out += 1
+        return False
+
+class RequestIdFilter(logging.Filter):
+    """Stamps records with the current request's id, in the thread that logs them."""
+
+    def filter(self, record):
+        record.request_id = request_id.get()
+        return True
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """A QueueHandler that drops records rather than wait for room in the queue."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._exceptions = logging.Formatter()
+
+    def prepare(self, record):
+        # Merge the arguments and render any traceback now: arguments may
+        # change and frames go away once the caller moves on
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        if record.exc_info:
+            record.exc_text = self._exceptions.formatException(record.exc_info)
+        record.msg, record.args, record.exc_info = record.message, None, None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+def _dumps(obj) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj, default=str).decode()
+    return json.dumps(obj, default=str, separators=(",", ":"))
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and value is not None:
+                entry[key] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return _dumps(entry)
+
+# Set up by setup()
+_handler = None
+_listener = None
+_sampler = None
+
+def setup():
+    """Route all logging through the queue and start the writer thread. Safe to call more than once."""
+    global _handler, _listener, _sampler
+    if _listener is not None:
+        return
+    stream = logging.StreamHandler(sys.stdout)
+    if LOG_FORMAT == "text":
+        stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"))
+    else:
+        stream.setFormatter(JsonFormatter())
+
+    log_queue = queue.Queue(LOG_QUEUE_SIZE)
+    handler = NonBlockingQueueHandler(log_queue)
+    _sampler = Sampler(parse_sample_rates(LOG_SAMPLE_RATES))
+    handler.addFilter(_sampler)
+    handler.addFilter(RequestIdFilter())
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(LOG_LEVEL)
+    # uvicorn's own loggers write to the console directly; send them through
+    # the queue too. Its access log is replaced by the "request" event.
+    for name in ("uvicorn", "uvicorn.error"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers = []
+        uvicorn_logger.propagate = True
+    logging.getLogger("uvicorn.access").disabled = True
+
+    _handler = handler
+    _listener = logging.handlers.QueueListener(log_queue, stream)
+    _listener.start()
+    atexit.register(stop)
+
+def stop():
+    """Write out what is queued and stop the writer thread."""
+    global _listener
+    listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+
+def stats() -> dict:
+    if _handler is None:
+        return {"running": False}
+    return {
+        "running": _listener is not None,
+        "queued": _handler.queue.qsize(),
+        "dropped": _handler.dropped,
+        "sampled_out": _sampler.sampled_out,
+    }
+
+class RequestIdMiddleware:
+    """
+    ASGI middleware giving each request an id (the client's X-Request-ID, or
+    a new one) for every record logged while it is handled, returning it in
+    the response and logging the request when it completes.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = None
+        for name, value in scope["headers"]:
+            if name == REQUEST_ID_HEADER.encode():
+                incoming = value.decode("latin-1")
+                break
+        rid = incoming if incoming and _VALID_REQUEST_ID.match(incoming) else uuid.uuid4().hex
+        token = request_id.set(rid)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(REQUEST_ID_HEADER.encode(), rid.encode())]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            logger.log(
+                logging.WARNING if status >= 500 else logging.INFO,
+                "%s %s %s", scope["method"], scope["path"], status,
+                extra={"event": "request", "method": scope["method"], "path": scope["path"], "status": status,
+                       "duration_ms": round((time.perf_counter() - started) * 1000, 1)}
+            )
+            request_id.reset(token)
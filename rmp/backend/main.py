@@ -1,20 +1,51 @@
 
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+import logs
 import models
 import database
 import routers
+import idempotency
+import group_commit
+import admission
+import metrics
+import warmup
+import jobs
+import notifications
+import auth_sessions
+import invalidation
+import sharding
 from sqlalchemy.orm import Session
 import uvicorn
 import os
 
-models.Base.metadata.create_all(bind=database.engine)
+# All logging goes through a queue to a background writer (see logs.py)
+logs.setup()
+
+# Importing the app touches no database: the schema is managed by
+# create_schema.py (or AUTO_CREATE_SCHEMA for local runs) and connections
+# are opened by the warm-up thread started below.
+metrics.instrument_engine(database.engine)
+if database.replica_engine is not None:
+    metrics.instrument_engine(database.replica_engine, "replica")
+for name, shard_engine in database.shard_engines.items():
+    metrics.instrument_engine(shard_engine, f"shard_{name}")
 
 app = FastAPI(title="RunMyPool API")
 
 # Get CORS origins from environment variable
 cors_origins = os.getenv("CORS_ORIGINS", "http://localhost:3000").split(",")
 
+# Replay stored responses for retried POSTs that carry an Idempotency-Key
+app.add_middleware(idempotency.IdempotencyMiddleware)
+
+# Shed low-priority traffic first so pick writes and logins keep capacity
+app.add_middleware(admission.AdmissionMiddleware)
+
+# Per-route latency, status, SQL and pool metrics, served at /metrics
+app.add_middleware(metrics.MetricsMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=cors_origins,
@@ -23,8 +54,50 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so every record logged for a request carries its X-Request-ID
+app.add_middleware(logs.RequestIdMiddleware)
+
 app.include_router(routers.router)
 
+@app.on_event("startup")
+def start_warmup():
+    warmup.start()
+
+@app.on_event("startup")
+def start_job_workers():
+    # JOB_WORKERS=0 leaves background jobs to worker.py processes
+    if jobs.JOB_WORKERS > 0:
+        jobs.runner.start()
+
+@app.on_event("startup")
+def start_invalidation_bus():
+    invalidation.bus.start()
+
+@app.on_event("startup")
+def start_session_flusher():
+    auth_sessions.cache.start()
+
+@app.on_event("shutdown")
+def flush_pick_queue():
+    group_commit.pick_queue.stop()
+
+@app.on_event("shutdown")
+def stop_job_workers():
+    jobs.runner.stop()
+    notifications.mailer.close()
+
+@app.on_event("shutdown")
+def flush_session_last_seen():
+    auth_sessions.cache.stop()
+
+@app.on_event("shutdown")
+def stop_invalidation_bus():
+    invalidation.bus.stop()
+
+@app.on_event("shutdown")
+def flush_logs():
+    logs.stop()
+
 @app.get("/")
 def read_root():
     return {"message": "Welcome to the RunMyPool FastAPI backend!"}
@@ -33,6 +106,53 @@ def read_root():
 def health_check():
     return {"status": "healthy"}
 
+@app.get("/health/ready")
+def readiness_check():
+    """503 until this worker has warmed its connection pool and caches."""
+    body = warmup.state.as_dict()
+    if not warmup.state.ready:
+        return JSONResponse(status_code=503, content=body)
+    return body
+
+@app.get("/health/db")
+def db_health():
+    """Connection pool usage for the primary and (if configured) the read replica or shards."""
+    pools = {"primary": database.pool_status(database.engine)}
+    if database.replica_engine is not None:
+        pools["replica"] = database.pool_status(database.replica_engine)
+    for name, shard_engine in database.shard_engines.items():
+        pools[f"shard_{name}"] = database.pool_status(shard_engine)
+    saturated = any(pool.get("saturation", 0) >= 1 for pool in pools.values())
+    body = {"status": "saturated" if saturated else "healthy", "pools": pools}
+    if sharding.enabled():
+        body["shard_map"] = sharding.shard_map.stats()
+    return body
+
+@app.get("/health/admission")
+def admission_stats():
+    return admission.controller.stats()
+
+@app.get("/health/jobs")
+def job_stats():
+    return jobs.runner.stats()
+
+@app.get("/health/sessions")
+def session_stats():
+    return auth_sessions.cache.stats()
+
+@app.get("/health/invalidation")
+def invalidation_stats():
+    return invalidation.bus.stats()
+
+@app.get("/health/logging")
+def logging_stats():
+    return logs.stats()
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     port = int(os.getenv("PORT", 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    # log_config=None keeps uvicorn from replacing the logging set up above
+    uvicorn.run(app, host="0.0.0.0", port=port, log_config=None)
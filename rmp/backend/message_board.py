@@ -8,7 +8,7 @@ from typing import List
 router = APIRouter(prefix="/messages", tags=["messages"])
 
 @router.get("/", response_model=List[schemas.MessageBoardOut])
-def list_messages(skip: int = 0, limit: int = 100, db: Session = Depends(deps.get_db)):
+def list_messages(skip: int = 0, limit: int = 100, db: Session = Depends(deps.get_read_db)):
     return db.query(models.MessageBoard).offset(skip).limit(limit).all()
 
 @router.post("/", response_model=schemas.MessageBoardOut)
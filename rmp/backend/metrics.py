@@ -0,0 +1,237 @@
+import contextvars
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+
+from sqlalchemy import event
+
+try:
+    from fastapi.routing import iter_route_contexts
+except ImportError:  # older FastAPI copies included routes, prefixed, into app.routes
+    iter_route_contexts = None
+
+# Latency buckets in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+POOL_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", 500))
+# Statements kept per request for the slow-request log
+SLOW_REQUEST_MAX_STATEMENTS = int(os.getenv("SLOW_REQUEST_MAX_STATEMENTS", 50))
+
+logger = logging.getLogger(__name__)
+
+class RequestStats:
+    __slots__ = ("statements", "db_seconds", "sql", "_started")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.sql = []
+        self._started = None
+
+_current = contextvars.ContextVar("request_stats", default=None)
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def lines(self, name: str, labels: str):
+        sep = "," if labels else ""
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{labels}{sep}le="{bound}"}} {cumulative}'
+        yield f'{name}_bucket{{{labels}{sep}le="+Inf"}} {self.count}'
+        suffix = f"{{{labels}}}" if labels else ""
+        yield f"{name}_sum{suffix} {self.sum:.6f}"
+        yield f"{name}_count{suffix} {self.count}"
+
+class Registry:
+    """Process-local request, SQL and connection pool metrics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.latency = defaultdict(lambda: Histogram(LATENCY_BUCKETS))
+        self.responses = defaultdict(int)
+        self.db_statements = defaultdict(int)
+        self.db_seconds = defaultdict(float)
+        self.slow_requests = defaultdict(int)
+        self.pool_wait = defaultdict(lambda: Histogram(POOL_WAIT_BUCKETS))
+        self.engines = {}
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float, stats: RequestStats):
+        key = (method, route)
+        with self._lock:
+            self.latency[key].observe(seconds)
+            self.responses[(method, route, status)] += 1
+            self.db_statements[key] += stats.statements
+            self.db_seconds[key] += stats.db_seconds
+
+    def observe_pool_wait(self, name: str, seconds: float):
+        with self._lock:
+            self.pool_wait[name].observe(seconds)
+
+    def render(self) -> str:
+        """Prometheus text exposition format."""
+        out = []
+        with self._lock:
+            out.append("# TYPE rmp_http_in_flight gauge")
+            out.append(f"rmp_http_in_flight {self.in_flight}")
+
+            out.append("# TYPE rmp_http_request_duration_seconds histogram")
+            for (method, route), histogram in sorted(self.latency.items()):
+                out.extend(histogram.lines("rmp_http_request_duration_seconds", f'method="{method}",route="{route}"'))
+
+            out.append("# TYPE rmp_http_responses_total counter")
+            for (method, route, status), count in sorted(self.responses.items()):
+                out.append(f'rmp_http_responses_total{{method="{method}",route="{route}",status="{status}"}} {count}')
+
+            out.append("# TYPE rmp_db_statements_total counter")
+            for (method, route), count in sorted(self.db_statements.items()):
+                out.append(f'rmp_db_statements_total{{method="{method}",route="{route}"}} {count}')
+
+            out.append("# TYPE rmp_db_seconds_total counter")
+            for (method, route), seconds in sorted(self.db_seconds.items()):
+                out.append(f'rmp_db_seconds_total{{method="{method}",route="{route}"}} {seconds:.6f}')
+
+            out.append("# TYPE rmp_http_slow_requests_total counter")
+            for (method, route), count in sorted(self.slow_requests.items()):
+                out.append(f'rmp_http_slow_requests_total{{method="{method}",route="{route}"}} {count}')
+
+            out.append("# TYPE rmp_db_pool_checkout_wait_seconds histogram")
+            for name, histogram in sorted(self.pool_wait.items()):
+                out.extend(histogram.lines("rmp_db_pool_checkout_wait_seconds", f'pool="{name}"'))
+
+        for metric, attr in (("size", "size"), ("checked_out", "checkedout"), ("overflow", "overflow"),
+                             ("checked_in", "checkedin")):
+            out.append(f"# TYPE rmp_db_pool_{metric} gauge")
+            for name, engine in sorted(self.engines.items()):
+                # Only QueuePool reports all of these; SingletonThreadPool's size is a plain int
+                value = getattr(engine.pool, attr, None)
+                if callable(value):
+                    out.append(f'rmp_db_pool_{metric}{{pool="{name}"}} {value()}')
+
+        return "\n".join(out) + "\n"
+
+registry = Registry()
+
+def instrument_engine(engine, name: str = "primary", registry: Registry = registry):
+    """Attach statement timing and pool checkout timing to an engine."""
+    registry.engines[name] = engine
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = _current.get()
+        if stats is not None:
+            stats._started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = _current.get()
+        if stats is not None and stats._started is not None:
+            stats.db_seconds += time.perf_counter() - stats._started
+            stats._started = None
+            stats.statements += 1
+            if len(stats.sql) < SLOW_REQUEST_MAX_STATEMENTS:
+                stats.sql.append(statement)
+
+    # The pool has no "checkout started" event, so time the call that waits
+    pool = engine.pool
+    connect = pool.connect
+
+    def timed_connect():
+        started = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            registry.observe_pool_wait(name, time.perf_counter() - started)
+
+    pool.connect = timed_connect
+
+def route_contexts(routes) -> list:
+    """
+    Every route of an app, nested included routers flattened, each with the
+    full path it is served at (prefixes included) as .path and .path_format.
+    """
+    if iter_route_contexts is None:
+        return list(routes)
+    return list(iter_route_contexts(routes))
+
+# id() of a route object -> its full path template, built from the app on
+# first use (routes are not always hashable, and live as long as the app)
+_route_templates = {}
+
+def route_template(scope) -> str:
+    """The full path template of the route that served scope, e.g. /schedule/week/{week_num}."""
+    global _route_templates
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+    template = _route_templates.get(id(route))
+    if template is None and "app" in scope:
+        # scope["route"] is the route as declared, without its router's prefix
+        _route_templates = {
+            id(getattr(context, "original_route", context)): context.path_format or context.path
+            for context in route_contexts(scope["app"].routes) if getattr(context, "path", None)
+        }
+        template = _route_templates.get(id(route))
+    return template or getattr(route, "path", None) or "unmatched"
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency, status, SQL count and DB time per
+    route template, and logging slow requests with the SQL they issued.
+    """
+
+    def __init__(self, app, registry: Registry = registry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self.registry.in_flight += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.registry.in_flight -= 1
+            _current.reset(token)
+            route_path = route_template(scope)
+            self.registry.observe_request(scope["method"], route_path, status, elapsed, stats)
+            if elapsed * 1000 >= SLOW_REQUEST_MS:
+                with self.registry._lock:
+                    self.registry.slow_requests[(scope["method"], route_path)] += 1
+                logger.warning(
+                    "slow request %s %s status=%s duration_ms=%.1f sql_statements=%d db_ms=%.1f sql=%r",
+                    scope["method"], scope["path"], status, elapsed * 1000,
+                    stats.statements, stats.db_seconds * 1000, stats.sql
+                )
@@ -0,0 +1,581 @@
+#!/usr/bin/env python3
+"""
+Versioned, online schema migrations.
+
+    python migrate.py                    # apply pending migrations
+    python migrate.py --status
+    python migrate.py --chunk-size 500 --pause-ms 200
+    python migrate.py --lock-wait 600    # on container start (see entrypoint.sh)
+
+Each migration runs once and is recorded in schema_migrations. Backfills
+walk the table in primary-key order and update at most --chunk-size rows
+per transaction, saving their resume point in the same transaction, so an
+interrupted run continues where it stopped and no lock is held for longer
+than one chunk. Indexes are added with ALGORITHM=INPLACE, LOCK=NONE on
+MySQL so reads and writes continue while they build.
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+from dotenv import load_dotenv
+
+# Load environment variables before database builds its URL
+load_dotenv()
+
+from sqlalchemy import DateTime, inspect, select, text
+from sqlalchemy.exc import OperationalError
+
+import models
+import database
+import sharding
+from seasons import season_of
+
+MIGRATION_CHUNK_SIZE = int(os.getenv("MIGRATION_CHUNK_SIZE", 1000))
+# Chunks are resized to take about this long, and never grow past the chunk size
+MIGRATION_CHUNK_SECONDS = float(os.getenv("MIGRATION_CHUNK_SECONDS", 0.5))
+MIGRATION_PAUSE_MS = float(os.getenv("MIGRATION_PAUSE_MS", 50))
+# Backfills wait while the read replica is further behind than this
+MIGRATION_MAX_REPLICA_LAG = float(os.getenv("MIGRATION_MAX_REPLICA_LAG", 5))
+# How long index DDL waits for a metadata lock before backing off and retrying
+MIGRATION_LOCK_WAIT_SECONDS = int(os.getenv("MIGRATION_LOCK_WAIT_SECONDS", 5))
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+migrations_table = models.SchemaMigration.__table__
+
+def split_statements(sql: str) -> list:
+    """Split a SQL script on semicolons, ignoring those in strings and -- comments."""
+    statements, current, quote, i = [], [], None, 0
+    while i < len(sql):
+        char = sql[i]
+        if quote:
+            current.append(char)
+            if char == quote:
+                quote = None
+        elif char in ("'", '"', "`"):
+            quote = char
+            current.append(char)
+        elif sql.startswith("--", i):
+            end = sql.find("\n", i)
+            i = len(sql) if end == -1 else end
+            continue
+        elif char == ";":
+            statements.append("".join(current).strip())
+            current = []
+        else:
+            current.append(char)
+        i += 1
+    statements.append("".join(current).strip())
+    return [statement for statement in statements if statement]
+
+def reference_inserts(filename: str, table: str) -> list:
+    """The INSERT INTO table statements of one of the repo's SQL files."""
+    with open(os.path.join(BACKEND_DIR, filename)) as f:
+        return [statement for statement in split_statements(f.read())
+                if statement.upper().startswith(f"INSERT INTO {table.upper()} ")]
+
+def load_reference_data(conn):
+    """The real teams and Schedule rows, as shipped in the repo's SQL files."""
+    for statement in reference_inserts("add_teams_table.sql", "teams"):
+        conn.execute(text(statement))
+    for statement in reference_inserts("schedule_inserts.sql", "Schedule"):
+        conn.execute(text(statement))
+
+def table_exists(name: str):
+    return lambda conn: inspect(conn).has_table(name)
+
+def column_exists(table: str, column: str):
+    return lambda conn: any(col["name"] == column for col in inspect(conn).get_columns(table))
+
+def has_rows(table: str):
+    return lambda conn: conn.execute(text(f"SELECT 1 FROM {table} LIMIT 1")).first() is not None
+
+def _is_mysql(conn) -> bool:
+    return conn.dialect.name in ("mysql", "mariadb")
+
+def trigger_exists(name: str):
+    def check(conn):
+        if _is_mysql(conn):
+            query = "SELECT 1 FROM information_schema.TRIGGERS WHERE TRIGGER_SCHEMA = DATABASE() AND TRIGGER_NAME = :name"
+        else:
+            query = "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = :name"
+        return conn.execute(text(query), {"name": name}).first() is not None
+    return check
+
+class Migration:
+    def __init__(self, version: int, name: str, skip_if=None):
+        self.version = version
+        self.name = name
+        self.skip_if = skip_if
+
+    def already_applied(self, conn) -> bool:
+        """True when the schema already has this change (e.g. from datamodel.sql)."""
+        return self.skip_if is not None and self.skip_if(conn)
+
+    def apply(self, runner, record):
+        raise NotImplementedError
+
+class SqlFile(Migration):
+    def __init__(self, version: int, name: str, path: str, skip_if=None):
+        super().__init__(version, name, skip_if)
+        self.path = path
+
+    def apply(self, runner, record):
+        with open(os.path.join(BACKEND_DIR, self.path)) as f:
+            statements = split_statements(f.read())
+        for statement in statements:
+            with runner.engine.begin() as conn:
+                conn.execute(text(statement))
+
+class Baseline(SqlFile):
+    """
+    datamodel.sql on MySQL. Other dialects (embedded SQLite) get the ORM
+    schema plus the teams and Schedule rows that datamodel.sql would load.
+    """
+
+    def apply(self, runner, record):
+        with runner.engine.connect() as conn:
+            mysql = _is_mysql(conn)
+        if mysql:
+            super().apply(runner, record)
+        else:
+            models.Base.metadata.create_all(bind=runner.engine)
+            with runner.engine.begin() as conn:
+                load_reference_data(conn)
+
+class Backfill(Migration):
+    """
+    UPDATE table SET ... WHERE ... in primary-key ranges of at most
+    chunk_size rows, one transaction per range.
+    """
+
+    def __init__(self, version: int, name: str, table: str, key: str, set_clause: str, where: str,
+                 start: str = "", skip_if=None):
+        super().__init__(version, name, skip_if)
+        self.table = table
+        self.key = key
+        self.set_clause = set_clause
+        self.where = where
+        self.start = start
+
+    def apply(self, runner, record):
+        next_keys = text(
+            f"SELECT {self.key} FROM {self.table} WHERE {self.key} > :lo ORDER BY {self.key} LIMIT :limit"
+        )
+        update = text(
+            f"UPDATE {self.table} SET {self.set_clause} "
+            f"WHERE {self.key} > :lo AND {self.key} <= :hi AND ({self.where})"
+        )
+        lo = record["resume_key"] or self.start
+        rows_done = record["rows_done"] or 0
+        chunk_size = runner.chunk_size
+        while True:
+            runner.wait_for_replica()
+            started = time.perf_counter()
+            with runner.engine.begin() as conn:
+                keys = conn.execute(next_keys, {"lo": lo, "limit": chunk_size}).scalars().all()
+                if not keys:
+                    break
+                hi = keys[-1]
+                rows_done += conn.execute(update, {"lo": lo, "hi": hi}).rowcount
+                conn.execute(
+                    migrations_table.update()
+                    .where(migrations_table.c.version == self.version)
+                    .values(resume_key=str(hi), rows_done=rows_done)
+                )
+            lo = hi
+            elapsed = time.perf_counter() - started
+
+            # Keep each transaction short: halve slow chunks, grow fast ones
+            if elapsed > runner.chunk_seconds:
+                chunk_size = max(10, chunk_size // 2)
+            elif elapsed < runner.chunk_seconds / 2:
+                chunk_size = min(runner.chunk_size, chunk_size * 2)
+            print(f"  {self.name}: {rows_done} rows updated, through {self.key}={hi} "
+                  f"({len(keys)} scanned in {elapsed * 1000:.0f} ms)")
+            time.sleep(runner.pause)
+
+class SeasonBackfill(Backfill):
+    """
+    Set table.season from a date column (see seasons.season_of), at most
+    chunk_size rows per transaction. The season is computed here rather
+    than in SQL, so the same migration runs on MySQL and SQLite shards.
+    """
+
+    def __init__(self, version: int, name: str, table: str, key: str, date_column: str):
+        Migration.__init__(self, version, name)
+        self.table = table
+        self.key = key
+        self.date_column = date_column
+
+    def apply(self, runner, record):
+        # Updated rows leave the criteria, so every chunk (and a resumed run)
+        # simply takes the first rows still missing a season
+        next_rows = text(
+            f"SELECT {self.key}, {self.date_column} FROM {self.table} "
+            f"WHERE season IS NULL AND {self.date_column} IS NOT NULL ORDER BY {self.key} LIMIT :limit"
+        ).columns(**{self.date_column: DateTime()})  # SQLite returns dates as strings otherwise
+        update = text(f"UPDATE {self.table} SET season = :season WHERE {self.key} = :key")
+        rows_done = record["rows_done"] or 0
+        while True:
+            runner.wait_for_replica()
+            with runner.engine.begin() as conn:
+                rows = conn.execute(next_rows, {"limit": runner.chunk_size}).all()
+                if not rows:
+                    break
+                conn.execute(update, [{"key": key, "season": season_of(when)} for key, when in rows])
+                rows_done += len(rows)
+                conn.execute(
+                    migrations_table.update()
+                    .where(migrations_table.c.version == self.version)
+                    .values(rows_done=rows_done)
+                )
+            print(f"  {self.name}: {rows_done} rows updated")
+            time.sleep(runner.pause)
+
+class VersionTriggers(Migration):
+    """
+    Triggers that bump a data_versions counter on every insert, update and
+    delete of a table, so ETags and cached payloads built from it change
+    whoever writes the rows: the app, a results script or a hand-run UPDATE.
+    """
+
+    EVENTS = ("INSERT", "UPDATE", "DELETE")
+
+    def __init__(self, version: int, name: str, table: str, counter: str):
+        super().__init__(version, name, skip_if=trigger_exists(self.trigger_name(table, "DELETE")))
+        self.table = table
+        self.counter = counter
+
+    @staticmethod
+    def trigger_name(table: str, event: str) -> str:
+        return f"{table.lower()}_{event.lower()}_version"
+
+    def apply(self, runner, record):
+        with runner.engine.begin() as conn:
+            for event in self.EVENTS:
+                name = self.trigger_name(self.table, event)
+                if _is_mysql(conn):
+                    # One statement, so no BEGIN ... END or DELIMITER is needed
+                    conn.execute(text(
+                        f"CREATE TRIGGER {name} AFTER {event} ON {self.table} FOR EACH ROW "
+                        f"INSERT INTO data_versions (name, version) VALUES ('{self.counter}', 1) "
+                        f"ON DUPLICATE KEY UPDATE version = version + 1"
+                    ))
+                else:
+                    conn.execute(text(
+                        f"CREATE TRIGGER {name} AFTER {event} ON {self.table} BEGIN "
+                        f"INSERT OR IGNORE INTO data_versions (name, version) VALUES ('{self.counter}', 0); "
+                        f"UPDATE data_versions SET version = version + 1 WHERE name = '{self.counter}'; "
+                        f"END"
+                    ))
+
+class PickChangeTrigger(Migration):
+    """
+    A trigger that records a pick's result or lock changing in its pool's
+    change log, as record_change does for the app's writes: grading and
+    locking happen outside the app, and clients syncing through
+    GET /pools/{id}/changes must still see them.
+    """
+
+    NAME = "picks_update_change"
+
+    def __init__(self, version: int, name: str):
+        super().__init__(version, name, skip_if=trigger_exists(self.NAME))
+
+    def apply(self, runner, record):
+        with runner.engine.begin() as conn:
+            if _is_mysql(conn):
+                # Sent as one statement, so BEGIN ... END needs no DELIMITER
+                conn.execute(text(
+                    f"CREATE TRIGGER {self.NAME} AFTER UPDATE ON picks FOR EACH ROW BEGIN "
+                    "IF NOT (NEW.result <=> OLD.result AND NEW.locked <=> OLD.locked) THEN "
+                    "UPDATE pools JOIN entries ON entries.pool_id = pools.id "
+                    "SET pools.change_version = COALESCE(pools.change_version, 0) + 1 "
+                    "WHERE entries.id = NEW.entry_id; "
+                    "INSERT INTO pool_changes (pool_id, version, kind, object_id, op, user_id, created_at) "
+                    "SELECT pools.id, pools.change_version, 'pick', NEW.id, 'upsert', entries.user_id, UTC_TIMESTAMP() "
+                    "FROM pools JOIN entries ON entries.pool_id = pools.id WHERE entries.id = NEW.entry_id; "
+                    "END IF; "
+                    "END"
+                ))
+            else:
+                conn.execute(text(
+                    f"CREATE TRIGGER {self.NAME} AFTER UPDATE OF result, locked ON picks "
+                    "WHEN NEW.result IS NOT OLD.result OR NEW.locked IS NOT OLD.locked BEGIN "
+                    "UPDATE pools SET change_version = COALESCE(change_version, 0) + 1 "
+                    "WHERE id = (SELECT pool_id FROM entries WHERE id = NEW.entry_id); "
+                    "INSERT INTO pool_changes (pool_id, version, kind, object_id, op, user_id, created_at) "
+                    "SELECT pools.id, pools.change_version, 'pick', NEW.id, 'upsert', entries.user_id, "
+                    "datetime('now') FROM pools JOIN entries ON entries.pool_id = pools.id "
+                    "WHERE entries.id = NEW.entry_id; "
+                    "END"
+                ))
+
+class ShardSchema(Migration):
+    """The pool tables on a new shard, created from the models (see sharding.py)."""
+
+    def apply(self, runner, record):
+        sharding.create_shard_schema(runner.engine)
+
+class OnlineIndex(Migration):
+    def __init__(self, version: int, name: str, table: str, index: str, columns: list, attempts: int = 10):
+        super().__init__(version, name)
+        self.table = table
+        self.index = index
+        self.columns = columns
+        self.attempts = attempts
+
+    def already_applied(self, conn) -> bool:
+        return any(index["name"] == self.index for index in inspect(conn).get_indexes(self.table))
+
+    def apply(self, runner, record):
+        columns = ", ".join(self.columns)
+        for attempt in range(1, self.attempts + 1):
+            try:
+                with runner.engine.begin() as conn:
+                    if not _is_mysql(conn):
+                        conn.execute(text(f"CREATE INDEX {self.index} ON {self.table} ({columns})"))
+                        return
+                    # The build itself is online, but the ALTER still needs a brief
+                    # metadata lock; give up quickly rather than queue traffic behind it.
+                    conn.execute(text(f"SET SESSION lock_wait_timeout = {MIGRATION_LOCK_WAIT_SECONDS}"))
+                    conn.execute(text(
+                        f"ALTER TABLE {self.table} ADD INDEX {self.index} ({columns}), "
+                        "ALGORITHM=INPLACE, LOCK=NONE"
+                    ))
+                    return
+            except OperationalError as e:
+                if "lock wait timeout" not in str(e).lower() or attempt == self.attempts:
+                    raise
+                print(f"  {self.name}: table busy, retrying ({attempt}/{self.attempts})")
+                time.sleep(min(2 ** attempt, 30))
+
+MIGRATIONS = [
+    Baseline(1, "baseline schema", "datamodel.sql", skip_if=table_exists("users")),
+    SqlFile(2, "pool change log", "add_pool_changes.sql", skip_if=table_exists("pool_changes")),
+    SqlFile(3, "reference data versions", "add_data_versions.sql", skip_if=table_exists("data_versions")),
+    # The UPDATE in add_teams_table.sql, done in chunks so picks is never locked as a whole
+    Backfill(
+        4, "backfill picks.team_id", table="picks", key="id",
+        set_clause="team_id = (SELECT teams.id FROM teams WHERE teams.abbrv = picks.team)",
+        where="team_id IS NULL AND team IN (SELECT abbrv FROM teams)"
+    ),
+    OnlineIndex(5, "index picks.team_id", "picks", "idx_picks_team_id", ["team_id"]),
+    OnlineIndex(6, "index picks by entry and week", "picks", "idx_picks_entry_week", ["entry_id", "week"]),
+    OnlineIndex(7, "index picks by entry and team", "picks", "idx_picks_entry_team", ["entry_id", "team_id"]),
+    SqlFile(8, "background jobs", "add_jobs.sql", skip_if=table_exists("jobs")),
+    SqlFile(9, "soft deletes", "add_soft_delete.sql", skip_if=column_exists("pools", "deleted_at")),
+    SqlFile(10, "notifications table", "add_notifications.sql", skip_if=table_exists("notifications")),
+    SqlFile(11, "sessions table", "add_sessions.sql", skip_if=table_exists("sessions")),
+    SqlFile(12, "pool shard map", "add_pool_shards.sql", skip_if=table_exists("pool_shards")),
+    SqlFile(13, "schedule seasons and audit log archive", "add_schedule_seasons.sql",
+            skip_if=column_exists("Schedule", "season")),
+    SqlFile(14, "pool and pick seasons", "add_pool_seasons.sql", skip_if=column_exists("picks", "season")),
+    SeasonBackfill(15, "backfill Schedule.season", "Schedule", "game_id", "start_time"),
+    SeasonBackfill(16, "backfill pools.season", "pools", "id", "created_at"),
+    SeasonBackfill(17, "backfill picks.season", "picks", "id", "created_at"),
+    OnlineIndex(18, "index Schedule by season and week", "Schedule", "idx_schedule_season_week", ["season", "week_num"]),
+    OnlineIndex(19, "index pools.season", "pools", "idx_pools_season", ["season"]),
+    OnlineIndex(20, "index picks.season", "picks", "idx_picks_season", ["season"]),
+    OnlineIndex(21, "index audit_logs.created_at", "audit_logs", "idx_audit_logs_created_at", ["created_at"]),
+    SqlFile(22, "pool rules tables", "add_rules.sql", skip_if=table_exists("rules")),
+    SqlFile(23, "pool types and pick confidences", "add_pool_types.sql", skip_if=column_exists("pools", "pool_type")),
+    SqlFile(24, "pool rule values", "add_pool_rule_values.sql", skip_if=column_exists("pool_rules", "value")),
+    SqlFile(25, "pool format rules", "rules_inserts.sql", skip_if=has_rows("rules")),
+    VersionTriggers(26, "bump the teams version on every change", "teams", "teams"),
+    VersionTriggers(27, "bump the schedule version on every change", "Schedule", "schedule"),
+    PickChangeTrigger(28, "log pick results and locks as pool changes"),
+    SqlFile(29, "idempotency keys", "add_idempotency_keys.sql", skip_if=table_exists("idempotency_keys")),
+]
+
+# Applied to each shard, which holds only the pool tables; recorded in the
+# shard's own schema_migrations
+SHARD_MIGRATIONS = [
+    ShardSchema(1, "pool tables", skip_if=table_exists("pools")),
+    SqlFile(2, "pool and pick seasons", "add_pool_seasons.sql", skip_if=column_exists("picks", "season")),
+    SeasonBackfill(3, "backfill pools.season", "pools", "id", "created_at"),
+    SeasonBackfill(4, "backfill picks.season", "picks", "id", "created_at"),
+    OnlineIndex(5, "index pools.season", "pools", "idx_pools_season", ["season"]),
+    OnlineIndex(6, "index picks.season", "picks", "idx_picks_season", ["season"]),
+    ShardSchema(7, "pool rules table", skip_if=table_exists("pool_rules")),
+    SqlFile(8, "pool types and pick confidences", "add_pool_types.sql", skip_if=column_exists("pools", "pool_type")),
+    PickChangeTrigger(9, "log pick results and locks as pool changes"),
+]
+
+class Runner:
+    def __init__(self, engine, migrations: list = MIGRATIONS, chunk_size: int = MIGRATION_CHUNK_SIZE,
+                 chunk_seconds: float = MIGRATION_CHUNK_SECONDS, pause_ms: float = MIGRATION_PAUSE_MS,
+                 replica_engine=None, max_replica_lag: float = MIGRATION_MAX_REPLICA_LAG):
+        self.engine = engine
+        self.migrations = sorted(migrations, key=lambda migration: migration.version)
+        self.chunk_size = chunk_size
+        self.chunk_seconds = chunk_seconds
+        self.pause = pause_ms / 1000.0
+        self.replica_engine = replica_engine
+        self.max_replica_lag = max_replica_lag
+
+    def records(self) -> dict:
+        migrations_table.create(bind=self.engine, checkfirst=True)
+        with self.engine.connect() as conn:
+            rows = conn.execute(select(migrations_table)).mappings().all()
+        return {row["version"]: dict(row) for row in rows}
+
+    def replica_lag(self):
+        """Seconds the replica is behind, or None if unknown."""
+        if self.replica_engine is None:
+            return None
+        try:
+            with self.replica_engine.connect() as conn:
+                if not _is_mysql(conn):
+                    return None
+                row = conn.execute(text("SHOW REPLICA STATUS")).mappings().first()
+        except OperationalError:
+            return None
+        if row is None:
+            return None
+        lag = row.get("Seconds_Behind_Source")
+        return float(lag) if lag is not None else None
+
+    def wait_for_replica(self):
+        while True:
+            lag = self.replica_lag()
+            if lag is None or lag <= self.max_replica_lag:
+                return
+            print(f"  replica is {lag:.0f}s behind, waiting")
+            time.sleep(1)
+
+    def _start(self, migration, records: dict) -> dict:
+        now = datetime.now(timezone.utc)
+        record = {"version": migration.version, "name": migration.name, "status": "running",
+                  "resume_key": None, "rows_done": 0, "started_at": now, "finished_at": None}
+        with self.engine.begin() as conn:
+            conn.execute(migrations_table.insert().values(**record))
+        records[migration.version] = record
+        return record
+
+    def _finish(self, migration, status: str):
+        with self.engine.begin() as conn:
+            conn.execute(
+                migrations_table.update()
+                .where(migrations_table.c.version == migration.version)
+                .values(status=status, finished_at=datetime.now(timezone.utc))
+            )
+
+    def run(self, target: int = None, lock_wait: int = 0) -> list:
+        """
+        Apply pending migrations up to and including target. Returns the
+        versions applied. Waits up to lock_wait seconds for another run to
+        finish first.
+        """
+        with self.engine.connect() as lock:
+            # Two deploys starting at once must not run the same migration twice
+            if _is_mysql(lock) and not lock.execute(text("SELECT GET_LOCK('rmp_migrate', :wait)"),
+                                                    {"wait": lock_wait}).scalar():
+                raise RuntimeError("Another migration run holds the rmp_migrate lock")
+            try:
+                return self._run(target)
+            finally:
+                if _is_mysql(lock):
+                    lock.execute(text("SELECT RELEASE_LOCK('rmp_migrate')"))
+
+    def _run(self, target: int = None) -> list:
+        records = self.records()
+        applied = []
+        for migration in self.migrations:
+            if target is not None and migration.version > target:
+                break
+            record = records.get(migration.version)
+            if record is not None and record["status"] != "running":
+                continue
+
+            if record is None:
+                with self.engine.connect() as conn:
+                    skip = migration.already_applied(conn)
+                record = self._start(migration, records)
+                if skip:
+                    print(f"{migration.version:04d} {migration.name}: already in schema, skipped")
+                    self._finish(migration, "skipped")
+                    continue
+            elif not isinstance(migration, Backfill):
+                # Only backfills can resume; a half-applied DDL script needs a look
+                raise RuntimeError(
+                    f"Migration {migration.version} ({migration.name}) was interrupted. "
+                    f"Check the schema, then run: python migrate.py --mark-done {migration.version}"
+                )
+
+            print(f"{migration.version:04d} {migration.name}: applying")
+            started = time.perf_counter()
+            migration.apply(self, record)
+            self._finish(migration, "done")
+            applied.append(migration.version)
+            print(f"{migration.version:04d} {migration.name}: done in {time.perf_counter() - started:.1f}s")
+        return applied
+
+    def mark_done(self, version: int):
+        with self.engine.begin() as conn:
+            conn.execute(
+                migrations_table.update()
+                .where(migrations_table.c.version == version)
+                .values(status="done", finished_at=datetime.now(timezone.utc))
+            )
+
+    def status(self) -> list:
+        records = self.records()
+        return [
+            (migration.version, migration.name, records.get(migration.version, {}).get("status", "pending"),
+             records.get(migration.version, {}).get("rows_done"))
+            for migration in self.migrations
+        ]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None, help="defaults to the application's database")
+    parser.add_argument("--status", action="store_true", help="list migrations and exit")
+    parser.add_argument("--target", type=int, default=None, help="stop after this version")
+    parser.add_argument("--mark-done", type=int, default=None, metavar="VERSION",
+                        help="record an interrupted migration as applied")
+    parser.add_argument("--chunk-size", type=int, default=MIGRATION_CHUNK_SIZE)
+    parser.add_argument("--chunk-seconds", type=float, default=MIGRATION_CHUNK_SECONDS)
+    parser.add_argument("--pause-ms", type=float, default=MIGRATION_PAUSE_MS)
+    parser.add_argument("--max-replica-lag", type=float, default=MIGRATION_MAX_REPLICA_LAG)
+    parser.add_argument("--lock-wait", type=int, default=0, metavar="SECONDS",
+                        help="wait this long for a concurrent run (another task starting) instead of failing")
+    args = parser.parse_args(argv)
+
+    if args.database_url:
+        engine = database.make_engine(args.database_url)
+        replica_engine = None
+    else:
+        engine = database.engine
+        replica_engine = database.replica_engine
+
+    runner = Runner(engine, chunk_size=args.chunk_size, chunk_seconds=args.chunk_seconds,
+                    pause_ms=args.pause_ms, replica_engine=replica_engine,
+                    max_replica_lag=args.max_replica_lag)
+
+    if args.status:
+        for version, name, status, rows_done in runner.status():
+            rows = f" ({rows_done} rows)" if rows_done else ""
+            print(f"{version:04d} {status:8s} {name}{rows}")
+        return 0
+    if args.mark_done is not None:
+        runner.mark_done(args.mark_done)
+        return 0
+
+    applied = runner.run(target=args.target, lock_wait=args.lock_wait)
+    print(f"{len(applied)} migration(s) applied")
+    # Shard migrations have their own versions, so --target leaves them alone
+    if not args.database_url and args.target is None:
+        for name, shard_engine in database.shard_engines.items():
+            shard_runner = Runner(shard_engine, SHARD_MIGRATIONS, chunk_size=args.chunk_size,
+                                  chunk_seconds=args.chunk_seconds, pause_ms=args.pause_ms)
+            applied = shard_runner.run(lock_wait=args.lock_wait)
+            print(f"shard {name}: {len(applied)} migration(s) applied")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,17 @@
+#!/usr/bin/env python3
+"""
+Backfill picks.team_id from picks.team (see add_teams_table.sql).
+
+Runs the migrations up to and including the chunked team_id backfill, which
+is safe to run during the season and resumes where it stopped if interrupted.
+Takes the same options as migrate.py, e.g. --chunk-size and --pause-ms.
+"""
+
+import sys
+
+import migrate
+
+TEAM_ID_BACKFILL = 4
+
+if __name__ == "__main__":
+    sys.exit(migrate.main(["--target", str(TEAM_ID_BACKFILL)] + sys.argv[1:]))
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Enum, Text, Integer
+from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Enum, Text, Integer, Index, LargeBinary
 from sqlalchemy.orm import relationship, declarative_base
 import enum
 
@@ -24,11 +24,13 @@ class User(Base):
     email = Column(String(255), unique=True, index=True, nullable=False)
     hashed_password = Column(String(255), nullable=False)
     is_active = Column(Boolean, default=True)
-    role = Column(Enum(UserRole), default=UserRole.USER)
+    # A native ENUM on MySQL; a VARCHAR with a CHECK constraint elsewhere
+    role = Column(Enum(UserRole, create_constraint=True), default=UserRole.USER)
     mfa_enabled = Column(Boolean, default=False)
     email_verified = Column(Boolean, default=False)
     created_at = Column(DateTime)
     updated_at = Column(DateTime)
+    deleted_at = Column(DateTime)  # set when deletion starts; hidden from queries (see deletion.py)
     # relationships
     pools = relationship("Pool", back_populates="owner")
     entries = relationship("Entry", back_populates="user")
@@ -41,12 +43,22 @@ class Pool(Base):
     lock_time = Column(DateTime)
     is_private = Column(Boolean, default=False)
     owner_id = Column(String(36), ForeignKey("users.id"))
+    change_version = Column(Integer, default=0)  # bumped on every entry/pick write; by a trigger for results and locks (see migrate.py)
+    compacted_version = Column(Integer, default=0)  # change log rows at or below this are gone
+    season = Column(Integer)  # see seasons.py
+    pool_type = Column(String(50))  # survivor, losing_survivor, pickem, confidence, ...; NULL is survivor (see rules.py)
     created_at = Column(DateTime)
     updated_at = Column(DateTime)
+    deleted_at = Column(DateTime)
     # relationships
     owner = relationship("User", back_populates="pools")
     entries = relationship("Entry", back_populates="pool")
 
+    __table_args__ = (
+        # Pool lists only show the current season
+        Index("idx_pools_season", "season"),
+    )
+
 class Entry(Base):
     __tablename__ = "entries"
     id = Column(String(36), primary_key=True, index=True)
@@ -56,6 +68,7 @@ class Entry(Base):
     alive = Column(Boolean, default=True)
     created_at = Column(DateTime)
     updated_at = Column(DateTime)
+    deleted_at = Column(DateTime)
     # relationships
     user = relationship("User", back_populates="entries")
     pool = relationship("Pool", back_populates="entries")
@@ -70,12 +83,167 @@ class Pick(Base):
     team_id = Column(Integer, ForeignKey("teams.id"))  # New foreign key to teams
     locked = Column(Boolean, default=False)
     result = Column(String(10))  # win, loss, pending
+    season = Column(Integer)
+    confidence = Column(Integer)  # confidence pools only
     created_at = Column(DateTime)
     updated_at = Column(DateTime)
     # relationships
     entry = relationship("Entry", back_populates="picks")
     team_obj = relationship("Team", back_populates="picks")
 
+    __table_args__ = (
+        # Pick upserts look up the existing pick by entry and week
+        Index("idx_picks_entry_week", "entry_id", "week"),
+        # Team availability checks look up an entry's picks by team id
+        Index("idx_picks_entry_team", "entry_id", "team_id"),
+        # The archive job finds completed seasons' picks
+        Index("idx_picks_season", "season"),
+    )
+
+class ArchivedPick(Base):
+    """A pick of a completed season, moved out of picks by the archive job (see archive.py)."""
+    __tablename__ = "picks_archive"
+    id = Column(String(36), primary_key=True)
+    entry_id = Column(String(36))
+    week = Column(Integer)
+    team = Column(String(255))
+    team_id = Column(Integer)
+    locked = Column(Boolean, default=False)
+    result = Column(String(10))
+    season = Column(Integer)
+    confidence = Column(Integer)
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    archived_at = Column(DateTime)
+
+    __table_args__ = (
+        Index("idx_picks_archive_entry_week", "entry_id", "week"),
+    )
+
+class PoolChange(Base):
+    __tablename__ = "pool_changes"
+    pool_id = Column(String(36), ForeignKey("pools.id"), primary_key=True)
+    version = Column(Integer, primary_key=True)
+    kind = Column(String(10), nullable=False)  # entry, pick, pool
+    object_id = Column(String(36), nullable=False)
+    op = Column(String(10), nullable=False)  # upsert, delete
+    user_id = Column(String(36))  # owner of the changed row; NULL for pool-wide changes
+    created_at = Column(DateTime)
+
+class DataVersion(Base):
+    __tablename__ = "data_versions"
+    name = Column(String(50), primary_key=True)  # teams, schedule
+    version = Column(Integer, nullable=False, default=0)
+
+class SchemaMigration(Base):
+    __tablename__ = "schema_migrations"
+    version = Column(Integer, primary_key=True)
+    name = Column(String(255), nullable=False)
+    status = Column(String(10), nullable=False)  # running, done, skipped
+    resume_key = Column(String(64))  # last key processed by a chunked backfill
+    rows_done = Column(Integer, default=0)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+
+class Job(Base):
+    __tablename__ = "jobs"
+    id = Column(String(36), primary_key=True)
+    kind = Column(String(50), nullable=False)
+    args = Column(Text)  # JSON
+    status = Column(String(10), nullable=False, default="queued")  # queued, running, done, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    run_at = Column(DateTime, nullable=False)  # not claimed before this time
+    locked_by = Column(String(100))
+    locked_at = Column(DateTime)
+    result = Column(Text)  # JSON
+    progress = Column(Text)  # JSON, reported by long-running handlers
+    error = Column(Text)
+    created_by = Column(String(36))
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    finished_at = Column(DateTime)
+
+    __table_args__ = (
+        # Workers claim the oldest due job in a given status
+        Index("idx_jobs_status_run_at", "status", "run_at"),
+    )
+
+class UserSession(Base):
+    __tablename__ = "sessions"
+    id = Column(String(36), primary_key=True)  # the token's sid claim
+    user_id = Column(String(36), ForeignKey("users.id"), nullable=False)
+    created_at = Column(DateTime)
+    last_seen_at = Column(DateTime)  # written behind, up to SESSION_LAST_SEEN_FLUSH_SECONDS late
+    expires_at = Column(DateTime)
+    revoked_at = Column(DateTime)
+    user_agent = Column(String(255))
+    ip_address = Column(String(45))
+
+    __table_args__ = (
+        Index("idx_sessions_user_id", "user_id"),
+        # Workers poll for sessions revoked since their last poll
+        Index("idx_sessions_revoked_at", "revoked_at"),
+    )
+
+class IdempotencyKey(Base):
+    """A POST's Idempotency-Key and the response it replays; see idempotency.py."""
+    __tablename__ = "idempotency_keys"
+    id = Column(String(64), primary_key=True)  # SHA-256 of the caller's credentials and Idempotency-Key
+    request_hash = Column(String(64), nullable=False)
+    status = Column(Integer)  # NULL while the first request is running
+    headers = Column(Text)  # JSON
+    body = Column(LargeBinary)
+    created_at = Column(DateTime)
+    expires_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        # Expired keys are deleted oldest first
+        Index("idx_idempotency_keys_expires_at", "expires_at"),
+    )
+
+class Notification(Base):
+    __tablename__ = "notifications"
+    id = Column(String(36), primary_key=True)
+    user_id = Column(String(36), ForeignKey("users.id"), nullable=False)
+    kind = Column(String(50), nullable=False)  # deadline_reminder, week_results
+    dedupe_key = Column(String(100), nullable=False)  # at most one notification per user and key
+    title = Column(String(255), nullable=False)
+    body = Column(Text)
+    created_at = Column(DateTime)
+    read_at = Column(DateTime)
+
+    __table_args__ = (
+        # Lets a retried send skip users it already notified
+        Index("idx_notifications_user_key", "user_id", "dedupe_key", unique=True),
+        # A user's notification list, newest first
+        Index("idx_notifications_user_created", "user_id", "created_at"),
+    )
+
+class Rule(Base):
+    """One setting of a pool format; see rules.py."""
+    __tablename__ = "rules"
+    id = Column(String(36), primary_key=True)
+    pool_type = Column(String(50))
+    rule_text = Column(String(255))
+    rule_type = Column(String(25))  # the setting, one of rules.RULE_TYPES
+    default_value = Column(String(25))
+    enabled_by_default = Column(Boolean)  # applies to every pool of the format
+
+class PoolRule(Base):
+    """A rule a pool has opted into, with its own value or NULL for the rule's default."""
+    __tablename__ = "pool_rules"
+    pool_id = Column(String(36), ForeignKey("pools.id"), primary_key=True)
+    rule_id = Column(String(36), ForeignKey("rules.id"), primary_key=True)
+    value = Column(String(25))
+
+class PoolShard(Base):
+    """Shard map: the database holding a pool's entries, picks and change log (see sharding.py)."""
+    __tablename__ = "pool_shards"
+    pool_id = Column(String(36), primary_key=True)
+    shard = Column(String(50), nullable=False)
+    created_at = Column(DateTime)
+
 class AuditLog(Base):
     __tablename__ = "audit_logs"
     id = Column(String(36), primary_key=True, index=True)
@@ -84,6 +252,25 @@ class AuditLog(Base):
     details = Column(Text)
     created_at = Column(DateTime)
 
+    __table_args__ = (
+        # The archive job moves out rows older than the retention period
+        Index("idx_audit_logs_created_at", "created_at"),
+    )
+
+class ArchivedAuditLog(Base):
+    """An audit log row past AUDIT_LOG_RETENTION_DAYS, moved out by the archive job."""
+    __tablename__ = "audit_logs_archive"
+    id = Column(String(36), primary_key=True)
+    user_id = Column(String(36))
+    action = Column(String(255))
+    details = Column(Text)
+    created_at = Column(DateTime)
+    archived_at = Column(DateTime)
+
+    __table_args__ = (
+        Index("idx_audit_logs_archive_created_at", "created_at"),
+    )
+
 class MessageBoard(Base):
     __tablename__ = "message_board"
     id = Column(String(36), primary_key=True, index=True)
@@ -107,7 +294,13 @@ class Schedule(Base):
     away_team_id = Column(Integer, ForeignKey("teams.id"), nullable=False)
     start_time = Column(DateTime, nullable=False)
     winning_team_id = Column(String(100), nullable=False, default='99')
+    season = Column(Integer)  # see seasons.py
     
     # relationships
     home_team = relationship("Team", foreign_keys=[home_team_id])
     away_team = relationship("Team", foreign_keys=[away_team_id])
+
+    __table_args__ = (
+        # Live schedule queries read one week of the current season
+        Index("idx_schedule_season_week", "season", "week_num"),
+    )
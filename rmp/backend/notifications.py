@@ -0,0 +1,411 @@
+"""
+Deadline reminders, weekly results and the other emails the app sends.
+
+Everything here runs as background jobs (see jobs.py), never on a request
+worker. A reminder job finds every entry still missing a pick for the week
+with one anti-join, groups the rows per user so each user gets a single
+email listing all of their entries, then works through the users in
+batches of NOTIFY_BATCH_SIZE: the emails go out over SMTP_CONNECTIONS
+persistent SMTP connections in parallel, and the batch's in-app
+notifications are inserted with one multi-row INSERT and committed with the
+job's progress. Users who already have the notification are skipped, so a
+retried job carries on where the failed attempt stopped.
+
+Without SMTP_HOST emails are only logged. For local runs point it at a sink:
+
+    python benchmarks/smtp_sink.py --port 1025
+    SMTP_HOST=localhost SMTP_PORT=1025 SMTP_STARTTLS=false python worker.py
+"""
+
+import logging
+import os
+import queue
+import smtplib
+import ssl
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from itertools import groupby
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import exists, func, insert
+from sqlalchemy.orm import Session
+
+import models
+import deps
+import jobs
+import seasons
+
+SMTP_HOST = os.getenv("SMTP_HOST")
+SMTP_PORT = int(os.getenv("SMTP_PORT", 587))
+SMTP_USERNAME = os.getenv("SMTP_USERNAME")
+SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "true").lower() == "true"
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", 30))
+# Open connections per process, which is also the number of concurrent sends
+SMTP_CONNECTIONS = int(os.getenv("SMTP_CONNECTIONS", 4))
+# Relays cap messages per session, so reconnect after this many
+SMTP_MESSAGES_PER_CONNECTION = int(os.getenv("SMTP_MESSAGES_PER_CONNECTION", 100))
+MAIL_FROM = os.getenv("MAIL_FROM", "RunMyPool <no-reply@runmypool.com>")
+FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:3000")
+
+# Users per batch: emails sent in parallel, then one INSERT and commit
+NOTIFY_BATCH_SIZE = int(os.getenv("NOTIFY_BATCH_SIZE", 500))
+# Deadline reminders go out this long before the week's first kickoff
+REMINDER_LEAD_HOURS = float(os.getenv("REMINDER_LEAD_HOURS", 24))
+
+DEADLINE_REMINDER = "deadline_reminder"
+WEEK_RESULTS = "week_results"
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/notifications", tags=["notifications"])
+
+def email_message(to: str, subject: str, body: str) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = MAIL_FROM
+    message["To"] = to
+    message["Subject"] = subject
+    message.set_content(body)
+    return message
+
+class SmtpUnavailable(Exception):
+    """The relay could not be reached, even after reconnecting; the job runner retries."""
+
+class _Connection:
+    def __init__(self):
+        self.smtp = None
+        self.sent = 0
+
+    def close(self):
+        if self.smtp is not None:
+            try:
+                self.smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+        self.smtp = None
+        self.sent = 0
+
+class SmtpPool:
+    """
+    A fixed set of persistent SMTP connections. A sender blocks until one is
+    free, so at most `size` messages are in flight from this process.
+    """
+
+    def __init__(self, host: str = SMTP_HOST, port: int = SMTP_PORT, username: str = SMTP_USERNAME,
+                 password: str = SMTP_PASSWORD, starttls: bool = SMTP_STARTTLS, size: int = SMTP_CONNECTIONS,
+                 messages_per_connection: int = SMTP_MESSAGES_PER_CONNECTION, timeout: float = SMTP_TIMEOUT):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.size = size
+        self.messages_per_connection = messages_per_connection
+        self.timeout = timeout
+        self.sent = 0
+        self._connections = queue.LifoQueue()
+        for _ in range(size):
+            self._connections.put(_Connection())
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> smtplib.SMTP:
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.starttls:
+            smtp.starttls(context=ssl.create_default_context())
+        if self.username:
+            smtp.login(self.username, self.password)
+        return smtp
+
+    def send(self, message: EmailMessage):
+        if not self.host:
+            logger.info("SMTP_HOST is not set; not sending %r to %s", message["Subject"], message["To"])
+            return
+        connection = self._connections.get()
+        try:
+            self._send(connection, message)
+        finally:
+            self._connections.put(connection)
+
+    def _send(self, connection: _Connection, message: EmailMessage):
+        # A connection that sat idle may have been dropped by the relay;
+        # reconnect once before giving up
+        for attempt in (1, 2):
+            if connection.smtp is None:
+                connection.smtp = self._connect()
+            try:
+                connection.smtp.send_message(message)
+                break
+            except OSError as e:
+                # SMTPException is an OSError too, but a refusal won't go through the second time
+                if isinstance(e, smtplib.SMTPException) and not isinstance(e, smtplib.SMTPServerDisconnected):
+                    raise
+                connection.close()
+                if attempt == 2:
+                    raise
+        connection.sent += 1
+        self.sent += 1
+        if connection.sent >= self.messages_per_connection:
+            connection.close()
+
+    def send_many(self, messages: list) -> dict:
+        """
+        Send in parallel over the pool. Returns {recipient: error} for messages
+        the relay refused; raises SmtpUnavailable if it could not be reached.
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="smtp")
+        futures = [(message["To"], self._executor.submit(self.send, message)) for message in messages]
+        failed = {}
+        unavailable = None
+        for to, future in futures:
+            try:
+                future.result()
+            except (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError) as e:
+                unavailable = e
+            except smtplib.SMTPException as e:
+                failed[to] = f"{type(e).__name__}: {e}"
+            except OSError as e:
+                unavailable = e
+        if unavailable is not None:
+            raise SmtpUnavailable(f"{type(unavailable).__name__}: {unavailable}")
+        return failed
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+        connections = []
+        while not self._connections.empty():
+            connections.append(self._connections.get_nowait())
+        for connection in connections:
+            connection.close()
+            self._connections.put(connection)
+
+mailer = SmtpPool()
+
+# Recipients
+
+def _week_deadline(db: Session, week: int):
+    """Picks for a week lock at its first kickoff."""
+    return db.query(func.min(models.Schedule.start_time)).filter(
+        models.Schedule.season == seasons.current_season(),
+        models.Schedule.week_num == week
+    ).scalar()
+
+def _missing_picks_query(db: Session, week: int):
+    """Every live entry without a pick for the week, with its owner's id, in one anti-join."""
+    # Users are looked up per batch in _notify_users: with sharding (see
+    # sharding.py) they live on another database than pools and entries
+    has_pick = exists().where(models.Pick.entry_id == models.Entry.id, models.Pick.week == week)
+    return db.query(
+        models.Entry.user_id, models.Pool.name, models.Entry.name
+    ).join(
+        models.Pool, models.Pool.id == models.Entry.pool_id
+    ).filter(
+        models.Pool.season == seasons.current_season(),
+        models.Entry.alive == True,
+        ~has_pick
+    )
+
+def _results_query(db: Session, week: int):
+    """Every graded pick for the week, with its entry and owner's id."""
+    return db.query(
+        models.Entry.user_id, models.Pool.name, models.Entry.name, models.Pick.team, models.Pick.result
+    ).join(
+        models.Pool, models.Pool.id == models.Entry.pool_id
+    ).join(models.Pick, models.Pick.entry_id == models.Entry.id).filter(
+        models.Pick.season == seasons.current_season(),
+        models.Pick.week == week,
+        models.Pick.result.in_(("win", "loss"))
+    )
+
+def _recipients(query) -> list:
+    """[(user_id, [row, ...]), ...] from a recipient query, per user in user, pool, entry order."""
+    # Sorted here rather than in SQL: a sharded query returns each shard's rows in turn
+    rows = sorted(query.all(), key=lambda row: row[:3])
+    return [
+        (user_id, [row[1:] for row in user_rows])
+        for user_id, user_rows in groupby(rows, key=lambda row: row[0])
+    ]
+
+# Messages
+
+def _reminder(week: int, deadline: datetime, lines: list):
+    title = f"Week {week} picks are due"
+    entries = "\n".join(f"  - {entry_name} ({pool_name})" for pool_name, entry_name in lines)
+    body = (
+        f"These entries still need a pick for week {week}, which locks at kickoff "
+        f"({deadline:%a %b %d %H:%M} UTC):\n\n{entries}\n\n"
+        f"Make your picks at {FRONTEND_URL}/picks"
+    )
+    return title, body
+
+def _results(week: int, lines: list):
+    title = f"Week {week} results"
+    results = "\n".join(
+        f"  - {entry_name} ({pool_name}): {team} {'won' if result == 'win' else 'lost'}"
+        for pool_name, entry_name, team, result in lines
+    )
+    body = f"Your week {week} results:\n\n{results}\n\nSee the standings at {FRONTEND_URL}/pools"
+    return title, body
+
+def _notify_users(db: Session, job: models.Job, kind: str, dedupe_key: str, recipients: list, render) -> dict:
+    """
+    Email each active (user_id, lines) recipient and add their in-app
+    notification, NOTIFY_BATCH_SIZE users per transaction.
+    """
+    progress = {"users": len(recipients), "notified": 0, "skipped": 0, "email_failures": 0}
+    for start in range(0, len(recipients), NOTIFY_BATCH_SIZE):
+        batch = recipients[start:start + NOTIFY_BATCH_SIZE]
+        user_ids = [user_id for user_id, _ in batch]
+        emails = dict(db.query(models.User.id, models.User.email).filter(
+            models.User.id.in_(user_ids),
+            models.User.is_active == True
+        ))
+        done = {user_id for (user_id,) in db.query(models.Notification.user_id).filter(
+            models.Notification.dedupe_key == dedupe_key,
+            models.Notification.user_id.in_(user_ids)
+        )}
+        progress["users"] -= len(batch) - len(emails)
+        batch = [(user_id, lines) for user_id, lines in batch if user_id in emails]
+        progress["skipped"] += sum(1 for user_id, _ in batch if user_id in done)
+        batch = [(user_id, lines) for user_id, lines in batch if user_id not in done]
+        if not batch:
+            continue
+
+        rendered = [(user_id, emails[user_id]) + render(lines) for user_id, lines in batch]
+        # Emails first: a crash before the commit re-sends this batch on retry
+        # rather than leaving users notified in-app but never emailed
+        failed = mailer.send_many([email_message(email, title, body) for _, email, title, body in rendered])
+        for to, error in failed.items():
+            logger.warning("%s email to %s failed: %s", kind, to, error)
+
+        now = datetime.utcnow()
+        # A Core insert: sharded sessions don't support the ORM bulk form
+        db.execute(insert(models.Notification.__table__), [
+            {
+                "id": str(uuid.uuid4()),
+                "user_id": user_id,
+                "kind": kind,
+                "dedupe_key": dedupe_key,
+                "title": title,
+                "body": body,
+                "created_at": now,
+            }
+            for user_id, _, title, body in rendered
+        ])
+        progress["notified"] += len(rendered)
+        progress["email_failures"] += len(failed)
+        jobs.report_progress(db, job, progress)
+        db.commit()
+    return progress
+
+@jobs.handler(DEADLINE_REMINDER)
+def _deadline_reminder_job(db: Session, job: models.Job):
+    week = jobs.job_args(job)["week"]
+    deadline = _week_deadline(db, week)
+    if deadline is None or deadline <= datetime.utcnow():
+        return {"skipped": "week has no upcoming kickoff"}
+    recipients = _recipients(_missing_picks_query(db, week))
+    # Week numbers repeat every season, and notifications are never archived
+    season = seasons.current_season()
+    return _notify_users(db, job, DEADLINE_REMINDER, f"reminder:{season}:{week}", recipients,
+                         lambda lines: _reminder(week, deadline, lines))
+
+@jobs.handler(WEEK_RESULTS)
+def _week_results_job(db: Session, job: models.Job):
+    week = jobs.job_args(job)["week"]
+    recipients = _recipients(_results_query(db, week))
+    season = seasons.current_season()
+    return _notify_users(db, job, WEEK_RESULTS, f"results:{season}:{week}", recipients,
+                         lambda lines: _results(week, lines))
+
+def schedule_reminders(db: Session, week: int, user_id: str = None) -> models.Job:
+    """Queue the week's reminders to run REMINDER_LEAD_HOURS before its first kickoff (or now, if that has passed)."""
+    deadline = _week_deadline(db, week)
+    if deadline is None:
+        raise HTTPException(status_code=404, detail=f"No games scheduled in week {week}")
+    send_at = deadline - timedelta(hours=REMINDER_LEAD_HOURS)
+    delay = max((send_at - datetime.utcnow()).total_seconds(), 0)
+    return jobs.enqueue(db, DEADLINE_REMINDER, {"week": week}, user_id=user_id, delay_seconds=delay)
+
+def _notification_out(notification: models.Notification) -> dict:
+    return {
+        "id": notification.id,
+        "kind": notification.kind,
+        "title": notification.title,
+        "body": notification.body,
+        "created_at": notification.created_at,
+        "read_at": notification.read_at,
+    }
+
+@router.get("/")
+def list_notifications(
+    unread: bool = False,
+    limit: int = 50,
+    db: Session = Depends(deps.get_read_db),
+    current_user: models.User = Depends(deps.get_current_user)
+):
+    """The current user's notifications, newest first."""
+    query = db.query(models.Notification).filter(models.Notification.user_id == current_user.id)
+    if unread:
+        query = query.filter(models.Notification.read_at.is_(None))
+    notifications = query.order_by(models.Notification.created_at.desc()).limit(limit).all()
+    return [_notification_out(notification) for notification in notifications]
+
+@router.post("/read")
+def mark_all_read(
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.get_current_user)
+):
+    updated = db.query(models.Notification).filter(
+        models.Notification.user_id == current_user.id,
+        models.Notification.read_at.is_(None)
+    ).update({models.Notification.read_at: datetime.utcnow()}, synchronize_session=False)
+    db.commit()
+    return {"updated": updated}
+
+@router.post("/{notification_id}/read")
+def mark_read(
+    notification_id: str,
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.get_current_user)
+):
+    notification = db.query(models.Notification).filter(
+        models.Notification.id == notification_id,
+        models.Notification.user_id == current_user.id
+    ).first()
+    if not notification:
+        raise HTTPException(status_code=404, detail="Notification not found")
+    if notification.read_at is None:
+        notification.read_at = datetime.utcnow()
+        db.commit()
+    return _notification_out(notification)
+
+@router.post("/weeks/{week}/reminders", status_code=202)
+def queue_deadline_reminders(
+    week: int,
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.require_super_admin)
+):
+    """Schedule the week's deadline reminders. Super-admins only."""
+    job = schedule_reminders(db, week, user_id=current_user.id)
+    db.commit()
+    return {"job_id": job.id, "run_at": job.run_at}
+
+@router.post("/weeks/{week}/results", status_code=202)
+def queue_week_results(
+    week: int,
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.require_super_admin)
+):
+    """Send every user their graded picks for the week. Super-admins only."""
+    job = jobs.enqueue(db, WEEK_RESULTS, {"week": week}, user_id=current_user.id)
+    db.commit()
+    return {"job_id": job.id, "run_at": job.run_at}
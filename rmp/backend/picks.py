@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
+from starlette.concurrency import run_in_threadpool
 from typing import List
 import uuid
 from datetime import datetime, timezone
@@ -8,22 +9,47 @@ from datetime import datetime, timezone
 from deps import get_db, get_current_user
 from models import Pick, Entry
 from schemas import PickCreate, PickUpdate, PickOut
+import group_commit
+from changes import record_change
+from versions import UserConditionalGet
+from singleflight import single_flight
+from teams import team_map
+import seasons
+import rules
 
 router = APIRouter()
 
-@router.post("/picks/create", response_model=PickOut)
-async def create_pick(
-    pick: PickCreate,
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
-):
-    # Verify the entry belongs to the current user
-    entry = db.query(Entry).filter(Entry.id == pick.entry_id, Entry.user_id == current_user.id).first()
-    if not entry:
+def _resolve_team(db: Session, team: str):
+    """Map the team abbreviation sent by the client to (team_id, abbreviation)."""
+    found = team_map.resolve(db, team)
+    if found is None:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Entry not found or doesn't belong to you"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown team {team}"
+        )
+    return found
+
+def _check_confidence(db: Session, plan: rules.RulePlan, entry_id: str, week: int, confidence):
+    """Reject a confidence the pool's rules don't allow, or one the entry used in another week."""
+    error = plan.pick_error(confidence)
+    if error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+    if not plan.confidence:
+        return
+    confidence_used = db.query(Pick.id).filter(
+        and_(Pick.entry_id == entry_id, Pick.confidence == confidence, Pick.week != week)
+    ).first()
+    if confidence_used:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Confidence {confidence} has already been used in this entry"
         )
+
+def _save_pick(db: Session, pick: PickCreate, team_id: int, abbrv: str, pool_id: str, user_id: str,
+               plan: rules.RulePlan, season: int) -> Pick:
+    """Insert or update the pick for an entry/week under the pool's rules, without committing."""
+    _check_confidence(db, plan, pick.entry_id, pick.week, pick.confidence)
+    confidence = pick.confidence if plan.confidence else None
     
     # Check if a pick already exists for this entry and week
     existing_pick = db.query(Pick).filter(
@@ -32,21 +58,22 @@ async def create_pick(
     
     if existing_pick:
         # Update existing pick
-        existing_pick.team = pick.team
+        existing_pick.team_id = team_id
+        existing_pick.team = abbrv
+        existing_pick.confidence = confidence
         existing_pick.updated_at = datetime.now(timezone.utc)
-        db.commit()
-        db.refresh(existing_pick)
+        record_change(db, pool_id, "pick", existing_pick.id, user_id=user_id)
         return existing_pick
     
     # Check if the team has already been used in this entry
-    team_already_used = db.query(Pick).filter(
-        and_(Pick.entry_id == pick.entry_id, Pick.team == pick.team)
+    team_already_used = plan.unique_teams and db.query(Pick.id).filter(
+        and_(Pick.entry_id == pick.entry_id, Pick.team_id == team_id)
     ).first()
     
     if team_already_used:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Team {pick.team} has already been selected in this entry"
+            detail=f"Team {abbrv} has already been selected in this entry"
         )
     
     # Create new pick
@@ -54,20 +81,73 @@ async def create_pick(
         id=str(uuid.uuid4()),
         entry_id=pick.entry_id,
         week=pick.week,
-        team=pick.team,
+        team_id=team_id,
+        team=abbrv,  # still written for readers of the old column
         locked=False,
+        season=season,
+        confidence=confidence,
         created_at=datetime.now(timezone.utc),
         updated_at=datetime.now(timezone.utc)
     )
     
     db.add(db_pick)
+    record_change(db, pool_id, "pick", db_pick.id, user_id=user_id)
+    return db_pick
+
+def _prepare_pick(db: Session, pick: PickCreate, current_user):
+    """
+    Everything a new pick is checked against: (entry, plan, team_id, abbrv, season).
+    Blocking, so handlers run it in the threadpool; the plan, team map and
+    season are cached, and read through the request's session on a miss.
+    """
+    # Verify the entry belongs to the current user
+    entry = db.query(Entry).filter(Entry.id == pick.entry_id, Entry.user_id == current_user.id).first()
+    if not entry:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Entry not found or doesn't belong to you"
+        )
+    # Cached per pool: no rule queries on the pick path
+    plan = rules.plan_for(entry.pool_id, db)
+    if plan.elimination and entry.alive is False:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="This entry has been eliminated"
+        )
+    team_id, abbrv = _resolve_team(db, pick.team)
+    return entry, plan, team_id, abbrv, seasons.current_season(db)
+
+def _commit_pick(db: Session, pick: PickCreate, prepared) -> Pick:
+    entry, plan, team_id, abbrv, season = prepared
+    db_pick = _save_pick(db, pick, team_id, abbrv, entry.pool_id, entry.user_id, plan, season)
     db.commit()
     db.refresh(db_pick)
     return db_pick
 
+@router.post("/picks/create", response_model=PickOut)
+async def create_pick(
+    pick: PickCreate,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    # Async only to await the group-commit writer; database work stays off the event loop
+    prepared = await run_in_threadpool(_prepare_pick, db, pick, current_user)
+    
+    if group_commit.PICK_GROUP_COMMIT:
+        entry, plan, team_id, abbrv, season = prepared
+        # Hand the write to the group-commit writer; this returns only after
+        # the batch containing it has been committed.
+        return await group_commit.pick_queue.run(
+            lambda session: _save_pick(session, pick, team_id, abbrv, entry.pool_id, entry.user_id, plan, season)
+        )
+    
+    return await run_in_threadpool(_commit_pick, db, pick, prepared)
+
 @router.get("/picks/entry/{entry_id}", response_model=List[PickOut])
-async def get_picks_for_entry(
+@single_flight(user_scoped=True)
+def get_picks_for_entry(
     entry_id: str,
+    etag: str = Depends(UserConditionalGet("entry")),
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
@@ -83,7 +163,7 @@ async def get_picks_for_entry(
     return picks
 
 @router.put("/picks/{pick_id}", response_model=PickOut)
-async def update_pick(
+def update_pick(
     pick_id: str,
     pick_update: PickUpdate,
     db: Session = Depends(get_db),
@@ -108,33 +188,46 @@ async def update_pick(
             detail="Cannot update a locked pick"
         )
     
+    updates = pick_update.dict(exclude_unset=True)
+    plan = rules.plan_for(pick.entry.pool_id, db)
+    if "confidence" in updates:
+        if not plan.confidence:
+            updates.pop("confidence")
+        else:
+            _check_confidence(db, plan, pick.entry_id, updates.get("week", pick.week), pick_update.confidence)
+    
     # If updating team, check if the new team is already used in this entry
-    if pick_update.team and pick_update.team != pick.team:
-        team_already_used = db.query(Pick).filter(
-            and_(
-                Pick.entry_id == pick.entry_id, 
-                Pick.team == pick_update.team,
-                Pick.id != pick_id
-            )
-        ).first()
-        
-        if team_already_used:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Team {pick_update.team} has already been selected in this entry"
-            )
+    if pick_update.team:
+        team_id, abbrv = _resolve_team(db, pick_update.team)
+        if team_id != pick.team_id and plan.unique_teams:
+            team_already_used = db.query(Pick.id).filter(
+                and_(
+                    Pick.entry_id == pick.entry_id, 
+                    Pick.team_id == team_id,
+                    Pick.id != pick_id
+                )
+            ).first()
+            
+            if team_already_used:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Team {abbrv} has already been selected in this entry"
+                )
+        updates["team"] = abbrv
+        pick.team_id = team_id
     
     # Update fields
-    for field, value in pick_update.dict(exclude_unset=True).items():
+    for field, value in updates.items():
         setattr(pick, field, value)
     
     pick.updated_at = datetime.now(timezone.utc)
+    record_change(db, pick.entry.pool_id, "pick", pick.id, user_id=current_user.id)
     db.commit()
     db.refresh(pick)
     return pick
 
 @router.delete("/picks/{pick_id}")
-async def delete_pick(
+def delete_pick(
     pick_id: str,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user)
@@ -158,6 +251,7 @@ async def delete_pick(
             detail="Cannot delete a locked pick"
         )
     
+    record_change(db, pick.entry.pool_id, "pick", pick.id, op="delete", user_id=current_user.id)
     db.delete(pick)
     db.commit()
     return {"message": "Pick deleted successfully"}
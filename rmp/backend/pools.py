@@ -4,11 +4,21 @@ from typing import List
 import models
 import schemas
 import deps
+from changes import record_change
+import versions
+import deletion
+import sharding
+import seasons
+import rules
+from singleflight import single_flight
 from datetime import datetime
+import logging
 import uuid
 
 router = APIRouter(prefix="/pools", tags=["pools"])
 
+logger = logging.getLogger(__name__)
+
 @router.post("/create", response_model=schemas.PoolOut)
 def create_pool(
     pool: schemas.PoolCreate, 
@@ -46,6 +56,9 @@ def create_pool(
             except (ValueError, TypeError) as e:
                 raise HTTPException(status_code=400, detail=f"Invalid lock_time format. Use YYYY-MM-DD HH:MM:SS or ISO format: {str(e)}")
         
+        if pool.pool_type is not None and pool.pool_type not in rules.pool_types():
+            raise HTTPException(status_code=400, detail=f"Unknown pool type {pool.pool_type}")
+        
         db_pool = models.Pool(
             id=str(uuid.uuid4()),
             name=pool.name,
@@ -53,6 +66,8 @@ def create_pool(
             lock_time=lock_time,
             is_private=pool.is_private,
             owner_id=current_user.id,
+            season=seasons.current_season(),
+            pool_type=pool.pool_type,
             created_at=datetime.utcnow(),
             updated_at=datetime.utcnow()
         )
@@ -70,37 +85,46 @@ def create_pool(
         db.commit()
         
         return db_pool
-    except Exception as e:
-        print(f"Create pool error: {str(e)}")
+    except HTTPException:
+        raise
+    except Exception:
+        logger.exception("create pool failed")
         raise HTTPException(status_code=500, detail="Failed to create pool")
 
 @router.get("/my-pools", response_model=List[schemas.PoolOut])
 def get_my_pools(
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
     current_user: models.User = Depends(deps.get_current_user)
 ):
-    """Get all pools where the current user is the owner or a member."""
+    """Get this season's pools where the current user is the owner or a member."""
     try:
-        # Get pools where user is the owner
-        owned_pools = db.query(models.Pool).filter(
-            models.Pool.owner_id == current_user.id
-        ).all()
+        # Get pools where user is the owner, from every shard at once
+        season = seasons.current_season()
+        owned_pools = sharding.fan_out(db, lambda session: session.query(models.Pool).filter(
+            models.Pool.owner_id == current_user.id,
+            models.Pool.season == season
+        ))
         
         # TODO: Add pools where user is a member (requires pool membership table)
         # For now, just return owned pools
         
         return owned_pools
-    except Exception as e:
-        print(f"Get my pools error: {str(e)}")
+    except Exception:
+        logger.exception("get my pools failed")
         raise HTTPException(status_code=500, detail="Failed to retrieve pools")
 
 @router.get("/", response_model=List[schemas.PoolOut])
-def list_pools(skip: int = 0, limit: int = 100, db: Session = Depends(deps.get_db)):
-    return db.query(models.Pool).offset(skip).limit(limit).all()
+def list_pools(skip: int = 0, limit: int = 100, db: Session = Depends(deps.get_read_db)):
+    """This season's pools; earlier seasons are under /history."""
+    season = seasons.current_season()
+    return sharding.fan_out_page(db, lambda session: session.query(models.Pool).filter(models.Pool.season == season),
+                                 [models.Pool.created_at, models.Pool.id], skip, limit)
 
 @router.get("/{pool_id}", response_model=schemas.PoolOut)
+@single_flight()
 def get_pool(
     pool_id: str,
+    etag: str = Depends(versions.UserConditionalGet("pool")),
     db: Session = Depends(deps.get_db),
     current_user: models.User = Depends(deps.get_current_user)
 ):
@@ -117,8 +141,8 @@ def get_pool(
         return pool
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"Get pool error: {str(e)}")
+    except Exception:
+        logger.exception("get pool failed")
         raise HTTPException(status_code=500, detail="Failed to retrieve pool")
 
 @router.patch("/{pool_id}", response_model=schemas.PoolOut)
@@ -150,23 +174,29 @@ def update_pool(
         
         pool.updated_at = datetime.utcnow()
         
+        record_change(db, pool.id, "pool", pool.id)
+        
         db.commit()
         db.refresh(pool)
         
         return pool
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"Update pool error: {str(e)}")
+    except Exception:
+        logger.exception("update pool failed")
         raise HTTPException(status_code=500, detail="Failed to update pool")
 
-@router.delete("/{pool_id}")
+@router.delete("/{pool_id}", status_code=202)
 def delete_pool(
     pool_id: str,
     db: Session = Depends(deps.get_db),
     current_user: models.User = Depends(deps.get_current_user)
 ):
-    """Delete a pool (only by the pool owner)."""
+    """
+    Delete a pool (only by the pool owner). The pool disappears immediately;
+    its entries, picks and admins are purged in the background by the
+    returned job (see GET /jobs/{job_id}).
+    """
     try:
         pool = db.query(models.Pool).filter(models.Pool.id == pool_id).first()
         
@@ -176,23 +206,20 @@ def delete_pool(
         if pool.owner_id != current_user.id:
             raise HTTPException(status_code=403, detail="Only pool owner can delete the pool")
         
-        # TODO: Check if pool has entries before deletion
-        # For now, allow deletion
-        
-        db.delete(pool)
+        job = deletion.delete_pool(db, pool, current_user.id)
         db.commit()
         
-        return {"message": "Pool deleted successfully"}
+        return {"message": "Pool deleted successfully", "job_id": job.id}
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"Delete pool error: {str(e)}")
+    except Exception:
+        logger.exception("delete pool failed")
         raise HTTPException(status_code=500, detail="Failed to delete pool")
 
 @router.get("/{pool_id}/is-admin")
 def check_pool_admin(
     pool_id: str,
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
     current_user: models.User = Depends(deps.get_current_user)
 ):
     """Check if the current user is an admin of the specified pool."""
@@ -220,6 +247,6 @@ def check_pool_admin(
         }
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"Check pool admin error: {str(e)}")
+    except Exception:
+        logger.exception("check pool admin failed")
         raise HTTPException(status_code=500, detail="Failed to check admin status")
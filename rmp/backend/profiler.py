@@ -0,0 +1,134 @@
+import asyncio
+import inspect
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+from starlette.routing import Match
+
+import models
+import deps
+import metrics
+
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", 60))
+PROFILE_MAX_STACKS = int(os.getenv("PROFILE_MAX_STACKS", 20000))
+# Frames kept per stack in the output; deeper stacks lose their leaf-most frames
+PROFILE_MAX_DEPTH = int(os.getenv("PROFILE_MAX_DEPTH", 128))
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+class StackSampler:
+    """
+    Statistical profiler: a background thread snapshots every other thread's
+    stack with sys._current_frames() at a fixed interval and counts
+    identical stacks. Memory is bounded by max_stacks distinct stacks
+    (anything beyond is counted under a single overflow entry) and the
+    sampler always stops on its own once its duration has elapsed.
+    """
+
+    def __init__(self, seconds: float, interval: float, target_code=None, max_stacks: int = PROFILE_MAX_STACKS):
+        self.seconds = seconds
+        self.interval = interval
+        self.target_code = target_code
+        self.max_stacks = max_stacks
+        self.stacks = Counter()
+        self.samples = 0
+
+    def run(self):
+        me = threading.get_ident()
+        deadline = time.monotonic() + self.seconds
+        while time.monotonic() < deadline:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != me:
+                    self._record(frame)
+            self.samples += 1
+            time.sleep(self.interval)
+        return self
+
+    def _record(self, frame):
+        # Walk the whole stack: under SQLAlchemy a route's handler can be far
+        # more than PROFILE_MAX_DEPTH frames from the leaf
+        codes = []
+        while frame is not None:
+            codes.append(frame.f_code)
+            frame = frame.f_back
+        if self.target_code is not None and self.target_code not in codes:
+            return
+        # Root first; truncating the leaf end keeps every stack rooted
+        codes.reverse()
+        names = [f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+                 for code in codes[:PROFILE_MAX_DEPTH]]
+        if len(codes) > PROFILE_MAX_DEPTH:
+            names.append(f"[{len(codes) - PROFILE_MAX_DEPTH} more frames]")
+        stack = ";".join(names)
+        if stack not in self.stacks and len(self.stacks) >= self.max_stacks:
+            stack = "[stack table full]"
+        self.stacks[stack] += 1
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's collapsed-stack format, readable by flamegraph.pl and speedscope."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+_running = threading.Lock()
+
+def _route_code(request: Request, method: str, path: str):
+    """
+    Code object of the handler serving method+path, unwrapped from any
+    decorators. path may be a concrete URL or the full route template.
+    Routes are tried in the order the app's router tries them.
+    """
+    scope = {"type": "http", "method": method, "path": path, "root_path": ""}
+    for route in metrics.route_contexts(request.app.routes):
+        endpoint = getattr(route, "endpoint", None)
+        if endpoint is None or method not in (getattr(route, "methods", None) or {method}):
+            continue
+        if path in (route.path, route.path_format) or route.matches(scope)[0] == Match.FULL:
+            return inspect.unwrap(endpoint).__code__
+    return None
+
+@router.get("/profile", response_class=PlainTextResponse)
+async def profile(
+    request: Request,
+    seconds: float = 10,
+    interval_ms: float = 10,
+    route: str = None,
+    method: str = "GET",
+    current_user: models.User = Depends(deps.require_super_admin)
+):
+    """
+    Sample every thread in this worker for `seconds` and return collapsed
+    stacks as a flamegraph-compatible file. Pass `route` (and `method`) to
+    keep only samples taken while that route's handler was on the stack.
+    """
+    if not 0 < seconds <= PROFILE_MAX_SECONDS:
+        raise HTTPException(status_code=400, detail=f"seconds must be between 0 and {PROFILE_MAX_SECONDS:g}")
+    if interval_ms < 1:
+        raise HTTPException(status_code=400, detail="interval_ms must be at least 1")
+
+    target_code = None
+    if route:
+        target_code = _route_code(request, method.upper(), route)
+        if target_code is None:
+            raise HTTPException(status_code=404, detail=f"No route matches {method.upper()} {route}")
+
+    if not _running.acquire(blocking=False):
+        raise HTTPException(status_code=409, detail="A profile is already running in this worker")
+    try:
+        sampler = StackSampler(seconds, interval_ms / 1000.0, target_code)
+        # Sample from a dedicated thread so the event loop keeps serving
+        # requests (and shows up in the profile) while we wait.
+        await asyncio.to_thread(sampler.run)
+    finally:
+        _running.release()
+
+    return PlainTextResponse(
+        sampler.collapsed(),
+        headers={
+            "Content-Disposition": f'attachment; filename="profile-{os.getpid()}-{int(time.time())}.collapsed"',
+            "X-Profile-Samples": str(sampler.samples),
+        }
+    )
@@ -0,0 +1,127 @@
+import gzip
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from fastapi import Request, Response
+
+import singleflight
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional encoding
+    brotli = None
+
+# Encoded payloads smaller than this are not worth compressing
+MIN_COMPRESS_BYTES = 1024
+# Payloads are rebuilt when their data version moves; this bounds how long
+# one is served if a version change is missed (a write that bypasses the
+# version triggers, say)
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", 300))
+
+def dumps(obj) -> bytes:
+    """Serialize to compact JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+class CachedPayload:
+    """One serialized payload plus its pre-compressed variants."""
+    __slots__ = ("identity", "gzip", "br")
+
+    def __init__(self, body: bytes):
+        self.identity = body
+        self.gzip = None
+        self.br = None
+        if len(body) >= MIN_COMPRESS_BYTES:
+            # Compressed once per data version, so spend the CPU on ratio
+            self.gzip = gzip.compress(body, compresslevel=9)
+            if brotli is not None:
+                self.br = brotli.compress(body, quality=11)
+
+    def select(self, accept_encoding: str):
+        """Return (body, content_encoding) for the client's Accept-Encoding."""
+        accepted = {part.split(";")[0].strip().lower() for part in accept_encoding.split(",")}
+        if self.br is not None and "br" in accepted:
+            return self.br, "br"
+        if self.gzip is not None and "gzip" in accepted:
+            return self.gzip, "gzip"
+        return self.identity, None
+
+class ResponseCache:
+    """
+    Keeps the final response bytes for large reference payloads, keyed on
+    the route/parameters and the version of the data they were built from,
+    for at most ttl seconds. A hit costs a dict lookup and a bytes copy into
+    the response.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = RESPONSE_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, version):
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is None or cached[0] != version or cached[2] <= time.monotonic():
+                return None
+            self._entries.move_to_end(key)
+            return cached[1]
+
+    def put(self, key, version, payload: CachedPayload):
+        with self._lock:
+            self._entries[key] = (version, payload, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_build(self, key, version, build) -> CachedPayload:
+        payload = self.get(key, version)
+        if payload is None:
+            # When an entry expires under load, only one request rebuilds it
+            payload = singleflight.group.do(
+                ("response_cache", key, version), lambda: self._build(key, version, build)
+            )
+        return payload
+
+    def _build(self, key, version, build) -> CachedPayload:
+        payload = self.get(key, version)
+        if payload is None:
+            payload = CachedPayload(dumps(build()))
+            self.put(key, version, payload)
+        return payload
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+cache = ResponseCache()
+
+def cached_json_response(request: Request, key, version, build, etag: str = None,
+                         cache_control: str = None) -> Response:
+    """
+    Serve build()'s result from the pre-serialized cache, picking the
+    pre-compressed variant that matches the request's Accept-Encoding.
+    """
+    payload = cache.get_or_build(key, version, build)
+    body, encoding = payload.select(request.headers.get("accept-encoding", ""))
+
+    headers = {"Vary": "Accept-Encoding"}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    if etag:
+        # Each encoding is a different representation, so it gets its own
+        # strong validator; versions.ConditionalGet strips the suffix back off.
+        headers["ETag"] = f'{etag[:-1]}-{encoding}"' if encoding else etag
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    return Response(content=body, media_type="application/json", headers=headers)
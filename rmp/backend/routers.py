@@ -8,14 +8,28 @@ import audit
 import message_board
 import teams
 import schedule
+import changes
+import export
+import profiler
+import jobs
+import notifications
+import archive
+import rules
 
 router = APIRouter()
 router.include_router(auth.router)
 router.include_router(users.router)
 router.include_router(pools.router)
+router.include_router(changes.router)
 router.include_router(entries.router)
 router.include_router(picks.router)
 router.include_router(audit.router)
+router.include_router(export.router)
 router.include_router(message_board.router)
 router.include_router(teams.router, prefix="/teams", tags=["teams"])
 router.include_router(schedule.router, prefix="/schedule", tags=["schedule"])
+router.include_router(jobs.router)
+router.include_router(notifications.router)
+router.include_router(archive.router)
+router.include_router(rules.router)
+router.include_router(profiler.router)
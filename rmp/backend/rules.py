@@ -0,0 +1,381 @@
+"""
+Pool formats and their rules.
+
+A pool's format (pools.pool_type: survivor, losing_survivor, pickem,
+confidence, ...) is defined by rows of the rules table: each rule sets one
+setting (its rule_type, see RULE_TYPES) to its default_value. A format's
+rules that are enabled_by_default apply to every pool of that format; a pool
+opts into further rules, or gives a rule its own value, through pool_rules.
+Pools without a type are survivor pools, and settings no rule mentions keep
+the survivor defaults in DEFAULTS.
+
+Rules are not read per request. The first time a pool is used, its rules are
+compiled into a RulePlan: the settings pick writes are checked against, and
+the SQL expressions that score every entry of the pool in one aggregate
+query. Plans are cached per pool for RULE_PLAN_TTL_SECONDS; editing a
+pool's rules, or any rule, evicts the affected plans here and, over the
+invalidation bus, on every other worker. Adding a format is a matter of
+adding rules rows; it costs no queries and no per-entry Python.
+"""
+
+import logging
+import os
+from datetime import datetime
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import and_, case, event, func, literal, or_
+from sqlalchemy.orm import Session
+
+import models
+import schemas
+import deps
+import jobs
+import versions
+from changes import record_change
+from database import SessionLocal
+from invalidation import bus
+
+# Rule edits evict plans at once; this only bounds staleness after a lost bus message
+RULE_PLAN_TTL_SECONDS = float(os.getenv("RULE_PLAN_TTL_SECONDS", 3600))
+
+DEFAULT_POOL_TYPE = "survivor"
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["rules"])
+
+def _result(value: str) -> str:
+    if value not in ("win", "loss"):
+        raise ValueError("must be win or loss")
+    return value
+
+def _flag(value: str) -> bool:
+    # A rule without a value switches its setting on
+    if value is None or value.lower() in ("", "true", "1", "yes"):
+        return True
+    if value.lower() in ("false", "0", "no"):
+        return False
+    raise ValueError("must be true or false")
+
+def _count(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise ValueError("must be at least 1")
+    return number
+
+# What each rule_type sets, and how its value is parsed
+RULE_TYPES = {
+    "pick_result": _result,  # the result that makes a pick correct: win, or loss for losing-team pools
+    "unique_teams": _flag,  # each team at most once per entry
+    "elimination": _flag,  # entries are knocked out after `strikes` incorrect picks
+    "strikes": _count,
+    "correct_points": _count,  # points per correct pick
+    "confidence": _flag,  # picks carry a confidence, scored instead of correct_points
+    "confidence_max": _count,  # confidences run from 1 to this, each used once per entry
+}
+
+# Survivor, the format every pool had before formats existed
+DEFAULTS = {
+    "pick_result": "win",
+    "unique_teams": True,
+    "elimination": True,
+    "strikes": 1,
+    "correct_points": 1,
+    "confidence": False,
+    "confidence_max": 18,
+}
+
+class RulePlan:
+    """
+    A pool's rules, compiled. Plans are shared by every request and thread
+    using the pool, so they never change; a rule edit compiles a new one.
+
+    correct, incorrect and points are aggregates over the picks of an entry
+    and alive whether the entry survives them; group picks by entry and
+    select them to score a whole pool in one query.
+    """
+
+    __slots__ = ("pool_type",) + tuple(RULE_TYPES) + ("correct", "incorrect", "points", "alive")
+
+    def __init__(self, pool_type: str, settings: dict):
+        values = dict(DEFAULTS, **settings)
+        result = models.Pick.result
+        hit = result == values["pick_result"]
+        miss = result == ("loss" if values["pick_result"] == "win" else "win")
+        per_pick = models.Pick.confidence if values["confidence"] else literal(values["correct_points"])
+        values["pool_type"] = pool_type
+        values["correct"] = func.coalesce(func.sum(case((hit, 1), else_=0)), 0)
+        values["incorrect"] = func.coalesce(func.sum(case((miss, 1), else_=0)), 0)
+        values["points"] = func.coalesce(func.sum(case((hit, per_pick), else_=0)), 0)
+        values["alive"] = values["incorrect"] < values["strikes"] if values["elimination"] else literal(True)
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("rule plans are immutable; edit the pool's rules instead")
+
+    def pick_error(self, confidence) -> str:
+        """Why a pick with this confidence breaks the rules (uniqueness aside), or None."""
+        if not self.confidence:
+            return None
+        if confidence is None:
+            return "Picks in confidence pools need a confidence"
+        if not 1 <= confidence <= self.confidence_max:
+            return f"Confidence must be between 1 and {self.confidence_max}"
+        return None
+
+    def settings(self) -> dict:
+        return {name: getattr(self, name) for name in RULE_TYPES}
+
+def compile_plan(pool_type: str, rules: list, chosen: dict) -> RulePlan:
+    """
+    The plan for a pool of pool_type from its rules: the format's defaults,
+    then the rules the pool chose (rule id -> value, None for the default).
+    """
+    settings = {}
+    for rule in sorted(rules, key=lambda rule: (rule.id in chosen, rule.id)):
+        parse = RULE_TYPES.get(rule.rule_type)
+        if parse is None:
+            # Rows can be added ahead of the code that understands them
+            logger.warning("ignoring rule %s of unknown type %s", rule.id, rule.rule_type)
+            continue
+        value = chosen.get(rule.id)
+        settings[rule.rule_type] = parse(value if value is not None else rule.default_value)
+    return RulePlan(pool_type, settings)
+
+def _load_plan(db: Session, pool_id: str) -> RulePlan:
+    pool_type = db.query(models.Pool.pool_type).filter(models.Pool.id == pool_id).scalar() or DEFAULT_POOL_TYPE
+    chosen = dict(db.query(models.PoolRule.rule_id, models.PoolRule.value)
+                  .filter(models.PoolRule.pool_id == pool_id).all())
+    # Two queries rather than a join: pool_rules lives on the pool's shard, rules on the global database
+    criteria = and_(models.Rule.pool_type == pool_type, models.Rule.enabled_by_default.is_(True))
+    if chosen:
+        criteria = or_(criteria, models.Rule.id.in_(list(chosen)))
+    rules = db.query(models.Rule).filter(criteria).all()
+    return compile_plan(pool_type, rules, chosen)
+
+_plans = versions.VersionCache()
+
+def plan_for(pool_id: str, db: Session = None) -> RulePlan:
+    """The pool's plan; callers holding a session pass it, so a miss needs no second connection."""
+    return _plans.get(pool_id, RULE_PLAN_TTL_SECONDS,
+                      lambda: versions.with_session(lambda session: _load_plan(session, pool_id), db))
+
+def pool_types() -> set:
+    """Every format with rules, and survivor."""
+    def load():
+        db = SessionLocal()
+        try:
+            return {row[0] for row in db.query(models.Rule.pool_type).distinct()} | {DEFAULT_POOL_TYPE}
+        finally:
+            db.close()
+    return _plans.get(("pool_types",), RULE_PLAN_TTL_SECONDS, load)
+
+# Invalidation. "*" stands for every plan: a rule itself changed.
+
+def _note_change(db: Session, key: str):
+    db.info.setdefault("rule_plans", set()).add(key)
+
+def _evict(key: str):
+    if key == "*":
+        _plans.clear()
+    else:
+        _plans.invalidate(key)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    changed = session.info.pop("rule_plans", ())
+    for key in changed:
+        _evict(key)
+    if changed:
+        bus.publish("rules", list(changed))
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop("rule_plans", None)
+
+bus.subscribe("rules", _evict)
+bus.on_reset(_plans.clear)
+
+# Scoring
+
+def standings_query(db: Session, plan: RulePlan, pool_id: str):
+    """Every entry of the pool with its score, unordered: one aggregate query over its picks."""
+    return db.query(
+        models.Entry.id.label("entry_id"),
+        models.Entry.user_id,
+        models.Entry.name,
+        plan.correct.label("correct"),
+        plan.incorrect.label("incorrect"),
+        plan.points.label("points"),
+        plan.alive.label("alive"),
+    ).outerjoin(
+        models.Pick, models.Pick.entry_id == models.Entry.id
+    ).filter(
+        models.Entry.pool_id == pool_id
+    ).group_by(
+        models.Entry.id, models.Entry.user_id, models.Entry.name
+    )
+
+def standings(db: Session, plan: RulePlan, pool_id: str) -> list:
+    """Every entry of the pool with its score, leaders first."""
+    return standings_query(db, plan, pool_id).order_by(
+        plan.alive.desc(), plan.points.desc(), plan.incorrect, models.Entry.name
+    ).all()
+
+def apply_eliminations(db: Session, plan: RulePlan, pool_id: str) -> dict:
+    """
+    Bring entries.alive in line with the pool's pick results, without
+    committing: one query finds the entries whose status changed (a
+    corrected result can bring an entry back), one UPDATE per direction.
+    """
+    counts = {"eliminated": 0, "revived": 0}
+    if not plan.elimination:
+        return counts
+    changed = db.query(models.Entry.id, models.Entry.user_id, plan.alive).outerjoin(
+        models.Pick, models.Pick.entry_id == models.Entry.id
+    ).filter(
+        models.Entry.pool_id == pool_id
+    ).group_by(
+        models.Entry.id, models.Entry.user_id, models.Entry.alive
+    ).having(func.coalesce(models.Entry.alive, True) != plan.alive).all()
+
+    now = datetime.utcnow()
+    for alive, label in ((False, "eliminated"), (True, "revived")):
+        entries = [(entry_id, user_id) for entry_id, user_id, survives in changed if bool(survives) == alive]
+        if not entries:
+            continue
+        db.query(models.Entry).filter(models.Entry.id.in_([entry_id for entry_id, _ in entries])).update(
+            {models.Entry.alive: alive, models.Entry.updated_at: now}, synchronize_session=False
+        )
+        for entry_id, user_id in entries:
+            record_change(db, pool_id, "entry", entry_id, user_id=user_id)
+        counts[label] = len(entries)
+    return counts
+
+@jobs.handler("score_pool")
+def _score_pool_job(db: Session, job: models.Job):
+    pool_id = jobs.job_args(job)["pool_id"]
+    return apply_eliminations(db, plan_for(pool_id, db), pool_id)
+
+# Rules API
+
+def _parse_value(rule: models.Rule, value: str):
+    parse = RULE_TYPES.get(rule.rule_type)
+    if parse is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"Unknown rule type {rule.rule_type}")
+    try:
+        parse(value)
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"Invalid value {value!r} for rule {rule.id}: {e}")
+
+@router.get("/rules", response_model=List[schemas.RuleOut])
+def list_rules(pool_type: str = None, db: Session = Depends(deps.get_read_db)):
+    """Every rule, or the rules of one pool format."""
+    query = db.query(models.Rule)
+    if pool_type is not None:
+        query = query.filter(models.Rule.pool_type == pool_type)
+    return query.order_by(models.Rule.pool_type, models.Rule.id).all()
+
+@router.post("/rules", response_model=schemas.RuleOut)
+def create_rule(
+    rule: schemas.RuleCreate,
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.require_super_admin)
+):
+    """Add a rule, or a whole new pool format rule by rule. Super-admins only."""
+    if db.query(models.Rule.id).filter(models.Rule.id == rule.id).first():
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Rule {rule.id} already exists")
+    db_rule = models.Rule(**rule.dict())
+    _parse_value(db_rule, db_rule.default_value)
+    db.add(db_rule)
+    _note_change(db, "*")
+    db.commit()
+    db.refresh(db_rule)
+    return db_rule
+
+@router.patch("/rules/{rule_id}", response_model=schemas.RuleOut)
+def update_rule(
+    rule_id: str,
+    rule_update: schemas.RuleUpdate,
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.require_super_admin)
+):
+    """Change a rule's text, default value or default status. Super-admins only."""
+    rule = db.query(models.Rule).filter(models.Rule.id == rule_id).first()
+    if not rule:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Rule not found")
+    for field, value in rule_update.dict(exclude_unset=True).items():
+        setattr(rule, field, value)
+    _parse_value(rule, rule.default_value)
+    _note_change(db, "*")
+    db.commit()
+    db.refresh(rule)
+    return rule
+
+@router.get("/pools/{pool_id}/rules", response_model=schemas.PoolRulesOut)
+def get_pool_rules(
+    pool_id: str,
+    db: Session = Depends(deps.get_read_db),
+    current_user: models.User = Depends(deps.get_current_user)
+):
+    """The rules a pool has chosen and the settings its format and choices add up to."""
+    plan = plan_for(pool_id, db)
+    chosen = db.query(models.PoolRule).filter(models.PoolRule.pool_id == pool_id).all()
+    return {"pool_id": pool_id, "pool_type": plan.pool_type, "rules": chosen, "settings": plan.settings()}
+
+@router.put("/pools/{pool_id}/rules", response_model=schemas.PoolRulesOut)
+def set_pool_rules(
+    pool_id: str,
+    pool_rules: List[schemas.PoolRuleIn],
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.require_pool_admin)
+):
+    """Replace the rules a pool has chosen. Pool owners, pool admins and super-admins only."""
+    pool = db.query(models.Pool).filter(models.Pool.id == pool_id).first()
+    if not pool:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Pool not found")
+    pool_type = pool.pool_type or DEFAULT_POOL_TYPE
+    wanted = {choice.rule_id: choice.value for choice in pool_rules}
+    rules = {rule.id: rule for rule in db.query(models.Rule).filter(models.Rule.id.in_(list(wanted))).all()} \
+        if wanted else {}
+    for rule_id, value in wanted.items():
+        rule = rules.get(rule_id)
+        if rule is None or rule.pool_type != pool_type:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                                detail=f"Rule {rule_id} is not a {pool_type} rule")
+        _parse_value(rule, value if value is not None else rule.default_value)
+
+    db.query(models.PoolRule).filter(models.PoolRule.pool_id == pool_id).delete(synchronize_session=False)
+    db.add_all([models.PoolRule(pool_id=pool_id, rule_id=rule_id, value=value) for rule_id, value in wanted.items()])
+    pool.updated_at = datetime.utcnow()
+    record_change(db, pool_id, "pool", pool_id)
+    _note_change(db, pool_id)
+    db.commit()
+    return get_pool_rules(pool_id, db, current_user)
+
+@router.get("/pools/{pool_id}/standings", response_model=List[schemas.StandingOut])
+def get_standings(
+    pool_id: str,
+    db: Session = Depends(deps.get_read_db),
+    current_user: models.User = Depends(deps.get_current_user)
+):
+    """Every entry's score under the pool's rules, leaders first."""
+    return standings(db, plan_for(pool_id, db), pool_id)
+
+@router.post("/pools/{pool_id}/score", status_code=202)
+def queue_scoring(
+    pool_id: str,
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.require_pool_admin)
+):
+    """
+    Eliminate (or restore) entries from their picks' results, once results
+    are in. Pool owners, pool admins and super-admins only.
+    """
+    job = jobs.enqueue(db, "score_pool", {"pool_id": pool_id}, user_id=current_user.id)
+    db.commit()
+    return {"job_id": job.id, "run_at": job.run_at}
@@ -0,0 +1,25 @@
+-- The pool formats: one row per setting (see rules.py for the rule types).
+-- Rules enabled by default apply to every pool of their format; the others
+-- are options a pool can choose through pool_rules.
+
+INSERT INTO rules (id, pool_type, rule_text, rule_type, default_value, enabled_by_default) VALUES
+('survivor-pick-result', 'survivor', 'Pick a team to win each week', 'pick_result', 'win', TRUE),
+('survivor-unique-teams', 'survivor', 'Each team can be picked once per entry', 'unique_teams', 'true', TRUE),
+('survivor-elimination', 'survivor', 'A losing pick eliminates the entry', 'elimination', 'true', TRUE),
+('survivor-strikes', 'survivor', 'Losing picks an entry can make', 'strikes', '1', TRUE),
+('survivor-second-chance', 'survivor', 'Entries survive their first losing pick', 'strikes', '2', FALSE),
+('losing-pick-result', 'losing_survivor', 'Pick a team to lose each week', 'pick_result', 'loss', TRUE),
+('losing-unique-teams', 'losing_survivor', 'Each team can be picked once per entry', 'unique_teams', 'true', TRUE),
+('losing-elimination', 'losing_survivor', 'Picking a winner eliminates the entry', 'elimination', 'true', TRUE),
+('losing-strikes', 'losing_survivor', 'Winning picks an entry can make', 'strikes', '1', TRUE),
+('losing-second-chance', 'losing_survivor', 'Entries survive their first winning pick', 'strikes', '2', FALSE),
+('pickem-pick-result', 'pickem', 'Pick a team to win each week', 'pick_result', 'win', TRUE),
+('pickem-unique-teams', 'pickem', 'Teams can be picked again', 'unique_teams', 'false', TRUE),
+('pickem-elimination', 'pickem', 'Nobody is eliminated; the most points wins', 'elimination', 'false', TRUE),
+('pickem-points', 'pickem', 'Points for a correct pick', 'correct_points', '1', TRUE),
+('pickem-unique-teams-option', 'pickem', 'Each team can be picked once per entry', 'unique_teams', 'true', FALSE),
+('confidence-pick-result', 'confidence', 'Pick a team to win each week', 'pick_result', 'win', TRUE),
+('confidence-unique-teams', 'confidence', 'Teams can be picked again', 'unique_teams', 'false', TRUE),
+('confidence-elimination', 'confidence', 'Nobody is eliminated; the most points wins', 'elimination', 'false', TRUE),
+('confidence-points', 'confidence', 'A correct pick scores its confidence', 'confidence', 'true', TRUE),
+('confidence-max', 'confidence', 'Highest confidence; each is used once per entry', 'confidence_max', '18', TRUE);
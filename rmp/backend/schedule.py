@@ -1,55 +1,65 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.orm import Session, joinedload
 from typing import List
 from models import Schedule, Team
 from deps import get_db
+from versions import ConditionalGet, SCHEDULE, reference_version
+from response_cache import cached_json_response
+import response_cache
+import seasons
+
+# Results are filled in as games finish, so keep the browser cache short.
+# Every payload is the current season's, so the season is part of the ETag
+# and of the cache keys below.
+schedule_etag = ConditionalGet(SCHEDULE, cache_control="public, max-age=60",
+                               parts=lambda: (seasons.current_season(),))
 
 router = APIRouter()
 
-@router.get("/week/{week_num}", response_model=List[dict])
-def get_schedule_for_week(week_num: int, db: Session = Depends(get_db)):
-    """
-    Get all games for a specific week
-    """
-    games = db.query(Schedule).filter(Schedule.week_num == week_num).all()
-    
-    result = []
-    for game in games:
-        result.append({
-            "game_id": game.game_id,
-            "week_num": game.week_num,
-            "home_team": {
-                "id": game.home_team.id,
-                "name": game.home_team.name,
-                "abbrv": game.home_team.abbrv,
-                "logo": game.home_team.logo
-            },
-            "away_team": {
-                "id": game.away_team.id,
-                "name": game.away_team.name,
-                "abbrv": game.away_team.abbrv,
-                "logo": game.away_team.logo
-            },
-            "start_time": game.start_time.isoformat() if game.start_time else None,
-            "winning_team_id": game.winning_team_id
-        })
-    
-    return result
+def _team_to_dict(team: Team) -> dict:
+    return {
+        "id": team.id,
+        "name": team.name,
+        "abbrv": team.abbrv,
+        "logo": team.logo
+    }
 
-@router.get("/teams/{week_num}", response_model=List[dict])
-def get_teams_playing_in_week(week_num: int, db: Session = Depends(get_db)):
-    """
-    Get all teams playing in a specific week (for pick selection)
-    """
-    games = db.query(Schedule).filter(Schedule.week_num == week_num).all()
-    
+def _game_to_dict(game: Schedule) -> dict:
+    return {
+        "game_id": game.game_id,
+        "week_num": game.week_num,
+        "home_team": _team_to_dict(game.home_team),
+        "away_team": _team_to_dict(game.away_team),
+        "start_time": game.start_time.isoformat() if game.start_time else None,
+        "winning_team_id": game.winning_team_id
+    }
+
+def _games_query(db: Session, season: int):
+    # Load both teams in the same query instead of two lazy loads per game
+    return db.query(Schedule).options(joinedload(Schedule.home_team), joinedload(Schedule.away_team)).filter(
+        Schedule.season == season
+    )
+
+# Routes whose responses are cached or carry an ETag read from the primary:
+# both are keyed on the primary's data version, so a lagging replica could
+# pin stale data under a new version. Only cache misses reach the database.
+def _schedule_response(request: Request, key, etag: str, build):
+    return cached_json_response(
+        request, key, reference_version(SCHEDULE), build,
+        etag=etag, cache_control=schedule_etag.cache_control
+    )
+
+def _week_games(games) -> list:
+    return [_game_to_dict(game) for game in games]
+
+def _week_teams(games) -> list:
     teams_set = set()
     for game in games:
         teams_set.add((game.home_team.id, game.home_team.name, game.home_team.abbrv, game.home_team.logo))
         teams_set.add((game.away_team.id, game.away_team.name, game.away_team.abbrv, game.away_team.logo))
-    
+
     # Convert to list and sort by team abbreviation
-    teams_list = [
+    return [
         {
             "id": team_id,
             "name": name,
@@ -58,35 +68,50 @@ def get_teams_playing_in_week(week_num: int, db: Session = Depends(get_db)):
         }
         for team_id, name, abbrv, logo in sorted(teams_set, key=lambda x: x[2])
     ]
-    
-    return teams_list
+
+def _week_query(db: Session, season: int, week_num: int):
+    return _games_query(db, season).filter(Schedule.week_num == week_num).order_by(Schedule.start_time).all()
+
+def prime_cache(db: Session):
+    """
+    Build every cached schedule payload from a single query so the first
+    requests after a deploy don't all miss at once.
+    """
+    version = reference_version(SCHEDULE)
+    season = seasons.current_season()
+    games = _games_query(db, season).order_by(Schedule.week_num, Schedule.start_time).all()
+    response_cache.cache.get_or_build(("schedule_all", season), version, lambda: _week_games(games))
+
+    by_week = {}
+    for game in games:
+        by_week.setdefault(game.week_num, []).append(game)
+    for week_num, week in by_week.items():
+        response_cache.cache.get_or_build(("schedule_week", season, week_num), version, lambda: _week_games(week))
+        response_cache.cache.get_or_build(("schedule_teams", season, week_num), version, lambda: _week_teams(week))
+
+@router.get("/week/{week_num}", response_model=List[dict])
+def get_schedule_for_week(week_num: int, request: Request, etag: str = Depends(schedule_etag), db: Session = Depends(get_db)):
+    """
+    Get all games for a specific week
+    """
+    season = seasons.current_season()
+    build = lambda: _week_games(_week_query(db, season, week_num))
+    return _schedule_response(request, ("schedule_week", season, week_num), etag, build)
+
+@router.get("/teams/{week_num}", response_model=List[dict])
+def get_teams_playing_in_week(week_num: int, request: Request, etag: str = Depends(schedule_etag), db: Session = Depends(get_db)):
+    """
+    Get all teams playing in a specific week (for pick selection)
+    """
+    season = seasons.current_season()
+    build = lambda: _week_teams(_week_query(db, season, week_num))
+    return _schedule_response(request, ("schedule_teams", season, week_num), etag, build)
 
 @router.get("/", response_model=List[dict])
-def get_all_schedules(db: Session = Depends(get_db)):
+def get_all_schedules(request: Request, etag: str = Depends(schedule_etag), db: Session = Depends(get_db)):
     """
     Get all scheduled games
     """
-    games = db.query(Schedule).order_by(Schedule.week_num, Schedule.start_time).all()
-    
-    result = []
-    for game in games:
-        result.append({
-            "game_id": game.game_id,
-            "week_num": game.week_num,
-            "home_team": {
-                "id": game.home_team.id,
-                "name": game.home_team.name,
-                "abbrv": game.home_team.abbrv,
-                "logo": game.home_team.logo
-            },
-            "away_team": {
-                "id": game.away_team.id,
-                "name": game.away_team.name,
-                "abbrv": game.away_team.abbrv,
-                "logo": game.away_team.logo
-            },
-            "start_time": game.start_time.isoformat() if game.start_time else None,
-            "winning_team_id": game.winning_team_id
-        })
-    
-    return result
+    season = seasons.current_season()
+    build = lambda: _week_games(_games_query(db, season).order_by(Schedule.week_num, Schedule.start_time).all())
+    return _schedule_response(request, ("schedule_all", season), etag, build)
@@ -1,274 +1,274 @@
 -- Insert NFL 2025 Regular Season Schedule
-INSERT INTO Schedule (game_id, week_num, home_team_id, away_team_id, start_time, winning_team_id) VALUES
-(401671834, 18, 33, 5, '2025-01-04 21:30:00', '99'),
-(401671836, 18, 23, 4, '2025-01-05 01:00:00', '99'),
-(401671827, 18, 1, 29, '2025-01-05 18:00:00', '99'),
-(401671840, 18, 6, 28, '2025-01-05 18:00:00', '99'),
-(401671844, 18, 9, 3, '2025-01-05 18:00:00', '99'),
-(401671826, 18, 10, 34, '2025-01-05 18:00:00', '99'),
-(401671837, 18, 11, 30, '2025-01-05 18:00:00', '99'),
-(401671831, 18, 17, 2, '2025-01-05 18:00:00', '99'),
-(401671841, 18, 21, 19, '2025-01-05 18:00:00', '99'),
-(401671828, 18, 27, 18, '2025-01-05 18:00:00', '99'),
-(401671838, 18, 7, 12, '2025-01-05 21:25:00', '99'),
-(401671839, 18, 13, 24, '2025-01-05 21:25:00', '99'),
-(401671830, 18, 14, 26, '2025-01-05 21:25:00', '99'),
-(401671833, 18, 20, 15, '2025-01-05 21:25:00', '99'),
-(401671845, 18, 22, 25, '2025-01-05 21:25:00', '99'),
-(401671843, 18, 8, 16, '2025-01-06 01:20:00', '99'),
-(401772510, 1, 21, 6, '2025-09-05 00:20:00', '99'),
-(401772714, 1, 24, 12, '2025-09-06 00:00:00', '99'),
-(401772830, 1, 1, 27, '2025-09-07 17:00:00', '99'),
-(401772829, 1, 5, 4, '2025-09-07 17:00:00', '99'),
-(401772719, 1, 11, 15, '2025-09-07 17:00:00', '99'),
-(401772720, 1, 17, 13, '2025-09-07 17:00:00', '99'),
-(401772718, 1, 18, 22, '2025-09-07 17:00:00', '99'),
-(401772721, 1, 20, 23, '2025-09-07 17:00:00', '99'),
-(401772827, 1, 28, 19, '2025-09-07 17:00:00', '99'),
-(401772828, 1, 30, 29, '2025-09-07 17:00:00', '99'),
-(401772832, 1, 7, 10, '2025-09-07 20:05:00', '99'),
-(401772831, 1, 26, 25, '2025-09-07 20:05:00', '99'),
-(401772722, 1, 9, 8, '2025-09-07 20:25:00', '99'),
-(401772723, 1, 14, 34, '2025-09-07 20:25:00', '99'),
-(401772918, 1, 2, 33, '2025-09-08 00:20:00', '99'),
-(401772810, 1, 3, 16, '2025-09-09 00:15:00', '99'),
-(401772936, 2, 9, 28, '2025-09-12 00:15:00', '99'),
-(401772725, 2, 4, 30, '2025-09-14 17:00:00', '99'),
-(401772834, 2, 6, 19, '2025-09-14 17:00:00', '99'),
-(401772835, 2, 8, 3, '2025-09-14 17:00:00', '99'),
-(401772724, 2, 10, 14, '2025-09-14 17:00:00', '99'),
-(401772728, 2, 15, 17, '2025-09-14 17:00:00', '99'),
-(401772833, 2, 18, 25, '2025-09-14 17:00:00', '99'),
-(401772727, 2, 20, 2, '2025-09-14 17:00:00', '99'),
-(401772836, 2, 23, 26, '2025-09-14 17:00:00', '99'),
-(401772726, 2, 33, 5, '2025-09-14 17:00:00', '99'),
-(401772729, 2, 11, 7, '2025-09-14 20:05:00', '99'),
-(401772730, 2, 22, 29, '2025-09-14 20:05:00', '99'),
-(401772837, 2, 12, 21, '2025-09-14 20:25:00', '99'),
-(401772919, 2, 16, 1, '2025-09-15 00:20:00', '99'),
-(401772715, 2, 34, 27, '2025-09-15 23:00:00', '99'),
-(401772811, 2, 13, 24, '2025-09-16 02:00:00', '99'),
-(401772937, 3, 2, 15, '2025-09-19 00:15:00', '99'),
-(401772842, 3, 5, 9, '2025-09-21 17:00:00', '99'),
-(401772733, 3, 10, 11, '2025-09-21 17:00:00', '99'),
-(401772731, 3, 16, 4, '2025-09-21 17:00:00', '99'),
-(401772732, 3, 17, 23, '2025-09-21 17:00:00', '99'),
-(401772839, 3, 21, 14, '2025-09-21 17:00:00', '99'),
-(401772840, 3, 27, 20, '2025-09-21 17:00:00', '99'),
-(401772841, 3, 28, 13, '2025-09-21 17:00:00', '99'),
-(401772838, 3, 29, 1, '2025-09-21 17:00:00', '99'),
-(401772734, 3, 30, 34, '2025-09-21 17:00:00', '99'),
-(401772735, 3, 24, 7, '2025-09-21 20:05:00', '99'),
-(401772736, 3, 26, 18, '2025-09-21 20:05:00', '99'),
-(401772844, 3, 3, 6, '2025-09-21 20:25:00', '99'),
-(401772843, 3, 25, 22, '2025-09-21 20:25:00', '99'),
-(401772920, 3, 19, 12, '2025-09-22 00:20:00', '99'),
-(401772812, 3, 33, 8, '2025-09-23 00:15:00', '99'),
-(401772938, 4, 22, 26, '2025-09-26 00:15:00', '99'),
-(401772632, 4, 23, 16, '2025-09-28 13:30:00', '99'),
-(401772739, 4, 1, 28, '2025-09-28 17:00:00', '99'),
-(401772740, 4, 2, 18, '2025-09-28 17:00:00', '99'),
-(401772846, 4, 8, 5, '2025-09-28 17:00:00', '99'),
-(401772847, 4, 17, 29, '2025-09-28 17:00:00', '99'),
-(401772737, 4, 19, 24, '2025-09-28 17:00:00', '99'),
-(401772845, 4, 27, 21, '2025-09-28 17:00:00', '99'),
-(401772738, 4, 34, 10, '2025-09-28 17:00:00', '99'),
-(401772849, 4, 14, 11, '2025-09-28 20:05:00', '99'),
-(401772848, 4, 25, 30, '2025-09-28 20:05:00', '99'),
-(401772741, 4, 12, 33, '2025-09-28 20:25:00', '99'),
-(401772742, 4, 13, 3, '2025-09-28 20:25:00', '99'),
-(401772921, 4, 6, 9, '2025-09-29 00:20:00', '99'),
-(401772813, 4, 15, 20, '2025-09-29 23:15:00', '99'),
-(401772716, 4, 7, 4, '2025-09-30 00:15:00', '99'),
-(401772939, 5, 14, 25, '2025-10-03 00:15:00', '99'),
-(401772633, 5, 5, 16, '2025-10-05 13:30:00', '99'),
-(401772851, 5, 11, 13, '2025-10-05 17:00:00', '99'),
-(401772744, 5, 18, 19, '2025-10-05 17:00:00', '99'),
-(401772850, 5, 20, 6, '2025-10-05 17:00:00', '99'),
-(401772745, 5, 21, 7, '2025-10-05 17:00:00', '99'),
-(401772852, 5, 29, 15, '2025-10-05 17:00:00', '99'),
-(401772743, 5, 33, 34, '2025-10-05 17:00:00', '99'),
-(401772747, 5, 22, 10, '2025-10-05 20:05:00', '99'),
-(401772746, 5, 26, 27, '2025-10-05 20:05:00', '99'),
-(401772854, 5, 4, 8, '2025-10-05 20:25:00', '99'),
-(401772853, 5, 24, 28, '2025-10-05 20:25:00', '99'),
-(401772922, 5, 2, 17, '2025-10-06 00:20:00', '99'),
-(401772814, 5, 30, 12, '2025-10-07 00:15:00', '99'),
-(401772940, 6, 19, 21, '2025-10-10 00:15:00', '99'),
-(401772634, 6, 20, 7, '2025-10-12 13:30:00', '99'),
-(401772856, 6, 11, 22, '2025-10-12 17:00:00', '99'),
-(401772750, 6, 15, 24, '2025-10-12 17:00:00', '99'),
-(401772748, 6, 23, 5, '2025-10-12 17:00:00', '99'),
-(401772749, 6, 27, 25, '2025-10-12 17:00:00', '99'),
-(401772858, 6, 29, 6, '2025-10-12 17:00:00', '99'),
-(401772857, 6, 30, 26, '2025-10-12 17:00:00', '99'),
-(401772855, 6, 33, 14, '2025-10-12 17:00:00', '99'),
-(401772859, 6, 13, 10, '2025-10-12 20:05:00', '99'),
-(401772752, 6, 9, 4, '2025-10-12 20:25:00', '99'),
-(401772751, 6, 18, 17, '2025-10-12 20:25:00', '99'),
-(401772923, 6, 12, 8, '2025-10-13 00:20:00', '99'),
-(401772815, 6, 1, 2, '2025-10-13 23:15:00', '99'),
-(401772717, 6, 28, 3, '2025-10-14 00:15:00', '99'),
-(401772941, 7, 4, 23, '2025-10-17 00:15:00', '99'),
-(401772635, 7, 30, 14, '2025-10-19 13:30:00', '99'),
-(401772861, 7, 3, 18, '2025-10-19 17:00:00', '99'),
-(401772754, 7, 5, 15, '2025-10-19 17:00:00', '99'),
-(401772755, 7, 10, 17, '2025-10-19 17:00:00', '99'),
-(401772753, 7, 12, 13, '2025-10-19 17:00:00', '99'),
-(401772862, 7, 16, 21, '2025-10-19 17:00:00', '99'),
-(401772860, 7, 20, 29, '2025-10-19 17:00:00', '99'),
-(401772757, 7, 7, 19, '2025-10-19 20:05:00', '99'),
-(401772756, 7, 24, 11, '2025-10-19 20:05:00', '99'),
-(401772864, 7, 6, 28, '2025-10-19 20:25:00', '99'),
-(401772863, 7, 22, 9, '2025-10-19 20:25:00', '99'),
-(401772924, 7, 25, 1, '2025-10-20 00:20:00', '99'),
-(401772816, 7, 8, 27, '2025-10-20 23:00:00', '99'),
-(401772826, 7, 26, 34, '2025-10-21 02:00:00', '99'),
-(401772942, 8, 24, 16, '2025-10-24 00:15:00', '99'),
-(401772760, 8, 1, 15, '2025-10-26 17:00:00', '99'),
-(401772758, 8, 4, 20, '2025-10-26 17:00:00', '99'),
-(401772868, 8, 17, 5, '2025-10-26 17:00:00', '99'),
-(401772867, 8, 21, 19, '2025-10-26 17:00:00', '99'),
-(401772865, 8, 29, 2, '2025-10-26 17:00:00', '99'),
-(401772759, 8, 33, 3, '2025-10-26 17:00:00', '99'),
-(401772866, 8, 34, 25, '2025-10-26 17:00:00', '99'),
-(401772869, 8, 18, 27, '2025-10-26 20:05:00', '99'),
-(401772762, 8, 7, 6, '2025-10-26 20:25:00', '99'),
-(401772761, 8, 11, 10, '2025-10-26 20:25:00', '99'),
-(401772925, 8, 23, 9, '2025-10-27 00:20:00', '99'),
-(401772817, 8, 12, 28, '2025-10-28 00:15:00', '99'),
-(401772943, 9, 15, 33, '2025-10-31 00:15:00', '99'),
-(401772765, 9, 4, 3, '2025-11-02 18:00:00', '99'),
-(401772871, 9, 8, 16, '2025-11-02 18:00:00', '99'),
-(401772872, 9, 9, 29, '2025-11-02 18:00:00', '99'),
-(401772764, 9, 10, 24, '2025-11-02 18:00:00', '99'),
-(401772763, 9, 17, 1, '2025-11-02 18:00:00', '99'),
-(401772767, 9, 19, 25, '2025-11-02 18:00:00', '99'),
-(401772766, 9, 23, 11, '2025-11-02 18:00:00', '99'),
-(401772870, 9, 34, 7, '2025-11-02 18:00:00', '99'),
-(401772873, 9, 13, 30, '2025-11-02 21:05:00', '99'),
-(401772874, 9, 14, 18, '2025-11-02 21:05:00', '99'),
-(401772768, 9, 2, 12, '2025-11-02 21:25:00', '99'),
-(401772926, 9, 28, 26, '2025-11-03 01:20:00', '99'),
-(401772818, 9, 6, 22, '2025-11-04 01:15:00', '99'),
-(401772944, 10, 7, 13, '2025-11-07 01:15:00', '99'),
-(401772636, 10, 11, 1, '2025-11-09 14:30:00', '99'),
-(401772875, 10, 3, 19, '2025-11-09 18:00:00', '99'),
-(401772771, 10, 15, 2, '2025-11-09 18:00:00', '99'),
-(401772876, 10, 16, 33, '2025-11-09 18:00:00', '99'),
-(401772769, 10, 20, 5, '2025-11-09 18:00:00', '99'),
-(401772772, 10, 27, 17, '2025-11-09 18:00:00', '99'),
-(401772877, 10, 29, 18, '2025-11-09 18:00:00', '99'),
-(401772770, 10, 34, 30, '2025-11-09 18:00:00', '99'),
-(401772773, 10, 26, 22, '2025-11-09 21:05:00', '99'),
-(401772879, 10, 25, 14, '2025-11-09 21:25:00', '99'),
-(401772878, 10, 28, 8, '2025-11-09 21:25:00', '99'),
-(401772927, 10, 24, 23, '2025-11-10 01:20:00', '99'),
-(401772630, 10, 9, 21, '2025-11-11 01:15:00', '99'),
-(401772945, 11, 17, 20, '2025-11-14 01:15:00', '99'),
-(401772631, 11, 15, 28, '2025-11-16 14:30:00', '99'),
-(401772882, 11, 1, 29, '2025-11-16 18:00:00', '99'),
-(401772776, 11, 2, 27, '2025-11-16 18:00:00', '99'),
-(401772881, 11, 10, 34, '2025-11-16 18:00:00', '99'),
-(401772880, 11, 16, 3, '2025-11-16 18:00:00', '99'),
-(401772883, 11, 19, 9, '2025-11-16 18:00:00', '99'),
-(401772774, 11, 23, 4, '2025-11-16 18:00:00', '99'),
-(401772775, 11, 30, 24, '2025-11-16 18:00:00', '99'),
-(401772884, 11, 14, 26, '2025-11-16 21:05:00', '99'),
-(401772885, 11, 22, 25, '2025-11-16 21:05:00', '99'),
-(401772777, 11, 5, 33, '2025-11-16 21:25:00', '99'),
-(401772778, 11, 7, 12, '2025-11-16 21:25:00', '99'),
-(401772928, 11, 21, 8, '2025-11-17 01:20:00', '99'),
-(401772819, 11, 13, 6, '2025-11-18 01:15:00', '99'),
-(401772946, 12, 34, 2, '2025-11-21 01:15:00', '99'),
-(401772780, 12, 3, 23, '2025-11-23 18:00:00', '99'),
-(401772781, 12, 4, 17, '2025-11-23 18:00:00', '99'),
-(401772888, 12, 8, 19, '2025-11-23 18:00:00', '99'),
-(401772887, 12, 9, 16, '2025-11-23 18:00:00', '99'),
-(401772886, 12, 10, 26, '2025-11-23 18:00:00', '99'),
-(401772779, 12, 12, 11, '2025-11-23 18:00:00', '99'),
-(401772782, 12, 33, 20, '2025-11-23 18:00:00', '99'),
-(401772784, 12, 13, 5, '2025-11-23 21:05:00', '99'),
-(401772783, 12, 22, 30, '2025-11-23 21:05:00', '99'),
-(401772890, 12, 6, 21, '2025-11-23 21:25:00', '99'),
-(401772889, 12, 18, 1, '2025-11-23 21:25:00', '99'),
-(401772929, 12, 14, 27, '2025-11-24 01:20:00', '99'),
-(401772820, 12, 25, 29, '2025-11-25 01:15:00', '99'),
-(401772891, 13, 8, 9, '2025-11-27 18:00:00', '99'),
-(401772694, 13, 6, 12, '2025-11-27 21:30:00', '99'),
-(401772930, 13, 33, 4, '2025-11-28 01:20:00', '99'),
-(401772621, 13, 21, 3, '2025-11-28 20:00:00', '99'),
-(401772785, 13, 5, 25, '2025-11-30 18:00:00', '99'),
-(401772786, 13, 10, 30, '2025-11-30 18:00:00', '99'),
-(401772787, 13, 11, 34, '2025-11-30 18:00:00', '99'),
-(401772892, 13, 15, 18, '2025-11-30 18:00:00', '99'),
-(401772893, 13, 20, 1, '2025-11-30 18:00:00', '99'),
-(401772895, 13, 27, 22, '2025-11-30 18:00:00', '99'),
-(401772894, 13, 29, 14, '2025-11-30 18:00:00', '99'),
-(401772896, 13, 26, 16, '2025-11-30 21:05:00', '99'),
-(401772789, 13, 23, 2, '2025-11-30 21:25:00', '99'),
-(401772788, 13, 24, 13, '2025-11-30 21:25:00', '99'),
-(401772931, 13, 28, 7, '2025-12-01 01:20:00', '99'),
-(401772821, 13, 17, 19, '2025-12-02 01:15:00', '99'),
-(401772947, 14, 8, 6, '2025-12-05 01:15:00', '99'),
-(401772900, 14, 1, 26, '2025-12-07 18:00:00', '99'),
-(401772898, 14, 5, 10, '2025-12-07 18:00:00', '99'),
-(401772897, 14, 9, 3, '2025-12-07 18:00:00', '99'),
-(401772899, 14, 16, 28, '2025-12-07 18:00:00', '99'),
-(401772790, 14, 20, 15, '2025-12-07 18:00:00', '99'),
-(401772792, 14, 27, 18, '2025-12-07 18:00:00', '99'),
-(401772793, 14, 30, 11, '2025-12-07 18:00:00', '99'),
-(401772791, 14, 33, 23, '2025-12-07 18:00:00', '99'),
-(401772794, 14, 13, 7, '2025-12-07 21:05:00', '99'),
-(401772902, 14, 2, 4, '2025-12-07 21:25:00', '99'),
-(401772901, 14, 22, 14, '2025-12-07 21:25:00', '99'),
-(401772932, 14, 12, 34, '2025-12-08 01:20:00', '99'),
-(401772822, 14, 24, 21, '2025-12-09 01:15:00', '99'),
-(401772948, 15, 27, 1, '2025-12-12 01:15:00', '99'),
-(401772904, 15, 3, 5, '2025-12-14 18:00:00', '99'),
-(401772796, 15, 4, 33, '2025-12-14 18:00:00', '99'),
-(401772798, 15, 12, 24, '2025-12-14 18:00:00', '99'),
-(401772795, 15, 17, 2, '2025-12-14 18:00:00', '99'),
-(401772905, 15, 19, 28, '2025-12-14 18:00:00', '99'),
-(401772906, 15, 21, 13, '2025-12-14 18:00:00', '99'),
-(401772797, 15, 30, 20, '2025-12-14 18:00:00', '99'),
-(401772903, 15, 34, 22, '2025-12-14 18:00:00', '99'),
-(401772800, 15, 7, 9, '2025-12-14 21:25:00', '99'),
-(401772909, 15, 14, 8, '2025-12-14 21:25:00', '99'),
-(401772908, 15, 18, 29, '2025-12-14 21:25:00', '99'),
-(401772907, 15, 25, 10, '2025-12-14 21:25:00', '99'),
-(401772799, 15, 26, 11, '2025-12-14 21:25:00', '99'),
-(401772933, 15, 6, 16, '2025-12-15 01:20:00', '99'),
-(401772823, 15, 23, 15, '2025-12-16 01:15:00', '99'),
-(401772949, 16, 26, 14, '2025-12-19 01:15:00', '99'),
-(401772613, 16, 3, 9, '2025-12-20 05:00:00', '99'),
-(401772612, 16, 28, 21, '2025-12-20 05:00:00', '99'),
-(401772802, 16, 5, 2, '2025-12-21 18:00:00', '99'),
-(401772910, 16, 6, 24, '2025-12-21 18:00:00', '99'),
-(401772803, 16, 10, 12, '2025-12-21 18:00:00', '99'),
-(401772801, 16, 18, 20, '2025-12-21 18:00:00', '99'),
-(401772911, 16, 19, 16, '2025-12-21 18:00:00', '99'),
-(401772912, 16, 29, 27, '2025-12-21 18:00:00', '99'),
-(401772804, 16, 33, 17, '2025-12-21 18:00:00', '99'),
-(401772913, 16, 7, 30, '2025-12-21 21:05:00', '99'),
-(401772914, 16, 22, 1, '2025-12-21 21:05:00', '99'),
-(401772806, 16, 8, 23, '2025-12-21 21:25:00', '99'),
-(401772805, 16, 34, 13, '2025-12-21 21:25:00', '99'),
-(401772934, 16, 15, 4, '2025-12-22 01:20:00', '99'),
-(401772824, 16, 11, 25, '2025-12-23 01:15:00', '99'),
-(401772710, 17, 28, 6, '2025-12-25 18:00:00', '99'),
-(401772711, 17, 16, 8, '2025-12-25 21:30:00', '99'),
-(401772622, 17, 12, 7, '2025-12-26 01:15:00', '99'),
-(401772954, 17, 4, 22, '2025-12-27 05:00:00', '99'),
-(401772953, 17, 9, 33, '2025-12-27 05:00:00', '99'),
-(401772950, 17, 13, 19, '2025-12-27 05:00:00', '99'),
-(401772951, 17, 24, 34, '2025-12-27 05:00:00', '99'),
-(401772952, 17, 29, 26, '2025-12-27 05:00:00', '99'),
-(401772807, 17, 5, 23, '2025-12-28 18:00:00', '99'),
-(401772809, 17, 10, 18, '2025-12-28 18:00:00', '99'),
-(401772915, 17, 11, 30, '2025-12-28 18:00:00', '99'),
-(401772916, 17, 15, 27, '2025-12-28 18:00:00', '99'),
-(401772808, 17, 20, 17, '2025-12-28 18:00:00', '99'),
-(401772917, 17, 2, 21, '2025-12-28 21:25:00', '99'),
-(401772935, 17, 25, 3, '2025-12-29 01:20:00', '99'),
-(401772825, 17, 1, 14, '2025-12-30 01:15:00', '99');
\ No newline at end of file
+INSERT INTO Schedule (game_id, week_num, home_team_id, away_team_id, start_time, winning_team_id, season) VALUES
+(401671834, 18, 33, 5, '2025-01-04 21:30:00', '99', 2024),
+(401671836, 18, 23, 4, '2025-01-05 01:00:00', '99', 2024),
+(401671827, 18, 1, 29, '2025-01-05 18:00:00', '99', 2024),
+(401671840, 18, 6, 28, '2025-01-05 18:00:00', '99', 2024),
+(401671844, 18, 9, 3, '2025-01-05 18:00:00', '99', 2024),
+(401671826, 18, 10, 34, '2025-01-05 18:00:00', '99', 2024),
+(401671837, 18, 11, 30, '2025-01-05 18:00:00', '99', 2024),
+(401671831, 18, 17, 2, '2025-01-05 18:00:00', '99', 2024),
+(401671841, 18, 21, 19, '2025-01-05 18:00:00', '99', 2024),
+(401671828, 18, 27, 18, '2025-01-05 18:00:00', '99', 2024),
+(401671838, 18, 7, 12, '2025-01-05 21:25:00', '99', 2024),
+(401671839, 18, 13, 24, '2025-01-05 21:25:00', '99', 2024),
+(401671830, 18, 14, 26, '2025-01-05 21:25:00', '99', 2024),
+(401671833, 18, 20, 15, '2025-01-05 21:25:00', '99', 2024),
+(401671845, 18, 22, 25, '2025-01-05 21:25:00', '99', 2024),
+(401671843, 18, 8, 16, '2025-01-06 01:20:00', '99', 2024),
+(401772510, 1, 21, 6, '2025-09-05 00:20:00', '99', 2025),
+(401772714, 1, 24, 12, '2025-09-06 00:00:00', '99', 2025),
+(401772830, 1, 1, 27, '2025-09-07 17:00:00', '99', 2025),
+(401772829, 1, 5, 4, '2025-09-07 17:00:00', '99', 2025),
+(401772719, 1, 11, 15, '2025-09-07 17:00:00', '99', 2025),
+(401772720, 1, 17, 13, '2025-09-07 17:00:00', '99', 2025),
+(401772718, 1, 18, 22, '2025-09-07 17:00:00', '99', 2025),
+(401772721, 1, 20, 23, '2025-09-07 17:00:00', '99', 2025),
+(401772827, 1, 28, 19, '2025-09-07 17:00:00', '99', 2025),
+(401772828, 1, 30, 29, '2025-09-07 17:00:00', '99', 2025),
+(401772832, 1, 7, 10, '2025-09-07 20:05:00', '99', 2025),
+(401772831, 1, 26, 25, '2025-09-07 20:05:00', '99', 2025),
+(401772722, 1, 9, 8, '2025-09-07 20:25:00', '99', 2025),
+(401772723, 1, 14, 34, '2025-09-07 20:25:00', '99', 2025),
+(401772918, 1, 2, 33, '2025-09-08 00:20:00', '99', 2025),
+(401772810, 1, 3, 16, '2025-09-09 00:15:00', '99', 2025),
+(401772936, 2, 9, 28, '2025-09-12 00:15:00', '99', 2025),
+(401772725, 2, 4, 30, '2025-09-14 17:00:00', '99', 2025),
+(401772834, 2, 6, 19, '2025-09-14 17:00:00', '99', 2025),
+(401772835, 2, 8, 3, '2025-09-14 17:00:00', '99', 2025),
+(401772724, 2, 10, 14, '2025-09-14 17:00:00', '99', 2025),
+(401772728, 2, 15, 17, '2025-09-14 17:00:00', '99', 2025),
+(401772833, 2, 18, 25, '2025-09-14 17:00:00', '99', 2025),
+(401772727, 2, 20, 2, '2025-09-14 17:00:00', '99', 2025),
+(401772836, 2, 23, 26, '2025-09-14 17:00:00', '99', 2025),
+(401772726, 2, 33, 5, '2025-09-14 17:00:00', '99', 2025),
+(401772729, 2, 11, 7, '2025-09-14 20:05:00', '99', 2025),
+(401772730, 2, 22, 29, '2025-09-14 20:05:00', '99', 2025),
+(401772837, 2, 12, 21, '2025-09-14 20:25:00', '99', 2025),
+(401772919, 2, 16, 1, '2025-09-15 00:20:00', '99', 2025),
+(401772715, 2, 34, 27, '2025-09-15 23:00:00', '99', 2025),
+(401772811, 2, 13, 24, '2025-09-16 02:00:00', '99', 2025),
+(401772937, 3, 2, 15, '2025-09-19 00:15:00', '99', 2025),
+(401772842, 3, 5, 9, '2025-09-21 17:00:00', '99', 2025),
+(401772733, 3, 10, 11, '2025-09-21 17:00:00', '99', 2025),
+(401772731, 3, 16, 4, '2025-09-21 17:00:00', '99', 2025),
+(401772732, 3, 17, 23, '2025-09-21 17:00:00', '99', 2025),
+(401772839, 3, 21, 14, '2025-09-21 17:00:00', '99', 2025),
+(401772840, 3, 27, 20, '2025-09-21 17:00:00', '99', 2025),
+(401772841, 3, 28, 13, '2025-09-21 17:00:00', '99', 2025),
+(401772838, 3, 29, 1, '2025-09-21 17:00:00', '99', 2025),
+(401772734, 3, 30, 34, '2025-09-21 17:00:00', '99', 2025),
+(401772735, 3, 24, 7, '2025-09-21 20:05:00', '99', 2025),
+(401772736, 3, 26, 18, '2025-09-21 20:05:00', '99', 2025),
+(401772844, 3, 3, 6, '2025-09-21 20:25:00', '99', 2025),
+(401772843, 3, 25, 22, '2025-09-21 20:25:00', '99', 2025),
+(401772920, 3, 19, 12, '2025-09-22 00:20:00', '99', 2025),
+(401772812, 3, 33, 8, '2025-09-23 00:15:00', '99', 2025),
+(401772938, 4, 22, 26, '2025-09-26 00:15:00', '99', 2025),
+(401772632, 4, 23, 16, '2025-09-28 13:30:00', '99', 2025),
+(401772739, 4, 1, 28, '2025-09-28 17:00:00', '99', 2025),
+(401772740, 4, 2, 18, '2025-09-28 17:00:00', '99', 2025),
+(401772846, 4, 8, 5, '2025-09-28 17:00:00', '99', 2025),
+(401772847, 4, 17, 29, '2025-09-28 17:00:00', '99', 2025),
+(401772737, 4, 19, 24, '2025-09-28 17:00:00', '99', 2025),
+(401772845, 4, 27, 21, '2025-09-28 17:00:00', '99', 2025),
+(401772738, 4, 34, 10, '2025-09-28 17:00:00', '99', 2025),
+(401772849, 4, 14, 11, '2025-09-28 20:05:00', '99', 2025),
+(401772848, 4, 25, 30, '2025-09-28 20:05:00', '99', 2025),
+(401772741, 4, 12, 33, '2025-09-28 20:25:00', '99', 2025),
+(401772742, 4, 13, 3, '2025-09-28 20:25:00', '99', 2025),
+(401772921, 4, 6, 9, '2025-09-29 00:20:00', '99', 2025),
+(401772813, 4, 15, 20, '2025-09-29 23:15:00', '99', 2025),
+(401772716, 4, 7, 4, '2025-09-30 00:15:00', '99', 2025),
+(401772939, 5, 14, 25, '2025-10-03 00:15:00', '99', 2025),
+(401772633, 5, 5, 16, '2025-10-05 13:30:00', '99', 2025),
+(401772851, 5, 11, 13, '2025-10-05 17:00:00', '99', 2025),
+(401772744, 5, 18, 19, '2025-10-05 17:00:00', '99', 2025),
+(401772850, 5, 20, 6, '2025-10-05 17:00:00', '99', 2025),
+(401772745, 5, 21, 7, '2025-10-05 17:00:00', '99', 2025),
+(401772852, 5, 29, 15, '2025-10-05 17:00:00', '99', 2025),
+(401772743, 5, 33, 34, '2025-10-05 17:00:00', '99', 2025),
+(401772747, 5, 22, 10, '2025-10-05 20:05:00', '99', 2025),
+(401772746, 5, 26, 27, '2025-10-05 20:05:00', '99', 2025),
+(401772854, 5, 4, 8, '2025-10-05 20:25:00', '99', 2025),
+(401772853, 5, 24, 28, '2025-10-05 20:25:00', '99', 2025),
+(401772922, 5, 2, 17, '2025-10-06 00:20:00', '99', 2025),
+(401772814, 5, 30, 12, '2025-10-07 00:15:00', '99', 2025),
+(401772940, 6, 19, 21, '2025-10-10 00:15:00', '99', 2025),
+(401772634, 6, 20, 7, '2025-10-12 13:30:00', '99', 2025),
+(401772856, 6, 11, 22, '2025-10-12 17:00:00', '99', 2025),
+(401772750, 6, 15, 24, '2025-10-12 17:00:00', '99', 2025),
+(401772748, 6, 23, 5, '2025-10-12 17:00:00', '99', 2025),
+(401772749, 6, 27, 25, '2025-10-12 17:00:00', '99', 2025),
+(401772858, 6, 29, 6, '2025-10-12 17:00:00', '99', 2025),
+(401772857, 6, 30, 26, '2025-10-12 17:00:00', '99', 2025),
+(401772855, 6, 33, 14, '2025-10-12 17:00:00', '99', 2025),
+(401772859, 6, 13, 10, '2025-10-12 20:05:00', '99', 2025),
+(401772752, 6, 9, 4, '2025-10-12 20:25:00', '99', 2025),
+(401772751, 6, 18, 17, '2025-10-12 20:25:00', '99', 2025),
+(401772923, 6, 12, 8, '2025-10-13 00:20:00', '99', 2025),
+(401772815, 6, 1, 2, '2025-10-13 23:15:00', '99', 2025),
+(401772717, 6, 28, 3, '2025-10-14 00:15:00', '99', 2025),
+(401772941, 7, 4, 23, '2025-10-17 00:15:00', '99', 2025),
+(401772635, 7, 30, 14, '2025-10-19 13:30:00', '99', 2025),
+(401772861, 7, 3, 18, '2025-10-19 17:00:00', '99', 2025),
+(401772754, 7, 5, 15, '2025-10-19 17:00:00', '99', 2025),
+(401772755, 7, 10, 17, '2025-10-19 17:00:00', '99', 2025),
+(401772753, 7, 12, 13, '2025-10-19 17:00:00', '99', 2025),
+(401772862, 7, 16, 21, '2025-10-19 17:00:00', '99', 2025),
+(401772860, 7, 20, 29, '2025-10-19 17:00:00', '99', 2025),
+(401772757, 7, 7, 19, '2025-10-19 20:05:00', '99', 2025),
+(401772756, 7, 24, 11, '2025-10-19 20:05:00', '99', 2025),
+(401772864, 7, 6, 28, '2025-10-19 20:25:00', '99', 2025),
+(401772863, 7, 22, 9, '2025-10-19 20:25:00', '99', 2025),
+(401772924, 7, 25, 1, '2025-10-20 00:20:00', '99', 2025),
+(401772816, 7, 8, 27, '2025-10-20 23:00:00', '99', 2025),
+(401772826, 7, 26, 34, '2025-10-21 02:00:00', '99', 2025),
+(401772942, 8, 24, 16, '2025-10-24 00:15:00', '99', 2025),
+(401772760, 8, 1, 15, '2025-10-26 17:00:00', '99', 2025),
+(401772758, 8, 4, 20, '2025-10-26 17:00:00', '99', 2025),
+(401772868, 8, 17, 5, '2025-10-26 17:00:00', '99', 2025),
+(401772867, 8, 21, 19, '2025-10-26 17:00:00', '99', 2025),
+(401772865, 8, 29, 2, '2025-10-26 17:00:00', '99', 2025),
+(401772759, 8, 33, 3, '2025-10-26 17:00:00', '99', 2025),
+(401772866, 8, 34, 25, '2025-10-26 17:00:00', '99', 2025),
+(401772869, 8, 18, 27, '2025-10-26 20:05:00', '99', 2025),
+(401772762, 8, 7, 6, '2025-10-26 20:25:00', '99', 2025),
+(401772761, 8, 11, 10, '2025-10-26 20:25:00', '99', 2025),
+(401772925, 8, 23, 9, '2025-10-27 00:20:00', '99', 2025),
+(401772817, 8, 12, 28, '2025-10-28 00:15:00', '99', 2025),
+(401772943, 9, 15, 33, '2025-10-31 00:15:00', '99', 2025),
+(401772765, 9, 4, 3, '2025-11-02 18:00:00', '99', 2025),
+(401772871, 9, 8, 16, '2025-11-02 18:00:00', '99', 2025),
+(401772872, 9, 9, 29, '2025-11-02 18:00:00', '99', 2025),
+(401772764, 9, 10, 24, '2025-11-02 18:00:00', '99', 2025),
+(401772763, 9, 17, 1, '2025-11-02 18:00:00', '99', 2025),
+(401772767, 9, 19, 25, '2025-11-02 18:00:00', '99', 2025),
+(401772766, 9, 23, 11, '2025-11-02 18:00:00', '99', 2025),
+(401772870, 9, 34, 7, '2025-11-02 18:00:00', '99', 2025),
+(401772873, 9, 13, 30, '2025-11-02 21:05:00', '99', 2025),
+(401772874, 9, 14, 18, '2025-11-02 21:05:00', '99', 2025),
+(401772768, 9, 2, 12, '2025-11-02 21:25:00', '99', 2025),
+(401772926, 9, 28, 26, '2025-11-03 01:20:00', '99', 2025),
+(401772818, 9, 6, 22, '2025-11-04 01:15:00', '99', 2025),
+(401772944, 10, 7, 13, '2025-11-07 01:15:00', '99', 2025),
+(401772636, 10, 11, 1, '2025-11-09 14:30:00', '99', 2025),
+(401772875, 10, 3, 19, '2025-11-09 18:00:00', '99', 2025),
+(401772771, 10, 15, 2, '2025-11-09 18:00:00', '99', 2025),
+(401772876, 10, 16, 33, '2025-11-09 18:00:00', '99', 2025),
+(401772769, 10, 20, 5, '2025-11-09 18:00:00', '99', 2025),
+(401772772, 10, 27, 17, '2025-11-09 18:00:00', '99', 2025),
+(401772877, 10, 29, 18, '2025-11-09 18:00:00', '99', 2025),
+(401772770, 10, 34, 30, '2025-11-09 18:00:00', '99', 2025),
+(401772773, 10, 26, 22, '2025-11-09 21:05:00', '99', 2025),
+(401772879, 10, 25, 14, '2025-11-09 21:25:00', '99', 2025),
+(401772878, 10, 28, 8, '2025-11-09 21:25:00', '99', 2025),
+(401772927, 10, 24, 23, '2025-11-10 01:20:00', '99', 2025),
+(401772630, 10, 9, 21, '2025-11-11 01:15:00', '99', 2025),
+(401772945, 11, 17, 20, '2025-11-14 01:15:00', '99', 2025),
+(401772631, 11, 15, 28, '2025-11-16 14:30:00', '99', 2025),
+(401772882, 11, 1, 29, '2025-11-16 18:00:00', '99', 2025),
+(401772776, 11, 2, 27, '2025-11-16 18:00:00', '99', 2025),
+(401772881, 11, 10, 34, '2025-11-16 18:00:00', '99', 2025),
+(401772880, 11, 16, 3, '2025-11-16 18:00:00', '99', 2025),
+(401772883, 11, 19, 9, '2025-11-16 18:00:00', '99', 2025),
+(401772774, 11, 23, 4, '2025-11-16 18:00:00', '99', 2025),
+(401772775, 11, 30, 24, '2025-11-16 18:00:00', '99', 2025),
+(401772884, 11, 14, 26, '2025-11-16 21:05:00', '99', 2025),
+(401772885, 11, 22, 25, '2025-11-16 21:05:00', '99', 2025),
+(401772777, 11, 5, 33, '2025-11-16 21:25:00', '99', 2025),
+(401772778, 11, 7, 12, '2025-11-16 21:25:00', '99', 2025),
+(401772928, 11, 21, 8, '2025-11-17 01:20:00', '99', 2025),
+(401772819, 11, 13, 6, '2025-11-18 01:15:00', '99', 2025),
+(401772946, 12, 34, 2, '2025-11-21 01:15:00', '99', 2025),
+(401772780, 12, 3, 23, '2025-11-23 18:00:00', '99', 2025),
+(401772781, 12, 4, 17, '2025-11-23 18:00:00', '99', 2025),
+(401772888, 12, 8, 19, '2025-11-23 18:00:00', '99', 2025),
+(401772887, 12, 9, 16, '2025-11-23 18:00:00', '99', 2025),
+(401772886, 12, 10, 26, '2025-11-23 18:00:00', '99', 2025),
+(401772779, 12, 12, 11, '2025-11-23 18:00:00', '99', 2025),
+(401772782, 12, 33, 20, '2025-11-23 18:00:00', '99', 2025),
+(401772784, 12, 13, 5, '2025-11-23 21:05:00', '99', 2025),
+(401772783, 12, 22, 30, '2025-11-23 21:05:00', '99', 2025),
+(401772890, 12, 6, 21, '2025-11-23 21:25:00', '99', 2025),
+(401772889, 12, 18, 1, '2025-11-23 21:25:00', '99', 2025),
+(401772929, 12, 14, 27, '2025-11-24 01:20:00', '99', 2025),
+(401772820, 12, 25, 29, '2025-11-25 01:15:00', '99', 2025),
+(401772891, 13, 8, 9, '2025-11-27 18:00:00', '99', 2025),
+(401772694, 13, 6, 12, '2025-11-27 21:30:00', '99', 2025),
+(401772930, 13, 33, 4, '2025-11-28 01:20:00', '99', 2025),
+(401772621, 13, 21, 3, '2025-11-28 20:00:00', '99', 2025),
+(401772785, 13, 5, 25, '2025-11-30 18:00:00', '99', 2025),
+(401772786, 13, 10, 30, '2025-11-30 18:00:00', '99', 2025),
+(401772787, 13, 11, 34, '2025-11-30 18:00:00', '99', 2025),
+(401772892, 13, 15, 18, '2025-11-30 18:00:00', '99', 2025),
+(401772893, 13, 20, 1, '2025-11-30 18:00:00', '99', 2025),
+(401772895, 13, 27, 22, '2025-11-30 18:00:00', '99', 2025),
+(401772894, 13, 29, 14, '2025-11-30 18:00:00', '99', 2025),
+(401772896, 13, 26, 16, '2025-11-30 21:05:00', '99', 2025),
+(401772789, 13, 23, 2, '2025-11-30 21:25:00', '99', 2025),
+(401772788, 13, 24, 13, '2025-11-30 21:25:00', '99', 2025),
+(401772931, 13, 28, 7, '2025-12-01 01:20:00', '99', 2025),
+(401772821, 13, 17, 19, '2025-12-02 01:15:00', '99', 2025),
+(401772947, 14, 8, 6, '2025-12-05 01:15:00', '99', 2025),
+(401772900, 14, 1, 26, '2025-12-07 18:00:00', '99', 2025),
+(401772898, 14, 5, 10, '2025-12-07 18:00:00', '99', 2025),
+(401772897, 14, 9, 3, '2025-12-07 18:00:00', '99', 2025),
+(401772899, 14, 16, 28, '2025-12-07 18:00:00', '99', 2025),
+(401772790, 14, 20, 15, '2025-12-07 18:00:00', '99', 2025),
+(401772792, 14, 27, 18, '2025-12-07 18:00:00', '99', 2025),
+(401772793, 14, 30, 11, '2025-12-07 18:00:00', '99', 2025),
+(401772791, 14, 33, 23, '2025-12-07 18:00:00', '99', 2025),
+(401772794, 14, 13, 7, '2025-12-07 21:05:00', '99', 2025),
+(401772902, 14, 2, 4, '2025-12-07 21:25:00', '99', 2025),
+(401772901, 14, 22, 14, '2025-12-07 21:25:00', '99', 2025),
+(401772932, 14, 12, 34, '2025-12-08 01:20:00', '99', 2025),
+(401772822, 14, 24, 21, '2025-12-09 01:15:00', '99', 2025),
+(401772948, 15, 27, 1, '2025-12-12 01:15:00', '99', 2025),
+(401772904, 15, 3, 5, '2025-12-14 18:00:00', '99', 2025),
+(401772796, 15, 4, 33, '2025-12-14 18:00:00', '99', 2025),
+(401772798, 15, 12, 24, '2025-12-14 18:00:00', '99', 2025),
+(401772795, 15, 17, 2, '2025-12-14 18:00:00', '99', 2025),
+(401772905, 15, 19, 28, '2025-12-14 18:00:00', '99', 2025),
+(401772906, 15, 21, 13, '2025-12-14 18:00:00', '99', 2025),
+(401772797, 15, 30, 20, '2025-12-14 18:00:00', '99', 2025),
+(401772903, 15, 34, 22, '2025-12-14 18:00:00', '99', 2025),
+(401772800, 15, 7, 9, '2025-12-14 21:25:00', '99', 2025),
+(401772909, 15, 14, 8, '2025-12-14 21:25:00', '99', 2025),
+(401772908, 15, 18, 29, '2025-12-14 21:25:00', '99', 2025),
+(401772907, 15, 25, 10, '2025-12-14 21:25:00', '99', 2025),
+(401772799, 15, 26, 11, '2025-12-14 21:25:00', '99', 2025),
+(401772933, 15, 6, 16, '2025-12-15 01:20:00', '99', 2025),
+(401772823, 15, 23, 15, '2025-12-16 01:15:00', '99', 2025),
+(401772949, 16, 26, 14, '2025-12-19 01:15:00', '99', 2025),
+(401772613, 16, 3, 9, '2025-12-20 05:00:00', '99', 2025),
+(401772612, 16, 28, 21, '2025-12-20 05:00:00', '99', 2025),
+(401772802, 16, 5, 2, '2025-12-21 18:00:00', '99', 2025),
+(401772910, 16, 6, 24, '2025-12-21 18:00:00', '99', 2025),
+(401772803, 16, 10, 12, '2025-12-21 18:00:00', '99', 2025),
+(401772801, 16, 18, 20, '2025-12-21 18:00:00', '99', 2025),
+(401772911, 16, 19, 16, '2025-12-21 18:00:00', '99', 2025),
+(401772912, 16, 29, 27, '2025-12-21 18:00:00', '99', 2025),
+(401772804, 16, 33, 17, '2025-12-21 18:00:00', '99', 2025),
+(401772913, 16, 7, 30, '2025-12-21 21:05:00', '99', 2025),
+(401772914, 16, 22, 1, '2025-12-21 21:05:00', '99', 2025),
+(401772806, 16, 8, 23, '2025-12-21 21:25:00', '99', 2025),
+(401772805, 16, 34, 13, '2025-12-21 21:25:00', '99', 2025),
+(401772934, 16, 15, 4, '2025-12-22 01:20:00', '99', 2025),
+(401772824, 16, 11, 25, '2025-12-23 01:15:00', '99', 2025),
+(401772710, 17, 28, 6, '2025-12-25 18:00:00', '99', 2025),
+(401772711, 17, 16, 8, '2025-12-25 21:30:00', '99', 2025),
+(401772622, 17, 12, 7, '2025-12-26 01:15:00', '99', 2025),
+(401772954, 17, 4, 22, '2025-12-27 05:00:00', '99', 2025),
+(401772953, 17, 9, 33, '2025-12-27 05:00:00', '99', 2025),
+(401772950, 17, 13, 19, '2025-12-27 05:00:00', '99', 2025),
+(401772951, 17, 24, 34, '2025-12-27 05:00:00', '99', 2025),
+(401772952, 17, 29, 26, '2025-12-27 05:00:00', '99', 2025),
+(401772807, 17, 5, 23, '2025-12-28 18:00:00', '99', 2025),
+(401772809, 17, 10, 18, '2025-12-28 18:00:00', '99', 2025),
+(401772915, 17, 11, 30, '2025-12-28 18:00:00', '99', 2025),
+(401772916, 17, 15, 27, '2025-12-28 18:00:00', '99', 2025),
+(401772808, 17, 20, 17, '2025-12-28 18:00:00', '99', 2025),
+(401772917, 17, 2, 21, '2025-12-28 21:25:00', '99', 2025),
+(401772935, 17, 25, 3, '2025-12-29 01:20:00', '99', 2025),
+(401772825, 17, 1, 14, '2025-12-30 01:15:00', '99', 2025);
\ No newline at end of file
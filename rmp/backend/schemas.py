@@ -35,7 +35,7 @@ class PoolBase(BaseModel):
     is_private: bool = False
 
 class PoolCreate(PoolBase):
-    pass
+    pool_type: Optional[str] = None  # survivor when not given; see GET /rules
 
 class PoolUpdate(BaseModel):
     name: Optional[str] = None
@@ -50,6 +50,8 @@ class PoolOut(BaseModel):
     lock_time: Optional[datetime] = None
     is_private: bool = False
     owner_id: str
+    season: Optional[int] = None
+    pool_type: Optional[str] = None
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
     
@@ -89,18 +91,22 @@ class PickBase(BaseModel):
 
 class PickCreate(PickBase):
     entry_id: str
+    confidence: Optional[int] = None  # confidence pools only
 
 class PickUpdate(BaseModel):
     week: Optional[int] = None
     team: Optional[str] = None
     locked: Optional[bool] = None
     result: Optional[str] = None
+    confidence: Optional[int] = None
 
 class PickOut(PickBase):
     id: str
     entry_id: str
+    team_id: Optional[int] = None
     locked: bool = False
     result: Optional[str] = None
+    confidence: Optional[int] = None
     created_at: datetime
     updated_at: datetime
     class Config:
@@ -109,6 +115,64 @@ class PickOut(PickBase):
             datetime: lambda v: v.isoformat() if v else None
         }
 
+class RuleCreate(BaseModel):
+    id: str
+    pool_type: str
+    rule_text: str
+    rule_type: str
+    default_value: Optional[str] = None
+    enabled_by_default: bool = False
+
+class RuleUpdate(BaseModel):
+    rule_text: Optional[str] = None
+    default_value: Optional[str] = None
+    enabled_by_default: Optional[bool] = None
+
+class RuleOut(BaseModel):
+    id: str
+    pool_type: Optional[str] = None
+    rule_text: Optional[str] = None
+    rule_type: Optional[str] = None
+    default_value: Optional[str] = None
+    enabled_by_default: Optional[bool] = None
+    class Config:
+        orm_mode = True
+
+class PoolRuleIn(BaseModel):
+    rule_id: str
+    value: Optional[str] = None  # the rule's default_value when not given
+
+class PoolRuleOut(PoolRuleIn):
+    class Config:
+        orm_mode = True
+
+class PoolRulesOut(BaseModel):
+    pool_id: str
+    pool_type: str
+    rules: List[PoolRuleOut] = []
+    settings: dict
+
+class StandingOut(BaseModel):
+    entry_id: str
+    user_id: Optional[str] = None
+    name: Optional[str] = None
+    correct: int = 0
+    incorrect: int = 0
+    points: int = 0
+    alive: bool = True
+    class Config:
+        orm_mode = True
+
+class PoolChangesOut(BaseModel):
+    pool_id: str
+    version: int
+    resync: bool = False
+    pool_changed: bool = False
+    entries: List[EntryOut] = []
+    picks: List[PickOut] = []
+    deleted_entries: List[str] = []
+    deleted_picks: List[str] = []
+
 class AuditLogOut(BaseModel):
     id: str
     user_id: str
@@ -117,6 +181,16 @@ class AuditLogOut(BaseModel):
     class Config:
         orm_mode = True
 
+class ArchivedAuditLogOut(BaseModel):
+    id: str
+    user_id: Optional[str] = None
+    action: Optional[str] = None
+    details: Optional[str] = None
+    created_at: Optional[datetime] = None
+    archived_at: Optional[datetime] = None
+    class Config:
+        orm_mode = True
+
 class MessageBoardOut(BaseModel):
     id: str
     user_id: str
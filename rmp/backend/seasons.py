@@ -0,0 +1,38 @@
+"""
+Seasons.
+
+Schedule games, pools and picks carry the season they belong to, named by
+the year it kicks off in: games played in January and February belong to
+the previous year's season. Live queries only read the current season,
+which is the newest season on the schedule unless CURRENT_SEASON pins it.
+Earlier seasons' picks are moved to picks_archive by the archive job (see
+archive.py), so the live tables and their indexes stay one season deep.
+"""
+
+import os
+from datetime import datetime
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+import models
+import versions
+
+# Pin the current season (e.g. while the next season's schedule is loaded early)
+CURRENT_SEASON = os.getenv("CURRENT_SEASON")
+
+def season_of(when: datetime) -> int:
+    """The season a game at (or a row created at) this time belongs to."""
+    return when.year if when.month >= 3 else when.year - 1
+
+def _newest_season(db: Session) -> int:
+    newest = db.query(func.max(models.Schedule.season)).scalar()
+    return newest if newest is not None else season_of(datetime.utcnow())
+
+def current_season(db: Session = None) -> int:
+    """The current season; pass the caller's session, if it has one, for cache misses to read through."""
+    if CURRENT_SEASON:
+        return int(CURRENT_SEASON)
+    # Keyed on the schedule version: loading a new season's games bumps it
+    version = versions.reference_version(versions.SCHEDULE, db)
+    return versions.cache.get(("season", version), 3600, lambda: versions.with_session(_newest_season, db))
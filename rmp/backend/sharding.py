@@ -0,0 +1,328 @@
+"""
+Pool-level sharding.
+
+A few huge public pools dominate write load, so pools can be spread over
+several databases. Everything that belongs to one pool (the pool row, its
+entries, picks, archived picks, admins, chosen rules and change log) lives
+together on the pool's shard; reference and account data (teams, Schedule,
+rules, users, sessions, jobs, notifications, ...) stays on the primary
+database, called "global" here.
+
+SHARD_URLS lists the shards as name=url pairs. When it is unset there is one
+database and none of this is used. When it is set, database.SessionLocal is
+a routing session: each ORM statement goes to the shard(s) its pool_id or
+entry_id criteria point at, and statements without such criteria go to
+every database holding pools. The shard map (the pool_shards table, on the
+global database) records where each pool lives; pools created before
+sharding was turned on have no row and stay on the global database. New
+pools are spread over SHARD_NEW_POOLS (default: every shard) by a hash of
+their id.
+
+A statement cannot join tables on different databases, so one that joins a
+sharded table to a global one raises CrossShardQuery; look the global rows up
+separately. Writes made to several shards in one session are committed one
+shard after another, not atomically.
+
+    SHARD_URLS="a=sqlite:///shard_a.db,b=sqlite:///shard_b.db"
+"""
+
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from sqlalchemy import MetaData, select
+from sqlalchemy.ext.horizontal_shard import ShardedSession
+from sqlalchemy.orm import Session, object_session, sessionmaker
+from sqlalchemy.sql import operators, visitors
+
+import models
+
+SHARD_URLS = os.getenv("SHARD_URLS", "")
+# Shards that new pools are placed on; leave a shard out to stop growing it
+SHARD_NEW_POOLS = [name for name in os.getenv("SHARD_NEW_POOLS", "").split(",") if name]
+# Threads per process for fanning a query out to every shard
+SHARD_FANOUT_THREADS = int(os.getenv("SHARD_FANOUT_THREADS", 8))
+
+GLOBAL = "global"
+
+# Tables whose rows live on their pool's shard
+SHARDED_TABLES = frozenset(("pools", "entries", "picks", "picks_archive", "pool_admins", "pool_changes",
+                            "pool_rules"))
+
+class CrossShardQuery(Exception):
+    """A statement joins sharded tables to global ones."""
+
+def parse_shard_urls(value: str) -> dict:
+    shards = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        name, _, url = item.partition("=")
+        name = name.strip()
+        if not url or name == GLOBAL:
+            raise ValueError(f"SHARD_URLS entries must be name=url with a name other than {GLOBAL}: {item}")
+        shards[name] = url.strip()
+    return shards
+
+class ShardMap:
+    """Which database each pool and entry lives on. Neither ever moves, so lookups are cached for good."""
+
+    def __init__(self, engines: dict, new_pool_shards: list = None, max_keys: int = 200000):
+        self.engines = engines
+        self.shard_names = [name for name in engines if name != GLOBAL]
+        self.new_pool_shards = list(new_pool_shards or self.shard_names)
+        unknown = set(self.new_pool_shards) - set(self.shard_names)
+        if unknown:
+            raise ValueError(f"SHARD_NEW_POOLS names unknown shards: {', '.join(sorted(unknown))}")
+        self.max_keys = max_keys
+        self._pools = OrderedDict()
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def all_shards(self) -> list:
+        """Every database that can hold pools, the global one included."""
+        return [GLOBAL] + self.shard_names
+
+    def _remember(self, cache: OrderedDict, key: str, shard: str):
+        with self._lock:
+            cache[key] = shard
+            cache.move_to_end(key)
+            if len(cache) > self.max_keys:
+                cache.popitem(last=False)
+
+    def pool_shard(self, pool_id: str) -> str:
+        with self._lock:
+            shard = self._pools.get(pool_id)
+        if shard is None:
+            with self.engines[GLOBAL].connect() as conn:
+                shard = conn.execute(
+                    select(models.PoolShard.shard).where(models.PoolShard.pool_id == pool_id)
+                ).scalar() or GLOBAL
+            self._remember(self._pools, pool_id, shard)
+        return shard
+
+    def assign(self, pool_id: str, conn) -> str:
+        """Place a new pool, recording it in the shard map through conn, a global connection."""
+        shard = self.new_pool_shards[zlib.crc32(pool_id.encode()) % len(self.new_pool_shards)]
+        conn.execute(models.PoolShard.__table__.insert().values(
+            pool_id=pool_id, shard=shard, created_at=datetime.utcnow()
+        ))
+        self._remember(self._pools, pool_id, shard)
+        return shard
+
+    def entry_shard(self, entry_id: str):
+        """The shard holding an entry, asking every shard at once on a miss; None if there is no such entry."""
+        with self._lock:
+            shard = self._entries.get(entry_id)
+        if shard is not None:
+            return shard
+
+        def holds(name):
+            with self.engines[name].connect() as conn:
+                found = conn.execute(select(models.Entry.id).where(models.Entry.id == entry_id)).first()
+            return name if found else None
+
+        shard = next((name for name in _executor().map(holds, self.all_shards) if name), None)
+        if shard is not None:
+            self._remember(self._entries, entry_id, shard)
+        return shard
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"shards": self.all_shards, "new_pools": self.new_pool_shards,
+                    "cached_pools": len(self._pools), "cached_entries": len(self._entries)}
+
+_pool_executor = None
+_executor_lock = threading.Lock()
+
+def _executor() -> ThreadPoolExecutor:
+    global _pool_executor
+    with _executor_lock:
+        if _pool_executor is None:
+            _pool_executor = ThreadPoolExecutor(SHARD_FANOUT_THREADS, thread_name_prefix="shard-fanout")
+        return _pool_executor
+
+# Routing
+
+def _is_sharded(mapper) -> bool:
+    return mapper.local_table.name in SHARDED_TABLES
+
+def _statement_tables(statement) -> set:
+    return {element.name for element in visitors.iterate(statement)
+            if getattr(element, "__visit_name__", None) == "table"}
+
+def _comparisons(statement):
+    """(table, column, [values]) for every column == value and column IN (...) in the statement."""
+    found = []
+
+    def visit_binary(binary):
+        if binary.operator not in (operators.eq, operators.in_op):
+            return
+        column, value = binary.left, binary.right
+        if getattr(value, "table", None) is not None and getattr(column, "table", None) is None:
+            column, value = value, column
+        table = getattr(column, "table", None)
+        if table is None or getattr(value, "__visit_name__", None) != "bindparam":
+            return
+        values = value.effective_value
+        if values is None:
+            return
+        found.append((table.name, column.name, values if isinstance(values, (list, tuple)) else [values]))
+
+    visitors.traverse(statement, {}, {"binary": visit_binary})
+    return found
+
+class ShardRouter:
+    """The shard_chooser, identity_chooser and execute_chooser of a routing session."""
+
+    def __init__(self, shard_map: ShardMap):
+        self.map = shard_map
+
+    def _entry_shards(self, entry_ids) -> set:
+        shards = {self.map.entry_shard(entry_id) for entry_id in entry_ids}
+        # An unknown entry has no rows anywhere; any one shard answers that
+        return {shard for shard in shards if shard is not None} or {GLOBAL}
+
+    def shard_chooser(self, mapper, instance, clause=None):
+        if mapper is None or not _is_sharded(mapper):
+            return GLOBAL
+        if instance is None:
+            # A bulk statement without a target object; execute_chooser routes those
+            return GLOBAL
+        table = mapper.local_table.name
+        if table == "pools":
+            # Only called for pools not yet written: place them now, in the
+            # same transaction as the rest of the session's global writes
+            conn = object_session(instance).connection(bind_arguments={"shard_id": GLOBAL})
+            return self.map.assign(instance.id, conn)
+        if table == "picks":
+            entry = instance.__dict__.get("entry")
+            if entry is not None and entry.pool_id:
+                return self.map.pool_shard(entry.pool_id)
+            return next(iter(self._entry_shards([instance.entry_id])))
+        return self.map.pool_shard(instance.pool_id)
+
+    def identity_chooser(self, mapper, primary_key, *, lazy_loaded_from, **kw):
+        if not _is_sharded(mapper):
+            return [GLOBAL]
+        if lazy_loaded_from is not None and lazy_loaded_from.identity_token is not None:
+            return [lazy_loaded_from.identity_token]
+        table = mapper.local_table.name
+        if table == "pools":
+            return [self.map.pool_shard(primary_key[0])]
+        if table == "entries":
+            return list(self._entry_shards([primary_key[0]]))
+        return self.map.all_shards
+
+    def execute_chooser(self, context):
+        statement = context.statement
+        tables = _statement_tables(statement)
+        sharded = tables & SHARDED_TABLES
+        if not sharded:
+            return [GLOBAL]
+        if tables - sharded:
+            raise CrossShardQuery(
+                f"query joins sharded tables ({', '.join(sorted(sharded))}) "
+                f"to global ones ({', '.join(sorted(tables - sharded))})"
+            )
+        shards = set()
+        for table, column, values in _comparisons(statement):
+            if table not in SHARDED_TABLES:
+                continue
+            if column == "pool_id" or (table == "pools" and column == "id"):
+                shards.update(self.map.pool_shard(value) for value in values)
+            elif column == "entry_id" or (table == "entries" and column == "id"):
+                shards.update(self._entry_shards(values))
+        return sorted(shards) if shards else self.map.all_shards
+
+class RoutingSession(ShardedSession):
+    """A ShardedSession that sends work without a mapper (text(), connection()) to the global database."""
+
+    def get_bind(self, mapper=None, *, shard_id=None, instance=None, clause=None, **kw):
+        if shard_id is None and mapper is None and instance is None:
+            shard_id = GLOBAL
+        return super().get_bind(mapper, shard_id=shard_id, instance=instance, clause=clause, **kw)
+
+# Set up by database.py when SHARD_URLS is set
+shard_map = None
+router = None
+
+def routing_sessionmaker(global_engine, shard_engines: dict):
+    global shard_map, router
+    shard_map = ShardMap({GLOBAL: global_engine, **shard_engines}, SHARD_NEW_POOLS)
+    router = ShardRouter(shard_map)
+    return sessionmaker(
+        class_=RoutingSession,
+        autocommit=False,
+        autoflush=False,
+        shards=shard_map.engines,
+        shard_chooser=router.shard_chooser,
+        identity_chooser=router.identity_chooser,
+        execute_chooser=router.execute_chooser,
+    )
+
+def enabled() -> bool:
+    return shard_map is not None
+
+def pool_databases() -> list:
+    """
+    bind_arguments for each database holding pool tables, for statements
+    that must run on every one of them (e.g. maintenance jobs) one by one.
+    """
+    if shard_map is None:
+        return [{}]
+    return [{"shard_id": name} for name in shard_map.all_shards]
+
+def fan_out(db: Session, query) -> list:
+    """
+    query(session) run on every database holding pools, in parallel, with
+    the results concatenated. Without sharding it simply runs on db. The
+    returned objects are detached: read their columns, not relationships.
+    """
+    if shard_map is None:
+        return list(query(db))
+
+    def run(name):
+        session = Session(bind=shard_map.engines[name])
+        try:
+            rows = list(query(session))
+            session.expunge_all()
+            return rows
+        finally:
+            session.close()
+
+    return [row for rows in _executor().map(run, shard_map.all_shards) for row in rows]
+
+def fan_out_page(db: Session, query, order_by: list, skip: int, limit: int) -> list:
+    """
+    One page of query(session) in order_by (ascending columns) order. Each
+    shard returns its first skip + limit rows and the page is cut from all
+    of them.
+    """
+    if shard_map is None:
+        return query(db).order_by(*order_by).offset(skip).limit(limit).all()
+    rows = fan_out(db, lambda session: query(session).order_by(*order_by).limit(skip + limit))
+    # NULLs first, as the databases sort them
+    rows.sort(key=lambda row: tuple((value is not None, value) for value in
+                                    (getattr(row, column.key) for column in order_by)))
+    return rows[skip:skip + limit]
+
+def _shard_metadata() -> MetaData:
+    """The sharded tables alone, without their foreign keys into tables on the global database."""
+    metadata = MetaData()
+    for name in sorted(SHARDED_TABLES):
+        table = models.Base.metadata.tables[name].to_metadata(metadata)
+        for fk in list(table.foreign_keys):
+            if fk.target_fullname.split(".")[0] not in SHARDED_TABLES:
+                table.constraints.discard(fk.constraint)
+                table.foreign_keys.discard(fk)
+                fk.parent.foreign_keys.discard(fk)
+    return metadata
+
+def create_shard_schema(engine):
+    """Create the sharded tables on a shard database."""
+    _shard_metadata().create_all(bind=engine)
@@ -0,0 +1,142 @@
+import asyncio
+import functools
+import hashlib
+import inspect
+import threading
+from concurrent.futures import Future, InvalidStateError
+
+from fastapi import Request
+
+class _LeaderGone(Exception):
+    """The leader was cancelled or interrupted before finishing; its followers run the work themselves."""
+
+class SingleFlight:
+    """
+    Collapses concurrent calls with the same key into one execution.
+
+    The first caller for a key runs the work; callers that arrive while it is
+    still running wait for and share its result (or exception). Nothing is
+    kept once the call finishes, so this never serves stale data - it only
+    stops identical work from running N times at once.
+
+    A follower that gives up (a cancelled task, a client that went away)
+    leaves the call running for everyone else. If the leader itself is
+    cancelled, its followers don't inherit the cancellation: the next one in
+    becomes the leader and runs the work again.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.shared = 0
+
+    def _join(self, key):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.shared += 1
+                return call, False
+            call = self._calls[key] = Future()
+            self.executed += 1
+            return call, True
+
+    def _finish(self, key, call: Future, result=None, error: BaseException = None):
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+        if error is not None and not isinstance(error, Exception):
+            # Cancellation and interrupts belong to the leader, not to the callers waiting on it
+            error = _LeaderGone()
+        try:
+            if error is not None:
+                call.set_exception(error)
+            else:
+                call.set_result(result)
+        except InvalidStateError:
+            pass
+
+    def do(self, key, fn):
+        """Run fn() once for all concurrent callers with this key (blocking)."""
+        while True:
+            call, leader = self._join(key)
+            if leader:
+                break
+            try:
+                return call.result()
+            except _LeaderGone:
+                continue
+        try:
+            result = fn()
+        except BaseException as e:
+            self._finish(key, call, error=e)
+            raise
+        self._finish(key, call, result)
+        return result
+
+    async def do_async(self, key, coro_fn):
+        """Await coro_fn() once for all concurrent callers with this key."""
+        while True:
+            call, leader = self._join(key)
+            if leader:
+                break
+            try:
+                # Shielded: cancelling one follower must not cancel the call the others share
+                return await asyncio.shield(asyncio.wrap_future(call))
+            except _LeaderGone:
+                continue
+        try:
+            result = await coro_fn()
+        except BaseException as e:
+            self._finish(key, call, error=e)
+            raise
+        self._finish(key, call, result)
+        return result
+
+group = SingleFlight()
+
+def _request_key(func, request: Request, user_scoped: bool):
+    key = (func.__module__, func.__qualname__, request.url.path, request.url.query)
+    if user_scoped:
+        authorization = request.headers.get("authorization", "")
+        key += (hashlib.sha1(authorization.encode()).hexdigest(),)
+    return key
+
+def single_flight(user_scoped: bool = False, flight: SingleFlight = group):
+    """
+    Route decorator that coalesces identical concurrent requests.
+
+    Requests are identical when they hit the same handler with the same path
+    and query string; with user_scoped=True the caller's Authorization header
+    is part of the key too, so users never share each other's results. Works
+    on both `def` and `async def` handlers. The shared result must not need
+    the leader's DB session after the handler returns (plain data or ORM rows
+    whose columns are already loaded).
+
+        @router.get("/{pool_id}")
+        @single_flight()
+        def get_pool(...):
+    """
+
+    def decorator(func):
+        signature = inspect.signature(func)
+        # Ask FastAPI for the Request under a name the handler won't use
+        params = list(signature.parameters.values())
+        params.append(inspect.Parameter("_single_flight_request", inspect.Parameter.KEYWORD_ONLY, annotation=Request))
+        new_signature = signature.replace(parameters=params)
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(*args, _single_flight_request: Request, **kwargs):
+                key = _request_key(func, _single_flight_request, user_scoped)
+                return await flight.do_async(key, lambda: func(*args, **kwargs))
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, _single_flight_request: Request, **kwargs):
+                key = _request_key(func, _single_flight_request, user_scoped)
+                return flight.do(key, lambda: func(*args, **kwargs))
+
+        wrapper.__signature__ = new_signature
+        return wrapper
+
+    return decorator
@@ -1,16 +1,77 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional, Tuple
+import threading
+import time
 from models import Team
 from deps import get_db
+from versions import ConditionalGet, TEAMS, reference_version
+from response_cache import cached_json_response
+import response_cache
+
+# Team data only changes between seasons
+teams_etag = ConditionalGet(TEAMS, cache_control="public, max-age=3600")
+
+# A lookup miss reloads the map at most this often, in case teams were
+# inserted without bumping the teams data version
+TEAM_MAP_MISS_RELOAD_SECONDS = 60
 
 router = APIRouter()
 
-@router.get("/", response_model=List[dict])
-def get_teams(db: Session = Depends(get_db)):
+class TeamMap:
     """
-    Get all teams
+    In-memory abbreviation <-> id lookup for the teams table, so pick writes
+    can validate and store integer team ids without a query. Reloaded when
+    the teams data version changes.
     """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._loaded_at = 0.0
+        # (abbreviation -> id, id -> abbreviation), swapped as a unit
+        self._maps = ({}, {})
+
+    def load(self, db: Session, force: bool = False):
+        """(Re)build the map if the teams data version changed."""
+        version = reference_version(TEAMS, db)
+        if version == self._version and not force:
+            return
+        with self._lock:
+            if version == self._version and not force:
+                return
+            rows = db.query(Team.id, Team.abbrv).all()
+            self._maps = (
+                {abbrv.upper(): team_id for team_id, abbrv in rows},
+                {team_id: abbrv for team_id, abbrv in rows},
+            )
+            self._version = version
+            self._loaded_at = time.monotonic()
+
+    def _lookup(self, team: str) -> Optional[Tuple[int, str]]:
+        ids, abbrvs = self._maps
+        key = team.strip().upper()
+        team_id = ids.get(key)
+        if team_id is None and key.isdigit() and int(key) in abbrvs:
+            team_id = int(key)
+        return (team_id, abbrvs[team_id]) if team_id is not None else None
+
+    def resolve(self, db: Session, team: str) -> Optional[Tuple[int, str]]:
+        """(team_id, abbreviation) for an abbreviation or numeric id, or None if unknown."""
+        self.load(db)
+        found = self._lookup(team)
+        if found is None and time.monotonic() - self._loaded_at > TEAM_MAP_MISS_RELOAD_SECONDS:
+            self.load(db, force=True)
+            found = self._lookup(team)
+        return found
+
+    def abbreviation(self, db: Session, team_id: int) -> Optional[str]:
+        self.load(db)
+        return self._maps[1].get(team_id)
+
+team_map = TeamMap()
+
+def _all_teams(db: Session) -> list:
     teams = db.query(Team).order_by(Team.id).all()
     return [
         {
@@ -22,8 +83,22 @@ def get_teams(db: Session = Depends(get_db)):
         for team in teams
     ]
 
+def prime_cache(db: Session):
+    """Build the cached teams payload ahead of the first request."""
+    response_cache.cache.get_or_build(("teams",), reference_version(TEAMS), lambda: _all_teams(db))
+
+@router.get("/", response_model=List[dict])
+def get_teams(request: Request, etag: str = Depends(teams_etag), db: Session = Depends(get_db)):
+    """
+    Get all teams
+    """
+    return cached_json_response(
+        request, ("teams",), reference_version(TEAMS), lambda: _all_teams(db),
+        etag=etag, cache_control=teams_etag.cache_control
+    )
+
 @router.get("/{team_id}", response_model=dict)
-def get_team(team_id: int, db: Session = Depends(get_db)):
+def get_team(team_id: int, etag: str = Depends(teams_etag), db: Session = Depends(get_db)):
     """
     Get a specific team by ID
     """
@@ -39,7 +114,7 @@ def get_team(team_id: int, db: Session = Depends(get_db)):
     }
 
 @router.get("/by-abbreviation/{abbreviation}", response_model=dict)
-def get_team_by_abbreviation(abbreviation: str, db: Session = Depends(get_db)):
+def get_team_by_abbreviation(abbreviation: str, etag: str = Depends(teams_etag), db: Session = Depends(get_db)):
     """
     Get a team by abbreviation
     """
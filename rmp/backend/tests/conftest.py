@@ -0,0 +1,124 @@
+"""
+Test fixtures.
+
+Every test gets fresh SQLite files, migrated with migrate.py. Tests that
+take the `db` fixture run twice: on a single SQLite database, and with two
+SQLite shards next to it (see sharding.py). Modules read their settings at
+import, so the environment is set here before anything imports them, and
+the session factories are swapped in by the fixture.
+
+    cd rmp/backend && python -m pytest -q tests
+"""
+
+import os
+import sys
+import uuid
+from types import SimpleNamespace
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, BACKEND_DIR)
+
+os.environ.setdefault("SQLALCHEMY_DATABASE_URL", "sqlite://")
+os.environ.setdefault("ADMISSION_ENABLED", "false")
+os.environ.setdefault("JOB_WORKERS", "0")
+os.environ.setdefault("WARMUP_ENABLED", "false")
+os.environ.setdefault("PURGE_PAUSE_MS", "0")
+os.environ.setdefault("MIGRATION_PAUSE_MS", "0")
+os.environ.setdefault("ETAG_SALT", "test")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+import auth_sessions
+import database
+import deps
+import group_commit
+import idempotency
+import jobs
+import main
+import migrate
+import rules
+import seasons
+import sharding
+import teams
+import versions
+from invalidation import bus
+
+PASSWORD = "Passw0rd!test"
+
+@pytest.fixture(params=["sqlite", "shards"])
+def db(request, tmp_path, monkeypatch):
+    """The app's databases: one SQLite file, or a primary plus shards "a" and "b"."""
+    engine = database.make_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    migrate.Runner(engine, pause_ms=0).run()
+    shard_engines = {}
+    if request.param == "shards":
+        for name in ("a", "b"):
+            shard_engines[name] = database.make_engine(f"sqlite:///{tmp_path / f'{name}.db'}")
+            migrate.Runner(shard_engines[name], migrate.SHARD_MIGRATIONS, pause_ms=0).run()
+
+    # routing_sessionmaker sets these; put them back afterwards
+    monkeypatch.setattr(sharding, "shard_map", None)
+    monkeypatch.setattr(sharding, "router", None)
+    if shard_engines:
+        session_factory = sharding.routing_sessionmaker(engine, shard_engines)
+    else:
+        session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    monkeypatch.setattr(database, "engine", engine)
+    monkeypatch.setattr(database, "shard_engines", shard_engines)
+    for module in (database, deps):
+        monkeypatch.setattr(module, "SessionLocal", session_factory)
+        monkeypatch.setattr(module, "ReplicaSessionLocal", session_factory)
+    for module in (versions, rules):
+        monkeypatch.setattr(module, "SessionLocal", session_factory)
+    for component in (auth_sessions.cache, group_commit.pick_queue, jobs.runner, idempotency.store):
+        monkeypatch.setattr(component, "session_factory", session_factory)
+
+    # Cached versions, sessions, rule plans and team ids belong to the last test's databases
+    bus._reset()
+    versions._entry_pools.clear()
+    monkeypatch.setattr(teams.team_map, "_version", None)
+
+    yield SimpleNamespace(mode=request.param, engine=engine, shard_engines=shard_engines,
+                          SessionLocal=session_factory)
+
+    group_commit.pick_queue.stop()
+    for shard_engine in shard_engines.values():
+        shard_engine.dispose()
+    engine.dispose()
+
+@pytest.fixture
+def client(db):
+    # Not entered as a context manager: no warm-up, job workers or bus threads
+    return TestClient(main.app)
+
+def register(client, email: str = None) -> dict:
+    """Register and log in a user; returns their id and auth headers."""
+    email = email or f"{uuid.uuid4().hex[:12]}@example.com"
+    response = client.post("/auth/register", json={"email": email, "password": PASSWORD,
+                                                    "first_name": "Test", "last_name": "User"})
+    assert response.status_code == 200, response.text
+    user_id = response.json()["id"]
+    response = client.post("/auth/login", json={"email": email, "password": PASSWORD})
+    assert response.status_code == 200, response.text
+    return {"id": user_id, "headers": {"Authorization": f"Bearer {response.json()['access_token']}"}}
+
+def create_pool(client, user: dict, name: str = "Pool") -> dict:
+    response = client.post("/pools/create", json={"name": name}, headers=user["headers"])
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def create_entry(client, user: dict, pool_id: str, name: str = "Entry") -> dict:
+    response = client.post("/entries/create", json={"name": name, "pool_id": pool_id}, headers=user["headers"])
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def pool_database(db, pool_id: str):
+    """The engine holding a pool's rows."""
+    if db.mode == "sqlite":
+        return db.engine
+    shard = sharding.shard_map.pool_shard(pool_id)
+    return db.engine if shard == sharding.GLOBAL else db.shard_engines[shard]
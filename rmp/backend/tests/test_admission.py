@@ -0,0 +1,88 @@
+from datetime import timedelta
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import admission
+from admission import CRITICAL, LOW, NORMAL, AdmissionController, AdmissionMiddleware
+from auth import create_access_token
+
+RATES = {CRITICAL: (1, 3), NORMAL: (1, 3), LOW: (1, 3)}
+
+def _scope(path: str, client: str = "203.0.113.7") -> dict:
+    return {"type": "http", "method": "GET", "path": path, "client": (client, 1234), "headers": []}
+
+def _bearer(token: str) -> dict:
+    return {b"authorization": f"Bearer {token}".encode()}
+
+def test_classify():
+    assert admission.classify("POST", "/picks/create") == CRITICAL
+    assert admission.classify("PUT", "/picks/abc") == CRITICAL
+    assert admission.classify("POST", "/auth/login") == CRITICAL
+    assert admission.classify("GET", "/pools/my-pools") == LOW
+    assert admission.classify("GET", "/schedule/") == NORMAL
+
+def test_clients_over_their_rate_get_429():
+    controller = AdmissionController(max_in_flight=100, rates=RATES)
+    for _ in range(3):
+        assert controller.admit("a", NORMAL) == (200, 0.0)
+        controller.release()
+    status, retry_after = controller.admit("a", NORMAL)
+    assert status == 429 and retry_after > 0
+    # Other clients, and the same client's other classes, have buckets of their own
+    assert controller.admit("b", NORMAL)[0] == 200
+    assert controller.admit("a", CRITICAL)[0] == 200
+    assert controller.stats()["counters"][NORMAL]["rate_limited"] == 1
+
+def test_low_and_normal_requests_are_shed_before_critical_ones():
+    controller = AdmissionController(max_in_flight=4, critical_reserve=0.5, low_share=0.25,
+                                     rates={priority: (100, 100) for priority in RATES})
+    assert controller.limits == {CRITICAL: 4, NORMAL: 2, LOW: 1}
+    assert controller.admit("a", LOW)[0] == 200
+    assert controller.admit("b", LOW) == (503, 1.0)
+    assert controller.admit("c", NORMAL)[0] == 200
+    assert controller.admit("d", NORMAL)[0] == 503
+    assert controller.admit("e", CRITICAL)[0] == 200
+    assert controller.admit("f", CRITICAL)[0] == 200
+    assert controller.admit("g", CRITICAL)[0] == 503
+    controller.release()
+    assert controller.admit("g", CRITICAL)[0] == 200
+    assert controller.stats()["counters"][LOW]["shed"] == 1
+
+def test_signed_in_users_are_limited_per_user():
+    token = create_access_token({"sub": "a@example.com", "sid": "one"})
+    other_session = create_access_token({"sub": "a@example.com", "sid": "two"})
+    assert admission._client_key(_scope("/pools/x"), _bearer(token)) == "user:a@example.com"
+    # Logging in again does not buy a fresh bucket, nor does changing address
+    assert admission._client_key(_scope("/pools/x", "198.51.100.1"), _bearer(other_session)) == "user:a@example.com"
+
+def test_unverified_tokens_are_limited_by_address():
+    address = "address:203.0.113.7"
+    assert admission._client_key(_scope("/pools/x"), {}) == address
+    assert admission._client_key(_scope("/pools/x"), _bearer("made.up.token")) == address
+    forged = create_access_token({"sub": "a@example.com"}).rsplit(".", 1)[0] + ".forged"
+    assert admission._client_key(_scope("/pools/x"), _bearer(forged)) == address
+    expired = create_access_token({"sub": "a@example.com"}, expires_delta=timedelta(minutes=-1))
+    assert admission._client_key(_scope("/pools/x"), _bearer(expired)) == address
+    reset = create_access_token({"sub": "a@example.com", "type": "password_reset"})
+    assert admission._client_key(_scope("/pools/x"), _bearer(reset)) == address
+    # Logins are always limited by address, whatever token comes with them
+    token = create_access_token({"sub": "a@example.com", "sid": "one"})
+    assert admission._client_key(_scope("/auth/login"), _bearer(token)) == address
+
+def test_middleware_answers_429_with_retry_after(monkeypatch):
+    monkeypatch.setattr(admission, "ADMISSION_ENABLED", True)
+    app = FastAPI()
+
+    @app.get("/pools/x")
+    def pool():
+        return {"ok": True}
+
+    app.add_middleware(AdmissionMiddleware, controller=AdmissionController(rates=RATES))
+    client = TestClient(app)
+    assert [client.get("/pools/x").status_code for _ in range(3)] == [200] * 3
+    response = client.get("/pools/x")
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) >= 1
+    # Health checks are never limited
+    assert client.get("/health").status_code == 404
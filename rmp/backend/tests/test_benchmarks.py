@@ -0,0 +1,43 @@
+import os
+import sys
+
+from sqlalchemy import create_engine, text
+
+from conftest import BACKEND_DIR
+
+sys.path.insert(0, os.path.join(BACKEND_DIR, "benchmarks"))
+import datagen
+import rush_bench
+
+def test_datagen_picks_like_survivor_players(tmp_path):
+    database_url = f"sqlite:///{tmp_path / 'bench.db'}"
+    counts = datagen.generate(database_url, num_pools=2, num_users=5, entries_per_user=2, week=4)
+    assert counts == {"users": 5, "pools": 2, "entries": 10, "picks": 30}
+
+    engine = create_engine(database_url)
+    with engine.connect() as conn:
+        # Each pick's team plays that week, and never twice for one entry
+        rows = conn.execute(text(
+            "SELECT p.entry_id, p.team_id FROM picks p JOIN Schedule s ON s.week_num = p.week "
+            "AND s.season = p.season AND p.team_id IN (s.home_team_id, s.away_team_id)"
+        )).all()
+        assert len(rows) == 30
+        assert len(set(rows)) == 30
+        assert conn.execute(text("SELECT MAX(week) FROM picks")).scalar() == 3
+    engine.dispose()
+
+    plan = rush_bench.load_plan(database_url, 4)
+    assert len(plan) == 5
+    assert all(len(entries) == 2 for _, entries in plan)
+
+def test_rate_limited_requests_are_not_errors():
+    results = rush_bench.Results()
+    results.record("picks_create", 0.01, 200)
+    results.record("picks_create", 0.01, 429)
+    results.record("picks_create", 0.01, 503)
+    results.record("picks_create", 0.01, 0)
+    summary = rush_bench.summarize(results, 1.0, {})
+    assert summary["requests"] == 4
+    assert summary["errors"] == 2
+    assert summary["rate_limited"] == 1
+    assert summary["endpoints"]["picks_create"]["rate_limited"] == 1
@@ -0,0 +1,53 @@
+from sqlalchemy import text
+
+from conftest import create_entry, create_pool, pool_database, register
+
+def _changes(client, user: dict, pool_id: str, since: int) -> dict:
+    response = client.get(f"/pools/{pool_id}/changes", params={"since": since}, headers=user["headers"])
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def test_pick_writes_are_logged(client, db):
+    user = register(client)
+    pool = create_pool(client, user)
+    entry = create_entry(client, user, pool["id"])
+    version = _changes(client, user, pool["id"], 0)["version"]
+
+    response = client.post("/picks/create", json={"entry_id": entry["id"], "week": 1, "team": "PHI"},
+                           headers=user["headers"])
+    pick_id = response.json()["id"]
+    changes = _changes(client, user, pool["id"], version)
+    assert [pick["id"] for pick in changes["picks"]] == [pick_id]
+    assert _changes(client, user, pool["id"], changes["version"]).get("picks", []) == []
+
+    client.delete(f"/picks/{pick_id}", headers=user["headers"])
+    assert _changes(client, user, pool["id"], changes["version"])["deleted_picks"] == [pick_id]
+
+def test_grading_and_locking_outside_the_app_are_logged(client, db):
+    user = register(client)
+    pool = create_pool(client, user)
+    entry = create_entry(client, user, pool["id"])
+    pick_id = client.post("/picks/create", json={"entry_id": entry["id"], "week": 1, "team": "PHI"},
+                          headers=user["headers"]).json()["id"]
+    version = _changes(client, user, pool["id"], 0)["version"]
+    other = register(client)
+
+    # As the grading script writes them, straight to the pool's database
+    database = pool_database(db, pool["id"])
+    with database.begin() as conn:
+        conn.execute(text("UPDATE picks SET locked = 1 WHERE id = :id"), {"id": pick_id})
+    changes = _changes(client, user, pool["id"], version)
+    assert changes["version"] == version + 1
+    assert [(pick["id"], pick["locked"]) for pick in changes["picks"]] == [(pick_id, True)]
+    # Logged as the entry owner's change, not a pool-wide one
+    assert not changes["pool_changed"]
+    assert _changes(client, other, pool["id"], version)["picks"] == []
+
+    with database.begin() as conn:
+        conn.execute(text("UPDATE picks SET result = 'win' WHERE id = :id"), {"id": pick_id})
+        # Writes that change neither are not logged
+        conn.execute(text("UPDATE picks SET result = 'win', updated_at = updated_at WHERE id = :id"),
+                     {"id": pick_id})
+    changes = _changes(client, user, pool["id"], changes["version"])
+    assert changes["version"] == version + 2
+    assert [(pick["id"], pick["result"]) for pick in changes["picks"]] == [(pick_id, "win")]
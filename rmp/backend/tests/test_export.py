@@ -0,0 +1,140 @@
+import csv
+import io
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+import export
+import models
+from conftest import create_pool, register
+
+def _entries(db, pool_id: str, user_id: str, names: list) -> list:
+    session = db.SessionLocal()
+    ids = []
+    for name in names:
+        entry_id = str(uuid.uuid4())
+        session.add(models.Entry(id=entry_id, pool_id=pool_id, user_id=user_id, name=name, alive=True,
+                                 created_at=datetime.utcnow()))
+        ids.append(entry_id)
+    session.commit()
+    session.close()
+    return ids
+
+def _picks(db, picks: list):
+    """picks: (entry_id, week, result) triples."""
+    session = db.SessionLocal()
+    for entry_id, week, result in picks:
+        session.add(models.Pick(id=str(uuid.uuid4()), entry_id=entry_id, week=week, team="PHI", result=result,
+                                created_at=datetime.utcnow()))
+    session.commit()
+    session.close()
+
+def _csv(response) -> list:
+    assert response.status_code == 200, response.text
+    return list(csv.reader(io.StringIO(response.text)))
+
+@pytest.fixture
+def statements(db):
+    """The SELECTs run on every database while the test runs."""
+    seen = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            seen.append(statement)
+
+    engines = [db.engine, *db.shard_engines.values()]
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", record)
+    yield seen
+    for engine in engines:
+        event.remove(engine, "before_cursor_execute", record)
+
+def test_exports_are_read_in_bounded_batches(client, db, monkeypatch, statements):
+    monkeypatch.setattr(export, "EXPORT_BATCH_SIZE", 3)
+    owner = register(client)
+    pool = create_pool(client, owner)
+    entry_ids = _entries(db, pool["id"], owner["id"], [f"Entry {i}" for i in range(7)] + [None])
+    _picks(db, [(entry_id, week, "win") for entry_id in entry_ids for week in (2, 1)])
+
+    sizes = []
+    batches = export._batches
+
+    def counted(report, params):
+        for batch in batches(report, params):
+            sizes.append(len(batch))
+            yield batch
+
+    monkeypatch.setattr(export, "_batches", counted)
+    statements.clear()
+    rows = _csv(client.get(f"/export/pools/{pool['id']}/picks", headers=owner["headers"]))
+
+    assert rows[0][:5] == ["pick_id", "entry_id", "entry_name", "user_email", "week"]
+    assert sorted((row[1], row[4]) for row in rows[1:]) == [(row[1], row[4]) for row in rows[1:]]
+    assert len({row[0] for row in rows[1:]}) == len(rows) - 1 == 16
+    assert sizes == [3, 3, 3, 3, 3, 1]
+    # Every query over picks asks for one batch, never the whole pool
+    pick_queries = [statement for statement in statements if "FROM picks" in statement]
+    assert len(pick_queries) == len(sizes)
+    assert all("LIMIT" in statement for statement in pick_queries)
+
+def test_standings_export_pages_through_ties_and_nulls(client, db, monkeypatch):
+    monkeypatch.setattr(export, "EXPORT_BATCH_SIZE", 2)
+    owner = register(client)
+    pool = create_pool(client, owner)
+    # Equal scores, equal and missing names: the entry id breaks every tie
+    entry_ids = _entries(db, pool["id"], owner["id"], ["b", "a", "a", None, "c"])
+    _picks(db, [(entry_ids[0], 1, "win"), (entry_ids[1], 1, "win"), (entry_ids[2], 1, "win"),
+                (entry_ids[4], 1, "loss")])
+
+    rows = _csv(client.get(f"/export/pools/{pool['id']}/standings", headers=owner["headers"]))[1:]
+    assert len(rows) == 5
+    assert {row[0] for row in rows} == set(entry_ids)
+    assert [row[1] for row in rows[:3]] == ["a", "a", "b"]
+    assert rows[0][0] < rows[1][0]
+    assert all(row[2] for row in rows)
+    # The losing pick knocked its entry out, last
+    assert rows[-1][0] == entry_ids[4]
+    assert rows[-1][3:] == ["False", "0", "1", "0"]
+
+def test_standings_export_scores_by_the_pools_rules(client, db):
+    owner = register(client)
+    response = client.post("/pools/create", json={"name": "Losers", "pool_type": "losing_survivor"},
+                           headers=owner["headers"])
+    assert response.status_code == 200, response.text
+    pool = response.json()
+    entry_ids = _entries(db, pool["id"], owner["id"], ["picked a loser", "picked a winner"])
+    _picks(db, [(entry_ids[0], 1, "loss"), (entry_ids[1], 1, "win")])
+
+    rows = _csv(client.get(f"/export/pools/{pool['id']}/standings", headers=owner["headers"]))
+    assert rows[0] == ["entry_id", "entry_name", "user_email", "alive", "correct", "incorrect", "points"]
+    assert [row[0] for row in rows[1:]] == entry_ids
+    assert [row[3:] for row in rows[1:]] == [["True", "1", "0", "1"], ["False", "0", "1", "0"]]
+    # The same scores as the API's
+    api = client.get(f"/pools/{pool['id']}/standings", headers=owner["headers"]).json()
+    assert [(row["entry_id"], row["points"]) for row in api] == [(entry_ids[0], 1), (entry_ids[1], 0)]
+
+def test_audit_export_since(client, db, monkeypatch):
+    monkeypatch.setattr(export, "EXPORT_BATCH_SIZE", 2)
+    now = datetime.utcnow()
+    session = db.SessionLocal()
+    for i in range(5):
+        session.add(models.AuditLog(id=f"log-{i}", action="test", created_at=now - timedelta(days=i)))
+    session.add(models.AuditLog(id="log-undated", action="test"))
+    session.commit()
+    session.close()
+
+    rows = list(export._batches(export.AUDIT_REPORT, {"since": None}))
+    assert [[row[0] for row in batch] for batch in rows] == [
+        ["log-undated", "log-4"], ["log-3", "log-2"], ["log-1", "log-0"]
+    ]
+    rows = list(export._batches(export.AUDIT_REPORT, {"since": now - timedelta(days=2, hours=1)}))
+    assert [row[0] for batch in rows for row in batch] == ["log-2", "log-1", "log-0"]
+
+def test_only_pool_admins_can_export(client, db):
+    owner = register(client)
+    pool = create_pool(client, owner)
+    other = register(client)
+    assert client.get(f"/export/pools/{pool['id']}/entries", headers=other["headers"]).status_code == 403
+    assert client.get(f"/export/pools/{pool['id']}/unknown", headers=owner["headers"]).status_code == 404
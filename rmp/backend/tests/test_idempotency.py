@@ -0,0 +1,98 @@
+import uuid
+
+import idempotency
+import models
+from conftest import create_pool, register
+from idempotency import IdempotencyStore
+
+def _create_entry(client, user: dict, pool_id: str, key: str, name: str = "Entry"):
+    return client.post("/entries/create", json={"name": name, "pool_id": pool_id},
+                       headers={**user["headers"], "Idempotency-Key": key})
+
+def _entry_count(db, pool_id: str) -> int:
+    session = db.SessionLocal()
+    try:
+        return session.query(models.Entry).filter(models.Entry.pool_id == pool_id).count()
+    finally:
+        session.close()
+
+def test_a_retry_replays_the_first_response(client, db):
+    user = register(client)
+    pool = create_pool(client, user)
+    key = str(uuid.uuid4())
+    first = _create_entry(client, user, pool["id"], key)
+    assert first.status_code == 200, first.text
+    assert "idempotent-replayed" not in first.headers
+
+    retry = _create_entry(client, user, pool["id"], key)
+    assert retry.status_code == 200
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert retry.json() == first.json()
+    assert _entry_count(db, pool["id"]) == 1
+
+    # Keys belong to the caller: another user's request with it runs
+    other = register(client)
+    other_pool = create_pool(client, other)
+    response = _create_entry(client, other, other_pool["id"], key)
+    assert response.status_code == 200
+    assert "idempotent-replayed" not in response.headers
+    assert _entry_count(db, other_pool["id"]) == 1
+
+def test_a_key_reused_for_another_request_is_rejected(client, db):
+    user = register(client)
+    pool = create_pool(client, user)
+    key = str(uuid.uuid4())
+    assert _create_entry(client, user, pool["id"], key).status_code == 200
+    response = _create_entry(client, user, pool["id"], key, name="Another")
+    assert response.status_code == 422
+    assert _entry_count(db, pool["id"]) == 1
+
+def test_a_retry_while_the_first_request_runs_gets_409(client, db, monkeypatch):
+    monkeypatch.setattr(idempotency, "IDEMPOTENCY_WAIT_SECONDS", 0.2)
+    monkeypatch.setattr(idempotency, "IDEMPOTENCY_POLL_SECONDS", 0.05)
+    user = register(client)
+    pool = create_pool(client, user)
+    key = str(uuid.uuid4())
+    # Another worker has claimed the key and not yet stored its response
+    body = f'{{"name":"Entry","pool_id":"{pool["id"]}"}}'.encode()
+    scoped = idempotency._scope_key({b"authorization": user["headers"]["Authorization"].encode()}, key.encode())
+    record, created = idempotency.store.begin(scoped, idempotency._request_hash("POST", "/entries/create", body))
+    assert created
+
+    response = client.post("/entries/create", content=body,
+                           headers={**user["headers"], "Idempotency-Key": key, "Content-Type": "application/json"})
+    assert response.status_code == 409
+    assert response.headers["retry-after"] == "1"
+    assert _entry_count(db, pool["id"]) == 0
+
+    # Once the first request fails, the key is free again
+    idempotency.store.abort(scoped)
+    response = client.post("/entries/create", content=body,
+                           headers={**user["headers"], "Idempotency-Key": key, "Content-Type": "application/json"})
+    assert response.status_code == 200, response.text
+    assert _entry_count(db, pool["id"]) == 1
+
+def test_keys_are_shared_by_every_worker(db):
+    # Two workers' stores over the same database
+    first, second = IdempotencyStore(db.SessionLocal), IdempotencyStore(db.SessionLocal)
+    record, created = first.begin("k", "hash")
+    assert created
+    record, created = second.begin("k", "hash")
+    assert not created and record.status is None
+
+    first.finish("k", 201, [(b"content-type", b"application/json")], b'{"id":1}')
+    record, created = second.begin("k", "hash")
+    assert not created
+    assert (record.status, record.headers, record.body) == (201, [(b"content-type", b"application/json")], b'{"id":1}')
+    # A stored response is never released
+    second.abort("k")
+    assert first.get("k").status == 201
+
+def test_expired_keys_can_be_used_again(db):
+    store = IdempotencyStore(db.SessionLocal, ttl_seconds=-1)
+    assert store.begin("old", "hash")[1]
+    store.finish("old", 200, [], b"{}")
+    assert store.get("old") is None
+    assert store.begin("old", "other hash")[1]
+    assert store.begin("older", "hash")[1]
+    assert store.purge_expired() == 2
@@ -0,0 +1,98 @@
+import time
+
+import pytest
+
+import invalidation
+from invalidation import MemoryBroker, MemoryBus, RedisBus
+
+def _workers(count: int, **kwargs) -> list:
+    broker = MemoryBroker()
+    return [MemoryBus(broker, **kwargs) for _ in range(count)]
+
+def _wait_for(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+def test_other_workers_receive_published_keys():
+    writer, reader = _workers(2)
+    received = {"writer": [], "reader": [], "other": []}
+    writer.subscribe("version", received["writer"].append)
+    reader.subscribe("version", received["reader"].append)
+    reader.subscribe("other", received["other"].append)
+
+    writer.publish("version", [["pool", "p1"], ["table", "teams"]])
+    writer.stop()
+    # Not the writer itself: it evicted its keys when it committed
+    assert received == {"writer": [], "reader": [["pool", "p1"], ["table", "teams"]], "other": []}
+    assert reader.counters["received"] == 2
+
+def test_keys_are_batched_into_few_messages():
+    writer, reader = _workers(2, max_batch=10)
+    received = []
+    reader.subscribe("rules", received.append)
+    sent = []
+    writer._send = lambda payload: (sent.append(payload), writer.broker.publish(writer.channel, payload))
+
+    # Queue everything before the publisher thread starts sending
+    for key in range(25):
+        writer._outbox.put(("rules", key))
+    writer.start()
+    writer.stop()
+    assert received == list(range(25))
+    assert len(sent) == 3
+
+def test_a_failing_handler_does_not_stop_the_others():
+    writer, reader = _workers(2)
+    received = []
+
+    def broken(key):
+        raise RuntimeError(key)
+
+    reader.subscribe("version", broken)
+    reader.subscribe("version", received.append)
+    writer.publish("version", ["a"])
+    writer.stop()
+    assert received == ["a"]
+
+def test_from_url():
+    assert isinstance(invalidation.from_url(""), MemoryBus)
+    assert isinstance(invalidation.from_url("memory://"), MemoryBus)
+    with pytest.raises(ValueError):
+        invalidation.from_url("kafka://broker:9092")
+
+def test_redis_bus_between_workers():
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    writer = RedisBus(client=fakeredis.FakeRedis(server=server))
+    reader = RedisBus(client=fakeredis.FakeRedis(server=server))
+    received = []
+    reader.subscribe("version", received.append)
+    reader.start()
+    try:
+        _wait_for(lambda: reader.client.pubsub_numsub(reader.channel)[0][1] == 1)
+        writer.publish("version", [["table", "schedule"]])
+        _wait_for(lambda: received)
+        assert received == [["table", "schedule"]]
+    finally:
+        writer.stop()
+        reader.stop()
+
+def test_redis_bus_resets_caches_after_reconnecting():
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    reader = RedisBus(client=fakeredis.FakeRedis(server=server))
+    resets = []
+    reader.on_reset(lambda: resets.append(True))
+    reader.start()
+    try:
+        _wait_for(lambda: reader.client.pubsub_numsub(reader.channel)[0][1] == 1)
+        assert resets == []
+        # Messages published while disconnected are lost, so every cache goes
+        server.connected = False
+        _wait_for(lambda: reader.counters["errors"])
+        server.connected = True
+        _wait_for(lambda: resets)
+    finally:
+        reader.stop()
@@ -0,0 +1,89 @@
+import json
+import logging
+import queue
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import logs
+from logs import JsonFormatter, NonBlockingQueueHandler, RequestIdFilter, RequestIdMiddleware, Sampler
+
+def _record(msg: str = "hello", level: int = logging.INFO, name: str = "test", **extra) -> logging.LogRecord:
+    record = logging.LogRecord(name, level, __file__, 1, msg, None, None)
+    for key, value in extra.items():
+        setattr(record, key, value)
+    return record
+
+def test_parse_sample_rates():
+    assert logs.parse_sample_rates("request=0.01, register=0.5,") == {"request": 0.01, "register": 0.5}
+    assert logs.parse_sample_rates("") == {}
+
+def test_sampled_events_keep_their_share_and_warnings_always_pass(monkeypatch):
+    sampler = Sampler({"request": 0.25, "noisy.logger": 0})
+    draws = iter([0.1, 0.3, 0.2, 0.9, 0.5, 0.5])
+    monkeypatch.setattr(logs.random, "random", lambda: next(draws))
+    assert [sampler.filter(_record(event="request")) for _ in range(4)] == [True, False, True, False]
+    assert sampler.sampled_out == 2
+
+    # Keyed on the logger name when a record has no event
+    assert not sampler.filter(_record(name="noisy.logger"))
+    assert sampler.filter(_record(name="noisy.logger", level=logging.WARNING))
+    assert sampler.filter(_record(event="request", level=logging.ERROR))
+    assert sampler.filter(_record(event="unsampled"))
+    assert sampler.sampled_out == 3
+
+def test_a_full_queue_drops_records_instead_of_blocking():
+    handler = NonBlockingQueueHandler(queue.Queue(2))
+    for i in range(5):
+        handler.handle(_record(f"record {i}"))
+    assert handler.dropped == 3
+    assert [handler.queue.get_nowait().getMessage() for _ in range(2)] == ["record 0", "record 1"]
+
+def test_records_are_rendered_before_they_are_queued():
+    handler = NonBlockingQueueHandler(queue.Queue())
+    items = ["a"]
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, "items=%s", (items,), None)
+    handler.handle(record)
+    items.append("b")
+    queued = handler.queue.get_nowait()
+    assert queued.getMessage() == "items=['a']"
+    assert queued.args is None
+
+def test_json_lines_carry_extras():
+    line = json.loads(JsonFormatter().format(_record("user registered", event="register", user_id="u1",
+                                                      request_id=None)))
+    assert line["msg"] == "user registered"
+    assert (line["level"], line["logger"], line["event"], line["user_id"]) == ("INFO", "test", "register", "u1")
+    # Unset extras are left out
+    assert "request_id" not in line
+
+def test_requests_get_an_id_for_their_records_and_response():
+    app = FastAPI()
+    seen = []
+    handler = NonBlockingQueueHandler(queue.Queue())
+    handler.addFilter(RequestIdFilter())
+    logger = logging.getLogger("tests.request_ids")
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+
+    @app.get("/work")
+    def work():
+        logger.info("working")
+        seen.append(logs.request_id.get())
+        return {}
+
+    app.add_middleware(RequestIdMiddleware)
+    client = TestClient(app)
+    try:
+        response = client.get("/work", headers={"X-Request-ID": "abc-123"})
+        assert response.headers["x-request-id"] == "abc-123"
+        # Ids that are not safe to log are replaced
+        response = client.get("/work", headers={"X-Request-ID": "bad id\nforged"})
+        assert response.headers["x-request-id"] != "bad id\nforged"
+        assert len(response.headers["x-request-id"]) == 32
+    finally:
+        logger.removeHandler(handler)
+    assert seen == ["abc-123", response.headers["x-request-id"]]
+    records = [handler.queue.get_nowait() for _ in range(handler.queue.qsize())]
+    assert [record.request_id for record in records] == seen
+    assert logs.request_id.get() is None
@@ -0,0 +1,84 @@
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+import metrics
+from metrics import Histogram, MetricsMiddleware, Registry
+
+def _app(registry: Registry, engine, slow: bool = False) -> FastAPI:
+    app = FastAPI()
+    router = APIRouter(prefix="/items")
+
+    @router.get("/{item_id}")
+    def get_item(item_id: int):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+        return {"id": item_id}
+
+    @router.get("/{item_id}/broken")
+    def broken(item_id: int):
+        raise RuntimeError("broken")
+
+    app.include_router(router)
+    app.add_middleware(MetricsMiddleware, registry=registry)
+    return app
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram((0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        histogram.observe(value)
+    assert list(histogram.lines("latency", 'route="/x"')) == [
+        'latency_bucket{route="/x",le="0.1"} 1',
+        'latency_bucket{route="/x",le="1.0"} 3',
+        'latency_bucket{route="/x",le="+Inf"} 4',
+        'latency_sum{route="/x"} 4.250000',
+        'latency_count{route="/x"} 4',
+    ]
+
+def test_requests_are_labelled_by_full_route_template(monkeypatch):
+    registry = Registry()
+    engine = create_engine("sqlite://")
+    metrics.instrument_engine(engine, "test", registry=registry)
+    client = TestClient(_app(registry, engine), raise_server_exceptions=False)
+
+    for item_id in (1, 2):
+        assert client.get(f"/items/{item_id}").status_code == 200
+    assert client.get("/items/3/broken").status_code == 500
+    assert client.get("/nowhere").status_code == 404
+
+    assert registry.responses == {
+        ("GET", "/items/{item_id}", 200): 2,
+        ("GET", "/items/{item_id}/broken", 500): 1,
+        ("GET", "unmatched", 404): 1,
+    }
+    assert registry.latency[("GET", "/items/{item_id}")].count == 2
+    # Two statements per request, timed
+    assert registry.db_statements[("GET", "/items/{item_id}")] == 4
+    assert registry.db_seconds[("GET", "/items/{item_id}")] > 0
+    assert registry.db_statements[("GET", "unmatched")] == 0
+    assert registry.in_flight == 0
+    assert registry.pool_wait["test"].count >= 1
+
+    rendered = registry.render()
+    assert 'rmp_http_responses_total{method="GET",route="/items/{item_id}",status="200"} 2' in rendered
+    assert 'rmp_db_statements_total{method="GET",route="/items/{item_id}"} 4' in rendered
+    assert 'rmp_db_pool_checkout_wait_seconds_count{pool="test"}' in rendered
+
+def test_slow_requests_are_counted_and_logged_with_their_sql(monkeypatch, caplog):
+    monkeypatch.setattr(metrics, "SLOW_REQUEST_MS", 0)
+    registry = Registry()
+    engine = create_engine("sqlite://")
+    metrics.instrument_engine(engine, "test", registry=registry)
+    client = TestClient(_app(registry, engine))
+    with caplog.at_level("WARNING", logger="metrics"):
+        client.get("/items/1")
+    assert registry.slow_requests[("GET", "/items/{item_id}")] == 1
+    assert "SELECT 1" in caplog.text and "sql_statements=2" in caplog.text
+
+def test_the_app_serves_its_metrics(client, db):
+    client.get("/schedule/week/1")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'route="/schedule/week/{week_num}"' in response.text
@@ -0,0 +1,172 @@
+import json
+import os
+import smtplib
+import sys
+import uuid
+from datetime import datetime, timedelta
+from email import message_from_bytes
+
+import pytest
+from sqlalchemy import text
+
+import jobs
+import models
+import notifications
+from conftest import BACKEND_DIR, create_entry, create_pool, register
+
+sys.path.insert(0, os.path.join(BACKEND_DIR, "benchmarks"))
+from smtp_sink import SmtpSink
+
+class Sink(SmtpSink):
+    """Keeps every message it receives."""
+
+    def __init__(self):
+        super().__init__()
+        self.inbox = []
+
+    def received(self, recipients: list, data: bytes):
+        super().received(recipients, data)
+        with self.lock:
+            self.inbox.append(message_from_bytes(data))
+
+@pytest.fixture
+def sink(monkeypatch):
+    sink = Sink().start()
+    mailer = notifications.SmtpPool(host=sink.host, port=sink.port, starttls=False, size=2,
+                                    messages_per_connection=2, timeout=5)
+    monkeypatch.setattr(notifications, "mailer", mailer)
+    yield sink
+    mailer.close()
+    sink.stop()
+
+def _upcoming_week(db, week: int):
+    with db.engine.begin() as conn:
+        conn.execute(text("UPDATE Schedule SET start_time = :start WHERE week_num = :week"),
+                     {"start": datetime.utcnow() + timedelta(days=2), "week": week})
+
+def _pick(db, entry_id: str, week: int):
+    session = db.SessionLocal()
+    session.add(models.Pick(id=str(uuid.uuid4()), entry_id=entry_id, week=week, team="PHI",
+                            created_at=datetime.utcnow()))
+    session.commit()
+    session.close()
+
+def _run(db, kind: str, week: int) -> dict:
+    session = db.SessionLocal()
+    job = jobs.enqueue(session, kind, {"week": week})
+    session.commit()
+    job_id = job.id
+    session.close()
+    assert jobs.runner.run_once()
+    with db.engine.connect() as conn:
+        job = conn.execute(text("SELECT status, result, error FROM jobs WHERE id = :id"), {"id": job_id}).one()
+    assert job.status == jobs.DONE, job.error
+    return json.loads(job.result)
+
+def test_reminders_go_once_to_each_user_missing_a_pick(client, db, sink, monkeypatch):
+    monkeypatch.setattr(notifications, "NOTIFY_BATCH_SIZE", 1)
+    _upcoming_week(db, 1)
+    owner = register(client, "owner@example.com")
+    pool = create_pool(client, owner, "Sunday Pool")
+    missing = [create_entry(client, owner, pool["id"], name) for name in ("First", "Second")]
+    done = register(client)
+    _pick(db, create_entry(client, done, pool["id"], "Picked")["id"], 1)
+    late = register(client, "late@example.com")
+    create_entry(client, late, pool["id"], "Late")
+
+    result = _run(db, notifications.DEADLINE_REMINDER, 1)
+    assert result == {"users": 2, "notified": 2, "skipped": 0, "email_failures": 0}
+    assert sorted(message["To"] for message in sink.inbox) == ["late@example.com", "owner@example.com"]
+    # One email per user, listing all of their entries
+    body = next(message for message in sink.inbox if message["To"] == "owner@example.com").get_payload()
+    assert all(f"{entry['name']} (Sunday Pool)" in body for entry in missing)
+    # Two connections, however many messages
+    assert sink.connections <= 2
+
+    response = client.get("/notifications/", headers=owner["headers"])
+    assert [notification["title"] for notification in response.json()] == ["Week 1 picks are due"]
+    assert client.get("/notifications/", headers=done["headers"]).json() == []
+
+    # Run again, the users who already have it are skipped
+    result = _run(db, notifications.DEADLINE_REMINDER, 1)
+    assert result == {"users": 2, "notified": 0, "skipped": 2, "email_failures": 0}
+    assert len(sink.inbox) == 2
+
+def test_no_reminders_once_the_week_has_kicked_off(client, db, sink):
+    owner = register(client)
+    create_entry(client, owner, create_pool(client, owner)["id"])
+    with db.engine.begin() as conn:
+        conn.execute(text("UPDATE Schedule SET start_time = :start WHERE week_num = 1"),
+                     {"start": datetime.utcnow() - timedelta(hours=1)})
+    assert _run(db, notifications.DEADLINE_REMINDER, 1) == {"skipped": "week has no upcoming kickoff"}
+    assert sink.inbox == []
+
+def test_notifications_are_marked_read(client, db, sink):
+    _upcoming_week(db, 1)
+    owner = register(client)
+    create_entry(client, owner, create_pool(client, owner)["id"])
+    _run(db, notifications.DEADLINE_REMINDER, 1)
+
+    notification = client.get("/notifications/?unread=true", headers=owner["headers"]).json()[0]
+    response = client.post(f"/notifications/{notification['id']}/read", headers=owner["headers"])
+    assert response.json()["read_at"] is not None
+    assert client.get("/notifications/?unread=true", headers=owner["headers"]).json() == []
+    # Only its owner can see or mark it
+    other = register(client)
+    assert client.post(f"/notifications/{notification['id']}/read", headers=other["headers"]).status_code == 404
+
+class FakeSmtp:
+    """Stands in for smtplib.SMTP; `script` says what each send does."""
+
+    connects = 0
+    script = []
+    sent = []
+
+    def __init__(self, host, port, timeout=None):
+        FakeSmtp.connects += 1
+
+    def send_message(self, message):
+        outcome = FakeSmtp.script.pop(0) if FakeSmtp.script else None
+        if outcome is not None:
+            raise outcome
+        FakeSmtp.sent.append(message["To"])
+
+    def quit(self):
+        pass
+
+@pytest.fixture
+def fake_smtp(monkeypatch):
+    monkeypatch.setattr(notifications.smtplib, "SMTP", FakeSmtp)
+    monkeypatch.setattr(FakeSmtp, "connects", 0)
+    monkeypatch.setattr(FakeSmtp, "script", [])
+    monkeypatch.setattr(FakeSmtp, "sent", [])
+    return FakeSmtp
+
+def _messages(count: int) -> list:
+    return [notifications.email_message(f"user{i}@example.com", "Subject", "Body") for i in range(count)]
+
+def test_smtp_pool_reconnects_a_dropped_connection(fake_smtp):
+    pool = notifications.SmtpPool(host="relay", starttls=False, size=1, messages_per_connection=100)
+    fake_smtp.script = [None, smtplib.SMTPServerDisconnected("idle")]
+    assert pool.send_many(_messages(2)) == {}
+    assert fake_smtp.sent == ["user0@example.com", "user1@example.com"]
+    assert fake_smtp.connects == 2
+    pool.close()
+
+def test_smtp_pool_rotates_connections(fake_smtp):
+    pool = notifications.SmtpPool(host="relay", starttls=False, size=1, messages_per_connection=2)
+    pool.send_many(_messages(5))
+    assert fake_smtp.connects == 3
+    pool.close()
+
+def test_refused_recipients_are_reported_and_an_unreachable_relay_raises(fake_smtp):
+    pool = notifications.SmtpPool(host="relay", starttls=False, size=1)
+    fake_smtp.script = [smtplib.SMTPRecipientsRefused({"user0@example.com": (550, b"no such user")})]
+    failed = pool.send_many(_messages(2))
+    assert list(failed) == ["user0@example.com"]
+    assert fake_smtp.sent == ["user1@example.com"]
+
+    fake_smtp.script = [ConnectionRefusedError("refused"), ConnectionRefusedError("refused")]
+    with pytest.raises(notifications.SmtpUnavailable):
+        pool.send_many(_messages(1))
+    pool.close()
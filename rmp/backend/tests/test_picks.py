@@ -0,0 +1,88 @@
+import pytest
+from sqlalchemy import text
+
+import group_commit
+import rules
+import sharding
+import teams
+import versions
+from conftest import create_entry, create_pool, pool_database, register
+
+def test_pick_create_update_delete(client, db):
+    user = register(client)
+    pool = create_pool(client, user)
+    entry = create_entry(client, user, pool["id"])
+
+    response = client.post("/picks/create", json={"entry_id": entry["id"], "week": 1, "team": "PHI"},
+                           headers=user["headers"])
+    assert response.status_code == 200, response.text
+    pick = response.json()
+    assert (pick["week"], pick["team"]) == (1, "PHI")
+    assert pick["team_id"] is not None
+
+    if db.mode == "shards":
+        # New pools are placed on a shard, never on the primary
+        assert sharding.shard_map.pool_shard(pool["id"]) in db.shard_engines
+    # The pick lives with its pool
+    with pool_database(db, pool["id"]).connect() as conn:
+        assert conn.execute(text("SELECT team FROM picks WHERE id = :id"), {"id": pick["id"]}).scalar() == "PHI"
+
+    response = client.put(f"/picks/{pick['id']}", json={"team": "DAL"}, headers=user["headers"])
+    assert response.status_code == 200, response.text
+    assert response.json()["team"] == "DAL"
+
+    response = client.get(f"/picks/entry/{entry['id']}", headers=user["headers"])
+    assert response.status_code == 200
+    assert [(p["week"], p["team"]) for p in response.json()] == [(1, "DAL")]
+
+    response = client.delete(f"/picks/{pick['id']}", headers=user["headers"])
+    assert response.status_code == 200, response.text
+    response = client.get(f"/picks/entry/{entry['id']}", headers=user["headers"])
+    assert response.json() == []
+
+def test_pick_rejects_a_team_used_in_an_earlier_week(client, db):
+    user = register(client)
+    entry = create_entry(client, user, create_pool(client, user)["id"])
+    response = client.post("/picks/create", json={"entry_id": entry["id"], "week": 1, "team": "PHI"},
+                           headers=user["headers"])
+    assert response.status_code == 200, response.text
+
+    response = client.post("/picks/create", json={"entry_id": entry["id"], "week": 2, "team": "PHI"},
+                           headers=user["headers"])
+    assert response.status_code == 400
+    assert "already been selected" in response.json()["detail"]
+
+def test_pick_on_someone_elses_entry_is_not_found(client, db):
+    owner = register(client)
+    entry = create_entry(client, owner, create_pool(client, owner)["id"])
+    other = register(client)
+    response = client.post("/picks/create", json={"entry_id": entry["id"], "week": 1, "team": "PHI"},
+                           headers=other["headers"])
+    assert response.status_code == 404
+
+@pytest.mark.parametrize("grouped", [False, True])
+def test_picks_load_rules_and_season_on_the_requests_session(client, db, monkeypatch, grouped):
+    user = register(client)
+    pool = create_pool(client, user)
+    entry = create_entry(client, user, pool["id"])
+    monkeypatch.setattr(group_commit, "PICK_GROUP_COMMIT", grouped)
+
+    def second_session():
+        raise AssertionError("the request already holds a session")
+
+    # Cold caches, and no sessions of their own to fill them with
+    versions.cache.clear()
+    rules._plans.clear()
+    monkeypatch.setattr(teams.team_map, "_version", None)
+    for module in (versions, rules):
+        monkeypatch.setattr(module, "SessionLocal", second_session)
+
+    response = client.post("/picks/create", json={"entry_id": entry["id"], "week": 1, "team": "PHI"},
+                           headers=user["headers"])
+    assert response.status_code == 200, response.text
+    pick_id = response.json()["id"]
+    with pool_database(db, pool["id"]).connect() as conn:
+        assert conn.execute(text("SELECT season FROM picks WHERE id = :id"), {"id": pick_id}).scalar()
+    rules._plans.clear()
+    response = client.put(f"/picks/{pick_id}", json={"team": "DAL"}, headers=user["headers"])
+    assert response.status_code == 200, response.text
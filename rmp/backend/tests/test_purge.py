@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, text, update
+
+import jobs
+import models
+from conftest import create_entry, create_pool, pool_database, register
+
+def _job(db, job_id: str) -> dict:
+    with db.engine.connect() as conn:
+        return conn.execute(select(models.Job.__table__).where(models.Job.id == job_id)).mappings().one()
+
+def _run_at(db, job_id: str, when: datetime):
+    with db.engine.begin() as conn:
+        conn.execute(update(models.Job.__table__).where(models.Job.id == job_id).values(run_at=when))
+
+def _count(engine, sql: str, **params) -> int:
+    with engine.connect() as conn:
+        return conn.execute(text(sql), params).scalar()
+
+def _pick(client, user: dict, entry_id: str, week: int, team: str):
+    response = client.post("/picks/create", json={"entry_id": entry_id, "week": week, "team": team},
+                           headers=user["headers"])
+    assert response.status_code == 200, response.text
+
+def test_deleted_entry_is_hidden_then_purged(client, db):
+    user = register(client)
+    pool = create_pool(client, user)
+    entry = create_entry(client, user, pool["id"])
+    _pick(client, user, entry["id"], 1, "PHI")
+    _pick(client, user, entry["id"], 2, "KC")
+
+    response = client.delete(f"/entries/{entry['id']}", headers=user["headers"])
+    assert response.status_code == 202, response.text
+    job_id = response.json()["job_id"]
+    # Gone from the API at once, still on disk until the job runs
+    assert client.get(f"/entries/{entry['id']}", headers=user["headers"]).status_code == 404
+    pool_db = pool_database(db, pool["id"])
+    assert _count(pool_db, "SELECT COUNT(*) FROM picks WHERE entry_id = :id", id=entry["id"]) == 2
+
+    assert jobs.runner.run_once()
+    job = _job(db, job_id)
+    assert job["status"] == jobs.DONE, job["error"]
+    assert _count(pool_db, "SELECT COUNT(*) FROM picks WHERE entry_id = :id", id=entry["id"]) == 0
+    assert _count(pool_db, "SELECT COUNT(*) FROM entries WHERE id = :id", id=entry["id"]) == 0
+
+def test_user_purge_retries_until_their_pool_is_purged(client, db):
+    owner = register(client)
+    pool = create_pool(client, owner)
+    entry = create_entry(client, owner, pool["id"])
+    _pick(client, owner, entry["id"], 1, "PHI")
+    pool_db = pool_database(db, pool["id"])
+
+    response = client.delete(f"/pools/{pool['id']}", headers=owner["headers"])
+    assert response.status_code == 202, response.text
+    pool_job = response.json()["job_id"]
+    response = client.delete(f"/users/{owner['id']}", headers=owner["headers"])
+    assert response.status_code == 202, response.text
+    user_job = response.json()["job_id"]
+
+    # The user purge runs first and has to wait for the pool purge
+    later = datetime.utcnow() + timedelta(hours=1)
+    _run_at(db, pool_job, later)
+    assert jobs.runner.run_once()
+    job = _job(db, user_job)
+    assert job["status"] == jobs.QUEUED
+    assert job["attempts"] == 1
+    assert job["error"].startswith("StillReferenced")
+    assert job["run_at"] > datetime.utcnow()
+    assert _count(db.engine, "SELECT COUNT(*) FROM users WHERE id = :id", id=owner["id"]) == 1
+    # What could go did go, and is not redone on the retry
+    assert _count(pool_db, "SELECT COUNT(*) FROM picks WHERE entry_id = :id", id=entry["id"]) == 0
+    assert _count(db.engine, "SELECT COUNT(*) FROM sessions WHERE user_id = :id", id=owner["id"]) == 0
+
+    _run_at(db, pool_job, datetime.utcnow())
+    assert jobs.runner.run_once()
+    assert _job(db, pool_job)["status"] == jobs.DONE
+    assert _count(pool_db, "SELECT COUNT(*) FROM pools WHERE id = :id", id=pool["id"]) == 0
+
+    _run_at(db, user_job, datetime.utcnow())
+    assert jobs.runner.run_once()
+    job = _job(db, user_job)
+    assert job["status"] == jobs.DONE, job["error"]
+    assert job["attempts"] == 2
+    assert _count(db.engine, "SELECT COUNT(*) FROM users WHERE id = :id", id=owner["id"]) == 0
+    assert not jobs.runner.run_once()
@@ -0,0 +1,55 @@
+import gzip
+import json
+
+from fastapi import Request
+
+import response_cache
+from response_cache import ResponseCache, cached_json_response
+
+def _request(accept_encoding: str = "") -> Request:
+    headers = [(b"accept-encoding", accept_encoding.encode())] if accept_encoding else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+def _builder(values: list):
+    calls = []
+
+    def build():
+        calls.append(1)
+        return values
+    return build, calls
+
+def test_payloads_are_rebuilt_when_their_version_moves():
+    cache = ResponseCache()
+    build, calls = _builder([1, 2, 3])
+    assert cache.get_or_build(("key",), (1,), build).identity == b"[1,2,3]"
+    cache.get_or_build(("key",), (1,), build)
+    assert len(calls) == 1
+    cache.get_or_build(("key",), (2,), build)
+    assert len(calls) == 2
+
+def test_payloads_expire_even_if_the_version_never_moves(monkeypatch):
+    cache = ResponseCache(ttl=60)
+    now = [1000.0]
+    monkeypatch.setattr(response_cache.time, "monotonic", lambda: now[0])
+    build, calls = _builder(["old"])
+    cache.get_or_build(("key",), (1,), build)
+    now[0] += 59
+    cache.get_or_build(("key",), (1,), build)
+    assert len(calls) == 1
+    now[0] += 2
+    cache.get_or_build(("key",), (1,), build)
+    assert len(calls) == 2
+
+def test_responses_use_the_precompressed_variant(monkeypatch):
+    monkeypatch.setattr(response_cache, "cache", ResponseCache())
+    values = [{"team": "PHI", "index": i} for i in range(100)]
+    response = cached_json_response(_request("gzip"), ("key",), (1,), lambda: values, etag='"abc"',
+                                    cache_control="public, max-age=60")
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == '"abc-gzip"'
+    assert json.loads(gzip.decompress(response.body)) == values
+
+    response = cached_json_response(_request(), ("key",), (1,), lambda: values, etag='"abc"')
+    assert "content-encoding" not in response.headers
+    assert response.headers["etag"] == '"abc"'
+    assert json.loads(response.body) == values
@@ -0,0 +1,132 @@
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+import models
+import rules
+from conftest import PASSWORD, create_entry, create_pool, register
+
+def _rule(id: str, rule_type: str, default_value: str = None):
+    return SimpleNamespace(id=id, rule_type=rule_type, default_value=default_value)
+
+@pytest.fixture
+def long_lived_plans(monkeypatch):
+    # Only an eviction can make a plan change during the test
+    monkeypatch.setattr(rules, "RULE_PLAN_TTL_SECONDS", 3600)
+
+def _super_admin(client, db) -> dict:
+    user = register(client)
+    session = db.SessionLocal()
+    user_row = session.query(models.User).filter(models.User.id == user["id"]).one()
+    user_row.role = models.UserRole.SUPER_ADMIN
+    email = user_row.email
+    session.commit()
+    session.close()
+    # A new session, so the cached one without the role is not used
+    response = client.post("/auth/login", json={"email": email, "password": PASSWORD})
+    return {"id": user["id"], "headers": {"Authorization": f"Bearer {response.json()['access_token']}"}}
+
+def _picks(db, picks: list):
+    """picks: (entry_id, week, result) triples."""
+    session = db.SessionLocal()
+    for entry_id, week, result in picks:
+        session.add(models.Pick(id=str(uuid.uuid4()), entry_id=entry_id, week=week, team=f"T{week}",
+                                result=result, created_at=datetime.utcnow()))
+    session.commit()
+    session.close()
+
+def test_chosen_rules_override_the_formats_defaults():
+    format_rules = [
+        _rule("strikes", "strikes", "1"),
+        _rule("second-chance", "strikes", "2"),
+        _rule("points", "correct_points", "1"),
+        _rule("future", "not_yet_known", "x"),
+    ]
+    plan = rules.compile_plan("survivor", format_rules, {})
+    # Unchosen rules apply in id order; settings no rule mentions keep the defaults
+    assert plan.strikes == 1
+    assert plan.correct_points == 1
+    assert plan.pick_result == "win" and plan.unique_teams is True
+
+    plan = rules.compile_plan("survivor", format_rules, {"second-chance": None, "points": "3"})
+    # A chosen rule beats the format's rule for the same setting, with its default or its own value
+    assert plan.strikes == 2
+    assert plan.correct_points == 3
+    assert plan.pool_type == "survivor"
+
+def test_plans_are_immutable():
+    plan = rules.compile_plan("survivor", [], {})
+    with pytest.raises(AttributeError):
+        plan.strikes = 3
+    with pytest.raises(AttributeError):
+        plan.extra = True
+    assert plan.strikes == 1
+
+def test_setting_a_pools_rules_evicts_its_plan(client, db, long_lived_plans):
+    owner = register(client)
+    pool = create_pool(client, owner)
+    other = create_pool(client, owner, name="Other")
+    url = f"/pools/{pool['id']}/rules"
+    assert client.get(url, headers=owner["headers"]).json()["settings"]["strikes"] == 1
+    other_plan = rules.plan_for(other["id"])
+
+    response = client.put(url, json=[{"rule_id": "survivor-second-chance"}], headers=owner["headers"])
+    assert response.status_code == 200, response.text
+    assert response.json()["settings"]["strikes"] == 2
+    assert client.get(url, headers=owner["headers"]).json()["settings"]["strikes"] == 2
+    # Other pools keep their plans
+    assert rules.plan_for(other["id"]) is other_plan
+
+    response = client.put(url, json=[{"rule_id": "losing-second-chance"}], headers=owner["headers"])
+    assert response.status_code == 400
+    assert client.get(url, headers=owner["headers"]).json()["settings"]["strikes"] == 2
+
+def test_editing_a_rule_evicts_every_plan(client, db, long_lived_plans):
+    admin = _super_admin(client, db)
+    pool = create_pool(client, admin)
+    url = f"/pools/{pool['id']}/rules"
+    assert client.get(url, headers=admin["headers"]).json()["settings"]["strikes"] == 1
+
+    owner = register(client)
+    assert client.patch("/rules/survivor-strikes", json={"default_value": "3"},
+                        headers=owner["headers"]).status_code == 403
+    response = client.patch("/rules/survivor-strikes", json={"default_value": "3"}, headers=admin["headers"])
+    assert response.status_code == 200, response.text
+    assert client.get(url, headers=admin["headers"]).json()["settings"]["strikes"] == 3
+
+    response = client.patch("/rules/survivor-strikes", json={"default_value": "none"}, headers=admin["headers"])
+    assert response.status_code == 400
+    assert client.get(url, headers=admin["headers"]).json()["settings"]["strikes"] == 3
+
+def test_standings_and_eliminations_follow_the_plan(client, db):
+    owner = register(client)
+    pool = create_pool(client, owner)
+    leader, trailer, out = (create_entry(client, owner, pool["id"], name)["id"] for name in ("a", "b", "c"))
+    _picks(db, [(leader, 1, "win"), (leader, 2, "win"), (trailer, 1, "win"), (out, 1, "loss")])
+
+    response = client.get(f"/pools/{pool['id']}/standings", headers=owner["headers"])
+    assert [(row["entry_id"], row["correct"], row["incorrect"], row["points"], row["alive"])
+            for row in response.json()] == [(leader, 2, 0, 2, True), (trailer, 1, 0, 1, True), (out, 0, 1, 0, False)]
+
+    session = db.SessionLocal()
+    plan = rules.plan_for(pool["id"], session)
+    assert rules.apply_eliminations(session, plan, pool["id"]) == {"eliminated": 1, "revived": 0}
+    session.commit()
+    # Already in line: nothing more to do
+    assert rules.apply_eliminations(session, plan, pool["id"]) == {"eliminated": 0, "revived": 0}
+    alive = dict(session.query(models.Entry.id, models.Entry.alive).filter(models.Entry.pool_id == pool["id"]))
+    assert alive == {leader: True, trailer: True, out: False}
+
+    # A corrected result brings the entry back
+    session.query(models.Pick).filter(models.Pick.entry_id == out).update({models.Pick.result: "win"})
+    assert rules.apply_eliminations(session, plan, pool["id"]) == {"eliminated": 0, "revived": 1}
+    session.commit()
+    assert session.query(models.Entry.alive).filter(models.Entry.id == out).scalar() is True
+
+    # Without elimination nobody is knocked out
+    pickem = rules.compile_plan("pickem", [_rule("no-elimination", "elimination", "false")], {})
+    session.query(models.Pick).filter(models.Pick.entry_id == out).update({models.Pick.result: "loss"})
+    assert rules.apply_eliminations(session, pickem, pool["id"]) == {"eliminated": 0, "revived": 0}
+    session.close()
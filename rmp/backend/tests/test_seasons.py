@@ -0,0 +1,49 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import text
+
+import seasons
+import versions
+
+@pytest.fixture
+def fresh_versions(monkeypatch):
+    monkeypatch.setattr(versions, "TABLE_VERSION_TTL_SECONDS", 0)
+
+def test_season_of():
+    assert seasons.season_of(datetime(2025, 9, 7)) == 2025
+    assert seasons.season_of(datetime(2026, 1, 4)) == 2025
+    assert seasons.season_of(datetime(2026, 3, 1)) == 2026
+
+def test_pinning_the_season_moves_schedule_etags_and_payloads(client, db, monkeypatch):
+    current = seasons.current_season()
+    response = client.get("/schedule/week/1")
+    assert response.json()
+    etag = response.headers["etag"]
+
+    monkeypatch.setattr(seasons, "CURRENT_SEASON", str(current + 1))
+    response = client.get("/schedule/week/1", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    # Not the cached payload of the season before
+    assert response.json() == []
+    assert client.get("/schedule/").json() == []
+
+def test_a_new_seasons_schedule_takes_over(client, db, fresh_versions):
+    current = seasons.current_season()
+    etag = client.get("/schedule/week/1").headers["etag"]
+    teams_etag = client.get("/schedule/teams/1").headers["etag"]
+
+    with db.engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO Schedule (game_id, week_num, home_team_id, away_team_id, start_time, winning_team_id, season) "
+            "SELECT 999999, 1, home_team_id, away_team_id, :start, '99', :season FROM Schedule LIMIT 1"
+        ), {"start": datetime(current + 1, 9, 10, 20, 20), "season": current + 1})
+
+    assert seasons.current_season() == current + 1
+    response = client.get("/schedule/week/1", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert [game["game_id"] for game in response.json()] == [999999]
+    response = client.get("/schedule/teams/1", headers={"If-None-Match": teams_etag})
+    assert response.status_code == 200
+    assert len(response.json()) == 2
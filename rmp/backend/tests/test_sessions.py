@@ -0,0 +1,105 @@
+import uuid
+from datetime import datetime
+
+import pytest
+
+import auth_sessions
+import models
+from conftest import PASSWORD, register
+
+def _login(client, email: str) -> dict:
+    response = client.post("/auth/login", json={"email": email, "password": PASSWORD})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+def _signed_in_twice(client):
+    email = f"{uuid.uuid4().hex[:12]}@example.com"
+    user = register(client, email)
+    return user, user["headers"], _login(client, email)
+
+@pytest.fixture
+def poll_every_request(monkeypatch):
+    monkeypatch.setattr(auth_sessions.cache, "poll_seconds", 0)
+    monkeypatch.setattr(auth_sessions.cache, "_next_poll", 0.0)
+
+def test_logout_revokes_only_that_session(client, db):
+    user, first, second = _signed_in_twice(client)
+    assert client.post("/auth/logout", headers=first).status_code == 200
+    assert client.get("/auth/me", headers=first).status_code == 401
+    assert client.get("/auth/me", headers=second).status_code == 200
+
+def test_sessions_can_be_listed_and_revoked(client, db):
+    user, first, second = _signed_in_twice(client)
+    sessions = client.get("/auth/sessions", headers=first).json()
+    assert len(sessions) == 2
+    other = next(session for session in sessions if not session["current"])
+
+    assert client.delete(f"/auth/sessions/{other['id']}", headers=first).status_code == 200
+    assert client.get("/auth/me", headers=second).status_code == 401
+    assert client.delete(f"/auth/sessions/{other['id']}", headers=first).status_code == 404
+    # Nobody else's sessions
+    stranger = register(client)
+    current = next(session for session in sessions if session["current"])
+    assert client.delete(f"/auth/sessions/{current['id']}", headers=stranger["headers"]).status_code == 404
+
+    third = _login(client, client.get("/auth/me", headers=first).json()["email"])
+    assert client.post("/auth/sessions/revoke-others", headers=first).json() == {"revoked": 1}
+    assert client.get("/auth/me", headers=third).status_code == 401
+    assert client.get("/auth/me", headers=first).status_code == 200
+
+def test_validation_is_served_from_the_cache(client, db):
+    user = register(client)
+    client.get("/auth/me", headers=user["headers"])
+    before = dict(auth_sessions.cache.counters)
+    for _ in range(3):
+        assert client.get("/auth/me", headers=user["headers"]).status_code == 200
+    assert auth_sessions.cache.counters["hits"] - before["hits"] == 3
+    assert auth_sessions.cache.counters["misses"] == before["misses"]
+
+def test_revocations_by_other_workers_are_polled(client, db, poll_every_request):
+    user, first, second = _signed_in_twice(client)
+    assert client.get("/auth/me", headers=first).status_code == 200
+    # Revoked straight in the database, as another worker's commit would be
+    session = db.SessionLocal()
+    session.query(models.UserSession).filter(models.UserSession.user_id == user["id"]).update(
+        {models.UserSession.revoked_at: datetime.utcnow()}
+    )
+    session.commit()
+    session.close()
+    assert client.get("/auth/me", headers=first).status_code == 401
+    assert client.get("/auth/me", headers=second).status_code == 401
+
+def test_deactivating_a_user_ends_their_cached_sessions(client, db):
+    user = register(client)
+    assert client.get("/auth/me", headers=user["headers"]).status_code == 200
+    session = db.SessionLocal()
+    session.query(models.User).filter(models.User.id == user["id"]).one().is_active = False
+    session.commit()
+    session.close()
+    assert client.get("/auth/me", headers=user["headers"]).status_code == 401
+
+def test_last_seen_is_written_behind_in_one_batch(client, db):
+    users = [register(client) for _ in range(3)]
+    auth_sessions.cache.flush_last_seen()
+    before = auth_sessions.cache.counters["last_seen_writes"]
+    for user in users:
+        for _ in range(2):
+            assert client.get("/auth/me", headers=user["headers"]).status_code == 200
+
+    session = db.SessionLocal()
+    ids = [user["id"] for user in users]
+
+    def last_seen() -> dict:
+        session.expire_all()
+        return dict(session.query(models.UserSession.id, models.UserSession.last_seen_at).filter(
+            models.UserSession.user_id.in_(ids)))
+
+    written = last_seen()
+    # One pending time per session, however many requests it made
+    assert auth_sessions.cache.stats()["pending_last_seen"] == 3
+    assert auth_sessions.cache.flush_last_seen() == 3
+    assert auth_sessions.cache.counters["last_seen_writes"] - before == 3
+    for sid, seen in last_seen().items():
+        assert seen is not None
+        assert written[sid] is None or seen > written[sid]
+    session.close()
@@ -0,0 +1,98 @@
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select
+
+import models
+import sharding
+
+def _route(statement) -> list:
+    return sharding.router.execute_chooser(SimpleNamespace(statement=statement))
+
+def _pool(db, owner_id: str) -> str:
+    pool_id = str(uuid.uuid4())
+    session = db.SessionLocal()
+    session.add(models.Pool(id=pool_id, name="Pool", owner_id=owner_id, created_at=datetime.utcnow()))
+    session.commit()
+    session.close()
+    return pool_id
+
+@pytest.fixture
+def shards(db):
+    if db.mode != "shards":
+        pytest.skip("routing only applies with shards")
+    user_id = str(uuid.uuid4())
+    session = db.SessionLocal()
+    session.add(models.User(id=user_id, email=f"{uuid.uuid4().hex[:12]}@example.com", hashed_password="x",
+                            created_at=datetime.utcnow()))
+    session.commit()
+    session.close()
+    # Enough pools that both shards hold one
+    pools = {}
+    while len(pools) < 2:
+        pool_id = _pool(db, user_id)
+        pools.setdefault(sharding.shard_map.pool_shard(pool_id), pool_id)
+    return SimpleNamespace(db=db, user_id=user_id, pools=pools)
+
+def test_statements_go_to_the_pools_shard(shards):
+    for shard, pool_id in shards.pools.items():
+        assert _route(select(models.Pool).where(models.Pool.id == pool_id)) == [shard]
+        assert _route(select(models.Entry).where(models.Entry.pool_id == pool_id)) == [shard]
+
+    both = list(shards.pools.values())
+    assert _route(select(models.Entry).where(models.Entry.pool_id.in_(both))) == ["a", "b"]
+
+def test_entry_criteria_find_the_entry_shard(shards):
+    shard, pool_id = next(iter(shards.pools.items()))
+    entry_id = str(uuid.uuid4())
+    session = shards.db.SessionLocal()
+    session.add(models.Entry(id=entry_id, pool_id=pool_id, user_id=shards.user_id, name="Entry",
+                             created_at=datetime.utcnow()))
+    session.commit()
+    session.close()
+
+    assert _route(select(models.Pick).where(models.Pick.entry_id == entry_id)) == [shard]
+    # Unknown entries have no rows anywhere; one database answers that
+    assert _route(select(models.Pick).where(models.Pick.entry_id == str(uuid.uuid4()))) == [sharding.GLOBAL]
+
+def test_unrestricted_and_global_statements(shards):
+    assert _route(select(models.Pool)) == [sharding.GLOBAL, "a", "b"]
+    assert _route(select(models.User).where(models.User.id == shards.user_id)) == [sharding.GLOBAL]
+    assert _route(select(models.Team)) == [sharding.GLOBAL]
+
+def test_pools_created_before_sharding_stay_on_the_primary(shards):
+    pool_id = str(uuid.uuid4())
+    # No pool_shards row, as for pools that predate SHARD_URLS
+    with shards.db.engine.begin() as conn:
+        conn.execute(models.Pool.__table__.insert().values(id=pool_id, name="Legacy", owner_id=shards.user_id,
+                                                           created_at=datetime.utcnow()))
+    assert _route(select(models.Pool).where(models.Pool.id == pool_id)) == [sharding.GLOBAL]
+    session = shards.db.SessionLocal()
+    assert session.query(models.Pool).filter(models.Pool.id == pool_id).one().name == "Legacy"
+    session.close()
+
+def test_joining_sharded_and_global_tables_is_refused(shards):
+    pool_id = next(iter(shards.pools.values()))
+    statement = select(models.Pool.name, models.User.email).join(
+        models.User, models.User.id == models.Pool.owner_id
+    ).where(models.Pool.id == pool_id)
+    with pytest.raises(sharding.CrossShardQuery):
+        _route(statement)
+
+    session = shards.db.SessionLocal()
+    try:
+        with pytest.raises(sharding.CrossShardQuery):
+            session.query(models.Pick).join(models.Team, models.Team.id == models.Pick.team_id).all()
+    finally:
+        session.close()
+
+def test_shard_urls_are_validated():
+    assert sharding.parse_shard_urls("a=sqlite:///a.db, b=sqlite:///b.db") == {
+        "a": "sqlite:///a.db", "b": "sqlite:///b.db"
+    }
+    with pytest.raises(ValueError):
+        sharding.parse_shard_urls("global=sqlite:///g.db")
+    with pytest.raises(ValueError):
+        sharding.parse_shard_urls("a")
@@ -0,0 +1,164 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from singleflight import SingleFlight
+
+def _wait_for_followers(flight: SingleFlight, count: int):
+    while flight.shared < count:
+        pass
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+    results = []
+
+    def work():
+        calls.append(1)
+        release.wait(5)
+        return "result"
+
+    threads = [threading.Thread(target=lambda: results.append(flight.do("key", work))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    _wait_for_followers(flight, 4)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [1]
+    assert results == ["result"] * 5
+    assert (flight.executed, flight.shared) == (1, 4)
+    # Nothing is kept afterwards
+    assert flight.do("key", lambda: "again") == "again"
+
+def test_followers_get_the_leaders_exception():
+    flight = SingleFlight()
+    release = threading.Event()
+    errors = []
+
+    def work():
+        release.wait(5)
+        raise ValueError("boom")
+
+    def call():
+        try:
+            flight.do("key", work)
+        except ValueError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    _wait_for_followers(flight, 2)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert [str(e) for e in errors] == ["boom"] * 3
+
+def test_interrupted_leader_hands_over_to_a_follower():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+    results = []
+    interrupted = []
+
+    def work():
+        calls.append(1)
+        if len(calls) == 1:
+            release.wait(5)
+            raise KeyboardInterrupt
+        time.sleep(0.1)
+        return "result"
+
+    def leader():
+        try:
+            flight.do("key", work)
+        except KeyboardInterrupt:
+            interrupted.append(1)
+
+    threads = [threading.Thread(target=leader)]
+    threads[0].start()
+    while not calls:
+        pass
+    threads += [threading.Thread(target=lambda: results.append(flight.do("key", work))) for _ in range(3)]
+    for thread in threads[1:]:
+        thread.start()
+    _wait_for_followers(flight, 3)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert interrupted == [1]
+    assert len(calls) == 2
+    assert results == ["result"] * 3
+
+def test_async_callers_share_one_call():
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def main():
+        return await asyncio.gather(*(flight.do_async("key", work) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["result"] * 5
+    assert calls == [1]
+
+def test_cancelled_async_follower_leaves_the_call_running():
+    flight = SingleFlight()
+
+    async def main():
+        gate = asyncio.Event()
+
+        async def work():
+            await gate.wait()
+            return "result"
+
+        leader = asyncio.create_task(flight.do_async("key", work))
+        await asyncio.sleep(0)
+        followers = [asyncio.create_task(flight.do_async("key", work)) for _ in range(3)]
+        await asyncio.sleep(0)
+        followers[0].cancel()
+        await asyncio.sleep(0)
+        gate.set()
+        results = await asyncio.gather(leader, *followers[1:])
+        with pytest.raises(asyncio.CancelledError):
+            await followers[0]
+        return results
+
+    assert asyncio.run(main()) == ["result"] * 3
+
+def test_cancelled_async_leader_does_not_cancel_its_followers():
+    flight = SingleFlight()
+    calls = []
+
+    async def main():
+        gate = asyncio.Event()
+
+        async def work():
+            calls.append(1)
+            if len(calls) == 1:
+                await gate.wait()
+            await asyncio.sleep(0.05)
+            return "result"
+
+        leader = asyncio.create_task(flight.do_async("key", work))
+        await asyncio.sleep(0)
+        followers = [asyncio.create_task(flight.do_async("key", work)) for _ in range(3)]
+        await asyncio.sleep(0)
+        leader.cancel()
+        results = await asyncio.gather(*followers)
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return results
+
+    assert asyncio.run(main()) == ["result"] * 3
+    # One follower took over and ran the work once more for the rest
+    assert len(calls) == 2
@@ -0,0 +1,67 @@
+import pytest
+from sqlalchemy import text
+
+import versions
+from conftest import create_entry, create_pool, register
+
+@pytest.fixture
+def fresh_versions(monkeypatch):
+    # Re-read every version instead of trusting it for a few seconds
+    monkeypatch.setattr(versions, "TABLE_VERSION_TTL_SECONDS", 0)
+    monkeypatch.setattr(versions, "POOL_VERSION_TTL_SECONDS", 0)
+
+def test_schedule_answers_304_until_a_result_is_written(client, db, fresh_versions):
+    response = client.get("/schedule/week/1")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    game_id = response.json()[0]["game_id"]
+    home_team_id = response.json()[0]["home_team"]["id"]
+    assert client.get("/schedule/week/1", headers={"If-None-Match": etag}).status_code == 304
+
+    # Results are written straight to the table, outside the app
+    with db.engine.begin() as conn:
+        conn.execute(text("UPDATE Schedule SET winning_team_id = :team WHERE game_id = :game"),
+                     {"team": str(home_team_id), "game": game_id})
+
+    response = client.get("/schedule/week/1", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    game = next(game for game in response.json() if game["game_id"] == game_id)
+    assert game["winning_team_id"] == str(home_team_id)
+    # The whole-season payload was cached too, and is rebuilt as well
+    response = client.get("/schedule/")
+    assert next(game for game in response.json() if game["game_id"] == game_id)["winning_team_id"] == \
+        str(home_team_id)
+
+def test_team_changes_move_the_teams_and_schedule_etags(client, db, fresh_versions):
+    teams_etag = client.get("/teams/").headers["etag"]
+    schedule_etag = client.get("/schedule/week/1").headers["etag"]
+    with db.engine.begin() as conn:
+        conn.execute(text("UPDATE teams SET logo = 'new.png' WHERE abbrv = 'PHI'"))
+
+    response = client.get("/teams/", headers={"If-None-Match": teams_etag})
+    assert response.status_code == 200
+    assert next(team for team in response.json() if team["abbrv"] == "PHI")["logo"] == "new.png"
+    # Schedule payloads embed the teams
+    assert client.get("/schedule/week/1", headers={"If-None-Match": schedule_etag}).status_code == 200
+
+def test_pool_etag_is_private_and_follows_pool_changes(client, db, fresh_versions):
+    owner = register(client)
+    pool = create_pool(client, owner)
+    response = client.get(f"/pools/{pool['id']}", headers=owner["headers"])
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"] == "private, no-cache"
+    assert client.get(f"/pools/{pool['id']}", headers={**owner["headers"], "If-None-Match": etag}).status_code == 304
+
+    # No 304 without credentials, and another user's validator never matches
+    assert client.get(f"/pools/{pool['id']}", headers={"If-None-Match": etag}).status_code in (401, 403)
+    other = register(client)
+    response = client.get(f"/pools/{pool['id']}", headers={**other["headers"], "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+    create_entry(client, owner, pool["id"])
+    response = client.get(f"/pools/{pool['id']}", headers={**owner["headers"], "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
@@ -0,0 +1,69 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+
+import main
+import response_cache
+import warmup
+
+@pytest.fixture
+def state(monkeypatch):
+    """A fresh warm-up state, the one /health/ready reports."""
+    state = warmup.WarmupState()
+    monkeypatch.setattr(warmup, "state", state)
+    monkeypatch.setattr(warmup.time, "sleep", lambda seconds: None)
+    return state
+
+def test_ready_only_once_warmed_up(client, db, state):
+    response = client.get("/health/ready")
+    assert response.status_code == 503
+    assert response.json()["ready"] is False
+
+    response_cache.cache.clear()
+    warmup.run(state)
+    response = client.get("/health/ready")
+    assert response.status_code == 200
+    assert response.json()["ready"] is True
+    assert response.json()["attempts"] == 1
+    # The first requests find their payloads already built
+    assert ("teams",) in response_cache.cache._entries
+
+def test_failed_attempts_are_retried(monkeypatch, state):
+    failures = ["database is starting up", "database is starting up"]
+
+    def warm_up():
+        if failures:
+            raise RuntimeError(failures.pop())
+
+    monkeypatch.setattr(warmup, "warm_up", warm_up)
+    warmup.run(state)
+    assert state.ready and state.error is None
+    assert state.attempts == 3
+
+def test_not_ready_after_the_last_attempt(monkeypatch, state):
+    monkeypatch.setattr(warmup, "WARMUP_MAX_ATTEMPTS", 2)
+
+    def warm_up():
+        raise RuntimeError("connection refused")
+
+    monkeypatch.setattr(warmup, "warm_up", warm_up)
+    warmup.run(state)
+    assert not state.ready
+    assert state.attempts == 2
+    response = TestClient(main.app).get("/health/ready")
+    assert response.status_code == 503
+    assert response.json()["error"] == "connection refused"
+
+def test_disabled_warmup_is_ready_at_once(monkeypatch, state):
+    monkeypatch.setattr(warmup, "WARMUP_ENABLED", False)
+    warmup.start(state)
+    assert state.ready and state.attempts == 0
+
+def test_fill_pool_opens_up_to_the_pool_size(monkeypatch):
+    monkeypatch.setattr(warmup, "WARMUP_CONNECTIONS", 5)
+    engine = create_engine("sqlite:///:memory:", pool_size=3, poolclass=QueuePool)
+    warmup._fill_pool(engine)
+    assert engine.pool.checkedin() == 3
+    # Pools without a size of their own are filled too
+    warmup._fill_pool(create_engine("sqlite://"))
@@ -0,0 +1,84 @@
+import threading
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+import database
+import models
+
+def test_concurrent_writers_all_commit(tmp_path):
+    engine = database.make_engine(f"sqlite:///{tmp_path / 'writes.db'}")
+    models.Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    writes = database.write_queues[engine]
+    errors = []
+
+    def write(rows: int):
+        for _ in range(rows):
+            db = Session()
+            try:
+                # Read first, then upgrade to a write: the case SQLite's busy handler loses
+                db.query(models.AuditLog).count()
+                db.add(models.AuditLog(id=str(uuid.uuid4()), action="test", created_at=datetime.utcnow()))
+                db.flush()
+                db.query(models.AuditLog).count()
+                db.commit()
+            except Exception as e:
+                errors.append(e)
+                db.rollback()
+            finally:
+                db.close()
+
+    threads = [threading.Thread(target=write, args=(25,)) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    db = Session()
+    assert db.query(models.AuditLog).count() == 16 * 25
+    db.close()
+    stats = writes.stats()
+    assert stats["waiting"] == 0
+    assert stats["counters"]["timeouts"] == 0
+    assert stats["counters"]["writes"] >= 16 * 25
+    engine.dispose()
+
+def test_writers_take_turns_in_arrival_order():
+    writes = database.WriteQueue(timeout=5)
+    first = object()
+    writes.acquire(first)
+    order = []
+
+    def writer(name: str):
+        holder = object()
+        writes.acquire(holder)
+        order.append(name)
+        writes.release(holder)
+
+    threads = []
+    for name in "abc":
+        thread = threading.Thread(target=writer, args=(name,))
+        thread.start()
+        threads.append(thread)
+        # Queue them one at a time so arrival order is known
+        while writes.stats()["waiting"] < len(threads):
+            pass
+    writes.release(first)
+    for thread in threads:
+        thread.join()
+    assert order == ["a", "b", "c"]
+
+def test_writer_gives_up_after_timeout():
+    writes = database.WriteQueue(timeout=0.05)
+    holder = object()
+    writes.acquire(holder)
+    with pytest.raises(TimeoutError):
+        writes.acquire(object())
+    assert writes.stats()["counters"]["timeouts"] == 1
+    assert writes.stats()["waiting"] == 0
+    writes.release(holder)
+    writes.acquire(object())
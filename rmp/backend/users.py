@@ -3,29 +3,44 @@ from sqlalchemy.orm import Session
 import models
 import schemas
 import deps
+import deletion
+import auth_sessions
 from typing import List
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 @router.get("/", response_model=List[schemas.UserOut])
-def list_users(skip: int = 0, limit: int = 100, db: Session = Depends(deps.get_db)):
+def list_users(skip: int = 0, limit: int = 100, db: Session = Depends(deps.get_read_db)):
     return db.query(models.User).offset(skip).limit(limit).all()
 
 @router.get("/{user_id}", response_model=schemas.UserOut)
-def get_user(user_id: int, db: Session = Depends(deps.get_db)):
+def get_user(user_id: int, db: Session = Depends(deps.get_read_db)):
     user = db.query(models.User).filter(models.User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
-@router.delete("/{user_id}")
-def delete_user(user_id: int, db: Session = Depends(deps.get_db)):
+@router.delete("/{user_id}", status_code=202)
+def delete_user(
+    user_id: str,
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.get_current_user)
+):
+    """
+    Delete an account (your own, or any as a super-admin). The account is
+    disabled immediately; its entries, picks, admin roles and messages are
+    purged in the background by the returned job.
+    """
+    if current_user.id != user_id and current_user.role != models.UserRole.SUPER_ADMIN:
+        raise HTTPException(status_code=403, detail="You can only delete your own account")
     user = db.query(models.User).filter(models.User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    db.delete(user)
+    if db.query(models.Pool.id).filter(models.Pool.owner_id == user_id).first():
+        raise HTTPException(status_code=409, detail="Delete or hand over the user's pools first")
+    job = deletion.delete_user(db, user, current_user.id)
     db.commit()
-    return {"ok": True}
+    return {"ok": True, "job_id": job.id}
 
 @router.patch("/{user_id}/email")
 def update_email(user_id: int, email: str, db: Session = Depends(deps.get_db)):
@@ -43,6 +58,7 @@ def reset_password(user_id: int, password: str, db: Session = Depends(deps.get_d
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     user.hashed_password = password  # Should hash in real impl
+    auth_sessions.revoke_user_sessions(db, user.id)
     db.commit()
     db.refresh(user)
     return user
@@ -0,0 +1,203 @@
+import hashlib
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+
+import deps
+import models
+from database import SessionLocal
+from invalidation import bus
+
+# How long a version read from the database is trusted before re-reading it.
+# Pool writes made by this worker invalidate immediately; writes on other
+# workers become visible within this window. The teams and schedule versions
+# are bumped by database triggers (see migrate.VersionTriggers) on every
+# change, whoever makes it, and are re-read at most this often.
+POOL_VERSION_TTL_SECONDS = float(os.getenv("POOL_VERSION_TTL_SECONDS", 1))
+TABLE_VERSION_TTL_SECONDS = float(os.getenv("TABLE_VERSION_TTL_SECONDS", 5))
+# Secret mixed into every ETag so clients cannot compute validators
+# themselves; change it to invalidate every ETag when a deploy changes
+# response shapes. Without one each process picks a random salt, which is
+# safe but means workers never share ETags.
+ETAG_SALT = os.getenv("ETAG_SALT") or secrets.token_hex(16)
+
+TEAMS = "teams"
+SCHEDULE = "schedule"
+
+class VersionCache:
+    """Small TTL cache of version numbers keyed by table name or pool id."""
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._values = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, ttl: float, loader):
+        now = time.monotonic()
+        with self._lock:
+            cached = self._values.get(key)
+            if cached is not None and cached[1] > now:
+                return cached[0]
+        value = loader()
+        with self._lock:
+            self._values[key] = (value, now + ttl)
+            self._values.move_to_end(key)
+            if len(self._values) > self.max_keys:
+                self._values.popitem(last=False)
+        return value
+
+    def invalidate(self, key):
+        with self._lock:
+            self._values.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+cache = VersionCache()
+# Entries never move between pools, so this mapping never goes stale
+_entry_pools = VersionCache()
+
+def with_session(query, db: Session = None):
+    """query(db), or query on a session of its own when the caller has none."""
+    if db is not None:
+        return query(db)
+    db = SessionLocal()
+    try:
+        return query(db)
+    finally:
+        db.close()
+
+# Callers holding a session (a request's) pass it as db: a cache miss then
+# reads through it rather than checking out a second pool connection.
+
+def table_version(name: str, db: Session = None) -> int:
+    return cache.get(("table", name), TABLE_VERSION_TTL_SECONDS, lambda: with_session(
+        lambda session: session.query(models.DataVersion.version).filter(
+            models.DataVersion.name == name
+        ).scalar() or 0, db
+    ))
+
+def reference_version(scope: str, db: Session = None) -> tuple:
+    """Version tuple of the reference data a TEAMS or SCHEDULE payload is built from."""
+    if scope == SCHEDULE:
+        # Schedule payloads embed team details, so both versions count
+        return (table_version(SCHEDULE, db), table_version(TEAMS, db))
+    return (table_version(TEAMS, db),)
+
+def pool_version(pool_id: str):
+    """The pool's change version, or None if the pool does not exist."""
+    def load(db):
+        row = db.query(func.coalesce(models.Pool.change_version, 0)).filter(models.Pool.id == pool_id).first()
+        return row[0] if row else None
+    return cache.get(("pool", pool_id), POOL_VERSION_TTL_SECONDS, lambda: with_session(load))
+
+def entry_pool_id(entry_id: str):
+    return _entry_pools.get(entry_id, 3600, lambda: with_session(
+        lambda db: db.query(models.Entry.pool_id).filter(models.Entry.id == entry_id).scalar()
+    ))
+
+def touch_pool(db: Session, pool_id: str):
+    """Mark a pool's cached version stale once the caller's transaction commits."""
+    db.info.setdefault("touched_versions", set()).add(("pool", pool_id))
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    touched = session.info.pop("touched_versions", ())
+    for key in touched:
+        cache.invalidate(key)
+    if touched:
+        # Other workers evict the same versions when the bus delivers this
+        bus.publish("version", [list(key) for key in touched])
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop("touched_versions", None)
+
+bus.subscribe("version", lambda key: cache.invalidate(tuple(key)))
+bus.on_reset(cache.clear)
+
+def make_etag(*parts) -> str:
+    digest = hashlib.sha1(":".join(str(part) for part in (ETAG_SALT,) + parts).encode()).hexdigest()
+    return f'"{digest[:20]}"'
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        # Compressed representations carry an encoding suffix (see response_cache)
+        for suffix in ('-gzip"', '-br"'):
+            if candidate.endswith(suffix):
+                candidate = candidate[:-len(suffix)] + '"'
+        if candidate == etag:
+            return True
+    return False
+
+class ConditionalGet:
+    """
+    Dependency that derives a strong ETag from version counters and answers
+    If-None-Match with 304 before the handler queries or serializes anything.
+
+    scope is TEAMS or SCHEDULE for reference data, "pool" for routes with a
+    pool_id path parameter, or "entry" for routes with an entry_id. Pool and
+    entry responses are private; use UserConditionalGet for them. parts, if
+    given, returns more values the response depends on (the season, say).
+    """
+
+    def __init__(self, scope: str, cache_control: str = "private, no-cache", parts=None):
+        self.scope = scope
+        self.cache_control = cache_control
+        self.parts = parts
+
+    def __call__(self, request: Request, response: Response):
+        return self.check(request, response)
+
+    def check(self, request: Request, response: Response, *extra):
+        if self.scope in (TEAMS, SCHEDULE):
+            parts = [self.scope, *reference_version(self.scope)]
+        else:
+            if self.scope == "entry":
+                pool_id = entry_pool_id(request.path_params["entry_id"])
+            else:
+                pool_id = request.path_params["pool_id"]
+            version = pool_version(pool_id) if pool_id else None
+            if version is None:
+                # Unknown pool or entry; let the handler produce its usual 404
+                return None
+            parts = [self.scope, pool_id, version]
+
+        parts.append(request.url.path)
+        parts.append(request.url.query)
+        if self.parts is not None:
+            parts.extend(self.parts())
+        parts.extend(extra)
+
+        etag = make_etag(*parts)
+        headers = {"ETag": etag, "Cache-Control": self.cache_control}
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _matches(if_none_match, etag):
+            raise HTTPException(status_code=304, headers=headers)
+
+        response.headers.update(headers)
+        return etag
+
+class UserConditionalGet(ConditionalGet):
+    """
+    ConditionalGet for responses that depend on who is asking. The caller is
+    authenticated before any version is looked up, so a 304 is never sent in
+    place of a 401, and their user id is mixed into the ETag so one user's
+    validator never matches another user's response.
+    """
+
+    def __call__(self, request: Request, response: Response,
+                 current_user: models.User = Depends(deps.get_current_user)):
+        return self.check(request, response, current_user.id)
@@ -0,0 +1,112 @@
+import logging
+import os
+import threading
+import time
+
+from sqlalchemy import and_
+
+import models
+import database
+import sharding
+import schedule
+import teams
+
+AUTO_CREATE_SCHEMA = os.getenv("AUTO_CREATE_SCHEMA", "false").lower() in ("1", "true", "yes")
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() in ("1", "true", "yes")
+# Connections opened per engine before the worker reports ready
+WARMUP_CONNECTIONS = int(os.getenv("WARMUP_CONNECTIONS", 5))
+WARMUP_MAX_ATTEMPTS = int(os.getenv("WARMUP_MAX_ATTEMPTS", 5))
+
+logger = logging.getLogger(__name__)
+
+class WarmupState:
+    def __init__(self):
+        self.ready = False
+        self.error = None
+        self.attempts = 0
+        self.seconds = None
+
+    def as_dict(self) -> dict:
+        return {
+            "ready": self.ready,
+            "error": self.error,
+            "attempts": self.attempts,
+            "seconds": self.seconds,
+        }
+
+state = WarmupState()
+
+def _fill_pool(engine):
+    # Open the connections together so the pool keeps all of them
+    count = WARMUP_CONNECTIONS
+    # QueuePool's size is a method; SingletonThreadPool's is a plain int
+    size = getattr(engine.pool, "size", None)
+    if callable(size):
+        count = min(count, size())
+    connections = []
+    try:
+        for _ in range(count):
+            connections.append(engine.connect())
+    finally:
+        for connection in connections:
+            connection.close()
+
+def _compile_hot_queries(db):
+    # Run the pick-deadline queries once with placeholder values so their
+    # compiled SQL is cached before the first real request needs it.
+    db.query(models.User).filter(models.User.email == "").first()
+    db.query(models.Entry).filter(models.Entry.id == "", models.Entry.user_id == "").first()
+    db.query(models.Pick).filter(and_(models.Pick.entry_id == "", models.Pick.week == 0)).first()
+    db.query(models.Pick.id).filter(and_(models.Pick.entry_id == "", models.Pick.team_id == 0)).first()
+    db.query(models.Pick).filter(models.Pick.entry_id == "").order_by(models.Pick.week).all()
+
+def warm_up():
+    """Open pooled connections, prime reference caches and compile hot queries."""
+    if AUTO_CREATE_SCHEMA:
+        models.Base.metadata.create_all(bind=database.engine)
+        for shard_engine in database.shard_engines.values():
+            sharding.create_shard_schema(shard_engine)
+
+    _fill_pool(database.engine)
+    if database.replica_engine is not None:
+        _fill_pool(database.replica_engine)
+    for shard_engine in database.shard_engines.values():
+        _fill_pool(shard_engine)
+
+    db = database.SessionLocal()
+    try:
+        teams.prime_cache(db)
+        teams.team_map.load(db)
+        schedule.prime_cache(db)
+        _compile_hot_queries(db)
+    finally:
+        db.close()
+
+def run(state: WarmupState = state):
+    """Warm up, retrying with backoff while the database is unreachable."""
+    started = time.perf_counter()
+    delay = 0.5
+    while True:
+        state.attempts += 1
+        try:
+            warm_up()
+            break
+        except Exception as e:
+            state.error = str(e)
+            if state.attempts >= WARMUP_MAX_ATTEMPTS:
+                logger.error("warm-up failed after %d attempts: %s", state.attempts, e)
+                return
+            logger.warning("warm-up attempt %d failed, retrying in %.1fs: %s", state.attempts, delay, e)
+            time.sleep(delay)
+            delay = min(delay * 2, 10.0)
+
+    state.error = None
+    state.seconds = round(time.perf_counter() - started, 3)
+    state.ready = True
+
+def start(state: WarmupState = state):
+    """Warm up in the background so the server accepts connections immediately."""
+    if not WARMUP_ENABLED:
+        state.ready = True
+        return
+    threading.Thread(target=run, args=(state,), name="warmup", daemon=True).start()
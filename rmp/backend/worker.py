@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Standalone background job worker (see jobs.py).
+
+    python worker.py --workers 4
+
+Run this next to API processes started with JOB_WORKERS=0 so grading,
+deletes, exports and notifications never compete with request handling.
+"""
+
+import argparse
+import logging
+import signal
+import threading
+
+from dotenv import load_dotenv
+
+# Load environment variables before database builds its URL
+load_dotenv()
+
+import jobs
+import logs
+import notifications
+import invalidation
+import routers  # noqa: F401 - importing the API modules registers their job handlers
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=max(jobs.JOB_WORKERS, 1))
+    args = parser.parse_args()
+    logs.setup()
+
+    stopped = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopped.set())
+    signal.signal(signal.SIGINT, lambda *_: stopped.set())
+
+    # Job writes must evict the API workers' caches too
+    invalidation.bus.start()
+    jobs.runner.workers = args.workers
+    jobs.runner.start()
+    logging.getLogger(__name__).info("running %d job workers as %s", args.workers, jobs.runner.name)
+    while not stopped.wait(1):
+        pass
+    jobs.runner.stop()
+    notifications.mailer.close()
+    invalidation.bus.stop()
+    logs.stop()
+
+if __name__ == "__main__":
+    main()
@@ -75,13 +75,18 @@ echo "Updating ECS task definitions..."
 # Update backend task definition
 sed "s/YOUR_ACCOUNT_ID/$AWS_ACCOUNT_ID/g; s/YOUR_REGION/$AWS_REGION/g" ecs-backend-task-definition.json > ecs-backend-task-definition-${ENVIRONMENT}.json
 
+# Update worker task definition (same image as the backend)
+sed "s/YOUR_ACCOUNT_ID/$AWS_ACCOUNT_ID/g; s/YOUR_REGION/$AWS_REGION/g" ecs-worker-task-definition.json > ecs-worker-task-definition-${ENVIRONMENT}.json
+
 # Update frontend task definition
 sed "s/YOUR_ACCOUNT_ID/$AWS_ACCOUNT_ID/g; s/YOUR_REGION/$AWS_REGION/g" ecs-frontend-task-definition.json > ecs-frontend-task-definition-${ENVIRONMENT}.json
 
 echo "Task definition files created:"
 echo "- ecs-backend-task-definition-${ENVIRONMENT}.json"
+echo "- ecs-worker-task-definition-${ENVIRONMENT}.json"
 echo "- ecs-frontend-task-definition-${ENVIRONMENT}.json"
 
 echo "To deploy to ECS, run:"
 echo "aws ecs register-task-definition --cli-input-json file://ecs-backend-task-definition-${ENVIRONMENT}.json"
+echo "aws ecs register-task-definition --cli-input-json file://ecs-worker-task-definition-${ENVIRONMENT}.json"
 echo "aws ecs register-task-definition --cli-input-json file://ecs-frontend-task-definition-${ENVIRONMENT}.json"